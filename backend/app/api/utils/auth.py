@@ -7,14 +7,14 @@ import json
 import logging
 from fastapi import Request, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
-from app.models import User, UserStatus
+from app.models import UserStatus
+from app.services.user_cache import CachedUser, get_user_cache
 
 logger = logging.getLogger(__name__)
 
 
-async def require_approved_user(request: Request, db: AsyncSession) -> User:
+async def require_approved_user(request: Request, db: AsyncSession) -> CachedUser:
     """
     Require that the current user is approved.
 
@@ -22,7 +22,7 @@ async def require_approved_user(request: Request, db: AsyncSession) -> User:
     an approved user (not waitlist, rejected, or suspended).
 
     Returns:
-        User: The approved user object
+        CachedUser: The approved user (identity and status, from the user cache)
 
     Raises:
         HTTPException: 401 if not authenticated, 403 if not approved
@@ -30,10 +30,8 @@ async def require_approved_user(request: Request, db: AsyncSession) -> User:
     # Get user ID from auth
     user_id = await get_current_user_id(request)
 
-    # Look up user in database
-    query = select(User).where(User.auth0_id == user_id)
-    result = await db.execute(query)
-    user = result.scalar_one_or_none()
+    # Look up user (cached; hits the database only on a miss)
+    user = await get_user_cache().get(db, user_id)
 
     if not user:
         logger.warning(f"User not found in database: {user_id}")
@@ -136,7 +134,7 @@ def _parse_token(token: str) -> str | None:
     return None
 
 
-async def get_or_create_user(db: AsyncSession, auth0_id: str) -> User:
+async def get_or_create_user(db: AsyncSession, auth0_id: str) -> CachedUser:
     """
     Get user by auth0_id. Raises 401 if user doesn't exist.
 
@@ -148,14 +146,12 @@ async def get_or_create_user(db: AsyncSession, auth0_id: str) -> User:
         auth0_id: The Auth0 user identifier
 
     Returns:
-        User: The user object
+        CachedUser: The user's identity and status (from the user cache)
 
     Raises:
         HTTPException: 401 if user not found (must login via Auth0 first)
     """
-    query = select(User).where(User.auth0_id == auth0_id)
-    result = await db.execute(query)
-    user = result.scalar_one_or_none()
+    user = await get_user_cache().get(db, auth0_id)
 
     if not user:
         logger.warning(f"User not found: {auth0_id}. Must login via Auth0 first.")
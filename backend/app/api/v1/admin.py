@@ -16,6 +16,7 @@ from app.core.infrastructure.database import get_db_session
 from app.models import User, UserStatus
 from app.api.v1.chat_projects import get_current_user_id
 from app.services.email_service import send_approval_email
+from app.services.user_cache import get_user_cache
 
 logger = logging.getLogger(__name__)
 
@@ -198,6 +199,7 @@ async def approve_user(
         target_user.rejection_reason = None  # Clear any previous rejection reason
 
         await db.commit()
+        get_user_cache().invalidate(target_user.auth0_id)
 
         logger.info(f"✅ Admin {admin_user.email} approved user {target_user.email}")
 
@@ -256,6 +258,7 @@ async def reject_user(
         target_user.approved_by = None
         
         await db.commit()
+        get_user_cache().invalidate(target_user.auth0_id)
         
         logger.info(f"❌ Admin {admin_user.email} rejected user {target_user.email}")
         
@@ -315,6 +318,7 @@ async def update_user(
             target_user.rejection_reason = update_data.rejection_reason
         
         await db.commit()
+        get_user_cache().invalidate(target_user.auth0_id)
         
         logger.info(f"✏️ Admin {admin_user.email} updated user {target_user.email}")
         
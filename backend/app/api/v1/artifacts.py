@@ -0,0 +1,71 @@
+"""
+Artifacts API - Content-addressed binary outputs (plots, images)
+
+Workflow events, stored workflow steps and tool results reference artifacts
+by sha256 instead of carrying base64 (see app/services/artifact_store.py).
+
+API Endpoints:
+  - GET  /{sha256}  - Artifact content (ETag, immutable caching, Range requests)
+  - HEAD /{sha256}  - Headers only
+"""
+
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1.files import get_user_uuid
+from app.core.infrastructure.database import get_db_session
+from app.services.artifact_store import get_artifact_store, is_valid_sha256
+
+router = APIRouter()
+
+# Content never changes for a given sha256
+CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag == etag or tag == f"W/{etag}" for tag in candidates)
+
+
+@router.api_route("/{sha256}", methods=["GET", "HEAD"])
+async def get_artifact(
+    sha256: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db_session),
+):
+    """
+    Serve an artifact by its sha256.
+
+    Supports If-None-Match (304), Range / If-Range (206) and HEAD. Only
+    owners of an artifact can read it (artifacts stored without an owner
+    are readable by any approved user).
+    """
+    if not is_valid_sha256(sha256):
+        raise HTTPException(status_code=404, detail="Artifact not found")
+
+    user_id = await get_user_uuid(request, db)
+
+    store = get_artifact_store()
+    path = await asyncio.to_thread(store.ensure_local, sha256)
+    # Same response for missing and foreign artifacts
+    if path is None or not store.can_read(sha256, user_id):
+        raise HTTPException(status_code=404, detail="Artifact not found")
+
+    etag = f'"{sha256}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    meta = store.get_meta(sha256) or {}
+    return FileResponse(
+        path=str(path),
+        media_type=meta.get("content_type", "application/octet-stream"),
+        headers=headers,
+    )
@@ -3,6 +3,7 @@ Chat Projects API - Project and Session CRUD, Message/Workflow Reading
 Note: Message sending is handled by V2 API (/api/v2/chat/projects)
 """
 
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, desc
@@ -14,6 +15,7 @@ import uuid
 from app.core.infrastructure.database import get_db_session
 from app.core.infrastructure.cloud_logging import get_logger
 from app.api.utils.auth import get_current_user_id, get_or_create_user
+from app.config import TOOLS_CONFIG
 from app.models.enums import UserStatus
 
 logger = get_logger(__name__)
@@ -32,6 +34,25 @@ from pydantic import BaseModel
 
 router = APIRouter()
 
+# Projects whose sandbox tools are being preloaded (one warm-up at a time per project)
+_preloading_projects: set = set()
+# Running preload tasks (the event loop only keeps weak references to tasks)
+_preload_tasks: set = set()
+
+
+async def _preload_project_tools(user_id: str, project_id: str):
+    """Execute a project's sandbox tools in the background so the first workflow finds them cached."""
+    if project_id in _preloading_projects:
+        return
+    _preloading_projects.add(project_id)
+    try:
+        from app.core.tools.tool_manager.tool_module_cache import get_tool_module_cache
+        await asyncio.to_thread(get_tool_module_cache().warm_project, user_id, project_id)
+    except Exception as e:
+        logger.warning(f"⚠️ Tool preload failed for project {project_id}: {e}")
+    finally:
+        _preloading_projects.discard(project_id)
+
 
 # Request models
 class CreateProjectRequest(BaseModel):
@@ -252,6 +273,12 @@ async def get_project(
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
 
+    # Owner opened the project: warm up its tools for the first workflow
+    if TOOLS_CONFIG.get("preload_project_tools", True):
+        task = asyncio.create_task(_preload_project_tools(str(user.id), project_id))
+        _preload_tasks.add(task)
+        task.add_done_callback(_preload_tasks.discard)
+
     # Build sessions with message counts
     sessions = []
     for session in project.sessions:
@@ -30,13 +30,12 @@ from typing import Optional
 import uuid
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from fastapi import Depends
 
 from app.api.v1.auth import get_current_user_id
 from app.core.infrastructure.database import get_db_session
-from app.models.database import User
 from app.models.enums import UserStatus
+from app.services.user_cache import get_user_cache
 
 router = APIRouter()
 
@@ -44,9 +43,7 @@ router = APIRouter()
 async def get_user_uuid(request: Request, db: AsyncSession) -> str:
     """Get user UUID from auth0_id for sandbox operations. Requires approved user."""
     auth0_id = await get_current_user_id(request)
-    query = select(User).where(User.auth0_id == auth0_id)
-    result = await db.execute(query)
-    user = result.scalar_one_or_none()
+    user = await get_user_cache().get(db, auth0_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -21,11 +21,38 @@ async def get_system_status():
     """Get comprehensive system status (V2 compatible)"""
     import time
     from app.services.websocket_broadcast import websocket_broadcaster
+    from app.services.sandbox import get_kernel_pool, get_sync_manager, get_hydrator
+    from app.tools.screening_resources import get_resource_registry
+    from app.services.artifact_store import get_artifact_store
+    from app.core.tools.tool_manager.tool_catalog import get_tool_catalog
+    from app.core.tools.tool_manager.tool_module_cache import get_tool_module_cache
+    from app.core.engines.langchain.agent_templates import get_agent_template_pool
+    from app.core.engines.langchain.context_budget import get_context_budget
+    from app.services.http_client import get_http_client
+    from app.services.response_cache import get_response_cache
+    from app.tools.api_translation import get_api_translator
+    from app.core.infrastructure.logging_config import get_log_pipeline
+    from app.services.user_cache import get_user_cache
 
     # V2: Return system status without labos_service dependency
     status = {
         "labos_initialized": True,  # V2 always ready
         "websocket_connections": websocket_broadcaster.get_connection_count(),
+        "websocket": websocket_broadcaster.get_stats(),
+        "sandbox_kernels": get_kernel_pool().get_stats(),
+        "sandbox_sync": get_sync_manager().get_stats(),
+        "sandbox_hydration": get_hydrator().get_stats(),
+        "screening_resources": get_resource_registry().get_stats(),
+        "artifacts": get_artifact_store().get_stats(),
+        "tool_catalog": get_tool_catalog().get_stats(),
+        "tool_modules": get_tool_module_cache().get_stats(),
+        "agent_templates": get_agent_template_pool().get_stats(),
+        "context_budget": get_context_budget().get_stats(),
+        "http_clients": get_http_client().get_stats(),
+        "response_cache": get_response_cache().get_stats(),
+        "api_translation": get_api_translator().get_stats(),
+        "logging": get_log_pipeline().get_stats(),
+        "user_cache": get_user_cache().get_stats(),
         "version": "2.0",
         "engine": "langchain",
         "timestamp": time.time()
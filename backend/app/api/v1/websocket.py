@@ -4,13 +4,47 @@ WebSocket endpoints for real-time workflow updates
 
 import asyncio
 import json
-from typing import Dict, Set
+from typing import Dict, Optional, Set
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from app.services.workflows import workflow_service
+from app.services.workflows import workflow_service, workflow_event_queue
 from app.services.websocket_broadcast import websocket_broadcaster
 
 router = APIRouter()
 
+def _parse_seq(value) -> Optional[int]:
+    """A client-sent last_seq as int, or None if missing or malformed."""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        print(f"⚠️ Ignoring invalid last_seq: {value!r}")
+        return None
+
+
+def _replay_workflow(websocket: WebSocket, workflow_id: str, last_seq: int, project_id: str = None):
+    """
+    Queue the events a reconnecting client missed (seq > last_seq), then a
+    workflow_replay marker. complete=False means part of the gap is gone
+    (or the workflow ran elsewhere) and the client should reload the history.
+    """
+    events, complete = workflow_event_queue.replay(workflow_id, last_seq)
+    for event in events:
+        websocket_broadcaster.send_to(
+            websocket,
+            websocket_broadcaster.workflow_step_message(workflow_id, event.to_dict(), project_id)
+        )
+    websocket_broadcaster.send_to(websocket, {
+        "type": "workflow_replay",
+        "workflow_id": workflow_id,
+        "project_id": project_id,
+        "from_seq": last_seq,
+        "last_seq": events[-1].seq if events else last_seq,
+        "replayed": len(events),
+        "complete": complete
+    })
+    print(f"🔁 Replayed {len(events)} events of {workflow_id} after seq {last_seq} (complete={complete})")
+
 # Removed unused ConnectionManager - using websocket_broadcaster directly
 
 @router.websocket("/ws")
@@ -27,45 +61,56 @@ async def websocket_general_endpoint(websocket: WebSocket):
 
             # Handle different types of messages
             if message.get("type") == "ping":
-                await websocket.send_text(json.dumps({
+                websocket_broadcaster.send_to(websocket, {
                     "type": "pong",
                     "timestamp": message.get("timestamp"),
                     "workflow_id": message.get("workflow_id")
-                }))
+                })
                 print(f"📤 Sent pong response for workflow: {message.get('workflow_id')}")
             elif message.get("type") == "subscribe_project":
                 # Subscribe to project-specific messages
                 project_id = message.get("project_id")
                 if project_id:
+                    # Resume: replay missed events first, then join the room for live delivery.
+                    # Both happen before the next await, so no live event can slip in between.
+                    last_seqs = message.get("last_seq")
+                    for workflow_id, last_seq in (last_seqs.items() if isinstance(last_seqs, dict) else ()):
+                        last_seq = _parse_seq(last_seq)
+                        if last_seq is not None:
+                            _replay_workflow(websocket, workflow_id, last_seq, project_id)
                     websocket_broadcaster.subscribe_to_project(websocket, project_id)
-                    await websocket.send_text(json.dumps({
+                    websocket_broadcaster.send_to(websocket, {
                         "type": "subscribed",
                         "project_id": project_id
-                    }))
+                    })
                     print(f"📌 Client subscribed to project: {project_id}")
             elif message.get("type") == "unsubscribe_project":
                 # Unsubscribe from project
                 project_id = message.get("project_id")
                 if project_id:
                     websocket_broadcaster.unsubscribe_from_project(websocket, project_id)
-                    await websocket.send_text(json.dumps({
+                    websocket_broadcaster.send_to(websocket, {
                         "type": "unsubscribed",
                         "project_id": project_id
-                    }))
+                    })
                     print(f"📌 Client unsubscribed from project: {project_id}")
             elif message.get("type") == "subscribe_workflow":
                 workflow_id = message.get("workflow_id")
-                if workflow_id:
+                last_seq = _parse_seq(message.get("last_seq"))
+                if workflow_id and last_seq is not None:
+                    # Resume from the client's last seen event
+                    _replay_workflow(websocket, workflow_id, last_seq, message.get("project_id"))
+                elif workflow_id:
                     # Send workflow status
                     steps = workflow_service.get_workflow_steps(workflow_id)
                     progress = workflow_service.get_workflow_progress(workflow_id)
 
-                    await websocket.send_text(json.dumps({
+                    websocket_broadcaster.send_to(websocket, {
                         "type": "workflow_status",
                         "workflow_id": workflow_id,
                         "steps": [step.dict() for step in steps],
                         "progress": progress
-                    }))
+                    })
 
     except WebSocketDisconnect:
         websocket_broadcaster.disconnect(websocket)
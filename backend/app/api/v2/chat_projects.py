@@ -17,21 +17,20 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.engines.langchain.langchain_engine import (
     initialize_langchain_labos,
-    run_query,
-    langchain_agent
+    arun_query,
 )
 from app.core.engines.langchain.multi_agent_system import (
     initialize_multi_agent_system,
-    run_multi_agent_query,
-    get_multi_agent_system,
+    arun_multi_agent_query,
     _register_agents_to_system,
     MultiAgentSystem
 )
 from app.core.llm.config import get_default_agent_configs, merge_agent_configs
+from app.config import PERFORMANCE_CONFIG
 from app.core.engines.langchain.langchain_websocket_callback import LangChainWebSocketCallback
 from app.services.workflows.workflow_event_listener import start_workflow_listener, stop_workflow_listener
 from app.services.workflows.workflow_events import workflow_event_queue
-from app.services.workflows.workflow_database import WorkflowDatabase
+from app.services.workflows.workflow_database import WorkflowDatabase, WorkflowStepStreamWriter
 from app.models.database.chat import ChatMessage, ChatSession, MessageRole, ChatProject
 from app.models.database import User
 from app.models.enums import UserStatus
@@ -284,34 +283,25 @@ async def process_message_with_agent(
 
         # Process in background
         async def process_in_background():
+            step_writer = None
             try:
                 from app.services.workflows import set_workflow_context
 
-                def run_with_context():
-                    step_counter = {'count': 0}
-
+                def prepare_sandbox():
                     # Initialize sandbox for this user/project
                     from app.services.sandbox import get_sandbox_manager
                     sandbox = get_sandbox_manager()
-                    sandbox_root = sandbox.ensure_project_sandbox(user_id, project_id)
+                    return sandbox.ensure_project_sandbox(user_id, project_id)
 
-                    set_workflow_context(
-                        workflow_id=workflow_id,
-                        step_counter=step_counter,
-                        metadata={
-                            'user_id': user_id,
-                            'project_id': project_id,
-                            'sandbox_root': str(sandbox_root),
-                        },
-                        ws_callback=ws_callback
-                    )
+                def build_system():
                     if use_multi_agent:
                         # ===== Create Multi-Agent System with SANDBOX-SAFE tools =====
-                        from app.core.engines.langchain.multi_agent_system import create_workflow_multi_agent_system
                         from app.core.engines.smolagents.tool_adapter import batch_convert_tools
 
                         # Import SANDBOX-SAFE tools (restricted file access, no shell commands)
-                        from app.tools.core.sandbox_python import python_interpreter
+                        from app.tools.core.sandbox_python import (
+                            python_interpreter, inspect_kernel, reset_kernel, snapshot_kernel,
+                        )
                         from app.tools.core.sandbox_files import (
                             save_file, read_file, list_project_files,
                             save_binary_file, read_binary_file, delete_file, file_exists,
@@ -339,8 +329,8 @@ async def process_message_with_agent(
                         # - save_file/read_file: restricted to sandbox/{user}/{project}/
                         # - NO shell commands, NO package installation
                         smolagent_tools = [
-                            # Code execution (sandbox-restricted)
-                            python_interpreter,
+                            # Code execution (sandbox-restricted, persistent per-project kernel)
+                            python_interpreter, inspect_kernel, reset_kernel, snapshot_kernel,
                             # File operations (sandbox-restricted)
                             save_file, read_file, list_project_files,
                             save_binary_file, read_binary_file, delete_file, file_exists,
@@ -369,28 +359,51 @@ async def process_message_with_agent(
                             agent_llm_configs=final_configs  # Use merged configs
                         )
 
-                        # Run query
-                        return system.run(
-                            query=query_content,
-                            conversation_history=formatted_history,
-                            callbacks=callbacks
-                        )
-                    else:
-                        return run_query(
-                            query=query_content,
-                            conversation_history=formatted_history,
-                            callbacks=callbacks
-                        )
+                        return system
+                    return None
+
+                step_counter = {'count': 0}
+                sandbox_root = await asyncio.to_thread(prepare_sandbox)
+
+                # Workflow context is a ContextVar: set here, it belongs to this task only
+                set_workflow_context(
+                    workflow_id=workflow_id,
+                    step_counter=step_counter,
+                    metadata={
+                        'user_id': user_id,
+                        'project_id': project_id,
+                        'sandbox_root': str(sandbox_root),
+                    },
+                    ws_callback=ws_callback
+                )
 
-                loop = asyncio.get_event_loop()
-                with ThreadPoolExecutor() as executor:
-                    result = await loop.run_in_executor(executor, run_with_context)
+                # Optionally persist steps in micro-batches while the agent runs
+                if PERFORMANCE_CONFIG.get("stream_workflow_steps"):
+                    step_writer = WorkflowStepStreamWriter(session_id, workflow_id, ws_callback.collected_steps)
+                    if not await step_writer.start():
+                        step_writer = None
+
+                # Tool imports and agent setup are blocking; keep them off the event loop
+                system = await asyncio.to_thread(build_system)
+
+                # Agent loop runs natively on the event loop (streamed tokens, async tools)
+                if system is not None:
+                    result = await system.arun(
+                        query=query_content,
+                        conversation_history=formatted_history,
+                        callbacks=callbacks
+                    )
+                else:
+                    result = await arun_query(
+                        query=query_content,
+                        conversation_history=formatted_history,
+                        callbacks=callbacks
+                    )
 
                 logger.info(f"[V2] Processing completed")
 
                 # Emit completion step
-                # NOTE: Cannot use get_workflow_context() here because we're in async context
-                # but the context was set in the executor thread. Use workflow_id directly.
+                # Use workflow_id directly (ws_callback already holds the collected steps)
                 from app.services.workflows import workflow_event_queue
                 from app.services.workflows.workflow_events import WorkflowEvent
 
@@ -433,7 +446,7 @@ async def process_message_with_agent(
                     try:
                         from app.core.engines.langchain.multi_agent_system import generate_follow_up_questions as gen_followups
                         followup_executor = ThreadPoolExecutor(max_workers=1)
-                        follow_up_future = loop.run_in_executor(
+                        follow_up_future = asyncio.get_running_loop().run_in_executor(
                             followup_executor,
                             lambda: gen_followups(
                                 user_query=message_content,
@@ -479,29 +492,18 @@ async def process_message_with_agent(
                 )
                 logger.info(f"[V2] Saved AI response to database with {len(follow_up_questions)} follow-up questions, execution_id: {execution_id}")
 
-                # Save workflow steps AFTER WorkflowExecution is created
-                if ws_callback.collected_steps and execution_id:
-                    class StepObject:
-                        def __init__(self, step_dict):
-                            self.type = step_dict.get("step_type", "unknown")
-                            self.title = step_dict.get("title", "Untitled")
-                            self.description = step_dict.get("description", "")
-                            self.status = "completed"
-                            self.tool_name = step_dict.get("tool_name")
-                            self.tool_result = step_dict.get("tool_result")
-                            self.step_metadata = step_dict.get("step_metadata")
-
-                    saved_count = 0
-                    for i, step_dict in enumerate(ws_callback.collected_steps):
-                        step_obj = StepObject(step_dict)
-                        success = await WorkflowDatabase.save_workflow_step(
-                            session_id=session_id,
-                            workflow_id=workflow_id,
-                            step=step_obj,
-                            step_index=i + 1
-                        )
-                        if success:
-                            saved_count += 1
+                # Save workflow steps AFTER WorkflowExecution is created (one transaction)
+                if step_writer is not None:
+                    saved_count = await step_writer.close()
+                    step_writer = None
+                    logger.info(f"[V2] Saved {saved_count}/{len(ws_callback.collected_steps)} workflow steps (streamed)")
+                elif ws_callback.collected_steps and execution_id:
+                    saved_count = await WorkflowDatabase.save_workflow_steps_batch(
+                        session_id=session_id,
+                        workflow_id=workflow_id,
+                        steps=ws_callback.collected_steps,
+                        execution_id=execution_id
+                    )
                     logger.info(f"[V2] Saved {saved_count}/{len(ws_callback.collected_steps)} workflow steps")
 
                 # Send chat_completed WebSocket message
@@ -540,6 +542,8 @@ async def process_message_with_agent(
                 logger.error(f"[V2] Error processing message: {e}")
                 import traceback
                 traceback.print_exc()
+                if step_writer is not None:
+                    await step_writer.close(error=str(e))
                 # Import needed for cleanup in error case
                 from app.services.workflows.workflow_events import workflow_event_queue as wf_queue
                 await stop_workflow_listener(listener_task)
@@ -871,60 +875,60 @@ async def send_message_to_project_v2(
         # Create async processing task (like V1)
         async def process_in_background():
             """Process the query in background and save results"""
+            step_writer = None
             try:
                 # Import workflow context
                 from app.services.workflows import set_workflow_context
 
-                # Create wrapper function that sets context before running agent
-                def run_with_context():
-                    step_counter = {'count': 0}
+                step_counter = {'count': 0}
 
-                    # Initialize sandbox for this user/project
-                    from app.services.sandbox import get_sandbox_manager
-                    sandbox = get_sandbox_manager()
-                    sandbox_root = sandbox.ensure_project_sandbox(user_id, project_id)
+                # Initialize sandbox for this user/project (blocking I/O, off the event loop)
+                from app.services.sandbox import get_sandbox_manager
+                sandbox = get_sandbox_manager()
+                sandbox_root = await asyncio.to_thread(sandbox.ensure_project_sandbox, user_id, project_id)
 
-                    set_workflow_context(
-                        workflow_id=workflow_id,
-                        step_counter=step_counter,
-                        metadata={
-                            'user_id': user_id,
-                            'project_id': project_id,
-                            'sandbox_root': str(sandbox_root),
-                        },
-                        ws_callback=ws_callback  # CRITICAL: Pass callback for step collection
-                    )
-                    # Use multi-agent or single agent based on request parameter
-                    if request.use_multi_agent:
-                        mode_str = request.mode or "deep"
-                        logger.info(f"[V2] Running query with Multi-Agent System (mode={mode_str}, sandbox: {sandbox_root})")
-                        return run_multi_agent_query(
-                            query=request.content,
-                            conversation_history=formatted_history,
-                            callbacks=callbacks,
-                            mode=mode_str
-                        )
-                    else:
-                        logger.info(f"[V2] Running query with Single Agent (debug mode)")
-                        return run_query(
-                            query=request.content,
-                            conversation_history=formatted_history,
-                            callbacks=callbacks
-                        )
+                # Workflow context is a ContextVar: set here, it belongs to this task only
+                set_workflow_context(
+                    workflow_id=workflow_id,
+                    step_counter=step_counter,
+                    metadata={
+                        'user_id': user_id,
+                        'project_id': project_id,
+                        'sandbox_root': str(sandbox_root),
+                    },
+                    ws_callback=ws_callback  # CRITICAL: Pass callback for step collection
+                )
 
-                # Run query with chat history in thread executor
-                loop = asyncio.get_event_loop()
-                with ThreadPoolExecutor() as executor:
-                    result = await loop.run_in_executor(executor, run_with_context)
+                # Optionally persist steps in micro-batches while the agent runs
+                if PERFORMANCE_CONFIG.get("stream_workflow_steps"):
+                    step_writer = WorkflowStepStreamWriter(session_id_str, workflow_id, ws_callback.collected_steps)
+                    if not await step_writer.start():
+                        step_writer = None
+
+                # Run the agent loop natively on the event loop (streamed tokens, async tools)
+                if request.use_multi_agent:
+                    mode_str = request.mode or "deep"
+                    logger.info(f"[V2] Running query with Multi-Agent System (mode={mode_str}, sandbox: {sandbox_root})")
+                    result = await arun_multi_agent_query(
+                        query=request.content,
+                        conversation_history=formatted_history,
+                        callbacks=callbacks,
+                        mode=mode_str
+                    )
+                else:
+                    logger.info(f"[V2] Running query with Single Agent (debug mode)")
+                    result = await arun_query(
+                        query=request.content,
+                        conversation_history=formatted_history,
+                        callbacks=callbacks
+                    )
 
                 logger.info(f"[V2] Query completed, got result")
                 logger.info(f"[V2] Result keys: {result.keys()}")
                 logger.info(f"[V2] Result output: {result.get('output', 'NO OUTPUT')[:200]}")
                 logger.info(f"[V2] Result success: {result.get('success', 'NO SUCCESS FLAG')}")
 
-                # Emit completion workflow step
-                # NOTE: Cannot use get_workflow_context() here because we're in async context
-                # but the context was set in the executor thread. Use workflow_id directly.
+                # Emit completion workflow step (use workflow_id directly)
                 # NOTE: workflow_event_queue is imported at module level (line 34)
                 from app.services.workflows.workflow_events import WorkflowEvent
 
@@ -938,7 +942,7 @@ async def send_message_to_project_v2(
                     try:
                         from app.core.engines.langchain.multi_agent_system import generate_follow_up_questions as gen_followups
                         followup_executor = ThreadPoolExecutor(max_workers=1)
-                        follow_up_future = loop.run_in_executor(
+                        follow_up_future = asyncio.get_running_loop().run_in_executor(
                             followup_executor,
                             lambda: gen_followups(
                                 user_query=request.content,
@@ -1007,29 +1011,18 @@ async def send_message_to_project_v2(
                 )
                 logger.info(f"[V2] Saved AI response with {len(follow_up_questions)} follow-up questions, execution_id: {execution_id}")
 
-                # Save workflow steps AFTER WorkflowExecution is created
-                if ws_callback.collected_steps and execution_id:
-                    class StepObject:
-                        def __init__(self, step_dict):
-                            self.type = step_dict.get("step_type", "unknown")
-                            self.title = step_dict.get("title", "Untitled")
-                            self.description = step_dict.get("description", "")
-                            self.status = "completed"
-                            self.tool_name = step_dict.get("tool_name")
-                            self.tool_result = step_dict.get("tool_result")
-                            self.step_metadata = step_dict.get("step_metadata")
-
-                    saved_count = 0
-                    for i, step_dict in enumerate(ws_callback.collected_steps):
-                        step_obj = StepObject(step_dict)
-                        success = await WorkflowDatabase.save_workflow_step(
-                            session_id=session_id_str,
-                            workflow_id=workflow_id,
-                            step=step_obj,
-                            step_index=i + 1
-                        )
-                        if success:
-                            saved_count += 1
+                # Save workflow steps AFTER WorkflowExecution is created (one transaction)
+                if step_writer is not None:
+                    saved_count = await step_writer.close()
+                    step_writer = None
+                    logger.info(f"[V2] Saved {saved_count}/{len(ws_callback.collected_steps)} workflow steps (streamed)")
+                elif ws_callback.collected_steps and execution_id:
+                    saved_count = await WorkflowDatabase.save_workflow_steps_batch(
+                        session_id=session_id_str,
+                        workflow_id=workflow_id,
+                        steps=ws_callback.collected_steps,
+                        execution_id=execution_id
+                    )
                     logger.info(f"[V2] Saved {saved_count}/{len(ws_callback.collected_steps)} workflow steps")
 
                 # Send completion notification via WebSocket
@@ -1066,6 +1059,8 @@ async def send_message_to_project_v2(
                 logger.error(f"[V2] Error in background processing: {str(e)}")
                 import traceback
                 traceback.print_exc()
+                if step_writer is not None:
+                    await step_writer.close(error=str(e))
 
                 # Send error notification
                 from app.services.websocket_broadcast import websocket_broadcaster
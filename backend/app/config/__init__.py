@@ -30,12 +30,15 @@ __all__ = [
     'STORAGE_CONFIG',
     'LOGGING_CONFIG',
     'EXTERNAL_APIS',
+    'HTTP_CONFIG',
+    'RESPONSE_CACHE_CONFIG',
     'ENVIRONMENT_URLS',
     'FRONTEND_URL',
     'BACKEND_URL',
     'TOOLS_CONFIG',
     'MEMORY_CONFIG',
     'PERFORMANCE_CONFIG',
+    'SANDBOX_CONFIG',
     'PHOENIX_CONFIG',
     'GMAIL_CONFIG',
     
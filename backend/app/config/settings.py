@@ -111,6 +111,14 @@ WEBSOCKET_CONFIG = {
     "ping_timeout": get_yaml_config("websocket.ping_timeout", int(os.getenv("WS_PING_TIMEOUT", "180"))),
     "max_connections": get_yaml_config("websocket.max_connections", int(os.getenv("WS_MAX_CONNECTIONS", "100"))),
     "receive_timeout": get_yaml_config("websocket.receive_timeout", int(os.getenv("WS_RECEIVE_TIMEOUT", "120"))),
+    "send_queue_size": get_yaml_config("websocket.send_queue_size", int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))),
+    "send_timeout": get_yaml_config("websocket.send_timeout", float(os.getenv("WS_SEND_TIMEOUT", "10"))),
+    "slow_consumer_policy": get_yaml_config("websocket.slow_consumer_policy", os.getenv("WS_SLOW_CONSUMER_POLICY", "disconnect")),
+    "backplane": os.getenv("WS_BACKPLANE", get_yaml_config("websocket.backplane", "inprocess")).lower(),
+    "backplane_url": os.getenv("WS_BACKPLANE_URL", get_yaml_config("websocket.backplane_url", "tcp://127.0.0.1:8765")),
+    "backplane_embedded_broker": get_yaml_config("websocket.backplane_embedded_broker", os.getenv("WS_BACKPLANE_EMBEDDED_BROKER", "true").lower() == "true"),
+    # Shared secret workers present to the broker (env only, not stored in the YAML)
+    "backplane_secret": os.getenv("WS_BACKPLANE_SECRET", ""),
 }
 
 # === Auth0 Configuration ===
@@ -127,6 +135,8 @@ AUTH0_CONFIG = {
 STORAGE_CONFIG = {
     "max_file_size": get_yaml_config("file_storage.max_file_size", int(os.getenv("MAX_FILE_SIZE", "10485760"))),
     "allowed_extensions": get_yaml_config("file_storage.allowed_extensions", [".txt", ".csv", ".json", ".yaml", ".yml", ".py", ".md", ".png", ".jpg", ".pdf"]),
+    "artifact_root": get_yaml_config("file_storage.artifact_root", os.getenv("ARTIFACT_ROOT", "./data/artifacts")),
+    "artifact_thumbnail_px": get_yaml_config("file_storage.artifact_thumbnail_px", 160),
 }
 
 # === Logging Configuration ===
@@ -136,6 +146,11 @@ LOGGING_CONFIG = {
     "file": DATA_DIR / "logs" / "labos.log",
     "max_size": get_yaml_config("logging.max_size", int(os.getenv("LOG_MAX_SIZE", "10485760"))),
     "backup_count": get_yaml_config("logging.backup_count", int(os.getenv("LOG_BACKUP_COUNT", "5"))),
+    # Captured stdout/stderr: "text" (raw lines to terminal + daily log) or "json" (structured records with workflow context)
+    "capture_mode": os.getenv("LOG_CAPTURE_MODE", get_yaml_config("logging.capture_mode", "text")).lower(),
+    "queue_size": get_yaml_config("logging.queue_size", 10000),
+    "flush_interval": get_yaml_config("logging.flush_interval", 1.0),
+    "flush_records": get_yaml_config("logging.flush_records", 200),
 }
 
 # === Gmail OAuth2 Configuration ===
@@ -169,6 +184,34 @@ EXTERNAL_APIS = {
     }
 }
 
+# === Shared HTTP Client (external database tools) ===
+HTTP_CONFIG = {
+    "connect_timeout": get_yaml_config("http.connect_timeout", 10),
+    "read_timeout": get_yaml_config("http.read_timeout", 60),
+    "max_retries": get_yaml_config("http.max_retries", 3),
+    "backoff_base": get_yaml_config("http.backoff_base", 0.5),
+    "backoff_max": get_yaml_config("http.backoff_max", 30.0),
+    "pool_maxsize": get_yaml_config("http.pool_maxsize", 16),
+    "max_hosts": get_yaml_config("http.max_hosts", 256),
+    "default_rate_limit": get_yaml_config("http.default_rate_limit", None),
+    # Requests per second per host (NCBI E-utilities default: 3/s, 10/s with PUBMED_API_KEY)
+    "rate_limits": get_yaml_config("http.rate_limits", {}),
+}
+
+# === Response Cache (REST / E-utilities lookups of the database tools) ===
+RESPONSE_CACHE_CONFIG = {
+    "enabled": get_yaml_config("response_cache.enabled", os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"),
+    # normal | offline (replay recorded responses only, no network)
+    "mode": os.getenv("RESPONSE_CACHE_MODE", get_yaml_config("response_cache.mode", "normal")),
+    "path": os.getenv("RESPONSE_CACHE_PATH", get_yaml_config("response_cache.path", "./data/cache/responses.sqlite3")),
+    "max_size_mb": get_yaml_config("response_cache.max_size_mb", 512),
+    "compression_level": get_yaml_config("response_cache.compression_level", 6),
+    "default_ttl": get_yaml_config("response_cache.default_ttl", 86400),
+    "stale_ttl": get_yaml_config("response_cache.stale_ttl", 604800),
+    "ttls": get_yaml_config("response_cache.ttls", {}),
+    "sources": get_yaml_config("response_cache.sources", {}),
+}
+
 # === Environment URLs ===
 # Priority: Environment variables > YAML defaults
 FRONTEND_URL = os.getenv("FRONTEND_URL", get_yaml_config("urls.default.frontend", "http://localhost:3000"))
@@ -190,6 +233,20 @@ TOOLS_CONFIG = {
     "template_cache_size": get_yaml_config("tools.template_cache_size", 50),
     "retry_max_attempts": get_yaml_config("tools.retry.max_attempts", 3),
     "retry_delay": get_yaml_config("tools.retry.delay", 1),
+    "catalog_modules": get_yaml_config("tools.catalog.modules", [
+        "app.tools.database", "app.tools.screening", "app.tools.pubmed", "app.tools.analysis",
+    ]),
+    "catalog_candidates": get_yaml_config("tools.catalog.candidates", 30),
+    "catalog_llm_rerank": get_yaml_config("tools.catalog.llm_rerank", False),
+    "catalog_build_on_startup": get_yaml_config("tools.catalog.build_on_startup", True),
+    "module_cache_size": get_yaml_config("tools.module_cache_size", 256),
+    "preload_project_tools": get_yaml_config("tools.preload_project_tools", True),
+    "batch_max_identifiers": get_yaml_config("tools.batch.max_identifiers", 1000),
+    "batch_workers": get_yaml_config("tools.batch.workers", 8),
+    "api_translation_fast_path": get_yaml_config("tools.api_translation.fast_path", True),
+    "api_translation_cache": get_yaml_config("tools.api_translation.cache", True),
+    "api_translation_similarity_threshold": get_yaml_config("tools.api_translation.similarity_threshold", 0),
+    "api_translation_recent_size": get_yaml_config("tools.api_translation.recent_size", 512),
 }
 
 # === Memory System Configuration ===
@@ -207,6 +264,51 @@ PERFORMANCE_CONFIG = {
     "retry_delay": get_yaml_config("tools.retry.delay", 1),
     "tool_loading_cache_size": get_yaml_config("tools.loading_cache_size", 100),
     "parallel_execution_timeout": get_yaml_config("performance.parallel_execution_timeout", 300),
+    "parallel_tool_calls": get_yaml_config("performance.parallel_tool_calls", os.getenv("PARALLEL_TOOL_CALLS", "true").lower() == "true"),
+    "tool_dispatch_workers": get_yaml_config("performance.tool_dispatch_workers", int(os.getenv("TOOL_DISPATCH_WORKERS", "16"))),
+    "stream_llm_tokens": get_yaml_config("performance.stream_llm_tokens", os.getenv("STREAM_LLM_TOKENS", "true").lower() == "true"),
+    "stream_workflow_steps": get_yaml_config("performance.stream_workflow_steps", os.getenv("STREAM_WORKFLOW_STEPS", "false").lower() == "true"),
+    "workflow_step_flush_size": get_yaml_config("performance.workflow_step_flush_size", 20),
+    "workflow_step_flush_interval": get_yaml_config("performance.workflow_step_flush_interval", 2.0),
+    "resource_check_interval": get_yaml_config("performance.resource_check_interval", 5.0),
+    "fuzzy_match_workers": get_yaml_config("performance.fuzzy_match_workers", -1),
+    "agent_template_pool": get_yaml_config("performance.agent_template_pool", True),
+    "agent_binding_cache_size": get_yaml_config("performance.agent_binding_cache_size", 128),
+    "context_budget_enabled": get_yaml_config("performance.context_budget.enabled", True),
+    "context_max_tokens": get_yaml_config("performance.context_budget.max_tokens", 100000),
+    "context_agent_budgets": get_yaml_config("performance.context_budget.agent_budgets", {}),
+    "context_keep_recent_observations": get_yaml_config("performance.context_budget.keep_recent_observations", 3),
+    "context_spill_threshold_tokens": get_yaml_config("performance.context_budget.spill_threshold_tokens", 2000),
+    "context_max_observation_tokens": get_yaml_config("performance.context_budget.max_observation_tokens", 16000),
+    "context_preview_tokens": get_yaml_config("performance.context_budget.preview_tokens", 300),
+    "context_token_counter": get_yaml_config("performance.context_budget.token_counter", "auto"),
+    "user_cache_enabled": get_yaml_config("performance.user_cache.enabled", os.getenv("USER_CACHE_ENABLED", "true").lower() == "true"),
+    "user_cache_ttl": get_yaml_config("performance.user_cache.ttl", 30),
+    "user_cache_size": get_yaml_config("performance.user_cache.size", 1024),
+}
+
+# === Sandbox Kernel Configuration ===
+# python_interpreter code runs in pre-forked kernel processes with hard limits
+SANDBOX_CONFIG = {
+    "kernel_pool_enabled": get_yaml_config("sandbox.kernel_pool_enabled", os.getenv("SANDBOX_KERNEL_POOL", "true").lower() == "true"),
+    "kernel_pool_size": get_yaml_config("sandbox.kernel_pool_size", int(os.getenv("SANDBOX_KERNEL_POOL_SIZE", "4"))),
+    "kernel_start_method": get_yaml_config("sandbox.kernel_start_method", "forkserver"),
+    "kernel_timeout": get_yaml_config("sandbox.kernel_timeout", int(os.getenv("SANDBOX_KERNEL_TIMEOUT", "60"))),
+    "kernel_memory_limit_mb": get_yaml_config("sandbox.kernel_memory_limit_mb", int(os.getenv("SANDBOX_KERNEL_MEMORY_MB", "2048"))),
+    "kernel_address_space_limit_mb": get_yaml_config("sandbox.kernel_address_space_limit_mb", 8192),
+    "kernel_max_tasks": get_yaml_config("sandbox.kernel_max_tasks", 50),
+    "kernel_recycle_rss_mb": get_yaml_config("sandbox.kernel_recycle_rss_mb", 1024),
+    "kernel_sessions_enabled": get_yaml_config("sandbox.kernel_sessions_enabled", os.getenv("SANDBOX_KERNEL_SESSIONS", "true").lower() == "true"),
+    "kernel_max_sessions": get_yaml_config("sandbox.kernel_max_sessions", int(os.getenv("SANDBOX_KERNEL_MAX_SESSIONS", "8"))),
+    "kernel_session_idle_timeout": get_yaml_config("sandbox.kernel_session_idle_timeout", 1800),
+    "kernel_sessions_memory_budget_mb": get_yaml_config("sandbox.kernel_sessions_memory_budget_mb", 8192),
+    "sync_max_concurrency": get_yaml_config("sandbox.sync_max_concurrency", int(os.getenv("SANDBOX_SYNC_CONCURRENCY", "8"))),
+    "sync_chunk_size_mb": get_yaml_config("sandbox.sync_chunk_size_mb", 8),
+    "sync_large_file_mb": get_yaml_config("sandbox.sync_large_file_mb", 32),
+    "hydration_enabled": get_yaml_config("sandbox.hydration_enabled", os.getenv("SANDBOX_LAZY_HYDRATION", "true").lower() == "true"),
+    "hydration_cache_mb": get_yaml_config("sandbox.hydration_cache_mb", int(os.getenv("SANDBOX_HYDRATION_CACHE_MB", "2048"))),
+    "hydration_manifest_ttl": get_yaml_config("sandbox.hydration_manifest_ttl", 60),
+    "prefetch_hints_max": get_yaml_config("sandbox.prefetch_hints_max", 20),
 }
 
 # === Phoenix Tracing Configuration ===
@@ -0,0 +1,185 @@
+"""
+Agent Template Pool - Shared, Immutable Parts of Workflow Agents
+
+Every chat message builds a MultiAgentSystem (create_workflow_multi_agent_system
+or the per-request configs in api/v2/chat_projects). The expensive parts of
+that are identical across workflows and are shared here:
+
+- LLM clients: one chat model per provider config (provider, model,
+  temperature, max_tokens, extra_params), so HTTP connection pools are reused
+- Tool bindings: model.bind_tools(...) result per (model, toolset); the
+  binding only holds tool schemas, tool execution goes through each agent's
+  own tool_map, so per-workflow tool closures stay per workflow
+- Setup metrics: latency of _register_agents_to_system and how many clients
+  and bindings each setup had to create
+
+A workflow's LangChainAgent then only holds its own tool list, tool map and
+conversation state.
+
+Usage:
+    from app.core.engines.langchain.agent_templates import get_agent_template_pool
+
+    pool = get_agent_template_pool()
+    model = pool.get_model(llm_config)
+    model_with_tools = pool.bind_tools(model, tools)
+"""
+
+import contextvars
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import PERFORMANCE_CONFIG
+
+# Counters of the setup currently running in this context (see track_setup)
+_setup_counters: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar(
+    '_setup_counters', default=None
+)
+
+
+def _config_key(config) -> Tuple:
+    extra = json.dumps(config.extra_params or {}, sort_keys=True, default=str)
+    return (config.provider.lower(), config.model, config.temperature, config.max_tokens, extra)
+
+
+def _tool_key(tool: Any) -> Tuple:
+    if isinstance(tool, dict):
+        return ("dict", json.dumps(tool, sort_keys=True, default=str))
+    return (getattr(tool, 'name', repr(tool)), getattr(tool, 'description', ''))
+
+
+def _count(name: str):
+    counters = _setup_counters.get()
+    if counters is not None:
+        counters[name] = counters.get(name, 0) + 1
+
+
+class AgentTemplatePool:
+    """
+    Process-wide pool of LLM clients and tool bindings.
+
+    Thread-safe: workflows are set up concurrently in worker threads.
+    """
+
+    def __init__(self, max_bindings: Optional[int] = None):
+        self.enabled = PERFORMANCE_CONFIG.get("agent_template_pool", True)
+        self.max_bindings = max_bindings or PERFORMANCE_CONFIG.get("agent_binding_cache_size", 128)
+        self._lock = threading.Lock()
+        self._models: Dict[Tuple, Any] = {}
+        self._bindings: "OrderedDict[Tuple, Tuple[Any, Any]]" = OrderedDict()
+        self._setup_seconds: deque = deque(maxlen=256)
+        self._stats = {
+            "clients_created": 0, "clients_reused": 0,
+            "bindings_created": 0, "bindings_reused": 0, "binding_evictions": 0,
+            "setups": 0, "setup_seconds_total": 0.0,
+        }
+
+    # ==================== LLM clients ====================
+
+    def get_model(self, config) -> Any:
+        """Shared chat model for an LLMConfig (created on first use)."""
+        from app.core.llm.factory import LLMFactory
+        if not self.enabled:
+            _count("clients_created")
+            return LLMFactory.create(config)
+
+        key = _config_key(config)
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._stats["clients_reused"] += 1
+                return model
+
+        # Create outside the lock (client construction can be slow)
+        model = LLMFactory.create(config)
+        with self._lock:
+            existing = self._models.setdefault(key, model)
+            if existing is model:
+                self._stats["clients_created"] += 1
+                _count("clients_created")
+            else:
+                self._stats["clients_reused"] += 1
+            return existing
+
+    # ==================== Tool bindings ====================
+
+    def bind_tools(self, model: Any, tools: List[Any]) -> Any:
+        """model.bind_tools(tools), cached per (model, tool names and descriptions)."""
+        if not self.enabled:
+            _count("bindings_created")
+            return model.bind_tools(tools)
+
+        key = (id(model),) + tuple(_tool_key(t) for t in tools)
+        with self._lock:
+            cached = self._bindings.get(key)
+            # The model reference guards against id() reuse after a model was freed
+            if cached is not None and cached[0] is model:
+                self._bindings.move_to_end(key)
+                self._stats["bindings_reused"] += 1
+                return cached[1]
+
+        bound = model.bind_tools(tools)
+        with self._lock:
+            self._bindings[key] = (model, bound)
+            self._bindings.move_to_end(key)
+            self._stats["bindings_created"] += 1
+            _count("bindings_created")
+            while len(self._bindings) > self.max_bindings:
+                self._bindings.popitem(last=False)
+                self._stats["binding_evictions"] += 1
+        return bound
+
+    # ==================== Metrics ====================
+
+    @contextmanager
+    def track_setup(self):
+        """Measure one workflow setup (latency, clients and bindings created)."""
+        counters: Dict[str, int] = {}
+        token = _setup_counters.set(counters)
+        start = time.perf_counter()
+        try:
+            yield counters
+        finally:
+            elapsed = time.perf_counter() - start
+            _setup_counters.reset(token)
+            counters["seconds"] = elapsed
+            with self._lock:
+                self._setup_seconds.append(elapsed)
+                self._stats["setups"] += 1
+                self._stats["setup_seconds_total"] += elapsed
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["clients"] = len(self._models)
+            stats["bindings"] = len(self._bindings)
+            recent = sorted(self._setup_seconds)
+        if recent:
+            stats["setup_ms_p50"] = round(recent[len(recent) // 2] * 1000, 2)
+            stats["setup_ms_p95"] = round(recent[min(len(recent) - 1, int(len(recent) * 0.95))] * 1000, 2)
+            stats["setup_ms_max"] = round(recent[-1] * 1000, 2)
+        return stats
+
+    def clear(self):
+        """Drop pooled clients and bindings (e.g. after API keys changed)."""
+        with self._lock:
+            self._models.clear()
+            self._bindings.clear()
+
+
+# Global singleton
+_pool: Optional[AgentTemplatePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_agent_template_pool() -> AgentTemplatePool:
+    """Get the global agent template pool instance."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = AgentTemplatePool()
+    return _pool
@@ -0,0 +1,339 @@
+"""
+Context Budget - Bounded Message Histories for LangChainAgent
+
+LangChainAgent.run/arun append every model response and every full
+ToolMessage to the message list and resend the whole list on each
+iteration, so a few visit_webpage / extract_pdf_content / query_* results
+made every later model call pay for them again.
+
+Before each model call the agent now fits its messages into a budget:
+
+- Token counts are kept per message (tiktoken when available, otherwise
+  a chars/4 estimate) and only recomputed when a message changes
+- The latest observations (ToolMessages) stay in full
+- Older large observations are spilled to the project sandbox
+  (workspace/context_*.txt) and replaced by a compact extract (head, tail,
+  size) plus the file name, so the agent can read_file() them again
+- A hard per-agent token budget: when messages are still over it, the
+  oldest chat history messages are dropped, then recent observations
+  are compacted too
+
+ToolMessages are compacted but never removed, so every tool call keeps its
+result; model responses are never modified (Gemini thought signatures).
+
+Usage:
+    from app.core.engines.langchain.context_budget import get_context_budget
+
+    window = get_context_budget().window(messages, "dev_agent", history_count=len(history))
+    window.fit()  # before each invoke(messages)
+"""
+
+import hashlib
+import logging
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import ToolMessage
+
+from app.config import PERFORMANCE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Fixed estimate for non-text content parts (images, PDFs, audio)
+MEDIA_PART_TOKENS = 1000
+
+
+class TokenCounter:
+    """Counts tokens of text; uses tiktoken when its encoding can be loaded."""
+
+    def __init__(self, mode: str = "auto"):
+        self.mode = mode
+        self._encoding = None
+        self._loaded = mode == "heuristic"
+        self._lock = threading.Lock()
+
+    def _get_encoding(self):
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    try:
+                        import tiktoken
+                        self._encoding = tiktoken.get_encoding("cl100k_base")
+                    except Exception as e:
+                        # The encoding is downloaded on first use; offline hosts fall back
+                        logger.info(f"ℹ️ tiktoken unavailable ({type(e).__name__}), estimating tokens as chars/4")
+                    self._loaded = True
+        return self._encoding
+
+    @property
+    def backend(self) -> str:
+        return "tiktoken" if self._get_encoding() is not None else "heuristic"
+
+    def count_text(self, text: str) -> int:
+        if not text:
+            return 0
+        encoding = self._get_encoding()
+        if encoding is not None:
+            return len(encoding.encode(text, disallowed_special=()))
+        return len(text) // 4 + 1
+
+    def count_content(self, content: Any) -> int:
+        if isinstance(content, str):
+            return self.count_text(content)
+        if isinstance(content, list):
+            total = 0
+            for part in content:
+                if isinstance(part, str):
+                    total += self.count_text(part)
+                elif isinstance(part, dict) and part.get("type") == "text":
+                    total += self.count_text(part.get("text", ""))
+                else:
+                    total += MEDIA_PART_TOKENS
+            return total
+        return self.count_text(str(content))
+
+    def count_message(self, message: Any) -> int:
+        tokens = self.count_content(getattr(message, "content", message)) + 4
+        tool_calls = getattr(message, "tool_calls", None)
+        if tool_calls:
+            tokens += self.count_text(str(tool_calls))
+        return tokens
+
+
+def _content_text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        parts = []
+        for part in content:
+            if isinstance(part, dict):
+                parts.append(str(part.get("text", part)))
+            else:
+                parts.append(str(part))
+        return "\n".join(parts)
+    return str(content)
+
+
+class ContextWindow:
+    """
+    Message list of one agent run, kept within the agent's token budget.
+
+    Compacts the list in place, so the agent loop keeps appending to the
+    same list object.
+    """
+
+    def __init__(self, budget: "ContextBudget", messages: List, agent_name: str, history_count: int = 0):
+        self.budget = budget
+        self.messages = messages
+        self.agent_name = agent_name or "agent"
+        self.max_tokens = budget.max_tokens_for(self.agent_name)
+        # messages[1:1 + history_count] is chat history from the DB (droppable)
+        self.history_count = history_count
+        self._tokens: Dict[int, tuple] = {}
+        self._compacted: set = set()
+        self._spilled: Dict[str, str] = {}
+        self.step_tokens: List[int] = []
+
+    # ==================== Token accounting ====================
+
+    def _count(self, message: Any) -> int:
+        key = id(message)
+        content = getattr(message, "content", None)
+        cached = self._tokens.get(key)
+        # Content is replaced (not mutated) on compaction, so identity detects changes
+        if cached is not None and cached[0] is content:
+            return cached[1]
+        tokens = self.budget.counter.count_message(message)
+        self._tokens[key] = (content, tokens)
+        return tokens
+
+    def total_tokens(self) -> int:
+        return sum(self._count(m) for m in self.messages)
+
+    # ==================== Compaction ====================
+
+    def _tool_name(self, message: ToolMessage) -> str:
+        """Name of the tool that produced a ToolMessage (from the matching tool call)."""
+        if getattr(message, "name", None):
+            return message.name
+        for candidate in self.messages:
+            for call in getattr(candidate, "tool_calls", None) or []:
+                if call.get("id") == message.tool_call_id:
+                    return call.get("name") or "tool"
+        return "tool"
+
+    def _spill(self, message: ToolMessage, text: str) -> Optional[str]:
+        """Save a full observation to the project sandbox; returns the file name."""
+        digest = hashlib.sha256(text.encode("utf-8", errors="replace")).hexdigest()
+        if digest in self._spilled:
+            return self._spilled[digest]
+        try:
+            from app.services.sandbox.agent_adapter import sandbox_save_file
+            tool_name = self._tool_name(message)
+            result = sandbox_save_file(
+                f"context_{self.agent_name}_{tool_name}_{digest[:10]}.txt",
+                text,
+                category="workspace",
+                description=f"Full output of {tool_name} (compacted from {self.agent_name} context)"
+            )
+        except Exception as e:
+            # No project context (V1 API, scripts): keep the extract only
+            logger.debug(f"Context spill skipped: {e}")
+            return None
+        self._spilled[digest] = result["filename"]
+        self.budget._record("spills", 1)
+        return result["filename"]
+
+    def _compact(self, index: int) -> int:
+        """Replace a ToolMessage by an extract (+ sandbox file); returns tokens saved."""
+        message = self.messages[index]
+        if id(message) in self._compacted:
+            return 0
+        before = self._count(message)
+        text = _content_text(message.content)
+        preview_chars = self.budget.preview_tokens * 4
+        if len(text) <= preview_chars * 2:
+            return 0
+
+        filename = self._spill(message, text)
+        head = text[:preview_chars]
+        tail = text[-preview_chars:]
+        lines = [f"[Observation compacted to save context: {before} tokens, {len(text)} chars, {text.count(chr(10)) + 1} lines]"]
+        if filename:
+            lines.append(f"Full output saved to workspace file '{filename}' - use read_file(\"{filename}\", category=\"workspace\") to view it.")
+        else:
+            lines.append("Full output is no longer available; re-run the tool if you need the omitted part.")
+        lines += ["--- beginning ---", head, "--- end ---", tail]
+
+        message.content = "\n".join(lines)
+        self._compacted.add(id(message))
+        saved = max(0, before - self._count(message))
+        self.budget._record("compactions", 1)
+        self.budget._record("tokens_saved", saved)
+        return saved
+
+    def _drop_oldest_history(self) -> bool:
+        if self.history_count <= 0 or len(self.messages) < 3:
+            return False
+        dropped = self.messages.pop(1)
+        self.history_count -= 1
+        self._tokens.pop(id(dropped), None)
+        # Keep tool call / tool result pairs together
+        while self.history_count > 0 and isinstance(self.messages[1], ToolMessage):
+            self.messages.pop(1)
+            self.history_count -= 1
+        self.budget._record("history_dropped", 1)
+        return True
+
+    def fit(self) -> int:
+        """
+        Compact the messages to the agent's budget before a model call.
+
+        Returns:
+            Token count of the messages that will be sent
+        """
+        if not self.budget.enabled:
+            total = self.total_tokens()
+            self.step_tokens.append(total)
+            self.budget._record_step(total)
+            return total
+
+        tool_indices = [i for i, m in enumerate(self.messages) if isinstance(m, ToolMessage)]
+        recent = set(tool_indices[-self.budget.keep_recent:]) if self.budget.keep_recent > 0 else set()
+
+        # 1. Older large observations, and any single observation over the cap
+        for i in tool_indices:
+            tokens = self._count(self.messages[i])
+            if (i not in recent and tokens > self.budget.spill_threshold) or tokens > self.budget.max_observation_tokens:
+                self._compact(i)
+
+        total = self.total_tokens()
+
+        # 2. Hard budget: drop the oldest chat history first...
+        while total > self.max_tokens and self._drop_oldest_history():
+            total = self.total_tokens()
+
+        # 3. ...then compact the remaining observations, oldest first
+        if total > self.max_tokens:
+            for i, message in enumerate(self.messages):
+                if total <= self.max_tokens:
+                    break
+                if isinstance(message, ToolMessage):
+                    total -= self._compact(i)
+            if total > self.max_tokens:
+                self.budget._record("over_budget", 1)
+                logger.warning(f"⚠️ {self.agent_name} context still {total} tokens (budget {self.max_tokens})")
+
+        self.step_tokens.append(total)
+        self.budget._record_step(total)
+        return total
+
+
+class ContextBudget:
+    """
+    Process-wide context budget settings and statistics.
+
+    Budgets come from PERFORMANCE_CONFIG (performance.context_* in
+    app_config.yaml); context_agent_budgets overrides the token budget per
+    agent name.
+    """
+
+    def __init__(self):
+        self.enabled = PERFORMANCE_CONFIG.get("context_budget_enabled", True)
+        self.max_tokens = PERFORMANCE_CONFIG.get("context_max_tokens", 100000)
+        self.agent_budgets = dict(PERFORMANCE_CONFIG.get("context_agent_budgets") or {})
+        self.keep_recent = PERFORMANCE_CONFIG.get("context_keep_recent_observations", 3)
+        self.spill_threshold = PERFORMANCE_CONFIG.get("context_spill_threshold_tokens", 2000)
+        self.max_observation_tokens = PERFORMANCE_CONFIG.get("context_max_observation_tokens", 16000)
+        self.preview_tokens = PERFORMANCE_CONFIG.get("context_preview_tokens", 300)
+        self.counter = TokenCounter(PERFORMANCE_CONFIG.get("context_token_counter", "auto"))
+        self._lock = threading.Lock()
+        self._recent_steps: deque = deque(maxlen=512)
+        self._stats = {"steps": 0, "compactions": 0, "spills": 0, "tokens_saved": 0,
+                       "history_dropped": 0, "over_budget": 0}
+
+    def max_tokens_for(self, agent_name: str) -> int:
+        return self.agent_budgets.get(agent_name, self.max_tokens)
+
+    def window(self, messages: List, agent_name: str, history_count: int = 0) -> ContextWindow:
+        """Budgeted view of one run's message list."""
+        return ContextWindow(self, messages, agent_name, history_count)
+
+    def _record(self, key: str, amount: int):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _record_step(self, tokens: int):
+        with self._lock:
+            self._stats["steps"] += 1
+            self._recent_steps.append(tokens)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            recent = sorted(self._recent_steps)
+        stats["enabled"] = self.enabled
+        stats["max_tokens"] = self.max_tokens
+        # Don't load the tiktoken encoding just for stats
+        stats["token_counter"] = self.counter.backend if self.counter._loaded else self.counter.mode
+        if recent:
+            stats["step_tokens_p50"] = recent[len(recent) // 2]
+            stats["step_tokens_p95"] = recent[min(len(recent) - 1, int(len(recent) * 0.95))]
+            stats["step_tokens_max"] = recent[-1]
+        return stats
+
+
+# Global singleton
+_budget: Optional[ContextBudget] = None
+_budget_lock = threading.Lock()
+
+
+def get_context_budget() -> ContextBudget:
+    """Get the global context budget instance."""
+    global _budget
+    if _budget is None:
+        with _budget_lock:
+            if _budget is None:
+                _budget = ContextBudget()
+    return _budget
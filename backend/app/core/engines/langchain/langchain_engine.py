@@ -4,6 +4,7 @@ Replacement for Smolagents-based labos_engine.py
 Uses direct API calls to Gemini, Claude, and GPT without OpenRouter
 """
 
+import asyncio
 import os
 import sys
 from typing import List, Dict, Any, Optional, Union
@@ -13,7 +14,7 @@ from pathlib import Path
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_anthropic import ChatAnthropic
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, ToolMessage
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage, ToolMessage, message_chunk_to_message
 from langchain_core.tools import tool as langchain_tool
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.runnables import RunnablePassthrough
@@ -25,6 +26,12 @@ from app.config import (
     PERFORMANCE_CONFIG, MEMORY_CONFIG, TOOLS_CONFIG
 )
 
+# Per-turn tool call dispatch (parallel-safe tools run concurrently)
+from .tool_dispatch import execute_tool_calls, aexecute_tool_calls
+
+# Per-agent token budget for the message list (see context_budget.py)
+from .context_budget import get_context_budget
+
 # Import tool adapter for converting Smolagents tools
 from app.core.engines.smolagents.tool_adapter import batch_convert_tools
 
@@ -131,24 +138,32 @@ class LangChainAgent:
         tools: List,
         system_prompt: str = "You are LabOS, a helpful AI assistant specialized in bioinformatics and computational biology.",
         max_iterations: int = 10,
-        verbose: bool = True
+        verbose: bool = True,
+        parallel_tool_calls: Optional[bool] = None,
+        name: str = "agent"
     ):
         self.model = model
-        self.tools = tools
+        self.name = name
+        self.tools = list(tools)  # Own list: add_tool must not change shared tool lists
         self.system_prompt = system_prompt
         self.max_iterations = max_iterations
         self.verbose = verbose
+        # Run independent tool calls of one model turn concurrently (see tool_dispatch.py)
+        if parallel_tool_calls is None:
+            parallel_tool_calls = PERFORMANCE_CONFIG.get("parallel_tool_calls", True)
+        self.parallel_tool_calls = parallel_tool_calls
 
-        # Bind tools to model
+        # Bind tools to model (bindings are shared across workflows, see agent_templates.py)
         # Note: Gemini's google_search grounding is INCOMPATIBLE with function calling
         # So we can only use google_search when there are NO other tools (Fast Mode)
+        from .agent_templates import get_agent_template_pool
         if len(self.tools) == 0:
             # Fast Mode: Only google_search for grounding (no function calling)
-            self.model_with_tools = self.model.bind_tools([{"google_search": {}}])
+            self.model_with_tools = get_agent_template_pool().bind_tools(self.model, [{"google_search": {}}])
             print(f"⚡ Fast Mode: Agent with Google Search grounding only")
         else:
             # Deep Mode: Use custom tools only (google_search not compatible with function calling)
-            self.model_with_tools = self.model.bind_tools(self.tools)
+            self.model_with_tools = get_agent_template_pool().bind_tools(self.model, self.tools)
             print(f"🧠 Deep Mode: Agent with {len(self.tools)} tools")
 
         # Create tool name -> tool object mapping
@@ -168,7 +183,8 @@ class LangChainAgent:
         self.tool_map[tool.name] = tool
 
         # Re-bind tools to model (no google_search - incompatible with function calling)
-        self.model_with_tools = self.model.bind_tools(self.tools)
+        from .agent_templates import get_agent_template_pool
+        self.model_with_tools = get_agent_template_pool().bind_tools(self.model, self.tools)
 
         if self.verbose:
             print(f"✅ Added tool: {tool.name}")
@@ -224,27 +240,13 @@ class LangChainAgent:
         else:
             return str(response)
 
-    def run(self, query: Union[str, List], conversation_history: Optional[List] = None, callbacks: Optional[List[BaseCallbackHandler]] = None) -> Dict[str, Any]:
-        """
-        Run the agent with a user query - manually triggers callbacks for tool execution
-
-        Args:
-            query: User's input query (string or list for multimodal content)
-                  - String: "Describe this image"
-                  - List: [{"type": "text", "text": "..."}, {"type": "media", "data": "...", "mime_type": "..."}]
-            conversation_history: Optional list of previous messages (user/assistant ONLY, no SystemMessage)
-            callbacks: Optional list of callback handlers for streaming/monitoring
-
-        Returns:
-            Dict with 'output' (final answer) and 'steps' (execution trace)
-        """
+    def _build_messages(self, query: Union[str, List], conversation_history: Optional[List]) -> List:
+        """Build the initial message list (SystemMessage + history + query) and log its structure"""
         # Build message list with proper structure:
         # All models (including Gemini) use SystemMessage in the message list
         messages = []
 
-        # Add SystemMessage for all models
         model_name = getattr(self.model, 'model', getattr(self.model, 'model_name', ''))
-        is_gemini = 'gemini' in model_name.lower() if model_name else False
 
         # Always add SystemMessage (Gemini 3.0 supports it in message history)
         messages.append(SystemMessage(content=self.system_prompt))
@@ -287,6 +289,111 @@ class LangChainAgent:
             print(f"  [{i}] {marker} {msg_type}: {content_preview}...")
         print(f"{'='*80}\n")
 
+        return messages
+
+    def _is_gemini(self) -> bool:
+        model_name = getattr(self.model, 'model', getattr(self.model, 'model_name', ''))
+        return 'gemini' in model_name.lower() if model_name else False
+
+    def _is_malformed_function_call(self, response, iteration: int) -> bool:
+        """Check for Gemini's MALFORMED_FUNCTION_CALL finish reason"""
+        if not hasattr(response, 'response_metadata'):
+            return False
+        if response.response_metadata.get('finish_reason', '') != 'MALFORMED_FUNCTION_CALL':
+            return False
+
+        error_msg = (
+            f"⚠️ Gemini returned MALFORMED_FUNCTION_CALL error. "
+            f"This usually means the model tried to call a tool but the format was invalid. "
+            f"Iteration: {iteration}/{self.max_iterations}"
+        )
+        print(error_msg)
+        return True
+
+    def _messages_without_history(self, messages: List) -> List:
+        """Rebuild messages without chat history (retry path for MALFORMED_FUNCTION_CALL)"""
+        messages_no_history = []
+        if not self._is_gemini():
+            messages_no_history.append(messages[0])  # SystemMessage for non-Gemini
+        messages_no_history.append(messages[-1])  # Current query (last message)
+        return messages_no_history
+
+    def _context_window(self, messages: List, conversation_history: Optional[List]):
+        """Budgeted view of this run's messages (older observations get compacted)"""
+        history_count = len(conversation_history) if conversation_history else 0
+        return get_context_budget().window(messages, self.name, history_count=history_count)
+
+    def _fit_context(self, window, iteration: int):
+        """Enforce the token budget before a model call"""
+        tokens = window.fit()
+        if self.verbose:
+            print(f"📏 Context: {tokens} tokens in {len(window.messages)} messages (iteration {iteration})")
+        return tokens
+
+    def _final_answer_result(self, response, step: Dict[str, Any], steps: List) -> Dict[str, Any]:
+        """Build the run result for a response without tool calls"""
+        # No tool calls - this is the final answer
+        # Use content_blocks for Gemini 3's structured content format
+        if hasattr(response, 'content_blocks') and response.content_blocks:
+            # Extract text from content blocks (Gemini 3 format)
+            text_blocks = [
+                block.get('text', '')
+                for block in response.content_blocks
+                if isinstance(block, dict) and block.get('type') == 'text'
+            ]
+            final_answer = ' '.join(text_blocks) if text_blocks else str(response.content)
+        else:
+            # Fallback to content for other models
+            final_answer = response.content if hasattr(response, 'content') else str(response)
+
+        # Ensure final_answer is a string
+        if not isinstance(final_answer, str):
+            final_answer = str(final_answer)
+
+        if self.verbose:
+            print(f"\n✅ Final answer: {final_answer}")
+
+        # Debug: Check if content is empty
+        if not final_answer or final_answer.strip() == "":
+            print(f"⚠️ WARNING: Final answer is empty!")
+            print(f"⚠️ Response object: {response}")
+            print(f"⚠️ Response type: {type(response)}")
+            print(f"⚠️ Response dir: {dir(response)}")
+
+            # Return error instead of empty response
+            return {
+                "output": "I apologize, but I was unable to generate a response. Please try rephrasing your question or try again.",
+                "steps": steps,
+                "success": False,
+                "error": "Empty response from model"
+            }
+
+        step["final_answer"] = True
+        steps.append(step)
+
+        return {
+            "output": final_answer,
+            "steps": steps,
+            "success": True
+        }
+
+    def run(self, query: Union[str, List], conversation_history: Optional[List] = None, callbacks: Optional[List[BaseCallbackHandler]] = None) -> Dict[str, Any]:
+        """
+        Run the agent with a user query - manually triggers callbacks for tool execution
+
+        Args:
+            query: User's input query (string or list for multimodal content)
+                  - String: "Describe this image"
+                  - List: [{"type": "text", "text": "..."}, {"type": "media", "data": "...", "mime_type": "..."}]
+            conversation_history: Optional list of previous messages (user/assistant ONLY, no SystemMessage)
+            callbacks: Optional list of callback handlers for streaming/monitoring
+
+        Returns:
+            Dict with 'output' (final answer) and 'steps' (execution trace)
+        """
+        messages = self._build_messages(query, conversation_history)
+        window = self._context_window(messages, conversation_history)
+
         steps = []
         iteration = 0
 
@@ -302,202 +409,206 @@ class LangChainAgent:
                     print(f"Iteration {iteration}/{self.max_iterations}")
                     print(f"{'='*80}")
 
+                # Keep the resent message list within the agent's token budget
+                context_tokens = self._fit_context(window, iteration)
+
                 # Get model response with callbacks
                 response = self.model_with_tools.invoke(messages, config=config)
 
                 # Check for MALFORMED_FUNCTION_CALL error
-                if hasattr(response, 'response_metadata'):
-                    finish_reason = response.response_metadata.get('finish_reason', '')
-                    if finish_reason == 'MALFORMED_FUNCTION_CALL':
-                        error_msg = (
-                            f"⚠️ Gemini returned MALFORMED_FUNCTION_CALL error. "
-                            f"This usually means the model tried to call a tool but the format was invalid. "
-                            f"Iteration: {iteration}/{self.max_iterations}"
-                        )
-                        print(error_msg)
-
-                        # Check if this is the first iteration
-                        if iteration == 1:
-                            # Try without chat history if available
-                            if conversation_history and len(conversation_history) > 0:
-                                print("🔄 Retrying without chat history...")
-                                # Rebuild messages without history
-                                messages_no_history = []
-                                if not is_gemini:
-                                    messages_no_history.append(messages[0])  # SystemMessage for non-Gemini
-                                messages_no_history.append(messages[-1])  # Current query (last message)
-
-                                response = self.model_with_tools.invoke(messages_no_history, config=config)
-                                if hasattr(response, 'response_metadata'):
-                                    if response.response_metadata.get('finish_reason') == 'MALFORMED_FUNCTION_CALL':
-                                        return {
-                                            "output": "I encountered a technical error while processing your request. This appears to be a model configuration issue. Please try again or rephrase your question.",
-                                            "steps": steps,
-                                            "success": False,
-                                            "error": "MALFORMED_FUNCTION_CALL after retry"
-                                        }
-                                # Success after retry - update messages to use no-history version
-                                print("✅ Retry succeeded! Continuing without chat history for this session.")
-                                messages = messages_no_history  # Use the version that worked
-                            else:
+                if self._is_malformed_function_call(response, iteration):
+                    # Check if this is the first iteration
+                    if iteration == 1:
+                        # Try without chat history if available
+                        if conversation_history and len(conversation_history) > 0:
+                            print("🔄 Retrying without chat history...")
+                            messages_no_history = self._messages_without_history(messages)
+
+                            response = self.model_with_tools.invoke(messages_no_history, config=config)
+                            if self._is_malformed_function_call(response, iteration):
                                 return {
-                                    "output": "I encountered a technical error (MALFORMED_FUNCTION_CALL). Please try rephrasing your question.",
+                                    "output": "I encountered a technical error while processing your request. This appears to be a model configuration issue. Please try again or rephrase your question.",
                                     "steps": steps,
                                     "success": False,
-                                    "error": "MALFORMED_FUNCTION_CALL on first iteration"
+                                    "error": "MALFORMED_FUNCTION_CALL after retry"
                                 }
+                            # Success after retry - update messages to use no-history version
+                            print("✅ Retry succeeded! Continuing without chat history for this session.")
+                            messages = messages_no_history  # Use the version that worked
+                            window = self._context_window(messages, None)
+                        else:
+                            return {
+                                "output": "I encountered a technical error (MALFORMED_FUNCTION_CALL). Please try rephrasing your question.",
+                                "steps": steps,
+                                "success": False,
+                                "error": "MALFORMED_FUNCTION_CALL on first iteration"
+                            }
 
                 messages.append(response)
 
                 # Log the step
                 step = {
                     "iteration": iteration,
-                    "response": response.content if hasattr(response, 'content') else str(response)
+                    "response": response.content if hasattr(response, 'content') else str(response),
+                    "context_tokens": context_tokens
                 }
 
                 # Check if there are tool calls
                 if not hasattr(response, 'tool_calls') or not response.tool_calls:
-                    # No tool calls - this is the final answer
-                    # Use content_blocks for Gemini 3's structured content format
-                    if hasattr(response, 'content_blocks') and response.content_blocks:
-                        # Extract text from content blocks (Gemini 3 format)
-                        text_blocks = [
-                            block.get('text', '')
-                            for block in response.content_blocks
-                            if isinstance(block, dict) and block.get('type') == 'text'
-                        ]
-                        final_answer = ' '.join(text_blocks) if text_blocks else str(response.content)
-                    else:
-                        # Fallback to content for other models
-                        final_answer = response.content if hasattr(response, 'content') else str(response)
-
-                    # Ensure final_answer is a string
-                    if not isinstance(final_answer, str):
-                        final_answer = str(final_answer)
-
-                    if self.verbose:
-                        print(f"\n✅ Final answer: {final_answer}")
-
-                    # Debug: Check if content is empty
-                    if not final_answer or final_answer.strip() == "":
-                        print(f"⚠️ WARNING: Final answer is empty!")
-                        print(f"⚠️ Response object: {response}")
-                        print(f"⚠️ Response type: {type(response)}")
-                        print(f"⚠️ Response dir: {dir(response)}")
-
-                        # Return error instead of empty response
-                        return {
-                            "output": "I apologize, but I was unable to generate a response. Please try rephrasing your question or try again.",
-                            "steps": steps,
-                            "success": False,
-                            "error": "Empty response from model"
-                        }
-
-                    step["final_answer"] = True
-                    steps.append(step)
-
-                    return {
-                        "output": final_answer,
-                        "steps": steps,
-                        "success": True
-                    }
+                    return self._final_answer_result(response, step, steps)
 
                 # Execute tool calls
                 if self.verbose:
                     print(f"\n🔧 Tool calls detected: {len(response.tool_calls)}")
 
-                tool_results = []
-                for tool_call in response.tool_calls:
-                    tool_name = tool_call['name']
-                    tool_args = tool_call['args']
-                    tool_call_id = tool_call['id']
-
-                    if self.verbose:
-                        print(f"  - Calling {tool_name} with args: {tool_args}")
-
-                    # Find and execute the tool
-                    if tool_name in self.tool_map:
-                        try:
-                            tool_obj = self.tool_map[tool_name]
-
-                            # MANUALLY TRIGGER on_tool_start callback
-                            if callbacks:
-                                for callback in callbacks:
-                                    try:
-                                        callback.on_tool_start(
-                                            serialized={"name": tool_name},
-                                            input_str=str(tool_args)
-                                        )
-                                    except Exception as cb_err:
-                                        print(f"⚠️  Callback error in on_tool_start: {cb_err}")
-
-                            # Execute tool
-                            result = tool_obj.invoke(tool_args)
-
-                            if self.verbose:
-                                print(f"    ✅ Result: {str(result)[:200]}...")
-
-                            # MANUALLY TRIGGER on_tool_end callback
-                            if callbacks:
-                                for callback in callbacks:
-                                    try:
-                                        callback.on_tool_end(output=str(result))
-                                    except Exception as cb_err:
-                                        print(f"⚠️  Callback error in on_tool_end: {cb_err}")
-
-                            tool_results.append({
-                                "tool": tool_name,
-                                "args": tool_args,
-                                "result": result,
-                                "success": True
-                            })
-
-                            # Add tool result to messages
-                            messages.append(ToolMessage(
-                                content=str(result),
-                                tool_call_id=tool_call_id
-                            ))
-
-                        except Exception as e:
-                            error_msg = f"Error executing {tool_name}: {str(e)}"
-                            if self.verbose:
-                                print(f"    ❌ {error_msg}")
-
-                            # MANUALLY TRIGGER on_tool_error callback
-                            if callbacks:
-                                for callback in callbacks:
-                                    try:
-                                        callback.on_tool_error(error=e)
-                                    except Exception as cb_err:
-                                        print(f"⚠️  Callback error in on_tool_error: {cb_err}")
-
-                            tool_results.append({
-                                "tool": tool_name,
-                                "args": tool_args,
-                                "error": str(e),
-                                "success": False
-                            })
-
-                            # Add error message
-                            messages.append(ToolMessage(
-                                content=error_msg,
-                                tool_call_id=tool_call_id
-                            ))
-                    else:
-                        error_msg = f"Tool {tool_name} not found"
-                        if self.verbose:
-                            print(f"    ❌ {error_msg}")
-
-                        tool_results.append({
-                            "tool": tool_name,
-                            "error": "Tool not found",
-                            "success": False
-                        })
-
-                        messages.append(ToolMessage(
-                            content=error_msg,
-                            tool_call_id=tool_call_id
-                        ))
+                # Independent read-only calls run concurrently; sandbox-mutating tools stay serial
+                tool_results, tool_messages = execute_tool_calls(
+                    response.tool_calls,
+                    self.tool_map,
+                    callbacks=callbacks,
+                    parallel=self.parallel_tool_calls,
+                    verbose=self.verbose
+                )
+                messages.extend(tool_messages)
+
+                step["tool_calls"] = tool_results
+                steps.append(step)
+
+            # Max iterations reached
+            return {
+                "output": "Max iterations reached without final answer",
+                "steps": steps,
+                "success": False,
+                "error": "max_iterations_reached"
+            }
+
+        except Exception as e:
+            if self.verbose:
+                print(f"\n❌ Agent error: {str(e)}")
+
+            return {
+                "output": f"Error: {str(e)}",
+                "steps": steps,
+                "success": False,
+                "error": str(e)
+            }
+
+    async def _ainvoke_model(self, messages: List, config: Dict[str, Any], stream: bool):
+        """
+        Get one model response without blocking the event loop.
+
+        With stream=True the response is consumed via astream(), so callbacks
+        receive on_llm_new_token for every partial token; chunks are merged
+        back into a single AIMessage (including tool calls).
+        """
+        if not stream:
+            return await self.model_with_tools.ainvoke(messages, config=config)
+
+        aggregated = None
+        async for chunk in self.model_with_tools.astream(messages, config=config):
+            aggregated = chunk if aggregated is None else aggregated + chunk
+
+        if aggregated is None:
+            return AIMessage(content="")
+        return message_chunk_to_message(aggregated)
+
+    async def arun(
+        self,
+        query: Union[str, List],
+        conversation_history: Optional[List] = None,
+        callbacks: Optional[List[BaseCallbackHandler]] = None,
+        stream: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """
+        Async version of run() - same loop, but never holds a thread while waiting.
+
+        Model calls use astream()/ainvoke(); tool calls go through
+        aexecute_tool_calls(), which awaits native async tools and offloads
+        sync tools to the shared bounded dispatch pool.
+
+        Args:
+            query: User's input query (string or list for multimodal content)
+            conversation_history: Optional list of previous messages (user/assistant ONLY, no SystemMessage)
+            callbacks: Optional list of callback handlers for streaming/monitoring
+            stream: Stream partial tokens to callbacks (on_llm_new_token);
+                    defaults to PERFORMANCE_CONFIG["stream_llm_tokens"]
+
+        Returns:
+            Dict with 'output' (final answer) and 'steps' (execution trace)
+        """
+        if stream is None:
+            stream = PERFORMANCE_CONFIG.get("stream_llm_tokens", True)
+
+        messages = self._build_messages(query, conversation_history)
+        window = self._context_window(messages, conversation_history)
+
+        steps = []
+        iteration = 0
+
+        # Prepare callback config
+        config = {"callbacks": callbacks} if callbacks else {}
+
+        try:
+            while iteration < self.max_iterations:
+                iteration += 1
+
+                if self.verbose:
+                    print(f"\n{'='*80}")
+                    print(f"Iteration {iteration}/{self.max_iterations} (async)")
+                    print(f"{'='*80}")
+
+                # Compaction may spill observations to the sandbox (GCS upload): off the event loop
+                context_tokens = await asyncio.to_thread(self._fit_context, window, iteration)
+                response = await self._ainvoke_model(messages, config, stream)
+
+                # Check for MALFORMED_FUNCTION_CALL error (same retry policy as run())
+                if self._is_malformed_function_call(response, iteration):
+                    if iteration == 1:
+                        if conversation_history and len(conversation_history) > 0:
+                            print("🔄 Retrying without chat history...")
+                            messages_no_history = self._messages_without_history(messages)
+
+                            response = await self._ainvoke_model(messages_no_history, config, stream)
+                            if self._is_malformed_function_call(response, iteration):
+                                return {
+                                    "output": "I encountered a technical error while processing your request. This appears to be a model configuration issue. Please try again or rephrase your question.",
+                                    "steps": steps,
+                                    "success": False,
+                                    "error": "MALFORMED_FUNCTION_CALL after retry"
+                                }
+                            print("✅ Retry succeeded! Continuing without chat history for this session.")
+                            messages = messages_no_history
+                            window = self._context_window(messages, None)
+                        else:
+                            return {
+                                "output": "I encountered a technical error (MALFORMED_FUNCTION_CALL). Please try rephrasing your question.",
+                                "steps": steps,
+                                "success": False,
+                                "error": "MALFORMED_FUNCTION_CALL on first iteration"
+                            }
+
+                messages.append(response)
+
+                step = {
+                    "iteration": iteration,
+                    "response": response.content if hasattr(response, 'content') else str(response),
+                    "context_tokens": context_tokens
+                }
+
+                if not hasattr(response, 'tool_calls') or not response.tool_calls:
+                    return self._final_answer_result(response, step, steps)
+
+                if self.verbose:
+                    print(f"\n🔧 Tool calls detected: {len(response.tool_calls)}")
+
+                tool_results, tool_messages = await aexecute_tool_calls(
+                    response.tool_calls,
+                    self.tool_map,
+                    callbacks=callbacks,
+                    parallel=self.parallel_tool_calls,
+                    verbose=self.verbose
+                )
+                messages.extend(tool_messages)
 
                 step["tool_calls"] = tool_results
                 steps.append(step)
@@ -686,6 +797,24 @@ def run_query(query: str, conversation_history: Optional[List] = None, callbacks
     return langchain_agent.run(query, conversation_history=conversation_history, callbacks=callbacks)
 
 
+async def arun_query(query: str, conversation_history: Optional[List] = None, callbacks: Optional[List[BaseCallbackHandler]] = None) -> Dict[str, Any]:
+    """
+    Async version of run_query() (uses LangChainAgent.arun)
+
+    Args:
+        query: User's input query
+        conversation_history: Optional list of previous messages
+        callbacks: Optional list of callback handlers for streaming/monitoring
+
+    Returns:
+        Dict with 'output' (final answer) and 'steps' (execution trace)
+    """
+    if langchain_agent is None:
+        raise RuntimeError("LangChain agent not initialized. Call initialize_langchain_labos() first.")
+
+    return await langchain_agent.arun(query, conversation_history=conversation_history, callbacks=callbacks)
+
+
 def get_agent() -> Optional[LangChainAgent]:
     """
     Get the current agent instance
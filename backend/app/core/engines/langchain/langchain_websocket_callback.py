@@ -6,6 +6,7 @@ Matches the Smolagents workflow format for frontend compatibility
 
 import json
 import re
+import time
 from typing import Any, Dict, List, Optional
 from datetime import datetime
 from langchain_core.callbacks.base import BaseCallbackHandler
@@ -22,8 +23,20 @@ class LangChainWebSocketCallback(BaseCallbackHandler):
     - Better testability (can inject mock queue)
     - Loose coupling (callback doesn't depend on global singleton)
     - Flexibility (can use different queue implementations)
+
+    Token streaming: on_llm_new_token() buffers partial output per LLM run
+    and emits coalesced "token" events (not persisted) so the frontend can
+    render the answer while it is generated.
     """
 
+    # Handlers only enqueue events, so run them inline on the event loop
+    # (keeps token/step ordering instead of hopping through an executor)
+    run_inline = True
+
+    # Coalesce streamed tokens: flush after this many chars or seconds
+    TOKEN_FLUSH_CHARS = 64
+    TOKEN_FLUSH_INTERVAL = 0.1
+
     def __init__(
         self,
         workflow_id: str,
@@ -47,6 +60,10 @@ class LangChainWebSocketCallback(BaseCallbackHandler):
         self.step_counter = 0
         self.current_tool_name = None
         self.current_tool_input = None
+        # run_id -> (tool_name, tool_input) so overlapping (parallel) tool calls stay paired
+        self._active_tools: Dict[Any, tuple] = {}
+        # run_id -> (buffered token text, last flush time) for streamed LLM output
+        self._token_buffers: Dict[Any, tuple] = {}
         self.collected_steps = []  # Collect steps for database persistence
 
         # Dependency injection: Use provided queue or fallback to global singleton
@@ -112,19 +129,23 @@ class LangChainWebSocketCallback(BaseCallbackHandler):
                     # Check for visualization_metadata field (sandbox plotting tools use this)
                     if 'visualization_metadata' in data:
                         viz_data = data['visualization_metadata']
-                        return {
-                            'visualizations': [{
-                                'type': viz_data.get('type', 'chart'),
-                                'chart_type': viz_data.get('chart_type', 'generated'),
-                                'title': viz_data.get('title', 'Visualization'),
-                                'filename': data.get('file_path'),
-                                'sandbox_path': data.get('sandbox_path'),
-                                'base64': viz_data.get('base64'),  # Full base64 image data
-                                'width': viz_data.get('width', 1000),
-                                'height': viz_data.get('height', 600),
-                                'format': viz_data.get('format', 'png'),
-                            }]
+                        visualization = {
+                            'type': viz_data.get('type', 'chart'),
+                            'chart_type': viz_data.get('chart_type', 'generated'),
+                            'title': viz_data.get('title', 'Visualization'),
+                            'filename': data.get('file_path'),
+                            'sandbox_path': data.get('sandbox_path'),
+                            'width': viz_data.get('width', 1000),
+                            'height': viz_data.get('height', 600),
+                            'format': viz_data.get('format', 'png'),
                         }
+                        if viz_data.get('artifact_url'):
+                            # Artifact reference: the image itself is served by /api/v1/artifacts
+                            visualization['sha256'] = viz_data.get('sha256')
+                            visualization['artifact_url'] = viz_data['artifact_url']
+                        else:
+                            visualization['base64'] = viz_data.get('base64')  # Full base64 image data (fallback)
+                        return {'visualizations': [visualization]}
 
                     # Check for visualization metadata field (legacy format)
                     if 'visualization' in data:
@@ -212,10 +233,43 @@ class LangChainWebSocketCallback(BaseCallbackHandler):
         # This avoids showing "Analyzing your request..." placeholders
         print(f"  ⏳ Waiting for LLM to complete before emitting thinking event")
 
+    def _flush_tokens(self, run_id: Any):
+        """Emit buffered tokens of one LLM run as a single token event"""
+        buffered, _ = self._token_buffers.pop(run_id, ("", 0.0))
+        if not buffered:
+            return
+
+        self.event_queue.put(WorkflowEvent(
+            workflow_id=self.workflow_id,
+            event_type="token",
+            timestamp=datetime.now(),
+            step_number=self.step_counter,
+            title="",
+            delta=buffered,
+            stream_id=str(run_id) if run_id is not None else None
+        ))
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        """Called for each streamed token (LangChainAgent.arun) - coalesced before emitting"""
+        if not token or not isinstance(token, str):
+            return
+
+        run_id = kwargs.get("run_id")
+        buffered, last_flush = self._token_buffers.get(run_id, ("", time.monotonic()))
+        buffered += token
+        self._token_buffers[run_id] = (buffered, last_flush)
+
+        if len(buffered) >= self.TOKEN_FLUSH_CHARS or time.monotonic() - last_flush >= self.TOKEN_FLUSH_INTERVAL:
+            self._flush_tokens(run_id)
+            self._token_buffers[run_id] = ("", time.monotonic())
+
     def on_llm_end(self, response: Any, **kwargs: Any) -> None:
         """Called when LLM finishes generating - emit actual thinking content"""
         print(f"🔔 LangChain Callback: on_llm_end called")
 
+        # Send the tail of a streamed response before the thinking step
+        self._flush_tokens(kwargs.get("run_id"))
+
         # Extract the actual LLM response text
         try:
             # LangChain response structure: response.generations[0][0].text
@@ -316,6 +370,9 @@ class LangChainWebSocketCallback(BaseCallbackHandler):
         tool_name = serialized.get("name", "unknown_tool")
         self.current_tool_name = tool_name
         self.current_tool_input = input_str
+        run_id = kwargs.get("run_id")
+        if run_id is not None:
+            self._active_tools[run_id] = (tool_name, input_str)
 
         print(f"  🔧 Tool: {tool_name}, Input: {input_str[:100]}...")
 
@@ -343,10 +400,17 @@ class LangChainWebSocketCallback(BaseCallbackHandler):
 
         self._emit_event("tool_execution", step_data)
 
+    def _resolve_tool_name(self, run_id: Any) -> Optional[str]:
+        """Tool name for a finished call (by run_id when available)"""
+        if run_id is not None and run_id in self._active_tools:
+            return self._active_tools.pop(run_id)[0]
+        return self.current_tool_name
+
     def on_tool_end(self, output: str, **kwargs: Any) -> None:
         """Called when tool execution ends"""
         print(f"🔔 LangChain Callback: on_tool_end called")
         print(f"  ✅ Tool result: {output[:200]}...")
+        tool_name = self._resolve_tool_name(kwargs.get("run_id"))
 
         # Extract visualization metadata from tool output
         visualization_metadata = self._extract_visualization_metadata(output)
@@ -354,16 +418,16 @@ class LangChainWebSocketCallback(BaseCallbackHandler):
 
         # Show tool output details (matching V1's detailed display)
         # V1 shows full stdout/output, so V2 should too
-        description = f"Completed {self.current_tool_name}"
+        description = f"Completed {tool_name}"
         if output:
             description = f"Result:\n{output}"
 
 
         step_data = {
             "step_type": "tool_execution",
-            "title": f"Tool Result: {self.current_tool_name}",
+            "title": f"Tool Result: {tool_name}",
             "description": description,
-            "tool_name": self.current_tool_name,
+            "tool_name": tool_name,
             "tool_result": output,
             "step_number": self._increment_step(),
             "timestamp": datetime.now().isoformat()
@@ -405,6 +469,7 @@ class LangChainWebSocketCallback(BaseCallbackHandler):
 
     def on_llm_error(self, error: Exception, **kwargs: Any) -> None:
         """Called when LLM encounters an error"""
+        self._token_buffers.pop(kwargs.get("run_id"), None)
         step_data = {
             "step_type": "error",
             "title": "Error",
@@ -417,11 +482,12 @@ class LangChainWebSocketCallback(BaseCallbackHandler):
 
     def on_tool_error(self, error: Exception, **kwargs: Any) -> None:
         """Called when tool encounters an error"""
+        tool_name = self._resolve_tool_name(kwargs.get("run_id"))
         step_data = {
             "step_type": "error",
             "title": "Tool Error",
-            "description": f"Tool {self.current_tool_name} error: {str(error)}",
-            "tool_name": self.current_tool_name,
+            "description": f"Tool {tool_name} error: {str(error)}",
+            "tool_name": tool_name,
             "step_number": self._increment_step(),
             "timestamp": datetime.now().isoformat()
         }
@@ -14,8 +14,12 @@ Key difference from Smolagents:
 """
 
 from typing import Dict, List, Optional, Any, Callable, Union, Tuple
+import dataclasses
 from dataclasses import dataclass, field
 from pathlib import Path
+import asyncio
+import copy
+import functools
 import json
 import yaml
 import base64
@@ -29,13 +33,13 @@ _active_system: contextvars.ContextVar[Optional['MultiAgentSystem']] = contextva
 )
 
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-from langchain_core.tools import tool
+from langchain_core.tools import tool, StructuredTool
 from langchain_core.callbacks import BaseCallbackHandler
 
 from .langchain_engine import LangChainAgent, create_model
+from .agent_templates import get_agent_template_pool
 
 # Import new LLM configuration layer
-from app.core.llm.factory import LLMFactory
 from app.core.llm.config import LLMConfig, get_default_agent_configs
 
 
@@ -87,6 +91,25 @@ class MultiAgentConfig:
         }
 
 
+@functools.lru_cache(maxsize=None)
+def _read_prompt_yaml(relative_path: str) -> Dict[str, Any]:
+    """
+    Parse a prompt file under app/config/prompts (once per process).
+
+    Workflows are set up for every chat message; the prompt files only
+    change with a deployment. Errors are not cached, so a missing file is
+    retried on the next call.
+    """
+    app_dir = Path(__file__).resolve().parents[3]
+    prompt_path = app_dir / "config" / "prompts" / relative_path
+
+    with open(prompt_path, 'r', encoding='utf-8') as f:
+        prompt_config = yaml.safe_load(f) or {}
+
+    print(f"✅ Loaded prompt from: {relative_path}")
+    return prompt_config
+
+
 def load_agent_prompts() -> Dict[str, Any]:
     """
     Load agent prompts from agent_prompts.yaml (V1 configuration)
@@ -95,14 +118,7 @@ def load_agent_prompts() -> Dict[str, Any]:
         Dictionary with prompts for each agent
     """
     try:
-        app_dir = Path(__file__).resolve().parents[3]
-        prompts_path = app_dir / "config" / "prompts" / "agent_prompts.yaml"
-
-        with open(prompts_path, 'r', encoding='utf-8') as f:
-            prompts = yaml.safe_load(f)
-
-        print(f"✅ Loaded agent prompts from: {prompts_path}")
-        return prompts
+        return copy.deepcopy(_read_prompt_yaml("agent_prompts.yaml"))
     except Exception as e:
         print(f"⚠️  Could not load agent prompts: {e}")
         return {}
@@ -119,15 +135,7 @@ def load_langchain_agent_prompt(agent_name: str) -> str:
         System prompt string for the agent
     """
     try:
-        app_dir = Path(__file__).resolve().parents[3]
-        prompt_path = app_dir / "config" / "prompts" / "langchain" / f"{agent_name}.yaml"
-
-        with open(prompt_path, 'r', encoding='utf-8') as f:
-            prompt_config = yaml.safe_load(f)
-
-        system_prompt = prompt_config.get('system_prompt', '')
-        print(f"✅ Loaded {agent_name} prompt from: langchain/{agent_name}.yaml")
-        return system_prompt
+        return _read_prompt_yaml(f"langchain/{agent_name}.yaml").get('system_prompt', '')
     except Exception as e:
         print(f"⚠️  Could not load {agent_name} prompt: {e}")
         return f"You are the {agent_name.replace('_', ' ').title()} in LABOS."
@@ -145,19 +153,8 @@ def load_manager_prompt(mode: str = "deep") -> str:
     """
     if mode == "fast":
         # Load Fast Mode prompt (smolagents format but works for LangChain too)
-        import yaml
-        from pathlib import Path
-
         try:
-            app_dir = Path(__file__).resolve().parents[3]
-            fast_prompt_path = app_dir / "config" / "prompts" / "LabOS_prompt_fast_mode.yaml"
-
-            with open(fast_prompt_path, 'r', encoding='utf-8') as f:
-                fast_prompt_config = yaml.safe_load(f)
-
-            system_prompt = fast_prompt_config.get('system_prompt', '')
-            print(f"⚡ Fast Mode prompt loaded from: {fast_prompt_path}")
-            return system_prompt
+            return _read_prompt_yaml("LabOS_prompt_fast_mode.yaml").get('system_prompt', '')
         except Exception as e:
             print(f"⚠️  Could not load Fast Mode prompt: {e}")
             # Fallback to basic fast mode prompt
@@ -357,33 +354,24 @@ class MultiAgentSystem:
             delegate_task.__doc__ = f"Delegate a task to {agent_name}. {description[:200]}"
             return delegate_task
 
+        async def adelegate_task(task: str) -> str:
+            return await self._aexecute_on_agent(agent_name, task)
+
         # Create function with docstring
         func = create_delegate_func(agent_name, agent_description)
 
-        # Apply @tool decorator
-        delegate_tool = tool(func)
-
-        # Set tool name
-        delegate_tool.name = f"ask_{agent_name}"
+        # Sync + async implementations: arun() awaits the sub-agent natively
+        delegate_tool = StructuredTool.from_function(
+            func=func,
+            coroutine=adelegate_task,
+            name=f"ask_{agent_name}",
+            description=func.__doc__
+        )
 
         return delegate_tool
 
-    def _execute_on_agent(self, agent_name: str, task: str) -> str:
-        """
-        Execute a task on a specific agent
-
-        Args:
-            agent_name: Name of the agent
-            task: Task to execute
-
-        Returns:
-            Agent's response
-        """
-        if agent_name not in self.agents:
-            return f"Error: Agent {agent_name} not found"
-
-        agent = self.agents[agent_name]
-
+    def _prepare_delegation(self, agent_name: str, task: str) -> List:
+        """Log the delegation and build the sub-agent's conversation context"""
         # Log delegation
         if self.verbose:
             print(f"\n{'='*60}")
@@ -409,60 +397,112 @@ class MultiAgentSystem:
             else:
                 history_context.append(HumanMessage(content=f"[{msg['agent']}]: {msg['content']}"))
 
+        return history_context
+
+    def _complete_delegation(self, agent_name: str, result: Dict[str, Any]) -> str:
+        """Turn a sub-agent result into the manager-facing response"""
+        response = result.get("output", "")
+
+        # If max iterations was reached, extract useful info from completed steps
+        # so the manager knows what was actually accomplished
+        if result.get("error") == "max_iterations_reached":
+            steps = result.get("steps", [])
+            successful_tools = []
+            for step in steps:
+                for tc in step.get("tool_calls", []):
+                    if tc.get("success") and tc.get("tool"):
+                        tool_result_str = str(tc.get("result", ""))[:300]
+                        successful_tools.append(f"- {tc['tool']}: {tool_result_str}")
+
+            if successful_tools:
+                response = (
+                    f"Task partially completed ({len(successful_tools)} tool calls executed "
+                    f"but agent ran out of iterations before producing a final summary).\n\n"
+                    f"Completed actions:\n" + "\n".join(successful_tools)
+                )
+
+            if self.verbose:
+                print(f"⚠️ {agent_name} hit max_iterations, extracted {len(successful_tools)} tool results")
+
+        # Add response to conversation
+        self.conversation.add_message(
+            agent_name=agent_name,
+            content=response,
+            metadata={
+                "success": result.get("success", True),
+                "steps": len(result.get("steps", []))
+            }
+        )
+
+        if self.verbose:
+            print(f"✅ {agent_name} completed task")
+            print(f"Response length: {len(response)} chars\n")
+
+        return response
+
+    def _delegation_error(self, agent_name: str, e: Exception) -> str:
+        error_msg = f"Error in {agent_name}: {str(e)}"
+        self.conversation.add_message(
+            agent_name=agent_name,
+            content=error_msg,
+            metadata={"type": "error"}
+        )
+        return error_msg
+
+    def _execute_on_agent(self, agent_name: str, task: str) -> str:
+        """
+        Execute a task on a specific agent
+
+        Args:
+            agent_name: Name of the agent
+            task: Task to execute
+
+        Returns:
+            Agent's response
+        """
+        if agent_name not in self.agents:
+            return f"Error: Agent {agent_name} not found"
+
+        agent = self.agents[agent_name]
+        history_context = self._prepare_delegation(agent_name, task)
+
         # Execute task
         try:
             result = agent.run(
                 query=task,
                 conversation_history=history_context
             )
+            return self._complete_delegation(agent_name, result)
 
-            response = result.get("output", "")
-
-            # If max iterations was reached, extract useful info from completed steps
-            # so the manager knows what was actually accomplished
-            if result.get("error") == "max_iterations_reached":
-                steps = result.get("steps", [])
-                successful_tools = []
-                for step in steps:
-                    for tc in step.get("tool_calls", []):
-                        if tc.get("success") and tc.get("tool"):
-                            tool_result_str = str(tc.get("result", ""))[:300]
-                            successful_tools.append(f"- {tc['tool']}: {tool_result_str}")
-
-                if successful_tools:
-                    response = (
-                        f"Task partially completed ({len(successful_tools)} tool calls executed "
-                        f"but agent ran out of iterations before producing a final summary).\n\n"
-                        f"Completed actions:\n" + "\n".join(successful_tools)
-                    )
-
-                if self.verbose:
-                    print(f"⚠️ {agent_name} hit max_iterations, extracted {len(successful_tools)} tool results")
-
-            # Add response to conversation
-            self.conversation.add_message(
-                agent_name=agent_name,
-                content=response,
-                metadata={
-                    "success": result.get("success", True),
-                    "steps": len(result.get("steps", []))
-                }
-            )
+        except Exception as e:
+            return self._delegation_error(agent_name, e)
 
-            if self.verbose:
-                print(f"✅ {agent_name} completed task")
-                print(f"Response length: {len(response)} chars\n")
+    async def _aexecute_on_agent(self, agent_name: str, task: str) -> str:
+        """
+        Async version of _execute_on_agent() (sub-agent runs via arun)
 
-            return response
+        Args:
+            agent_name: Name of the agent
+            task: Task to execute
 
-        except Exception as e:
-            error_msg = f"Error in {agent_name}: {str(e)}"
-            self.conversation.add_message(
-                agent_name=agent_name,
-                content=error_msg,
-                metadata={"type": "error"}
+        Returns:
+            Agent's response
+        """
+        if agent_name not in self.agents:
+            return f"Error: Agent {agent_name} not found"
+
+        agent = self.agents[agent_name]
+        history_context = self._prepare_delegation(agent_name, task)
+
+        try:
+            result = await agent.arun(
+                query=task,
+                conversation_history=history_context
             )
-            return error_msg
+            return self._complete_delegation(agent_name, result)
+
+        except Exception as e:
+            return self._delegation_error(agent_name, e)
 
     def register_dev_agent(
         self,
@@ -498,9 +538,8 @@ class MultiAgentSystem:
         # Use provided model or create one
         if model is None:
             if llm_config is not None:
-                # Use LLMConfig (recommended way)
-                from app.core.llm.factory import LLMFactory
-                model = LLMFactory.create(llm_config)
+                # Use LLMConfig (recommended way, pooled per config)
+                model = get_agent_template_pool().get_model(llm_config)
             else:
                 # Fallback to old model_type/temperature API (backward compatibility)
                 model = create_model(
@@ -513,7 +552,8 @@ class MultiAgentSystem:
             tools=all_tools,
             system_prompt=system_prompt,
             max_iterations=10,
-            verbose=self.verbose
+            verbose=self.verbose,
+            name="dev_agent"
         )
 
         self.agents["dev_agent"] = agent
@@ -563,8 +603,7 @@ class MultiAgentSystem:
         # Use provided model or create one
         if model is None:
             if llm_config is not None:
-                from app.core.llm.factory import LLMFactory
-                model = LLMFactory.create(llm_config)
+                model = get_agent_template_pool().get_model(llm_config)
             else:
                 model = create_model(
                     model_type=model_type,
@@ -576,7 +615,8 @@ class MultiAgentSystem:
             tools=all_tools,
             system_prompt=system_prompt,
             max_iterations=8,
-            verbose=self.verbose
+            verbose=self.verbose,
+            name="tool_creation_agent"
         )
 
         self.agents["tool_creation_agent"] = agent
@@ -622,8 +662,7 @@ class MultiAgentSystem:
         # Use provided model or create one
         if model is None:
             if llm_config is not None:
-                from app.core.llm.factory import LLMFactory
-                model = LLMFactory.create(llm_config)
+                model = get_agent_template_pool().get_model(llm_config)
             else:
                 model = create_model(
                     model_type=model_type,
@@ -635,7 +674,8 @@ class MultiAgentSystem:
             tools=tools,
             system_prompt=system_prompt,
             max_iterations=6,
-            verbose=self.verbose
+            verbose=self.verbose,
+            name="critic_agent"
         )
 
         self.agents["critic_agent"] = agent
@@ -682,12 +722,10 @@ class MultiAgentSystem:
         # Use provided model or create one (prefer lightweight/fast model for quick generation)
         if model is None:
             if llm_config is not None:
-                from app.core.llm.factory import LLMFactory
-                model = LLMFactory.create(llm_config)
+                model = get_agent_template_pool().get_model(llm_config)
             else:
                 # Use lightweight flash model for fast follow-up generation
                 import os
-                from app.core.llm.factory import LLMFactory
                 from app.core.llm.config import LLMConfig
                 # Use GEMINI_FLASH_MODEL for speed, fallback to gemini-3-flash-preview
                 flash_model = os.getenv("GEMINI_FLASH_MODEL", "gemini-3-flash-preview")
@@ -697,7 +735,7 @@ class MultiAgentSystem:
                     temperature=temperature,
                     max_tokens=512  # Small output for follow-up questions
                 )
-                model = LLMFactory.create(config)
+                model = get_agent_template_pool().get_model(config)
                 print(f"⚡ Follow-up agent using fast model: {flash_model}")
 
         # No tools needed - pure LLM generation
@@ -706,7 +744,8 @@ class MultiAgentSystem:
             tools=[],  # No tools
             system_prompt=system_prompt,
             max_iterations=1,  # Single pass
-            verbose=self.verbose
+            verbose=self.verbose,
+            name="follow_up_agent"
         )
 
         self.agents["follow_up_agent"] = agent
@@ -775,8 +814,7 @@ class MultiAgentSystem:
         # Use provided model or create one
         if model is None:
             if llm_config is not None:
-                from app.core.llm.factory import LLMFactory
-                model = LLMFactory.create(llm_config)
+                model = get_agent_template_pool().get_model(llm_config)
             else:
                 model = create_model(
                     model_type=model_type,
@@ -788,7 +826,8 @@ class MultiAgentSystem:
             tools=all_tools,
             system_prompt=system_prompt,
             max_iterations=15,  # More iterations for coordination
-            verbose=self.verbose
+            verbose=self.verbose,
+            name="manager_agent"
         )
 
         self.manager_agent = agent
@@ -807,27 +846,8 @@ class MultiAgentSystem:
 
         return agent
 
-    def run(
-        self,
-        query: Union[str, List],
-        conversation_history: Optional[List] = None,
-        callbacks: Optional[List[BaseCallbackHandler]] = None
-    ) -> Dict[str, Any]:
-        """
-        Run the multi-agent system with a user query
-
-        The manager_agent receives the query and coordinates other agents as needed.
-
-        Args:
-            query: User's input query (string or list for multimodal content)
-                  - String: "Describe this image"
-                  - List: [{"type": "text", "text": "..."}, {"type": "media", "data": "...", "mime_type": "..."}]
-            conversation_history: Optional conversation history from database
-            callbacks: Optional callback handlers
-
-        Returns:
-            Dict with 'output', 'steps', 'agents_involved'
-        """
+    def _begin_run(self, query: Union[str, List]):
+        """Emit the start workflow step and record the user query"""
         if not self.manager_agent:
             raise RuntimeError("Manager agent not initialized. Call register_manager_agent() first.")
 
@@ -885,6 +905,50 @@ class MultiAgentSystem:
             metadata={"type": "user_query"}
         )
 
+    def _finish_run(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Record the manager's answer and attach agent metadata"""
+        # Add manager's response to conversation
+        self.conversation.add_message(
+            agent_name="manager_agent",
+            content=result.get("output", ""),
+            metadata={
+                "type": "final_answer",
+                "success": result.get("success", True)
+            }
+        )
+
+        # NOTE: Complete step is emitted in chat_projects.py after the run completes
+        # This ensures all callback events are processed before the Complete step
+
+        # Add metadata about agent involvement
+        result["agents_involved"] = list(self.agents.keys())
+        result["conversation_messages"] = len(self.conversation.messages)
+
+        return result
+
+    def run(
+        self,
+        query: Union[str, List],
+        conversation_history: Optional[List] = None,
+        callbacks: Optional[List[BaseCallbackHandler]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run the multi-agent system with a user query
+
+        The manager_agent receives the query and coordinates other agents as needed.
+
+        Args:
+            query: User's input query (string or list for multimodal content)
+                  - String: "Describe this image"
+                  - List: [{"type": "text", "text": "..."}, {"type": "media", "data": "...", "mime_type": "..."}]
+            conversation_history: Optional conversation history from database
+            callbacks: Optional callback handlers
+
+        Returns:
+            Dict with 'output', 'steps', 'agents_involved'
+        """
+        self._begin_run(query)
+
         # Prepare conversation history
         full_history = conversation_history or []
 
@@ -900,24 +964,43 @@ class MultiAgentSystem:
         finally:
             _active_system.reset(token)
 
-        # Add manager's response to conversation
-        self.conversation.add_message(
-            agent_name="manager_agent",
-            content=result.get("output", ""),
-            metadata={
-                "type": "final_answer",
-                "success": result.get("success", True)
-            }
-        )
+        return self._finish_run(result)
 
-        # NOTE: Complete step is emitted in chat_projects.py after executor completes
-        # This ensures all callback events are processed before the Complete step
+    async def arun(
+        self,
+        query: Union[str, List],
+        conversation_history: Optional[List] = None,
+        callbacks: Optional[List[BaseCallbackHandler]] = None
+    ) -> Dict[str, Any]:
+        """
+        Async version of run() - the manager and delegated sub-agents run on
+        the event loop via LangChainAgent.arun(), streaming partial tokens to
+        callbacks. Sync tools are offloaded to the shared tool dispatch pool.
 
-        # Add metadata about agent involvement
-        result["agents_involved"] = list(self.agents.keys())
-        result["conversation_messages"] = len(self.conversation.messages)
+        Args:
+            query: User's input query (string or list for multimodal content)
+            conversation_history: Optional conversation history from database
+            callbacks: Optional callback handlers
 
-        return result
+        Returns:
+            Dict with 'output', 'steps', 'agents_involved'
+        """
+        self._begin_run(query)
+
+        full_history = conversation_history or []
+
+        # ContextVar is per-task, so concurrent arun() calls on one loop stay isolated
+        token = _active_system.set(self)
+        try:
+            result = await self.manager_agent.arun(
+                query=query,
+                conversation_history=full_history,
+                callbacks=callbacks
+            )
+        finally:
+            _active_system.reset(token)
+
+        return self._finish_run(result)
 
     def get_status(self) -> Dict[str, Any]:
         """Get status of the multi-agent system"""
@@ -1202,62 +1285,69 @@ def _register_agents_to_system(
         verbose: Enable verbose logging
         agent_llm_configs: Optional LLM configs for each agent (from get_default_agent_configs or user override)
     """
-    # Load default configs if not provided
-    if agent_llm_configs is None:
-        agent_llm_configs = get_default_agent_configs()
-
-    # Create LLM instances for each agent
-    dev_config = agent_llm_configs.get("dev_agent")
-    dev_model = LLMFactory.create(dev_config) if dev_config else None
-
-    tool_config = agent_llm_configs.get("tool_creation_agent")
-    tool_model = LLMFactory.create(tool_config) if tool_config else None
-
-    critic_config = agent_llm_configs.get("critic_agent")
-    critic_model = LLMFactory.create(critic_config) if critic_config else None
-
-    manager_config = agent_llm_configs.get("manager")
-
-    # In Fast Mode with Gemini: Enable Google Search grounding
-    if mode == "fast" and manager_config and manager_config.provider.lower() == "gemini":
-        print(f"⚡ Fast Mode: Enabling Google Search grounding for Gemini")
-        # Add google_search to extra_params
-        manager_config.extra_params["google_search"] = True
+    pool = get_agent_template_pool()
+    with pool.track_setup() as setup:
+        # Load default configs if not provided
+        if agent_llm_configs is None:
+            agent_llm_configs = get_default_agent_configs()
+
+        # LLM clients are shared per config (see agent_templates.py)
+        dev_config = agent_llm_configs.get("dev_agent")
+        dev_model = pool.get_model(dev_config) if dev_config else None
+
+        tool_config = agent_llm_configs.get("tool_creation_agent")
+        tool_model = pool.get_model(tool_config) if tool_config else None
+
+        critic_config = agent_llm_configs.get("critic_agent")
+        critic_model = pool.get_model(critic_config) if critic_config else None
+
+        manager_config = agent_llm_configs.get("manager")
+
+        # In Fast Mode with Gemini: Enable Google Search grounding
+        if mode == "fast" and manager_config and manager_config.provider.lower() == "gemini":
+            print(f"⚡ Fast Mode: Enabling Google Search grounding for Gemini")
+            # Add google_search to extra_params (on a copy: configs may be shared)
+            manager_config = dataclasses.replace(
+                manager_config, extra_params={**manager_config.extra_params, "google_search": True}
+            )
 
-    manager_model = LLMFactory.create(manager_config) if manager_config else None
+        manager_model = pool.get_model(manager_config) if manager_config else None
 
-    # In Fast Mode: Only register manager agent (no specialized agents)
-    if mode == "fast":
-        print(f"⚡ Fast Mode: Registering ONLY manager agent (no specialized agents)")
-        if manager_model:
-            system.register_manager_agent(tools=manager_tools, mode=mode, model=manager_model)
-        else:
-            system.register_manager_agent(tools=manager_tools, mode=mode)
-    else:
-        # Deep Mode: Register all agents in order
-        # 1. Dev agent (visualization, research, tool-based operations)
-        if dev_model:
-            system.register_dev_agent(tools=base_tools, model=dev_model)
+        # In Fast Mode: Only register manager agent (no specialized agents)
+        if mode == "fast":
+            print(f"⚡ Fast Mode: Registering ONLY manager agent (no specialized agents)")
+            if manager_model:
+                system.register_manager_agent(tools=manager_tools, mode=mode, model=manager_model)
+            else:
+                system.register_manager_agent(tools=manager_tools, mode=mode)
         else:
-            system.register_dev_agent(tools=base_tools)
+            # Deep Mode: Register all agents in order
+            # 1. Dev agent (visualization, research, tool-based operations)
+            if dev_model:
+                system.register_dev_agent(tools=base_tools, model=dev_model)
+            else:
+                system.register_dev_agent(tools=base_tools)
 
-        # 2. Tool creation agent (dynamic tool generation)
-        if tool_model:
-            system.register_tool_creation_agent(tools=base_tools, model=tool_model)
-        else:
-            system.register_tool_creation_agent(tools=base_tools)
+            # 2. Tool creation agent (dynamic tool generation)
+            if tool_model:
+                system.register_tool_creation_agent(tools=base_tools, model=tool_model)
+            else:
+                system.register_tool_creation_agent(tools=base_tools)
 
-        # 3. Critic agent (quality evaluation)
-        if critic_model:
-            system.register_critic_agent(tools=base_tools, model=critic_model)
-        else:
-            system.register_critic_agent(tools=base_tools)
+            # 3. Critic agent (quality evaluation)
+            if critic_model:
+                system.register_critic_agent(tools=base_tools, model=critic_model)
+            else:
+                system.register_critic_agent(tools=base_tools)
 
-        # 4. Manager agent (must be last to get delegation tools)
-        if manager_model:
-            system.register_manager_agent(tools=manager_tools, mode=mode, model=manager_model)
-        else:
-            system.register_manager_agent(tools=manager_tools, mode=mode)
+            # 4. Manager agent (must be last to get delegation tools)
+            if manager_model:
+                system.register_manager_agent(tools=manager_tools, mode=mode, model=manager_model)
+            else:
+                system.register_manager_agent(tools=manager_tools, mode=mode)
+
+    print(f"⏱️ Agent setup ({mode}): {setup['seconds'] * 1000:.1f} ms, "
+          f"{setup.get('clients_created', 0)} new LLM clients, {setup.get('bindings_created', 0)} new tool bindings")
 
     if verbose:
         print("\n" + "="*80)
@@ -1334,6 +1424,33 @@ def run_multi_agent_query(
     return system.run(query, conversation_history, callbacks)
 
 
+async def arun_multi_agent_query(
+    query: str,
+    conversation_history: Optional[List] = None,
+    callbacks: Optional[List[BaseCallbackHandler]] = None,
+    mode: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Async version of run_multi_agent_query() (fresh system per query, run via arun)
+
+    Args:
+        query: User query
+        conversation_history: Optional chat history
+        callbacks: Optional callbacks
+        mode: Override mode ("fast" or "deep"). If None, uses config mode.
+
+    Returns:
+        Dict with output and metadata
+    """
+    # Agent setup is blocking (prompt files, model clients); keep it off the event loop
+    system = await asyncio.to_thread(create_workflow_multi_agent_system, False, mode)
+
+    if not system:
+        raise RuntimeError("Multi-agent system not configured. Call initialize_multi_agent_system() first.")
+
+    return await system.arun(query, conversation_history, callbacks)
+
+
 def generate_follow_up_questions(
     user_query: str,
     ai_response: str,
@@ -0,0 +1,339 @@
+"""
+Tool Dispatch for LangChain Agents
+
+Executes the tool calls returned by a single model turn:
+- Parallel-safe tools (read-only lookups such as query_pubmed, visit_webpage,
+  gemini_google_search) run concurrently on a shared, bounded thread pool
+- Every other tool (python_interpreter, file writers, plotting, delegation
+  to sub-agents) runs serially and acts as a barrier between parallel groups
+- ToolMessages are returned in the original tool_call order
+- Per-call callbacks fire on the calling thread, in order, and carry a
+  run_id so concurrent calls stay paired with their results
+- aexecute_tool_calls() is the async variant used by LangChainAgent.arun():
+  native async tools are awaited, sync tools are offloaded to the same
+  bounded pool so the event loop never blocks on a tool
+
+A tool declares itself parallel-safe with metadata={"parallel_safe": True}
+(see mark_parallel_safe), otherwise the PARALLEL_SAFE_TOOLS defaults apply.
+"""
+
+import asyncio
+import contextvars
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from langchain_core.messages import ToolMessage
+from langchain_core.callbacks.base import BaseCallbackHandler
+
+from app.config import PERFORMANCE_CONFIG
+
+
+# Read-only tools that only talk to external services. They never touch the
+# project sandbox or process-global state, so they are safe to run together.
+PARALLEL_SAFE_TOOLS = frozenset({
+    # Search and web content
+    "gemini_google_search", "gemini_realtime_search",
+    "enhanced_google_search", "search_google_basic", "search_google", "multi_source_search",
+    "smart_search_router", "search_with_serpapi", "enhanced_knowledge_search",
+    "visit_webpage", "extract_url_content", "extract_pdf_content",
+    "search_github_repositories", "search_github_code", "get_github_repository_info",
+    # Literature
+    "query_pubmed", "pubmed_search", "query_arxiv", "query_scholar",
+    # Biological databases
+    "query_uniprot", "query_alphafold", "query_interpro", "query_pdb", "query_pdb_identifiers",
+    "query_kegg", "query_stringdb", "query_paleobiology", "query_jaspar", "query_worms",
+    "query_cbioportal", "query_clinvar", "query_geo", "query_dbsnp", "query_ucsc",
+    "query_ensembl", "query_opentarget_genetics", "query_opentarget", "query_gwas_catalog",
+    "query_gnomad", "blast_sequence", "query_reactome", "query_regulomedb", "query_pride",
+    "query_gtopdb", "region_to_ccre_screen", "get_genes_near_ccre", "query_remap",
+    "query_mpd", "query_emdb",
+    "query_uniprot_batch", "query_alphafold_batch", "query_ensembl_batch", "query_dbsnp_batch",
+    "query_clinvar_batch", "query_gnomad_batch",
+})
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# Marks dispatch worker threads so nested dispatches fall back to serial
+# execution instead of waiting on the pool they are running in.
+_worker_state = threading.local()
+
+
+def is_parallel_safe(tool_obj: Any) -> bool:
+    """
+    Check whether a tool may run concurrently with other tool calls.
+
+    Explicit metadata wins over the PARALLEL_SAFE_TOOLS defaults, so a tool
+    can opt in (or out) without touching this module.
+    """
+    metadata = getattr(tool_obj, "metadata", None) or {}
+    if "parallel_safe" in metadata:
+        return bool(metadata["parallel_safe"])
+    return getattr(tool_obj, "name", None) in PARALLEL_SAFE_TOOLS
+
+
+def mark_parallel_safe(tool_obj: Any, safe: bool = True) -> Any:
+    """
+    Declare a LangChain tool as parallel-safe (or force it serial).
+
+    Returns:
+        The same tool, for use as `tool = mark_parallel_safe(tool)`
+    """
+    tool_obj.metadata = {**(getattr(tool_obj, "metadata", None) or {}), "parallel_safe": safe}
+    return tool_obj
+
+
+def get_tool_dispatch_executor() -> ThreadPoolExecutor:
+    """Get the process-wide tool dispatch pool (created on first use)."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=PERFORMANCE_CONFIG.get("tool_dispatch_workers", 16),
+                    thread_name_prefix="tool-dispatch"
+                )
+    return _executor
+
+
+def _invoke_in_worker(tool_obj: Any, tool_args: Dict[str, Any], workflow_context: Any) -> Any:
+    """Run a tool on a pool thread with the caller's workflow context attached."""
+    from app.services.workflows.workflow_context import attach_workflow_context, detach_workflow_context
+
+    _worker_state.active = True
+    attach_workflow_context(workflow_context)
+    try:
+        return tool_obj.invoke(tool_args)
+    finally:
+        detach_workflow_context()
+        _worker_state.active = False
+
+
+def _fire_callbacks(callbacks: Optional[List[BaseCallbackHandler]], method: str, **kwargs):
+    """Call a callback hook on every handler, isolating handler errors."""
+    if not callbacks:
+        return
+    for callback in callbacks:
+        try:
+            getattr(callback, method)(**kwargs)
+        except Exception as cb_err:
+            print(f"⚠️  Callback error in {method}: {cb_err}")
+
+
+class _PendingCall:
+    """Book-keeping for one tool call of the current model turn."""
+
+    def __init__(self, tool_call: Dict[str, Any], tool_obj: Any):
+        self.name = tool_call["name"]
+        self.args = tool_call["args"]
+        self.call_id = tool_call["id"]
+        self.tool_obj = tool_obj
+        self.run_id = uuid.uuid4()
+        self.result: Any = None
+        self.error: Optional[Exception] = None
+
+
+def _start(call: _PendingCall, callbacks, verbose: bool):
+    if verbose:
+        print(f"  - Calling {call.name} with args: {call.args}")
+    _fire_callbacks(
+        callbacks, "on_tool_start",
+        serialized={"name": call.name},
+        input_str=str(call.args),
+        run_id=call.run_id
+    )
+
+
+def _finish(call: _PendingCall, callbacks, verbose: bool) -> Tuple[Dict[str, Any], ToolMessage]:
+    if call.error is None:
+        if verbose:
+            print(f"    ✅ Result: {str(call.result)[:200]}...")
+        _fire_callbacks(callbacks, "on_tool_end", output=str(call.result), run_id=call.run_id)
+        return (
+            {"tool": call.name, "args": call.args, "result": call.result, "success": True},
+            ToolMessage(content=str(call.result), tool_call_id=call.call_id)
+        )
+
+    error_msg = f"Error executing {call.name}: {str(call.error)}"
+    if verbose:
+        print(f"    ❌ {error_msg}")
+    _fire_callbacks(callbacks, "on_tool_error", error=call.error, run_id=call.run_id)
+    return (
+        {"tool": call.name, "args": call.args, "error": str(call.error), "success": False},
+        ToolMessage(content=error_msg, tool_call_id=call.call_id)
+    )
+
+
+def _plan_groups(
+    tool_calls: List[Dict[str, Any]],
+    tool_map: Dict[str, Any],
+    parallel: bool
+) -> List[Union[Dict[str, Any], List[_PendingCall]]]:
+    """
+    Split one turn's tool calls into execution groups, preserving order.
+
+    Consecutive parallel-safe calls form one group; every other call is a
+    group of its own. Unknown tools are returned as the raw tool_call dict.
+    """
+    plan: List[Union[Dict[str, Any], List[_PendingCall]]] = []
+    group: List[_PendingCall] = []
+
+    for tool_call in tool_calls:
+        tool_obj = tool_map.get(tool_call["name"])
+        if tool_obj is not None and parallel and is_parallel_safe(tool_obj):
+            group.append(_PendingCall(tool_call, tool_obj))
+            continue
+
+        if group:
+            plan.append(group)
+            group = []
+        plan.append([_PendingCall(tool_call, tool_obj)] if tool_obj is not None else tool_call)
+
+    if group:
+        plan.append(group)
+    return plan
+
+
+def _missing_tool(tool_call: Dict[str, Any], verbose: bool) -> Tuple[Dict[str, Any], ToolMessage]:
+    error_msg = f"Tool {tool_call['name']} not found"
+    if verbose:
+        print(f"    ❌ {error_msg}")
+    return (
+        {"tool": tool_call["name"], "error": "Tool not found", "success": False},
+        ToolMessage(content=error_msg, tool_call_id=tool_call["id"])
+    )
+
+
+def execute_tool_calls(
+    tool_calls: List[Dict[str, Any]],
+    tool_map: Dict[str, Any],
+    callbacks: Optional[List[BaseCallbackHandler]] = None,
+    parallel: bool = True,
+    verbose: bool = True
+) -> Tuple[List[Dict[str, Any]], List[ToolMessage]]:
+    """
+    Execute the tool calls of one model turn.
+
+    Consecutive parallel-safe calls are grouped and run concurrently; any
+    other call runs on its own, after the preceding group has finished.
+
+    Args:
+        tool_calls: response.tool_calls from the model
+        tool_map: Tool name -> tool object
+        callbacks: Optional callback handlers (fired per call, in order)
+        parallel: Allow concurrent execution of parallel-safe tools
+        verbose: Print progress
+
+    Returns:
+        Tuple of (tool_results for the step trace, ToolMessages in tool_call order)
+    """
+    from app.services.workflows.workflow_context import get_workflow_context
+
+    tool_results: List[Dict[str, Any]] = []
+    tool_messages: List[ToolMessage] = []
+
+    # Nested dispatch from inside a pool worker runs serially
+    parallel = parallel and not getattr(_worker_state, "active", False)
+    workflow_context = get_workflow_context()
+
+    for group in _plan_groups(tool_calls, tool_map, parallel):
+        if isinstance(group, dict):
+            result, message = _missing_tool(group, verbose)
+            tool_results.append(result)
+            tool_messages.append(message)
+            continue
+
+        if len(group) == 1:
+            call = group[0]
+            _start(call, callbacks, verbose)
+            try:
+                call.result = call.tool_obj.invoke(call.args)
+            except Exception as e:
+                call.error = e
+        else:
+            if verbose:
+                print(f"  ⚡ Running {len(group)} tool calls in parallel: {[c.name for c in group]}")
+
+            executor = get_tool_dispatch_executor()
+            futures = []
+            for call in group:
+                _start(call, callbacks, verbose)
+                ctx = contextvars.copy_context()
+                futures.append(executor.submit(ctx.run, _invoke_in_worker, call.tool_obj, call.args, workflow_context))
+
+            for call, future in zip(group, futures):
+                try:
+                    call.result = future.result()
+                except Exception as e:
+                    call.error = e
+
+        for call in group:
+            result, message = _finish(call, callbacks, verbose)
+            tool_results.append(result)
+            tool_messages.append(message)
+
+    return tool_results, tool_messages
+
+
+async def _ainvoke_tool(tool_obj: Any, tool_args: Dict[str, Any]) -> Any:
+    """
+    Invoke a tool without blocking the event loop.
+
+    Tools with a native coroutine are awaited directly; sync tools are
+    offloaded to the shared dispatch pool with the current context
+    (workflow context, active system) copied over.
+    """
+    if getattr(tool_obj, "coroutine", None) is not None:
+        return await tool_obj.ainvoke(tool_args)
+
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_tool_dispatch_executor(), ctx.run, _invoke_in_worker, tool_obj, tool_args, None
+    )
+
+
+async def aexecute_tool_calls(
+    tool_calls: List[Dict[str, Any]],
+    tool_map: Dict[str, Any],
+    callbacks: Optional[List[BaseCallbackHandler]] = None,
+    parallel: bool = True,
+    verbose: bool = True
+) -> Tuple[List[Dict[str, Any]], List[ToolMessage]]:
+    """
+    Async counterpart of execute_tool_calls() for LangChainAgent.arun().
+
+    Same grouping, ordering and callback guarantees; parallel groups are
+    awaited together with asyncio.gather instead of blocking a thread.
+    """
+    tool_results: List[Dict[str, Any]] = []
+    tool_messages: List[ToolMessage] = []
+
+    async def run_call(call: _PendingCall):
+        try:
+            call.result = await _ainvoke_tool(call.tool_obj, call.args)
+        except Exception as e:
+            call.error = e
+
+    for group in _plan_groups(tool_calls, tool_map, parallel):
+        if isinstance(group, dict):
+            result, message = _missing_tool(group, verbose)
+            tool_results.append(result)
+            tool_messages.append(message)
+            continue
+
+        if verbose and len(group) > 1:
+            print(f"  ⚡ Running {len(group)} tool calls in parallel: {[c.name for c in group]}")
+
+        for call in group:
+            _start(call, callbacks, verbose)
+        await asyncio.gather(*(run_call(call) for call in group))
+
+        for call in group:
+            result, message = _finish(call, callbacks, verbose)
+            tool_results.append(result)
+            tool_messages.append(message)
+
+    return tool_results, tool_messages
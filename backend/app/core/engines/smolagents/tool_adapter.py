@@ -98,6 +98,13 @@ def smolagent_to_langchain(smolagent_tool: Any) -> Callable:
     # Convert to LangChain tool
     langchain_wrapped = langchain_tool(wrapper)
 
+    # Carry over parallel-safety declaration (see core/engines/langchain/tool_dispatch.py)
+    if hasattr(smolagent_tool, 'parallel_safe'):
+        langchain_wrapped.metadata = {
+            **(langchain_wrapped.metadata or {}),
+            "parallel_safe": bool(smolagent_tool.parallel_safe)
+        }
+
     return langchain_wrapped
 
 
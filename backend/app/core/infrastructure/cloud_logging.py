@@ -3,11 +3,12 @@ Google Cloud Logging integration - Captures ALL logs including smolagents
 """
 
 import logging
-import sys
 import os
 from typing import Optional, Dict, Any
 from contextvars import ContextVar
 
+from app.core.infrastructure.logging_config import get_log_pipeline, get_terminal_stream
+
 # Context variable for tracking user/workflow info
 log_context: ContextVar[Dict[str, Any]] = ContextVar('log_context', default={})
 
@@ -87,7 +88,8 @@ class JsonFormatter(logging.Formatter):
 
         # Build log entry compatible with Cloud Logging
         log_entry = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            # Event time (records may be formatted later on the log writer thread)
+            "timestamp": datetime.utcfromtimestamp(record.created).isoformat() + "Z",
             "severity": record.levelname,
             "message": record.getMessage(),
             "logging.googleapis.com/sourceLocation": {
@@ -125,8 +127,8 @@ def setup_json_logging():
     # Create JSON formatter
     json_formatter = JsonFormatter()
 
-    # Create stdout handler
-    handler = logging.StreamHandler(sys.stdout)
+    # Create stdout handler (the real stdout, not the print capture)
+    handler = logging.StreamHandler(get_terminal_stream())
     handler.setLevel(logging.INFO)
     handler.setFormatter(json_formatter)
 
@@ -143,6 +145,8 @@ def setup_json_logging():
         root_logger.removeHandler(h)
 
     root_logger.addHandler(handler)
+    # Daily log file through the non-blocking log pipeline
+    get_log_pipeline().attach(root_logger)
 
     # Configure smolagents logger
     smolagents_logger = logging.getLogger('smolagents')
@@ -160,8 +164,8 @@ def setup_console_logging():
         datefmt='%Y-%m-%d %H:%M:%S'
     )
 
-    # Create console handler
-    console_handler = logging.StreamHandler(sys.stdout)
+    # Create console handler (the real stdout, not the print capture)
+    console_handler = logging.StreamHandler(get_terminal_stream())
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
 
@@ -178,6 +182,8 @@ def setup_console_logging():
         root_logger.removeHandler(handler)
 
     root_logger.addHandler(console_handler)
+    # Daily log file through the non-blocking log pipeline
+    get_log_pipeline().attach(root_logger)
 
     # Configure smolagents logger
     smolagents_logger = logging.getLogger('smolagents')
@@ -3,13 +3,30 @@ Enhanced Logging Configuration
 - Captures all stdout/stderr to daily log files
 - Creates per-workflow log files for detailed tracking
 - Can be disabled in production via environment variable
+
+Captured output goes through a non-blocking pipeline: printing threads only
+enqueue the line (logging records go through a QueueHandler); a writer
+thread (QueueListener) owns the open log file, flushes in batches and
+rotates it daily and by size. The queue is bounded and drops DEBUG/INFO records first
+when the writer falls behind.
+
+With logging.capture_mode = "json" (env LOG_CAPTURE_MODE), print output is
+written as JSON records (cloud_logging.JsonFormatter) with the user,
+project and workflow of the printing thread instead of raw stdout lines.
 """
 
+import atexit
+import logging
+import logging.handlers
 import os
+import queue
 import sys
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
-from app.config import DATA_DIR
+from typing import Any, Dict, Optional
+from app.config import DATA_DIR, LOGGING_CONFIG
 
 # Environment-based logging control
 ENVIRONMENT = os.getenv('ENVIRONMENT', 'development')
@@ -18,22 +35,368 @@ ENABLE_FILE_LOGGING = os.getenv('ENABLE_FILE_LOGGING', 'true' if ENVIRONMENT !=
 # Workflow log tracking
 _workflow_log_files = {}
 
+# Logger of captured stdout/stderr lines (handled by the pipeline only)
+OUTPUT_LOGGER_NAME = "labos.output"
+
+# Partial lines longer than this are emitted without waiting for a newline
+_MAX_PARTIAL_LINE = 65536
+
+
+_context_sources = None
+
+
+def _current_context() -> tuple:
+    """(user_id, project_id, workflow_id) of the calling thread / task."""
+    global _context_sources
+    if _context_sources is None:
+        from app.core.infrastructure.cloud_logging import log_context
+        try:
+            from app.services.workflows.workflow_context import get_workflow_context
+        except Exception:
+            get_workflow_context = lambda: None
+        _context_sources = (log_context, get_workflow_context)
+    log_context, get_workflow_context = _context_sources
+
+    context = log_context.get({})
+    user_id = context.get("user_id") or ""
+    project_id = context.get("project_id") or ""
+    workflow_id = context.get("workflow_id") or ""
+    if not workflow_id:
+        workflow = get_workflow_context()
+        if workflow is not None:
+            workflow_id = workflow.workflow_id
+            user_id = user_id or str(workflow.metadata.get("user_id") or "")
+            project_id = project_id or str(workflow.metadata.get("project_id") or "")
+    return user_id, project_id, workflow_id
+
+
+class _CapturedLine:
+    """
+    One captured stdout/stderr line as queued by OutputCapture.
+
+    Cheaper than a LogRecord on the printing thread; the writer thread turns
+    it into a record of the labos.output logger.
+    """
+
+    __slots__ = ("levelno", "message", "stream", "created", "context")
+
+    def __init__(self, levelno: int, message: str, stream: str, context: Optional[tuple]):
+        self.levelno = levelno
+        self.message = message
+        self.stream = stream
+        self.created = time.time()
+        self.context = context
+
+    @property
+    def levelname(self) -> str:
+        return logging.getLevelName(self.levelno)
+
+    def to_record(self) -> logging.LogRecord:
+        record = logging.LogRecord(OUTPUT_LOGGER_NAME, self.levelno, self.stream, 0, self.message, None, None)
+        record.created = self.created
+        record.msecs = (self.created - int(self.created)) * 1000
+        record.stream = self.stream
+        record.user_id, record.project_id, record.workflow_id = self.context or ("", "", "")
+        return record
+
+
+class BoundedLogQueue(queue.Queue):
+    """
+    Log record queue that never blocks the producer.
+
+    When full, a record below WARNING is dropped (the incoming one, or the
+    oldest queued one to make room for a WARNING+ record); only when the
+    queue holds nothing but WARNING+ records is the oldest of those dropped.
+    """
+
+    def __init__(self, maxsize: int):
+        super().__init__(maxsize)
+        self.dropped: Dict[str, int] = {}
+        self.max_depth = 0
+
+    def _count_drop(self, record):
+        level = getattr(record, "levelname", "UNKNOWN")
+        self.dropped[level] = self.dropped.get(level, 0) + 1
+
+    def put(self, item, block=True, timeout=None):
+        with self.not_full:
+            if self.maxsize > 0 and self._qsize() >= self.maxsize:
+                # None is the listener's stop sentinel and always gets in
+                important = item is None or item.levelno >= logging.WARNING
+                if not important:
+                    self._count_drop(item)
+                    return
+                victim = next((r for r in self.queue if r is not None and r.levelno < logging.WARNING), None)
+                if victim is None:
+                    victim = next((r for r in self.queue if r is not None), None)
+                if victim is None:
+                    return
+                self.queue.remove(victim)
+                self.unfinished_tasks -= 1
+                self._count_drop(victim)
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.max_depth = max(self.max_depth, self._qsize())
+            self.not_empty.notify()
+
+    def put_nowait(self, item):
+        self.put(item, block=False)
+
+
+class DailyRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Keeps <prefix>_YYYYMMDD.log open; switches to a new file at midnight and
+    rotates to .1, .2, ... when the day's file exceeds max_bytes.
+
+    Flushes are batched: after flush_records records, flush_interval seconds
+    or any ERROR record (and when the writer thread is idle).
+    """
+
+    def __init__(self, log_dir: Path, prefix: str, max_bytes: int, backup_count: int,
+                 flush_interval: float, flush_records: int):
+        self.log_dir = Path(log_dir)
+        self.prefix = prefix
+        self.flush_interval = flush_interval
+        self.flush_records = flush_records
+        self._day = datetime.now().strftime("%Y%m%d")
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self.rotations = 0
+        self.flushes = 0
+        super().__init__(self._path(self._day), maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+
+    def _path(self, day: str) -> str:
+        return str(self.log_dir / f"{self.prefix}_{day}.log")
+
+    def shouldRollover(self, record):
+        if datetime.now().strftime("%Y%m%d") != self._day:
+            return 1
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        today = datetime.now().strftime("%Y%m%d")
+        if today != self._day:
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+            self._day = today
+            self.baseFilename = os.path.abspath(self._path(today))
+            self.stream = self._open()
+        else:
+            super().doRollover()
+        self.rotations += 1
+
+    def emit(self, record):
+        super().emit(record)
+        if record.levelno >= logging.ERROR:
+            self.force_flush()
+
+    def flush(self):
+        # Called by StreamHandler.emit after every record
+        self._pending += 1
+        if self._pending >= self.flush_records or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.force_flush()
+
+    def force_flush(self):
+        self.acquire()
+        try:
+            if self.stream and self._pending:
+                self.stream.flush()
+                self.flushes += 1
+            self._pending = 0
+            self._last_flush = time.monotonic()
+        finally:
+            self.release()
+
+    def close(self):
+        self.force_flush()
+        super().close()
+
+
+class _BatchingQueueListener(logging.handlers.QueueListener):
+    """QueueListener that flushes its handlers whenever the queue goes idle."""
+
+    def __init__(self, log_queue, *handlers, flush_interval: float = 1.0):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.flush_interval = flush_interval
+        self.written = 0
+
+    def dequeue(self, block):
+        while True:
+            try:
+                return self.queue.get(block, self.flush_interval if block else None)
+            except queue.Empty:
+                if not block:
+                    raise
+                for handler in self.handlers:
+                    getattr(handler, "force_flush", handler.flush)()
+
+    def prepare(self, record):
+        if isinstance(record, _CapturedLine):
+            return record.to_record()
+        return record
+
+    def handle(self, record):
+        super().handle(record)
+        self.written += 1
+
+
+class _OutputFormatter(logging.Formatter):
+    """Captured print lines as-is; other records in the console format."""
+
+    def __init__(self):
+        super().__init__('[%(asctime)s] [%(levelname)s] %(name)s: %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+
+    def format(self, record):
+        if record.name == OUTPUT_LOGGER_NAME:
+            return record.getMessage()
+        return super().format(record)
+
+
+class WorkflowContextFilter(logging.Filter):
+    """
+    Attach user_id / project_id / workflow_id of the emitting thread.
+
+    Runs on the producer thread (QueueHandler filter), where the log context
+    (cloud_logging.set_log_context) and the workflow context are set.
+    """
+
+    def filter(self, record):
+        record.user_id, record.project_id, record.workflow_id = _current_context()
+        return True
+
+
+class LogPipeline:
+    """
+    Bounded queue + writer thread for captured output (and, optionally,
+    logging records): producers only enqueue, the listener thread formats,
+    writes and rotates.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        config = config or LOGGING_CONFIG
+        self.capture_mode = config.get("capture_mode", "text")
+        self.file_enabled = ENABLE_FILE_LOGGING
+        self.queue = BoundedLogQueue(config.get("queue_size", 10000))
+        self.flush_interval = config.get("flush_interval", 1.0)
+        self.flush_records = config.get("flush_records", 200)
+        self.max_size = config.get("max_size", 10485760)
+        self.backup_count = config.get("backup_count", 5)
+        self.file_handler: Optional[DailyRotatingFileHandler] = None
+        self.listener: Optional[_BatchingQueueListener] = None
+        self.queue_handler = logging.handlers.QueueHandler(self.queue)
+        self.queue_handler.addFilter(WorkflowContextFilter())
+        self._lock = threading.Lock()
+
+    def start(self, terminal_stream=None):
+        """Start the writer thread; terminal_stream receives JSON records in json capture mode."""
+        with self._lock:
+            if self.listener is not None:
+                return
+            handlers = []
+            if self.file_enabled:
+                log_dir = DATA_DIR / "logs"
+                log_dir.mkdir(parents=True, exist_ok=True)
+                self.file_handler = DailyRotatingFileHandler(
+                    log_dir, "all_output", self.max_size, self.backup_count,
+                    self.flush_interval, self.flush_records
+                )
+                self.file_handler.setFormatter(self._formatter())
+                handlers.append(self.file_handler)
+            if self.capture_mode == "json" and terminal_stream is not None:
+                console = logging.StreamHandler(terminal_stream)
+                console.setFormatter(self._formatter())
+                # Only captured prints; logging records have their own console handler
+                console.addFilter(lambda record: record.name == OUTPUT_LOGGER_NAME)
+                handlers.append(console)
+
+            self.listener = _BatchingQueueListener(self.queue, *handlers, flush_interval=self.flush_interval)
+            self.listener.start()
+            atexit.register(self.stop)
+
+    def _formatter(self) -> logging.Formatter:
+        if self.capture_mode == "json":
+            from app.core.infrastructure.cloud_logging import JsonFormatter
+            return JsonFormatter()
+        return _OutputFormatter()
+
+    @property
+    def current_file(self) -> Optional[str]:
+        return self.file_handler.baseFilename if self.file_handler else None
+
+    def enqueue_line(self, levelno: int, message: str, stream: str):
+        """Queue one captured output line (workflow context is only captured in json mode)."""
+        context = _current_context() if self.capture_mode == "json" else None
+        self.queue.put_nowait(_CapturedLine(levelno, message, stream, context))
+
+    def attach(self, logger: logging.Logger):
+        """Also write a logger's records to the log file (through the queue)."""
+        if self.listener is not None and self.queue_handler not in logger.handlers:
+            logger.addHandler(self.queue_handler)
+
+    def stop(self):
+        """Drain the queue, flush and close the log file."""
+        with self._lock:
+            listener, self.listener = self.listener, None
+        if listener is None:
+            return
+        listener.stop()
+        for handler in listener.handlers:
+            if handler is self.file_handler:
+                handler.close()
+            else:
+                handler.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = {
+            "running": self.listener is not None,
+            "capture_mode": self.capture_mode,
+            "file": self.current_file,
+            "queue_depth": self.queue.qsize(),
+            "queue_max_depth": self.queue.max_depth,
+            "queue_size": self.queue.maxsize,
+            "dropped": dict(self.queue.dropped),
+            "written": self.listener.written if self.listener else 0,
+        }
+        if self.file_handler:
+            stats["flushes"] = self.file_handler.flushes
+            stats["rotations"] = self.file_handler.rotations
+        return stats
+
 
 class OutputCapture:
-    """Capture stdout/stderr to file while maintaining terminal output"""
-    def __init__(self, log_file, terminal_stream):
-        self.log_file = log_file
+    """
+    Capture stdout/stderr into the log pipeline while maintaining terminal output.
+
+    write() only buffers the partial line and enqueues complete lines; the
+    file is written by the pipeline's writer thread.
+    """
+
+    def __init__(self, pipeline: LogPipeline, terminal_stream, stream_name: str = "stdout"):
+        self.pipeline = pipeline
         self.terminal = terminal_stream
+        self.stream_name = stream_name
+        # print() calls write() for the text and the newline separately
+        self._partial = threading.local()
+        self._level = logging.WARNING if stream_name == "stderr" else logging.INFO
+        self._to_terminal = pipeline.capture_mode != "json"
 
     def write(self, message):
-        # Write to terminal
-        self.terminal.write(message)
-        self.terminal.flush()
-
-        # Write to log file (only if enabled)
-        if ENABLE_FILE_LOGGING:
-            with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(message)
+        if self._to_terminal:
+            self.terminal.write(message)
+            if "\n" in message:
+                self.terminal.flush()
+
+        buffered = getattr(self._partial, "text", "") + message
+        lines = buffered.split("\n")
+        self._partial.text = lines.pop()
+        if len(self._partial.text) > _MAX_PARTIAL_LINE:
+            lines.append(self._partial.text)
+            self._partial.text = ""
+        for line in lines:
+            if line or self._to_terminal:
+                self.pipeline.enqueue_line(self._level, line, self.stream_name)
+        return len(message)
 
     def flush(self):
         self.terminal.flush()
@@ -46,6 +409,10 @@ class OutputCapture:
         """Check if the terminal is a TTY"""
         return self.terminal.isatty() if hasattr(self.terminal, 'isatty') else False
 
+    @property
+    def encoding(self):
+        return getattr(self.terminal, "encoding", "utf-8")
+
 
 class WorkflowLogger:
     """Logger for individual workflow execution tracking"""
@@ -130,34 +497,36 @@ class WorkflowLogger:
 def setup_logging():
     """Setup enhanced logging with environment control"""
 
-    if not ENABLE_FILE_LOGGING:
+    pipeline = get_log_pipeline()
+    if not ENABLE_FILE_LOGGING and pipeline.capture_mode != "json":
         print(f"ℹ️  File logging disabled (environment: {ENVIRONMENT})")
         return None
 
-    # Create logs directory
-    log_dir = DATA_DIR / "logs"
-    log_dir.mkdir(parents=True, exist_ok=True)
-
-    # Create daily log file
-    today = datetime.now().strftime("%Y%m%d")
-    log_file = log_dir / f"all_output_{today}.log"
-
     # Save original streams
     original_stdout = sys.stdout
     original_stderr = sys.stderr
+    pipeline.start(terminal_stream=original_stdout)
 
     # Redirect both stdout and stderr to capture
-    sys.stdout = OutputCapture(log_file, original_stdout)
-    sys.stderr = OutputCapture(log_file, original_stderr)
+    sys.stdout = OutputCapture(pipeline, original_stdout, "stdout")
+    sys.stderr = OutputCapture(pipeline, original_stderr, "stderr")
 
-    print(f"📝 File logging enabled")
+    log_dir = DATA_DIR / "logs"
+    print(f"📝 File logging {'enabled' if ENABLE_FILE_LOGGING else 'disabled'} (capture mode: {pipeline.capture_mode})")
     print(f"   Environment: {ENVIRONMENT}")
-    print(f"   Daily log: {log_file}")
-    print(f"   Workflow logs: {log_dir / 'workflows'}")
+    if ENABLE_FILE_LOGGING:
+        print(f"   Daily log: {pipeline.current_file}")
+        print(f"   Workflow logs: {log_dir / 'workflows'}")
 
     return None
 
 
+def get_terminal_stream(stream=None):
+    """The real terminal stream behind a captured sys.stdout / sys.stderr."""
+    stream = stream or sys.stdout
+    return getattr(stream, "terminal", stream)
+
+
 def get_workflow_logger(workflow_id: str, project_id: str = None) -> WorkflowLogger:
     """Get a logger for a specific workflow"""
     return WorkflowLogger(workflow_id, project_id)
@@ -165,4 +534,19 @@ def get_workflow_logger(workflow_id: str, project_id: str = None) -> WorkflowLog
 
 def get_workflow_log_path(workflow_id: str) -> Path:
     """Get the log file path for a workflow (if it exists)"""
-    return _workflow_log_files.get(workflow_id)
\ No newline at end of file
+    return _workflow_log_files.get(workflow_id)
+
+
+# Global singleton
+_pipeline: Optional[LogPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_log_pipeline() -> LogPipeline:
+    """Get the global log pipeline instance."""
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = LogPipeline()
+    return _pipeline
@@ -7,6 +7,7 @@ Supports loading from environment variables and merging with user overrides.
 
 from dataclasses import dataclass, field
 from typing import Optional, Dict, Any
+import copy
 import os
 import yaml
 from pathlib import Path
@@ -108,6 +109,10 @@ class LLMConfig:
         }
 
 
+# Parsed config/llm_models.yaml, keyed by file mtime (read once per change, not per workflow)
+_yaml_cache: Dict[str, Any] = {"mtime": None, "data": None}
+
+
 def _load_yaml_config() -> Optional[Dict[str, Any]]:
     """
     Load LLM configuration from config/llm_models.yaml
@@ -117,16 +122,23 @@ def _load_yaml_config() -> Optional[Dict[str, Any]]:
     """
     config_path = Path(__file__).parent.parent.parent.parent / "config" / "llm_models.yaml"
 
-    if not config_path.exists():
-        return None
-
     try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f)
-    except Exception as e:
-        print(f"Warning: Failed to load {config_path}: {e}")
+        mtime = config_path.stat().st_mtime
+    except OSError:
         return None
 
+    if _yaml_cache["mtime"] != mtime:
+        try:
+            with open(config_path, "r", encoding="utf-8") as f:
+                _yaml_cache["data"] = yaml.safe_load(f)
+            _yaml_cache["mtime"] = mtime
+        except Exception as e:
+            print(f"Warning: Failed to load {config_path}: {e}")
+            return None
+
+    # Callers build LLMConfigs from it; never hand out the cached dicts
+    return copy.deepcopy(_yaml_cache["data"])
+
 
 def get_default_agent_configs() -> Dict[str, LLMConfig]:
     """
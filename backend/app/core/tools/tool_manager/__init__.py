@@ -14,6 +14,8 @@ Exported Components:
 - Tool Registry: list_dynamic_tools, get_tool_signature, dynamic_tools_registry
 - Parallel Executor: execute_tools_in_parallel
 - Intelligent Selector: analyze_query_and_load_relevant_tools
+- Tool Catalog: get_tool_catalog
+- Tool Module Cache: get_tool_module_cache
 """
 
 from .tool_loader import (
@@ -26,6 +28,8 @@ from .tool_creator import create_new_tool, save_tool_to_sandbox
 from .tool_registry import tool_registry, get_predefined_tools
 from .parallel_executor import execute_tools_in_parallel
 from .intelligent_selector import analyze_query_and_load_relevant_tools
+from .tool_catalog import get_tool_catalog
+from .tool_module_cache import get_tool_module_cache
 
 __all__ = [
     # Tool Loader
@@ -47,4 +51,10 @@ __all__ = [
 
     # Intelligent Selector
     'analyze_query_and_load_relevant_tools',
+
+    # Tool Catalog
+    'get_tool_catalog',
+
+    # Tool Module Cache
+    'get_tool_module_cache',
 ]
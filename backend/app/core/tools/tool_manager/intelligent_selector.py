@@ -1,32 +1,84 @@
 """
-Intelligent Tool Selector - LLM-based Tool Selection
+Intelligent Tool Selector - Catalog-based Tool Selection
 
 This module provides intelligent tool selection and loading:
-- Analyze user queries using LLM
-- Select most relevant tools from available tool files
-- Fallback to keyword matching if LLM fails
-- Caching mechanism to reduce repeated LLM calls
+- Rank all available tools for a user query with the prebuilt tool catalog
+  (BM25 over names and descriptions, see tool_catalog.py)
+- Optionally let an LLM re-order the top candidates (tools.catalog.llm_rerank)
+- Load the selected tools into the running agents
+- Caching mechanism to reduce repeated selections
 """
 
 from smolagents import tool
 import hashlib
 import time
 import threading
-import os
-import sys
-import inspect
-import importlib.util
+
+from app.config import TOOLS_CONFIG
+
+from .tool_catalog import get_tool_catalog
 
 # Tool loading cache and lock
 tool_loading_cache = {}
 tool_loading_lock = threading.Lock()
 
+# Agents that receive selected tools
+TARGET_AGENTS = ('dev_agent', 'tool_creation_agent')
+
+
+def _rerank_with_llm(user_query: str, hits: list, max_tools: int) -> list:
+    """Re-order catalog candidates with an LLM; keeps the catalog order on failure."""
+    from ...tools.llm import json_llm_call
+
+    llm_prompt = f"""Select relevant tools for this query: "{user_query}"
+
+Available tools ({len(hits)}):
+{chr(10).join([f"{i+1}. {hit.name}: {hit.entry.description[:100]}" for i, hit in enumerate(hits)])}
+
+Return JSON with top {max_tools} most relevant tools:
+{{
+    "selected_tools": [
+        {{"name": "tool_name", "relevance_score": 0.95}}
+    ]
+}}"""
+
+    try:
+        llm_response = json_llm_call(llm_prompt, "gemini-2.5-flash")
+        if "error" in llm_response:
+            return hits
+        by_name = {hit.name: hit for hit in hits}
+        selected = [by_name[t.get("name")] for t in llm_response.get("selected_tools", []) if t.get("name") in by_name]
+        return selected or hits
+    except Exception:
+        return hits
+
+
+def _load_into_active_agents(tools: list) -> int:
+    """Add tools to the agents of the running multi-agent system; returns the number added."""
+    from app.core.engines.langchain.multi_agent_system import get_active_multi_agent_system
+    system = get_active_multi_agent_system()
+    if not system or not tools:
+        return 0
+
+    from app.core.engines.smolagents.tool_adapter import batch_convert_tools
+    loaded = 0
+    for lc_tool in batch_convert_tools(tools):
+        added = False
+        for agent_name in TARGET_AGENTS:
+            agent = system.agents.get(agent_name)
+            if agent and hasattr(agent, 'add_tool') and lc_tool.name not in agent.tool_map:
+                agent.add_tool(lc_tool)
+                added = True
+        loaded += int(added)
+    return loaded
+
 
 @tool
 def analyze_query_and_load_relevant_tools(user_query: str, max_tools: int = 10) -> str:
-    """Analyze user query using LLM and intelligently load the most relevant tools.
+    """Analyze user query and intelligently load the most relevant tools.
 
-    Optimized version with caching and reduced token usage.
+    Searches every predefined, database/screening and project tool through a
+    prebuilt index, so selection takes milliseconds and needs no LLM call.
 
     Args:
         user_query: The user's task description or query
@@ -36,14 +88,14 @@ def analyze_query_and_load_relevant_tools(user_query: str, max_tools: int = 10)
         Status of the tool loading operation with analysis details
     """
     try:
-        # Import agents from parent module
-        from .. import labos_engine
-        manager_agent = labos_engine.manager_agent
-        tool_creation_agent = labos_engine.tool_creation_agent
+        from app.services.workflows import get_workflow_context
+        context = get_workflow_context()
+        user_id = context.metadata.get('user_id') if context else None
+        project_id = context.metadata.get('project_id') if context else None
 
         # Check cache first
         query_hash = hashlib.md5(user_query.encode()).hexdigest()
-        cache_key = f"{query_hash}_{max_tools}"
+        cache_key = f"{query_hash}_{max_tools}_{user_id}_{project_id}"
 
         with tool_loading_lock:
             if cache_key in tool_loading_cache:
@@ -52,142 +104,40 @@ def analyze_query_and_load_relevant_tools(user_query: str, max_tools: int = 10)
                 if time.time() - cached_time < 300:
                     return f"🔄 Using cached tool selection\n{cached_result}"
 
-        # Import LLM functionality
-        from ...tools.llm import json_llm_call
+        catalog = get_tool_catalog()
+        use_llm = TOOLS_CONFIG.get("catalog_llm_rerank", False)
+        candidates = max(max_tools, TOOLS_CONFIG.get("catalog_candidates", 30)) if use_llm else max_tools
 
-        # Define tool files to analyze
-        script_dir = os.getcwd()
-        tool_files = {
-            'literature_tools': os.path.join(script_dir, 'app', 'tools', 'literature.py'),
-            'database_tools': os.path.join(script_dir, 'app', 'tools', 'database.py'),
-            'virtual_screening_tools': os.path.join(script_dir, 'app', 'tools', 'screening.py')
-        }
+        start = time.perf_counter()
+        hits = catalog.search(user_query, k=candidates, user_id=user_id, project_id=project_id)
+        search_ms = (time.perf_counter() - start) * 1000
 
-        available_tools = {}
+        if not hits:
+            return f"🔍 No relevant tools found for query: '{user_query}'"
 
-        # Extract tools and their descriptions from each file
-        for module_name, file_path in tool_files.items():
-            if not os.path.exists(file_path):
-                continue
+        if use_llm:
+            hits = _rerank_with_llm(user_query, hits, max_tools)
+        hits = hits[:max_tools]
 
+        # Resolve tool objects (imports modules / project files only for selected tools)
+        selected = []
+        failed = []
+        for hit in hits:
             try:
-                # Load the module
-                spec = importlib.util.spec_from_file_location(module_name, file_path)
-                if spec is None or spec.loader is None:
-                    continue
-
-                module = importlib.util.module_from_spec(spec)
-                sys.modules[module_name] = module
-                spec.loader.exec_module(module)
-
-                # Find all tools (SimpleTool objects created by @tool decorator)
-                for name, obj in inspect.getmembers(module):
-                    if hasattr(obj, '__class__') and 'SimpleTool' in str(type(obj)):
-                        # Extract description from tool object or docstring
-                        if hasattr(obj, 'description') and obj.description:
-                            description = obj.description
-                        else:
-                            doc = inspect.getdoc(obj) or ""
-                            description = doc.split('\n\n')[0].replace('\n', ' ').strip()
-
-                        available_tools[name] = {
-                            'function': obj,
-                            'description': description,
-                            'module': module_name,
-                            'file_path': file_path
-                        }
-
+                selected.append(hit.resolve())
             except Exception as e:
-                continue
-
-        if not available_tools:
-            return f"❌ No tools found in literature_tools.py, database_tools.py, or virtual_screening_tools.py"
-
-        # Create tool list for LLM analysis - OPTIMIZED
-        tool_list = []
-        for tool_name, tool_info in available_tools.items():
-            tool_list.append({
-                "name": tool_name,
-                "description": tool_info['description'][:100],  # Truncate descriptions
-                "module": tool_info['module']
-            })
-
-        # Create OPTIMIZED LLM prompt for intelligent tool selection
-        llm_prompt = f"""Select relevant tools for this query: "{user_query}"
-
-Available tools ({len(tool_list)}):
-{chr(10).join([f"{i+1}. {tool['name']} [{tool['module']}]: {tool['description']}" for i, tool in enumerate(tool_list[:20])])}
-
-Return JSON with top {max_tools} most relevant tools:
-{{
-    "selected_tools": [
-        {{"name": "tool_name", "relevance_score": 0.95}}
-    ]
-}}"""
-
-        # Use LLM to select tools intelligently
-        try:
-            llm_response = json_llm_call(llm_prompt, "gemini-2.5-flash")
-
-            if "error" in llm_response:
-                # Fallback to simple keyword matching if LLM fails
-                return _fallback_tool_selection(user_query, available_tools, max_tools, manager_agent, tool_creation_agent)
-
-            selected_tool_data = llm_response.get("selected_tools", [])
-
-            if not selected_tool_data:
-                return f"🔍 LLM analysis found no relevant tools for query: '{user_query}'"
+                failed.append(f"{hit.name}: {e}")
 
-        except Exception as e:
-            # Fallback to simple selection if LLM fails completely
-            return _fallback_tool_selection(user_query, available_tools, max_tools, manager_agent, tool_creation_agent)
-
-        # Load selected tools into agents
-        loaded_tools = []
-        loaded_count = 0
-
-        for tool_selection in selected_tool_data:
-            tool_name = tool_selection.get("name")
-
-            if tool_name not in available_tools:
-                continue
-
-            try:
-                tool_info = available_tools[tool_name]
-                tool_func = tool_info['function']
-
-                # Add to manager_agent tools if not already present
-                if tool_name not in manager_agent.tools:
-                    manager_agent.tools[tool_name] = tool_func
-
-                    # Important: also update CodeAgent's Python executor
-                    if hasattr(manager_agent, 'python_executor') and hasattr(manager_agent.python_executor, 'custom_tools'):
-                        manager_agent.python_executor.custom_tools[tool_name] = tool_func
-
-                    loaded_count += 1
-
-                # Add to tool_creation_agent tools if not already present
-                if tool_name not in tool_creation_agent.tools:
-                    tool_creation_agent.tools[tool_name] = tool_func
-
-                    # Important: also update CodeAgent's Python executor
-                    if hasattr(tool_creation_agent, 'python_executor') and hasattr(tool_creation_agent.python_executor, 'custom_tools'):
-                        tool_creation_agent.python_executor.custom_tools[tool_name] = tool_func
-
-                loaded_tools.append({
-                    'name': tool_name,
-                    'relevance': tool_selection.get("relevance_score", 0.0),
-                    'module': tool_info['module']
-                })
-
-            except Exception as e:
-                continue
+        loaded_count = _load_into_active_agents(selected)
 
         # Generate concise result summary
-        result = f"🎯 Loaded {loaded_count} tools for: '{user_query[:50]}...'\n"
-        result += f"Tools: {', '.join([t['name'] for t in loaded_tools[:5]])}"
-        if len(loaded_tools) > 5:
-            result += f" (+{len(loaded_tools)-5} more)"
+        names = [hit.name for hit in hits]
+        result = f"🎯 Loaded {loaded_count} tools for: '{user_query[:50]}...' ({search_ms:.1f} ms)\n"
+        result += f"Tools: {', '.join(names[:5])}"
+        if len(names) > 5:
+            result += f" (+{len(names)-5} more)"
+        if failed:
+            result += f"\n⚠️ Failed to load: {'; '.join(failed[:3])}"
 
         # Cache the result
         with tool_loading_lock:
@@ -197,67 +147,3 @@ Return JSON with top {max_tools} most relevant tools:
 
     except Exception as e:
         return f"❌ Error analyzing query and loading tools: {str(e)}"
-
-
-def _fallback_tool_selection(user_query: str, available_tools: dict, max_tools: int,
-                              manager_agent, tool_creation_agent) -> str:
-    """Fallback tool selection using simple keyword matching when LLM fails.
-
-    Args:
-        user_query: The user's query
-        available_tools: Dictionary of available tools
-        max_tools: Maximum number of tools to load
-        manager_agent: Manager agent instance
-        tool_creation_agent: Tool creation agent instance
-
-    Returns:
-        Summary of loaded tools
-    """
-    query_lower = user_query.lower()
-    tool_scores = []
-
-    # Simple keyword matching
-    for tool_name, tool_info in available_tools.items():
-        tool_text = f"{tool_name.replace('_', ' ')} {tool_info['description']}".lower()
-
-        # Score based on keyword matches
-        score = 0
-        query_words = query_lower.split()
-        for word in query_words:
-            if len(word) > 2 and word in tool_text:
-                score += 1
-
-        tool_scores.append((tool_name, score))
-
-    # Sort by score and take top tools
-    tool_scores.sort(key=lambda x: x[1], reverse=True)
-    selected_tools = tool_scores[:max_tools]
-
-    if not selected_tools or all(score == 0 for _, score in selected_tools):
-        return f"🔍 No relevant tools found for query: '{user_query}' (fallback method used)"
-
-    # Load tools and return summary
-    loaded_count = 0
-    for tool_name, score in selected_tools:
-        if score > 0:
-            tool_func = available_tools[tool_name]['function']
-
-            # Add to manager_agent
-            if tool_name not in manager_agent.tools:
-                manager_agent.tools[tool_name] = tool_func
-
-                # Important: also update CodeAgent's Python executor
-                if hasattr(manager_agent, 'python_executor') and hasattr(manager_agent.python_executor, 'custom_tools'):
-                    manager_agent.python_executor.custom_tools[tool_name] = tool_func
-
-                loaded_count += 1
-
-            # Add to tool_creation_agent
-            if tool_name not in tool_creation_agent.tools:
-                tool_creation_agent.tools[tool_name] = tool_func
-
-                # Important: also update CodeAgent's Python executor
-                if hasattr(tool_creation_agent, 'python_executor') and hasattr(tool_creation_agent.python_executor, 'custom_tools'):
-                    tool_creation_agent.python_executor.custom_tools[tool_name] = tool_func
-
-    return f"🎯 Fallback Analysis: '{user_query}'\n✅ Loaded {loaded_count} tools using keyword matching."
@@ -0,0 +1,413 @@
+"""
+Tool Catalog - Prebuilt Retrieval Index for Tool Selection
+
+Indexes every tool the agents can load and answers "which tools match this
+query?" in milliseconds, without importing tool modules or calling an LLM:
+
+- Predefined tools: from ToolRegistry.discover_predefined_tools()
+- Tool modules (app.tools.database, app.tools.screening, ...): docstrings
+  are read with ast, so modules with import-time side effects (model
+  clients, os.chdir) are only imported when one of their tools is selected
+- Project tools: tools_manifest.json of each sandbox project, indexed on
+  first use and updated incrementally by save_tool_to_sandbox (manifest
+  mtime is re-checked, so deletions and edits from the API are picked up)
+
+Ranking is Okapi BM25 over tool name and description tokens; the name
+counts twice so "pubmed" ranks query_pubmed above tools that only mention
+PubMed in passing.
+
+Usage:
+    from app.core.tools.tool_manager.tool_catalog import get_tool_catalog
+
+    hits = get_tool_catalog().search("find GO terms for my gene list", k=10,
+                                     user_id=user_id, project_id=project_id)
+    tools = [hit.resolve() for hit in hits]
+"""
+
+import ast
+import importlib
+import importlib.util
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import TOOLS_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Name tokens are repeated this many times in the document
+NAME_WEIGHT = 2
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+# Whole identifiers in a query, for explicitly named tools ("run query_uniprot")
+_IDENTIFIER = re.compile(r"[a-z0-9_]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do for from how i in into is it me my of on or "
+    "please show that the this to use using what which with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens without stopwords; trailing plural 's' stripped."""
+    tokens = []
+    for token in _TOKEN.findall(text.lower().replace("_", " ")):
+        if token in _STOPWORDS or len(token) < 2:
+            continue
+        if len(token) > 4 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+@dataclass
+class CatalogEntry:
+    """One indexed tool"""
+    name: str
+    description: str
+    source: str                       # "predefined", "module" or "project"
+    module: Optional[str] = None      # Module name ("module") or file path ("project")
+    scope: Optional[Tuple[str, str]] = None  # (user_id, project_id) for project tools
+    tool: Any = None                  # Loaded tool object (resolved lazily)
+    code_hash: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        if self.scope:
+            return f"project:{self.scope[0]}:{self.scope[1]}:{self.name}"
+        return f"{self.source}:{self.name}"
+
+    def resolve(self) -> Any:
+        """The tool object (imports the module / executes the project file on first use)."""
+        if self.tool is not None:
+            return self.tool
+
+        if self.source == "module":
+            module = importlib.import_module(self.module)
+            self.tool = getattr(module, self.name, None)
+        elif self.source == "project":
+            from .tool_module_cache import get_tool_module_cache, tools_in_module
+            module = get_tool_module_cache().load_file(self.module, self.name)
+            tools = [obj for _, obj in tools_in_module(module)]
+            named = [obj for obj in tools if getattr(obj, 'name', None) == self.name]
+            self.tool = (named or tools or [None])[0]
+
+        if self.tool is None:
+            raise LookupError(f"No @tool named '{self.name}' found in {self.module}")
+        return self.tool
+
+
+@dataclass
+class CatalogHit:
+    entry: CatalogEntry
+    score: float
+
+    @property
+    def name(self) -> str:
+        return self.entry.name
+
+    def resolve(self) -> Any:
+        return self.entry.resolve()
+
+
+@dataclass
+class _ProjectState:
+    manifest_path: Path
+    mtime: Optional[float] = None
+    names: set = field(default_factory=set)
+
+
+def extract_module_tools(file_path: str) -> List[Tuple[str, str]]:
+    """
+    (name, description) of the @tool functions in a source file, without importing it.
+
+    The description is the first paragraph of the docstring, like smolagents uses.
+    """
+    source = Path(file_path).read_text(encoding="utf-8")
+    tree = ast.parse(source, filename=str(file_path))
+    tools = []
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        decorated = any(
+            (isinstance(d, ast.Name) and d.id == "tool") or
+            (isinstance(d, ast.Attribute) and d.attr == "tool") or
+            (isinstance(d, ast.Call) and getattr(d.func, "id", getattr(d.func, "attr", None)) == "tool")
+            for d in node.decorator_list
+        )
+        if not decorated:
+            continue
+        doc = ast.get_docstring(node) or ""
+        summary = doc.split("\n\n")[0].replace("\n", " ").strip()
+        args = " ".join(a.arg for a in node.args.args)
+        tools.append((node.name, f"{summary} {args}".strip()))
+    return tools
+
+
+class ToolCatalog:
+    """
+    Incremental BM25 index over predefined, module and per-project tools.
+
+    Thread-safe: searches and updates can come from concurrent workflows.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries: Dict[str, CatalogEntry] = {}
+        self._doc_tf: Dict[str, Counter] = {}
+        self._doc_len: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_len = 0
+        self._projects: Dict[Tuple[str, str], _ProjectState] = {}
+        self._built = False
+        self._stats = {"builds": 0, "build_seconds": 0.0, "searches": 0, "search_seconds": 0.0,
+                       "project_syncs": 0}
+
+    # ==================== Index maintenance ====================
+
+    def _add(self, entry: CatalogEntry):
+        key = entry.key
+        if key in self._entries:
+            self._remove(key)
+        tokens = tokenize(entry.name) * NAME_WEIGHT + tokenize(entry.description)
+        tf = Counter(tokens)
+        self._entries[key] = entry
+        self._doc_tf[key] = tf
+        self._doc_len[key] = len(tokens)
+        self._total_len += len(tokens)
+        for term, count in tf.items():
+            self._postings.setdefault(term, {})[key] = count
+
+    def _remove(self, key: str):
+        if key not in self._entries:
+            return
+        for term in self._doc_tf.pop(key):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_len -= self._doc_len.pop(key)
+        del self._entries[key]
+
+    def build(self, force: bool = False) -> int:
+        """
+        Index predefined and module tools (once per process unless force=True).
+
+        Returns:
+            Number of indexed global tools
+        """
+        with self._lock:
+            if self._built and not force:
+                return sum(1 for e in self._entries.values() if e.scope is None)
+
+            start = time.perf_counter()
+            for key in [k for k, e in self._entries.items() if e.scope is None]:
+                self._remove(key)
+
+            from .tool_registry import tool_registry
+            seen = set()
+            for tool in tool_registry.discover_predefined_tools():
+                name = getattr(tool, 'name', None)
+                if not name or name in seen:
+                    continue
+                seen.add(name)
+                inputs = " ".join(getattr(tool, 'inputs', {}) or {})
+                description = f"{getattr(tool, 'description', '') or ''} {inputs}".strip()
+                self._add(CatalogEntry(name=name, description=description, source="predefined", tool=tool))
+
+            for module_name in TOOLS_CONFIG.get("catalog_modules", []):
+                try:
+                    spec = importlib.util.find_spec(module_name)
+                    if spec is None or not spec.origin:
+                        continue
+                    for name, description in extract_module_tools(spec.origin):
+                        if name in seen:
+                            continue
+                        seen.add(name)
+                        self._add(CatalogEntry(name=name, description=description,
+                                               source="module", module=module_name))
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not index tool module {module_name}: {e}")
+
+            self._built = True
+            elapsed = time.perf_counter() - start
+            self._stats["builds"] += 1
+            self._stats["build_seconds"] += elapsed
+            logger.info(f"📚 Tool catalog built: {len(seen)} tools in {elapsed * 1000:.0f} ms")
+            return len(seen)
+
+    def sync_project(self, user_id: str, project_id: str, force: bool = False):
+        """(Re)index a project's sandbox tools if its manifest changed since the last sync."""
+        from app.services.sandbox import get_sandbox_manager
+        sandbox = get_sandbox_manager()
+        scope = (str(user_id), str(project_id))
+
+        with self._lock:
+            state = self._projects.get(scope)
+            if state is None:
+                project_dir = sandbox.get_project_sandbox(user_id, project_id)
+                state = _ProjectState(manifest_path=project_dir / sandbox.TOOLS_DIR / sandbox.TOOLS_MANIFEST)
+                self._projects[scope] = state
+
+            try:
+                mtime = state.manifest_path.stat().st_mtime
+            except OSError:
+                mtime = None
+            if not force and mtime == state.mtime:
+                return
+
+            entries = sandbox.list_tools(user_id, project_id, status="active") if mtime is not None else []
+            tools_dir = state.manifest_path.parent
+            current = {}
+            for item in entries:
+                current[item["name"]] = item
+
+            for name in state.names - set(current):
+                self._remove(CatalogEntry(name=name, description="", source="project", scope=scope).key)
+            for name, item in current.items():
+                existing = self._entries.get(CatalogEntry(name=name, description="", source="project", scope=scope).key)
+                if existing is not None and existing.code_hash == item.get("code_hash"):
+                    continue
+                self._add(self._project_entry(scope, item, tools_dir))
+
+            state.names = set(current)
+            state.mtime = mtime
+            self._stats["project_syncs"] += 1
+
+    def _project_entry(self, scope: Tuple[str, str], item: Dict[str, Any], tools_dir: Path) -> CatalogEntry:
+        description = f"{item.get('description', '')} {item.get('category', '')}".strip()
+        return CatalogEntry(
+            name=item["name"],
+            description=description,
+            source="project",
+            module=str(tools_dir / item.get("filename", f"{item['name']}.py")),
+            scope=scope,
+            code_hash=item.get("code_hash"),
+        )
+
+    def add_project_tool(
+        self,
+        user_id: str,
+        project_id: str,
+        tool_name: str,
+        description: str,
+        category: str,
+        file_path: str,
+        code_hash: Optional[str] = None,
+        tool: Any = None
+    ):
+        """Index a tool that was just saved to a project sandbox (see save_tool_to_sandbox)."""
+        scope = (str(user_id), str(project_id))
+        with self._lock:
+            entry = self._project_entry(
+                scope,
+                {"name": tool_name, "description": description, "category": category,
+                 "code_hash": code_hash, "filename": Path(file_path).name},
+                Path(file_path).parent,
+            )
+            entry.tool = tool
+            self._add(entry)
+            state = self._projects.get(scope)
+            if state is not None:
+                state.names.add(tool_name)
+                try:
+                    state.mtime = state.manifest_path.stat().st_mtime
+                except OSError:
+                    pass
+
+    # ==================== Search ====================
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        user_id: Optional[str] = None,
+        project_id: Optional[str] = None
+    ) -> List[CatalogHit]:
+        """
+        Top-k tools for a query (global tools plus the given project's tools).
+
+        A project tool shadows a global tool with the same name.
+        """
+        self.build()
+        if user_id and project_id:
+            try:
+                self.sync_project(user_id, project_id)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not index project tools: {e}")
+        scope = (str(user_id), str(project_id)) if user_id and project_id else None
+
+        start = time.perf_counter()
+        terms = set(tokenize(query))
+        named = set(_IDENTIFIER.findall(query.lower()))
+        with self._lock:
+            n_docs = len(self._entries) or 1
+            avg_len = (self._total_len / n_docs) or 1.0
+            scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for key, tf in postings.items():
+                    entry = self._entries[key]
+                    if entry.scope is not None and entry.scope != scope:
+                        continue
+                    norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * self._doc_len[key] / avg_len)
+                    scores[key] = scores.get(key, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+
+            # Explicitly named tools go first (whole identifiers only: "go" must not match "gorilla")
+            for key, entry in self._entries.items():
+                if entry.name.lower() in named and (entry.scope is None or entry.scope == scope):
+                    scores[key] = scores.get(key, 0.0) + 100.0
+
+            hits: Dict[str, CatalogHit] = {}
+            for key, score in scores.items():
+                entry = self._entries[key]
+                current = hits.get(entry.name)
+                if current is None:
+                    hits[entry.name] = CatalogHit(entry=entry, score=score)
+                elif entry.scope is not None:
+                    hits[entry.name] = CatalogHit(entry=entry, score=max(score, current.score))
+                elif current.entry.scope is not None:
+                    current.score = max(score, current.score)
+            result = sorted(hits.values(), key=lambda h: (-h.score, h.name))[:k]
+
+            self._stats["searches"] += 1
+            self._stats["search_seconds"] += time.perf_counter() - start
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["tools"] = len(self._entries)
+            stats["terms"] = len(self._postings)
+            stats["projects"] = len(self._projects)
+            if stats["searches"]:
+                stats["avg_search_ms"] = round(stats["search_seconds"] / stats["searches"] * 1000, 3)
+            return stats
+
+
+# Global singleton
+_catalog: Optional[ToolCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_tool_catalog() -> ToolCatalog:
+    """Get the global tool catalog instance."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = ToolCatalog()
+    return _catalog
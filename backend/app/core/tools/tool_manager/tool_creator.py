@@ -58,6 +58,13 @@ def save_tool_to_sandbox(
             metadata={"created_via": "tool_creation_agent", "auto_generated": True}
         )
 
+        # Make the tool searchable by analyze_query_and_load_relevant_tools
+        from .tool_catalog import get_tool_catalog
+        get_tool_catalog().add_project_tool(
+            user_id, project_id, tool_name, description, category,
+            file_path=result['local_path'], code_hash=result.get('code_hash')
+        )
+
         # Emit observation event
         from app.services.workflows import emit_observation_event
         emit_observation_event(
@@ -67,28 +74,13 @@ def save_tool_to_sandbox(
 
         # Auto-load the tool into current agents so it's immediately usable
         try:
-            import importlib.util
-            import sys
-            import inspect
+            from .tool_module_cache import get_tool_module_cache, tools_in_module
 
-            tool_file_path = result['local_path']
-            spec = importlib.util.spec_from_file_location(tool_name, tool_file_path)
-            if spec is None or spec.loader is None:
-                return f"Tool '{tool_name}' saved to sandbox.\n\nCould not auto-load module. Run load_project_tools() to retry."
-
-            module = importlib.util.module_from_spec(spec)
-            sys.modules[tool_name] = module
-            spec.loader.exec_module(module)
+            # Cached by code hash: later load_project_tools calls reuse this module
+            module = get_tool_module_cache().load_file(result['local_path'], tool_name)
 
             # Find @tool decorated functions (smolagents format)
-            smolagent_tools = []
-            for name, obj in inspect.getmembers(module):
-                is_tool = (
-                    (inspect.isfunction(obj) and hasattr(obj, '__smolagents_tool__')) or
-                    (type(obj).__name__ == 'SimpleTool' and callable(obj))
-                )
-                if is_tool:
-                    smolagent_tools.append(obj)
+            smolagent_tools = [obj for _, obj in tools_in_module(module)]
 
             # Get the active running system (not a fresh instance)
             from app.core.engines.langchain.multi_agent_system import get_active_multi_agent_system
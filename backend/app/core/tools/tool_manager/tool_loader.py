@@ -7,6 +7,7 @@ This module handles loading tools from various sources:
 - Refresh all available tools
 - Add specific tools to agents
 - Retry mechanism for failed loads
+- Executed tool modules are cached by code hash (see tool_module_cache.py)
 """
 
 from smolagents import tool
@@ -16,10 +17,11 @@ import os
 import glob
 import sys
 import inspect
-import importlib.util
 import asyncio
 import tempfile
 
+from .tool_module_cache import get_tool_module_cache, tools_in_module
+
 
 # Retry decorator
 def retry_on_failure(max_retries=3, delay=1.0):
@@ -65,7 +67,8 @@ def load_project_tools() -> str:
         user_id = context.metadata.get('user_id', 'system')
 
         sandbox = get_sandbox_manager()
-        tool_entries = sandbox.list_tools(user_id, project_id, status="active")
+        module_cache = get_tool_module_cache()
+        tool_entries = module_cache.sync_project(user_id, project_id)
 
         if not tool_entries:
             return f"No tools found for this project (ID: {project_id})"
@@ -86,27 +89,14 @@ def load_project_tools() -> str:
                     failed_tools.append(f"{tool_name}: File not found")
                     continue
 
-                spec = importlib.util.spec_from_file_location(tool_name, tool_file_path)
-                if spec is None or spec.loader is None:
-                    failed_tools.append(f"{tool_name}: Could not create module spec")
-                    continue
-
-                module = importlib.util.module_from_spec(spec)
-                sys.modules[tool_name] = module
-                spec.loader.exec_module(module)
+                # Executed once per code hash, reused across workflows
+                module = module_cache.load_file(tool_file_path, tool_name)
 
                 # Find @tool decorated functions and inject into agents
                 from app.core.engines.langchain.multi_agent_system import get_multi_agent_system
                 system = get_multi_agent_system()
 
-                tool_functions = []
-                for name, obj in inspect.getmembers(module):
-                    is_tool = (
-                        (inspect.isfunction(obj) and hasattr(obj, '__smolagents_tool__')) or
-                        (type(obj).__name__ == 'SimpleTool' and callable(obj))
-                    )
-                    if is_tool:
-                        tool_functions.append((name, obj))
+                tool_functions = tools_in_module(module)
 
                 if tool_functions and system:
                     for func_name, tool_func in tool_functions:
@@ -167,29 +157,15 @@ def load_dynamic_tool(tool_name: str, add_to_agents: bool = True) -> str:
         if not os.path.exists(tool_file_path):
             return f"❌ Tool file '{tool_file_path}' not found."
 
-        # Load the module
-        spec = importlib.util.spec_from_file_location(tool_name, tool_file_path)
-        if spec is None or spec.loader is None:
-            return f"❌ Could not load module specification for '{tool_name}'."
-
-        module = importlib.util.module_from_spec(spec)
-        sys.modules[tool_name] = module
-        spec.loader.exec_module(module)
+        # Load the module (cached by content hash)
+        module = get_tool_module_cache().load_file(tool_file_path, tool_name)
 
         result = f"✅ Successfully loaded tool '{tool_name}' from {tool_file_path}"
 
         if add_to_agents:
             # Find all functions decorated with @tool in the loaded module
             # Note: @tool decorator wraps functions into SimpleTool objects
-            tool_functions = []
-            for name, obj in inspect.getmembers(module):
-                # Check for SimpleTool objects (created by @tool decorator)
-                is_tool = (
-                    (inspect.isfunction(obj) and hasattr(obj, '__smolagents_tool__')) or
-                    (type(obj).__name__ == 'SimpleTool' and callable(obj))
-                )
-                if is_tool:
-                    tool_functions.append((name, obj))
+            tool_functions = tools_in_module(module)
 
             if tool_functions:
                 # Add to all agents' tools (tools is a dict in smolagents)
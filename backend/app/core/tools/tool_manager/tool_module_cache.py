@@ -0,0 +1,241 @@
+"""
+Tool Module Cache - Compiled Modules of Dynamically Created Tools
+
+Agent-created tools (sandbox tools/*.py, app/tools/*.py, ProjectTool.code)
+used to be re-executed with spec.loader.exec_module / exec on every
+load_project_tools call and every request. This cache keeps the executed
+module per source sha256 (the code_hash stored in tools_manifest.json and
+ProjectTool), so identical code is executed once per process.
+
+- LRU bound: tools.module_cache_size modules
+- Invalidation: a changed file has a new hash; hashes that drop out of a
+  project's manifest are evicted when the manifest changes
+- warm_project(): preloads a project's tools (run in the background when its
+  owner opens the project, GET /projects/{project_id} in api/v1/chat_projects.py)
+
+Usage:
+    from app.core.tools.tool_manager.tool_module_cache import get_tool_module_cache
+
+    module = get_tool_module_cache().load_file("/data/sandboxes/u/p/tools/my_tool.py")
+    tools = tools_in_module(module)
+"""
+
+import hashlib
+import importlib.util
+import inspect
+import linecache
+import logging
+import sys
+import threading
+import time
+import types
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import TOOLS_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+def code_hash(code: str) -> str:
+    """sha256 of tool source, as stored in tools_manifest.json."""
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+def tools_in_module(module: types.ModuleType) -> List[Tuple[str, Any]]:
+    """(name, tool) pairs of the @tool decorated functions / SimpleTool objects of a module."""
+    found = []
+    for name, obj in inspect.getmembers(module):
+        is_tool = (
+            (inspect.isfunction(obj) and hasattr(obj, '__smolagents_tool__')) or
+            (type(obj).__name__ == 'SimpleTool' and callable(obj))
+        )
+        if is_tool:
+            found.append((name, obj))
+    return found
+
+
+class ToolModuleCache:
+    """
+    Thread-safe LRU of executed tool modules keyed by source sha256.
+
+    Loading the same hash concurrently executes the code once; other
+    callers wait for the result.
+    """
+
+    def __init__(self, max_modules: Optional[int] = None):
+        self.max_modules = max_modules or TOOLS_CONFIG.get("module_cache_size", 256)
+        self._lock = threading.Lock()
+        self._modules: "OrderedDict[str, types.ModuleType]" = OrderedDict()
+        self._loading: Dict[str, threading.Lock] = {}
+        self._exec_seconds: Dict[str, float] = {}
+        # (user_id, project_id) -> (manifest mtime, hashes in manifest)
+        self._projects: Dict[Tuple[str, str], Tuple[Optional[float], set]] = {}
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0,
+                       "exec_seconds": 0.0, "exec_seconds_saved": 0.0}
+
+    # ==================== Loading ====================
+
+    def _get(self, digest: str) -> Optional[types.ModuleType]:
+        with self._lock:
+            module = self._modules.get(digest)
+            if module is not None:
+                self._modules.move_to_end(digest)
+                self._stats["hits"] += 1
+                self._stats["exec_seconds_saved"] += self._exec_seconds.get(digest, 0.0)
+            return module
+
+    def _put(self, digest: str, module: types.ModuleType, seconds: float):
+        with self._lock:
+            self._modules[digest] = module
+            self._modules.move_to_end(digest)
+            self._exec_seconds[digest] = seconds
+            self._stats["misses"] += 1
+            self._stats["exec_seconds"] += seconds
+            while len(self._modules) > self.max_modules:
+                evicted, _ = self._modules.popitem(last=False)
+                self._exec_seconds.pop(evicted, None)
+                self._stats["evictions"] += 1
+
+    def _load(self, digest: str, build) -> types.ModuleType:
+        module = self._get(digest)
+        if module is not None:
+            return module
+
+        with self._lock:
+            load_lock = self._loading.setdefault(digest, threading.Lock())
+        with load_lock:
+            module = self._get(digest)
+            if module is not None:
+                return module
+            start = time.perf_counter()
+            try:
+                module = build()
+                self._put(digest, module, time.perf_counter() - start)
+            finally:
+                # Only after _put: a caller arriving in between would otherwise
+                # get a fresh lock, miss the cache and execute the module again
+                with self._lock:
+                    self._loading.pop(digest, None)
+            return module
+
+    def load_file(self, file_path: str, module_name: Optional[str] = None) -> types.ModuleType:
+        """
+        Executed module of a tool file (cached by content hash).
+
+        Args:
+            file_path: Path of the .py file
+            module_name: Module name (default: file stem); also registered in sys.modules
+
+        Returns:
+            The module object
+        """
+        path = Path(file_path)
+        source = path.read_bytes()
+        digest = hashlib.sha256(source).hexdigest()
+        name = module_name or path.stem
+
+        def build():
+            spec = importlib.util.spec_from_file_location(name, str(path))
+            if spec is None or spec.loader is None:
+                raise ImportError(f"Could not create module spec for {path}")
+            module = importlib.util.module_from_spec(spec)
+            code = compile(source, str(path), "exec")
+            exec(code, module.__dict__)
+            return module
+
+        module = self._load(digest, build)
+        sys.modules[name] = module
+        return module
+
+    def load_source(self, code: str, module_name: str = "dynamic_tool") -> types.ModuleType:
+        """Executed module of tool source code (e.g. ProjectTool.code), cached by hash."""
+        digest = code_hash(code)
+
+        def build():
+            # Register the source so inspect.getsource (used by smolagents @tool) finds it
+            filename = f"<tool:{module_name}:{digest[:12]}>"
+            linecache.cache[filename] = (len(code), None, code.splitlines(True), filename)
+            module = types.ModuleType(module_name)
+            module.__file__ = filename
+            exec(compile(code, filename, "exec"), module.__dict__)
+            return module
+
+        return self._load(digest, build)
+
+    # ==================== Projects ====================
+
+    def sync_project(self, user_id: str, project_id: str) -> List[Dict[str, Any]]:
+        """
+        Active tools_manifest.json entries of a project.
+
+        When the manifest changed since the last call, modules whose hash is
+        no longer listed are evicted.
+        """
+        from app.services.sandbox import get_sandbox_manager
+        sandbox = get_sandbox_manager()
+        scope = (str(user_id), str(project_id))
+        manifest_path = sandbox.get_project_sandbox(user_id, project_id) / sandbox.TOOLS_DIR / sandbox.TOOLS_MANIFEST
+        try:
+            mtime = manifest_path.stat().st_mtime
+        except OSError:
+            mtime = None
+
+        entries = sandbox.list_tools(user_id, project_id, status="active") if mtime is not None else []
+        hashes = {e.get("code_hash") for e in entries if e.get("code_hash")}
+
+        with self._lock:
+            previous = self._projects.get(scope)
+            self._projects[scope] = (mtime, hashes)
+            if previous is not None and previous[0] != mtime:
+                still_used = set().union(*(h for s, (_, h) in self._projects.items()))
+                for digest in previous[1] - still_used:
+                    if self._modules.pop(digest, None) is not None:
+                        self._exec_seconds.pop(digest, None)
+                        self._stats["invalidations"] += 1
+        return entries
+
+    def warm_project(self, user_id: str, project_id: str) -> int:
+        """Execute all active tools of a project ahead of use; returns the number loaded."""
+        from app.services.sandbox import get_sandbox_manager
+        sandbox = get_sandbox_manager()
+        tools_dir = sandbox.get_project_sandbox(user_id, project_id) / sandbox.TOOLS_DIR
+
+        loaded = 0
+        for entry in self.sync_project(user_id, project_id):
+            file_path = tools_dir / entry["filename"]
+            if not file_path.exists():
+                continue
+            try:
+                self.load_file(str(file_path), entry["name"])
+                loaded += 1
+            except Exception as e:
+                logger.warning(f"⚠️ Could not preload tool {entry['name']}: {e}")
+        if loaded:
+            logger.info(f"🔥 Preloaded {loaded} tools for project {project_id}")
+        return loaded
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["modules"] = len(self._modules)
+            stats["max_modules"] = self.max_modules
+            total = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = round(stats["hits"] / total, 3) if total else 0.0
+            return stats
+
+
+# Global singleton
+_cache: Optional[ToolModuleCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_tool_module_cache() -> ToolModuleCache:
+    """Get the global tool module cache instance."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ToolModuleCache()
+    return _cache
@@ -186,16 +186,17 @@ class ToolRegistry:
                     return []
 
                 # Convert database records to executable tool objects
+                from .tool_module_cache import get_tool_module_cache
+                module_cache = get_tool_module_cache()
                 custom_tools = []
                 for tool_record in tool_records:
                     try:
-                        # Execute the tool code to create the function
+                        # Execute the tool code to create the function (once per code hash)
                         # The tool code should define a function decorated with @tool
-                        exec_globals = {}
-                        exec(tool_record.code, exec_globals)
+                        module = module_cache.load_source(tool_record.code, tool_record.name)
 
                         # Find the tool function in the executed code
-                        for name, obj in exec_globals.items():
+                        for name, obj in vars(module).items():
                             if callable(obj) and hasattr(obj, 'name'):
                                 custom_tools.append(obj)
                                 logger.debug(f"  ✅ Loaded custom tool: {tool_record.name} for user {user_id}")
@@ -60,6 +60,7 @@ from app.api.v1.websocket import router as websocket_router
 from app.api.v1.auth import router as auth_router
 from app.api.v1.admin import router as admin_router
 from app.api.v1.gcs import router as gcs_router
+from app.api.v1.artifacts import router as artifacts_router
 
 # V2 API - LangChain + Direct API
 from app.api.v2.chat import router as v2_chat_router
@@ -101,7 +102,33 @@ async def lifespan(app: FastAPI):
     #     logger.error(f"LABOS AI initialization failed: {e}")
     #     print(f"❌ LABOS AI initialization failed: {e}")
 
-    # WebSocket broadcaster is already initialized and ready to use
+    # Pre-fork sandbox kernels so the first python_interpreter call is fast
+    try:
+        from app.config import SANDBOX_CONFIG
+        if SANDBOX_CONFIG.get("kernel_pool_enabled", True):
+            from app.services.sandbox import get_kernel_pool
+            await asyncio.to_thread(get_kernel_pool().warm_up)
+    except Exception as e:
+        logger.error(f"Sandbox kernel pool warm-up failed: {e}")
+        print(f"⚠️ Sandbox kernel pool warm-up failed: {e}")
+
+    # Index all tools once so tool selection is a lookup, not a module scan
+    try:
+        from app.config import TOOLS_CONFIG
+        if TOOLS_CONFIG.get("catalog_build_on_startup", True):
+            from app.core.tools.tool_manager.tool_catalog import get_tool_catalog
+            await asyncio.to_thread(get_tool_catalog().build)
+    except Exception as e:
+        logger.error(f"Tool catalog build failed: {e}")
+        print(f"⚠️ Tool catalog build failed: {e}")
+
+    # Join the event backplane so clients on other workers see this worker's events
+    try:
+        await websocket_broadcaster.start()
+    except Exception as e:
+        logger.error(f"Event backplane startup failed: {e}")
+        print(f"⚠️ Event backplane startup failed: {e}")
+
     logger.info("LabOS AI Backend startup completed successfully")
     print("✅ LabOS AI Backend started successfully!")
     
@@ -110,15 +137,44 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Starting LabOS AI Backend shutdown")
     print("🛑 Shutting down LabOS AI Backend...")
-    try:
-        # await labos_service.cleanup()  # V1 only - disabled
-        pass  # V2 cleanup handled elsewhere
-        await close_database()
+    # await labos_service.cleanup()  # V1 only - disabled
+    # V2 cleanup handled elsewhere
+
+    def _stop_kernel_pool():
+        from app.services.sandbox import shutdown_kernel_pool
+        shutdown_kernel_pool()
+
+    def _close_http_client():
+        from app.services.http_client import get_http_client
+        get_http_client().close()
+
+    def _close_response_cache():
+        from app.services.response_cache import get_response_cache
+        get_response_cache().close()
+
+    # Each step on its own: a failing step (e.g. a backplane socket error) must
+    # not skip the ones after it, least of all closing the database
+    shutdown_steps = [
+        ("event backplane", websocket_broadcaster.stop),
+        ("kernel pool", lambda: asyncio.to_thread(_stop_kernel_pool)),
+        ("HTTP client", _close_http_client),
+        ("response cache", _close_response_cache),
+        ("database", close_database),
+    ]
+    failed = False
+    for name, step in shutdown_steps:
+        try:
+            result = step()
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            failed = True
+            logger.error(f"Shutdown error ({name}): {e}")
+            print(f"❌ Shutdown error ({name}): {e}")
+
+    if not failed:
         logger.info("LabOS AI Backend shutdown completed successfully")
         print("✅ LabOS AI Backend shutdown complete!")
-    except Exception as e:
-        logger.error(f"Shutdown error: {e}")
-        print(f"❌ Shutdown error: {e}")
 
 # Create FastAPI app
 app = FastAPI(
@@ -150,6 +206,7 @@ app.include_router(memory_router, prefix="/api/v1/memory", tags=["v1-memory"])
 app.include_router(system_router, prefix="/api/v1/system", tags=["v1-system"])
 app.include_router(admin_router, prefix="/api/v1/admin", tags=["v1-admin"])
 app.include_router(gcs_router, prefix="/api/v1/gcs", tags=["v1-gcs"])
+app.include_router(artifacts_router, prefix="/api/v1/artifacts", tags=["v1-artifacts"])
 app.include_router(websocket_router, prefix="", tags=["v1-websocket"])  # No prefix for /ws
 
 # ==========================================
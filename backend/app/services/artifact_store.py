@@ -0,0 +1,241 @@
+"""
+LABOS Artifact Store
+
+Content-addressed storage for binary outputs (plots, images) that used to
+travel inline as base64 through workflow events, WebSocket messages,
+workflow_steps.step_metadata and the LLM context. Artifacts are stored once
+under their sha256 and referenced by a small dict:
+
+    {"sha256": "...", "url": "/api/v1/artifacts/<sha256>", "content_type": "image/png",
+     "size": 48213, "thumbnail": "data:image/png;base64,..."}  # thumbnail optional, a few KB
+
+Layout (local disk, mirrored to GCS under _artifacts/ when sandbox sync is on):
+    {artifact_root}/{sha256[:2]}/{sha256}        content
+    {artifact_root}/{sha256[:2]}/{sha256}.json   content type, size, owners
+
+Served by GET /api/v1/artifacts/{sha256} with a strong ETag, immutable
+caching and Range support (see app/api/v1/artifacts.py).
+
+Usage:
+    from app.services.artifact_store import get_artifact_store
+
+    ref = get_artifact_store().put_file("/data/sandboxes/u/p/generated/plot.png", owner=user_id)
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.config import STORAGE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Route of app/api/v1/artifacts.py
+URL_PREFIX = "/api/v1/artifacts"
+
+# GCS prefix of mirrored artifacts (next to the {user_id}/ sandbox prefixes)
+GCS_PREFIX = "_artifacts"
+
+_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+
+def is_valid_sha256(value: str) -> bool:
+    return bool(value) and bool(_SHA256.match(value))
+
+
+class ArtifactStore:
+    """
+    sha256-keyed blob store with per-artifact owner lists.
+
+    Thread-safe: plotting tools call put_file from tool threads.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or STORAGE_CONFIG.get("artifact_root", "./data/artifacts"))
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.thumbnail_px = STORAGE_CONFIG.get("artifact_thumbnail_px", 160)
+        self._lock = threading.Lock()
+        self._stats = {"stored": 0, "deduplicated": 0, "bytes_stored": 0, "remote_fetches": 0}
+
+    # ==================== Paths ====================
+
+    def path_for(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / sha256
+
+    def _meta_path(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / f"{sha256}.json"
+
+    def url_for(self, sha256: str) -> str:
+        return f"{URL_PREFIX}/{sha256}"
+
+    # ==================== Write ====================
+
+    def put_file(
+        self,
+        file_path: str,
+        content_type: Optional[str] = None,
+        owner: Optional[str] = None,
+        thumbnail: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Store a file (deduplicated by content) and return its reference.
+
+        Args:
+            file_path: File to store; it is copied, the original stays in place
+            content_type: MIME type (guessed from the file name if omitted)
+            owner: User id allowed to fetch the artifact (None: any authenticated user)
+            thumbnail: Include a small inline thumbnail for images
+
+        Returns:
+            Reference dict (sha256, url, content_type, size, optional thumbnail)
+        """
+        sha256 = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                sha256.update(chunk)
+        digest = sha256.hexdigest()
+        content_type = content_type or mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+
+        target = self.path_for(digest)
+        with self._lock:
+            created = not target.exists()
+            if created:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                # Copy next to the target and rename, so readers never see partial files
+                fd, tmp_path = tempfile.mkstemp(dir=target.parent, suffix=".part")
+                os.close(fd)
+                shutil.copyfile(file_path, tmp_path)
+                os.replace(tmp_path, target)
+                self._stats["stored"] += 1
+                self._stats["bytes_stored"] += target.stat().st_size
+            else:
+                self._stats["deduplicated"] += 1
+            meta, changed = self._update_meta(digest, content_type, target.stat().st_size, owner)
+
+        if created or changed:
+            self._mirror(digest)
+
+        ref = {
+            "sha256": digest,
+            "url": self.url_for(digest),
+            "content_type": meta["content_type"],
+            "size": meta["size"],
+        }
+        if thumbnail and meta["content_type"].startswith("image/"):
+            thumb = self.thumbnail(digest)
+            if thumb:
+                ref["thumbnail"] = thumb
+        return ref
+
+    def _update_meta(self, sha256: str, content_type: str, size: int, owner: Optional[str]):
+        """Create or extend the sidecar; returns (meta, changed)."""
+        meta = self.get_meta(sha256)
+        changed = meta is None
+        if meta is None:
+            meta = {"content_type": content_type, "size": size, "owners": [], "created_at": time.time()}
+        if owner and owner not in meta["owners"]:
+            meta["owners"].append(owner)
+            changed = True
+        elif not owner and not meta.get("public"):
+            meta["public"] = True
+            changed = True
+        if changed:
+            self._meta_path(sha256).write_text(json.dumps(meta))
+        return meta, changed
+
+    def _mirror(self, sha256: str):
+        """Copy a new artifact to GCS so other instances can serve it."""
+        try:
+            from app.services.sandbox import get_sync_manager
+            sync = get_sync_manager()
+            prefix = f"{GCS_PREFIX}/{sha256[:2]}"
+            sync.upload_in_background(str(self.path_for(sha256)), f"{prefix}/{sha256}")
+            sync.upload_in_background(str(self._meta_path(sha256)), f"{prefix}/{sha256}.json")
+        except Exception as e:
+            logger.warning(f"Could not mirror artifact {sha256[:12]} to GCS: {e}")
+
+    # ==================== Read ====================
+
+    def get_meta(self, sha256: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(self._meta_path(sha256).read_text())
+        except (OSError, ValueError):
+            return None
+
+    def ensure_local(self, sha256: str) -> Optional[Path]:
+        """Local path of an artifact, fetched from the GCS mirror if another instance stored it."""
+        path = self.path_for(sha256)
+        if path.exists() and self._meta_path(sha256).exists():
+            return path
+
+        try:
+            from app.services.sandbox import get_sync_manager
+            sync = get_sync_manager()
+            if not sync.sync_enabled:
+                return None
+            prefix = f"{GCS_PREFIX}/{sha256[:2]}"
+            if not sync.download_blocking(f"{prefix}/{sha256}.json", str(self._meta_path(sha256))):
+                return None
+            if not path.exists() and not sync.download_blocking(f"{prefix}/{sha256}", str(path)):
+                return None
+        except Exception as e:
+            logger.warning(f"Could not fetch artifact {sha256[:12]} from GCS: {e}")
+            return None
+
+        with self._lock:
+            self._stats["remote_fetches"] += 1
+        return path
+
+    def can_read(self, sha256: str, user_id: Optional[str]) -> bool:
+        meta = self.get_meta(sha256)
+        if meta is None:
+            return False
+        return bool(meta.get("public")) or (user_id is not None and user_id in meta.get("owners", []))
+
+    def thumbnail(self, sha256: str) -> Optional[str]:
+        """Small PNG data URI of an image artifact (cached next to the artifact)."""
+        if not self.thumbnail_px:
+            return None
+        thumb_path = self.root / sha256[:2] / f"{sha256}.thumb.png"
+        if not thumb_path.exists():
+            try:
+                from PIL import Image
+                with Image.open(self.path_for(sha256)) as image:
+                    image.thumbnail((self.thumbnail_px, self.thumbnail_px))
+                    buffer = BytesIO()
+                    image.save(buffer, format="PNG", optimize=True)
+                thumb_path.write_bytes(buffer.getvalue())
+            except Exception as e:
+                logger.debug(f"No thumbnail for artifact {sha256[:12]}: {e}")
+                return None
+        return "data:image/png;base64," + base64.b64encode(thumb_path.read_bytes()).decode("utf-8")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats)
+
+
+# Global singleton
+_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Get the global artifact store instance."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ArtifactStore()
+    return _store
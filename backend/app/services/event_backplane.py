@@ -0,0 +1,389 @@
+"""
+Event Backplane - Cross-worker fan-out of WebSocket broadcasts
+
+websocket_broadcaster and workflow_event_queue live inside one process. With
+`uvicorn --workers N` (or several Cloud Run instances) a client whose socket
+landed on worker A never saw events of a workflow running on worker B. The
+broadcaster now hands every message it publishes to a backplane, which
+delivers it to the other workers; each worker then routes it to its own
+project rooms.
+
+Routing is by topic:
+- project:<project_id> - messages of one project; a worker is subscribed
+  only while it has at least one local client in that project's room
+- * - messages without project_id (sent to every connection)
+
+Implementations (websocket.backplane):
+- inprocess: nothing leaves the process (single worker, the default)
+- tcp: a small built-in broker speaking newline-delimited frames. Run it
+  standalone (python -m app.services.event_backplane --port 8765), or let
+  the first worker that finds no broker host it (websocket.backplane_embedded_broker)
+
+Frames (one per line, payload is the JSON message serialized once):
+    AUTH <secret> | SUB <topic> | UNSUB <topic> | PUB <topic> <payload> | MSG <topic> <payload>
+
+A client's first frame must be AUTH with the shared secret
+(websocket.backplane_secret, env WS_BACKPLANE_SECRET); the broker closes
+connections that send anything else first. The broker listens on loopback
+by default and refuses to bind another address without a secret.
+
+Delivery is at-most-once: messages published while a worker is
+disconnected from the broker are dropped and counted.
+"""
+
+import asyncio
+import hmac
+import ipaddress
+import logging
+import os
+import uuid
+from typing import Any, Callable, Dict, Optional, Set
+from urllib.parse import urlsplit
+
+from app.config import WEBSOCKET_CONFIG
+
+logger = logging.getLogger('labos.websocket')
+
+GLOBAL_TOPIC = "*"
+
+# Per-connection write buffer above which messages are dropped instead of queued
+MAX_WRITE_BUFFER = 8 * 1024 * 1024
+
+# Frames are single lines; large workflow steps (step_metadata) must still fit
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def project_topic(project_id: Optional[str]) -> str:
+    """Topic of a project room (GLOBAL_TOPIC for messages without project_id)"""
+    return f"project:{project_id}" if project_id else GLOBAL_TOPIC
+
+
+class EventBackplane:
+    """
+    Base backplane: publishes serialized messages to other workers and hands
+    messages received from them to the handler set with set_handler().
+
+    publish/subscribe/unsubscribe are called on the event loop and never block.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self._handler: Optional[Callable[[str, str], None]] = None
+        self.topics: Set[str] = set()
+        self.stats = {"published": 0, "received": 0, "dropped": 0}
+
+    def set_handler(self, handler: Callable[[str, str], None]):
+        """Set the callback for remote messages: handler(topic, payload)"""
+        self._handler = handler
+
+    async def start(self):
+        """Connect to the transport (no-op for in-process)"""
+
+    async def stop(self):
+        """Disconnect from the transport"""
+
+    def subscribe(self, topic: str):
+        self.topics.add(topic)
+
+    def unsubscribe(self, topic: str):
+        self.topics.discard(topic)
+
+    def publish(self, topic: str, payload: str) -> bool:
+        """Send a message to the other workers; returns False if it was dropped."""
+        self.stats["published"] += 1
+        return True
+
+    def _deliver(self, topic: str, payload: str):
+        self.stats["received"] += 1
+        if self._handler is None:
+            return
+        try:
+            self._handler(topic, payload)
+        except Exception as e:
+            logger.warning(f"Backplane handler failed for {topic}: {type(e).__name__}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "subscribed_topics": len(self.topics), **self.stats}
+
+
+class InProcessBackplane(EventBackplane):
+    """Single-process backplane: local delivery is all there is."""
+
+    name = "inprocess"
+
+
+class TcpBackplane(EventBackplane):
+    """
+    Backplane client of a BackplaneBroker.
+
+    Keeps one connection to the broker, re-subscribes its topics after a
+    reconnect, and (with embedded_broker) starts the broker itself when
+    nothing is listening on the configured address.
+    """
+
+    name = "tcp"
+
+    def __init__(self, url: str, embedded_broker: bool = True, reconnect_delay: float = 1.0, secret: str = ""):
+        super().__init__()
+        parts = urlsplit(url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 8765
+        self.embedded_broker = embedded_broker
+        self.reconnect_delay = reconnect_delay
+        self.secret = secret
+        self.node_id = uuid.uuid4().hex[:8]
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+        self._connected = asyncio.Event()
+        self._broker: Optional[BackplaneBroker] = None
+        self.stats.update({"connects": 0, "disconnects": 0, "hosting_broker": False})
+
+    async def start(self, timeout: float = 5.0):
+        """Start the connection task and wait (up to timeout) for the first connect."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Backplane broker {self.host}:{self.port} not reachable yet, retrying in background")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._broker is not None:
+            await self._broker.stop()
+            self._broker = None
+
+    def subscribe(self, topic: str):
+        if topic not in self.topics:
+            self.topics.add(topic)
+            self._send(f"SUB {topic}\n")
+
+    def unsubscribe(self, topic: str):
+        if topic in self.topics:
+            self.topics.discard(topic)
+            self._send(f"UNSUB {topic}\n")
+
+    def publish(self, topic: str, payload: str) -> bool:
+        if self._send(f"PUB {topic} {payload}\n"):
+            self.stats["published"] += 1
+            return True
+        self.stats["dropped"] += 1
+        return False
+
+    def _send(self, frame: str) -> bool:
+        writer = self._writer
+        if writer is None or writer.is_closing():
+            return False
+        if writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            return False
+        writer.write(frame.encode())
+        return True
+
+    async def _run(self):
+        """Connect, read MSG frames, reconnect on failure."""
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port, limit=MAX_FRAME_SIZE)
+            except OSError:
+                if self.embedded_broker and self._broker is None and await self._host_broker():
+                    continue
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+
+            self._writer = writer
+            self.stats["connects"] += 1
+            writer.write(f"AUTH {self.secret}\n".encode())
+            # Subscriptions made while disconnected (or before the reconnect) are replayed
+            for topic in self.topics:
+                writer.write(f"SUB {topic}\n".encode())
+            self._connected.set()
+            logger.info(f"Backplane {self.node_id} connected to {self.host}:{self.port}")
+
+            try:
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    op, _, rest = line.decode().rstrip("\n").partition(" ")
+                    if op == "MSG":
+                        topic, _, payload = rest.partition(" ")
+                        self._deliver(topic, payload)
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+                logger.warning(f"Backplane connection lost: {type(e).__name__}: {e}")
+            finally:
+                self._writer = None
+                self._connected.clear()
+                self.stats["disconnects"] += 1
+                writer.close()
+            await asyncio.sleep(self.reconnect_delay)
+
+    async def _host_broker(self) -> bool:
+        """Try to become the broker; False if another worker bound the port first."""
+        broker = BackplaneBroker(self.host, self.port, secret=self.secret)
+        try:
+            await broker.start()
+        except OSError:
+            return False
+        except ValueError as e:
+            # Non-loopback address without a secret: leave hosting to a configured broker
+            logger.warning(f"Backplane {self.node_id} not hosting the broker: {e}")
+            self.embedded_broker = False
+            return False
+        self._broker = broker
+        self.stats["hosting_broker"] = True
+        logger.info(f"Backplane {self.node_id} is hosting the broker on {self.host}:{self.port}")
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = super().get_stats()
+        stats["connected"] = self._writer is not None
+        stats["broker"] = f"{self.host}:{self.port}"
+        if self._broker is not None:
+            stats["broker_stats"] = self._broker.get_stats()
+        return stats
+
+
+class BackplaneBroker:
+    """
+    Topic router for TcpBackplane clients.
+
+    A PUB frame is forwarded as MSG to every connection subscribed to its
+    topic, except the publisher (which already delivered locally). Clients
+    must authenticate with AUTH <secret> before anything else.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, secret: str = ""):
+        self.host = host
+        self.port = port
+        self.secret = secret
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._subscribers: Dict[str, Set[asyncio.StreamWriter]] = {}
+        self._clients: Set[asyncio.StreamWriter] = set()
+        self.stats = {"messages_in": 0, "messages_out": 0, "dropped": 0, "clients_total": 0, "auth_failures": 0}
+
+    async def start(self):
+        if not self.secret and not _is_loopback(self.host):
+            raise ValueError(f"Refusing to serve the backplane on {self.host} without a shared secret (WS_BACKPLANE_SECRET)")
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_FRAME_SIZE)
+        if self.port == 0:
+            self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._clients):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self):
+        await self.start()
+        logger.info(f"Backplane broker listening on {self.host}:{self.port}")
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._clients.add(writer)
+        self.stats["clients_total"] += 1
+        topics: Set[str] = set()
+        try:
+            op, _, secret = (await reader.readline()).rstrip(b"\n").partition(b" ")
+            if op != b"AUTH" or not hmac.compare_digest(secret, self.secret.encode()):
+                self.stats["auth_failures"] += 1
+                logger.warning("Backplane broker rejected a client that did not authenticate")
+                return
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                op, _, rest = line.partition(b" ")
+                if op == b"PUB":
+                    topic, _, _ = rest.partition(b" ")
+                    self._forward(topic.decode(), b"MSG " + rest, writer)
+                elif op == b"SUB":
+                    topic = rest.decode().strip()
+                    topics.add(topic)
+                    self._subscribers.setdefault(topic, set()).add(writer)
+                elif op == b"UNSUB":
+                    topic = rest.decode().strip()
+                    topics.discard(topic)
+                    self._unsubscribe(topic, writer)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError, asyncio.CancelledError):
+            # Client went away, sent an oversized frame, or the broker is shutting down
+            pass
+        finally:
+            for topic in topics:
+                self._unsubscribe(topic, writer)
+            self._clients.discard(writer)
+            writer.close()
+
+    def _forward(self, topic: str, frame: bytes, sender: asyncio.StreamWriter):
+        self.stats["messages_in"] += 1
+        for subscriber in self._subscribers.get(topic, ()):
+            if subscriber is sender:
+                continue
+            if subscriber.is_closing() or subscriber.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+                # A stalled worker must not grow the broker's memory without bound
+                self.stats["dropped"] += 1
+                continue
+            subscriber.write(frame)
+            self.stats["messages_out"] += 1
+
+    def _unsubscribe(self, topic: str, writer: asyncio.StreamWriter):
+        subscribers = self._subscribers.get(topic)
+        if subscribers is not None:
+            subscribers.discard(writer)
+            if not subscribers:
+                del self._subscribers[topic]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "clients": len(self._clients), "topics": len(self._subscribers)}
+
+
+def create_backplane(config: Optional[Dict[str, Any]] = None) -> EventBackplane:
+    """Build the backplane selected by websocket.backplane"""
+    config = WEBSOCKET_CONFIG if config is None else config
+    backend = config.get("backplane", "inprocess")
+    if backend == "tcp":
+        return TcpBackplane(
+            config.get("backplane_url", "tcp://127.0.0.1:8765"),
+            embedded_broker=config.get("backplane_embedded_broker", True),
+            secret=config.get("backplane_secret", ""),
+        )
+    if backend != "inprocess":
+        logger.warning(f"Unknown websocket.backplane '{backend}', using inprocess")
+    return InProcessBackplane()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the WebSocket event backplane broker")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="Bind address; anything but loopback requires a secret")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    # Secret from the environment, not argv (visible in the process list)
+    secret = os.getenv("WS_BACKPLANE_SECRET") or WEBSOCKET_CONFIG.get("backplane_secret", "")
+    try:
+        asyncio.run(BackplaneBroker(args.host, args.port, secret=secret).serve_forever())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,356 @@
+"""
+Shared HTTP Client for External Database Tools
+
+The database, screening, predefined and pubmed tools used to call bare
+requests.get/post (or urllib) for every query: a new TCP+TLS handshake to
+UniProt, Ensembl, NCBI, STRING or Reactome per call, often no timeout, and
+retry behaviour that differed from tool to tool. All of them now go through
+this client:
+
+- Pooled sessions: one requests.Session (keep-alive connection pool) per host
+- Default timeouts: (connect, read) from the http config section
+- Per-host token buckets: e.g. NCBI E-utilities 3 requests/s, 10/s when
+  PUBMED_API_KEY (NCBI API key) is set; the key is added to E-utilities
+  requests automatically
+- Retries: connection errors, timeouts, 429 and 5xx, with full-jitter
+  exponential backoff (Retry-After is honoured); POST is only retried when
+  the caller marks it idempotent
+- Metrics: per-host latency histograms, retries, errors and throttle waits
+- Per-host state (sessions, buckets, stats) is LRU-bounded by http.max_hosts:
+  tools also fetch arbitrary URLs (web pages, PDFs), which must not grow it
+  without limit
+
+Responses are plain requests.Response objects and failures raise
+requests.exceptions.*, so callers keep their existing error handling.
+
+Usage:
+    from app.services.http_client import get_http_client
+
+    response = get_http_client().get("https://rest.uniprot.org/uniprotkb/P04637", params={"format": "json"})
+    response.raise_for_status()
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.config import HTTP_CONFIG, EXTERNAL_APIS
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+NCBI_EUTILS_HOST = "eutils.ncbi.nlm.nih.gov"
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1.0, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token; returns the seconds spent waiting."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Reserve the token now (may go negative), wait for it outside the lock
+            self._tokens -= 1.0
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class HostStats:
+    """Request counters and latency histogram of one host."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.throttled = 0
+        self.throttle_seconds = 0.0
+        self.latency_total = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.status_codes: Dict[int, int] = {}
+
+    def observe(self, seconds: float, status: Optional[int]):
+        self.requests += 1
+        self.latency_total += seconds
+        ms = seconds * 1000
+        index = next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if ms <= bound), len(LATENCY_BUCKETS_MS))
+        self.buckets[index] += 1
+        if status is None:
+            self.errors += 1
+        else:
+            self.status_codes[status] = self.status_codes.get(status, 0) + 1
+
+    def percentile_ms(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket containing the given percentile."""
+        if not self.requests:
+            return None
+        target = fraction * self.requests
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                return float(LATENCY_BUCKETS_MS[i]) if i < len(LATENCY_BUCKETS_MS) else float("inf")
+        return float("inf")
+
+    def to_dict(self) -> Dict[str, Any]:
+        histogram = {f"le_{bound}ms": count for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets)}
+        histogram["gt_30000ms"] = self.buckets[-1]
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "throttle_seconds": round(self.throttle_seconds, 3),
+            "latency_ms_avg": round(self.latency_total / self.requests * 1000, 1) if self.requests else None,
+            "latency_ms_p50": self.percentile_ms(0.5),
+            "latency_ms_p95": self.percentile_ms(0.95),
+            "latency_histogram": histogram,
+            "status_codes": dict(self.status_codes),
+        }
+
+
+class HttpClient:
+    """
+    Pooled, rate-limited, retrying HTTP client shared by all tools.
+
+    Thread-safe: tools run concurrently in the tool dispatch pool.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        config = config or HTTP_CONFIG
+        self.timeout = (config.get("connect_timeout", 10), config.get("read_timeout", 60))
+        self.max_retries = config.get("max_retries", 3)
+        self.backoff_base = config.get("backoff_base", 0.5)
+        self.backoff_max = config.get("backoff_max", 30.0)
+        self.pool_maxsize = config.get("pool_maxsize", 16)
+        self.max_hosts = config.get("max_hosts", 256)
+        self.rate_limits: Dict[str, float] = dict(config.get("rate_limits") or {})
+        self.default_rate_limit = config.get("default_rate_limit")
+
+        self.ncbi_api_key = EXTERNAL_APIS.get("pubmed", {}).get("api_key", "")
+        if NCBI_EUTILS_HOST not in self.rate_limits:
+            # NCBI E-utilities: 3 requests/s without an API key, 10/s with one
+            self.rate_limits[NCBI_EUTILS_HOST] = 10 if self.ncbi_api_key else 3
+
+        self._lock = threading.Lock()
+        # Least recently used first; trimmed to max_hosts
+        self._sessions: "OrderedDict[str, requests.Session]" = OrderedDict()
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._stats: "OrderedDict[str, HostStats]" = OrderedDict()
+        self._evicted_hosts = 0
+
+    # ==================== Per-host state ====================
+
+    def _session(self, scheme: str, host: str) -> requests.Session:
+        key = f"{scheme}://{host}"
+        evicted = []
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+                session.mount(f"{scheme}://", adapter)
+                self._sessions[key] = session
+                while len(self._sessions) > self.max_hosts:
+                    evicted.append(self._sessions.popitem(last=False)[1])
+            else:
+                self._sessions.move_to_end(key)
+        # Requests still running on an evicted session finish; its idle connections are closed
+        for old in evicted:
+            old.close()
+        return session
+
+    def _rate_limit_key(self, host: str) -> str:
+        """Most specific rate limit entry for a host ("string-db.org" also covers version-12-0.string-db.org)."""
+        matches = [key for key in self.rate_limits if host == key or host.endswith("." + key)]
+        return max(matches, key=len) if matches else host
+
+    def _bucket(self, host: str) -> Optional[TokenBucket]:
+        key = self._rate_limit_key(host)
+        rate = self.rate_limits.get(key, self.default_rate_limit)
+        if not rate:
+            return None
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                # Subdomains of one service share the bucket of the matched entry
+                bucket = self._buckets[key] = TokenBucket(rate)
+                while len(self._buckets) > self.max_hosts:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            return bucket
+
+    def _host_stats(self, host: str) -> HostStats:
+        """Stats of a host; called with self._lock held."""
+        stats = self._stats.get(host)
+        if stats is None:
+            stats = self._stats[host] = HostStats()
+            while len(self._stats) > self.max_hosts:
+                self._stats.popitem(last=False)
+                self._evicted_hosts += 1
+        else:
+            self._stats.move_to_end(host)
+        return stats
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response]) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        # Full jitter: uniform(0, base * 2^attempt), capped
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    # ==================== Requests ====================
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Any = None,
+        retries: Optional[int] = None,
+        idempotent: Optional[bool] = None,
+        **kwargs
+    ) -> requests.Response:
+        """
+        Send a request through the pooled session of the URL's host.
+
+        Args:
+            method: HTTP method
+            url: Full URL
+            params: Query parameters
+            timeout: Seconds or (connect, read); defaults to the http config
+            retries: Retries after the first attempt (default: http.max_retries)
+            idempotent: Allow retrying this request (default: True except for POST/PATCH)
+            **kwargs: Passed to requests.Session.request (headers, json, data, stream, ...)
+
+        Returns:
+            The last response (retryable statuses are returned after the final attempt)
+
+        Raises:
+            requests.exceptions.RequestException: Connection errors and timeouts after all retries
+        """
+        method = method.upper()
+        parts = urlsplit(url)
+        host = parts.hostname or ""
+        session = self._session(parts.scheme or "https", host)
+        bucket = self._bucket(host)
+
+        if host == NCBI_EUTILS_HOST and self.ncbi_api_key:
+            params = dict(params or {})
+            params.setdefault("api_key", self.ncbi_api_key)
+
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        max_retries = (self.max_retries if retries is None else retries) if idempotent else 0
+
+        attempt = 0
+        while True:
+            if bucket is not None:
+                waited = bucket.acquire()
+                if waited > 0:
+                    with self._lock:
+                        stats = self._host_stats(host)
+                        stats.throttled += 1
+                        stats.throttle_seconds += waited
+
+            start = time.perf_counter()
+            response = None
+            error = None
+            try:
+                response = session.request(method, url, params=params, timeout=timeout or self.timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                self._host_stats(host).observe(elapsed, response.status_code if response is not None else None)
+
+            retryable = error is not None or response.status_code in RETRY_STATUS_CODES
+            if not retryable or attempt >= max_retries:
+                if error is not None:
+                    raise error
+                return response
+
+            delay = self._backoff(attempt, response)
+            attempt += 1
+            with self._lock:
+                self._host_stats(host).retries += 1
+            reason = type(error).__name__ if error is not None else f"HTTP {response.status_code}"
+            logger.info(f"🔁 {method} {host}: {reason}, retry {attempt}/{max_retries} in {delay:.2f}s")
+            if response is not None:
+                response.close()
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        return self.request("HEAD", url, **kwargs)
+
+    # ==================== Metrics ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hosts = {host: stats.to_dict() for host, stats in self._stats.items()}
+            sessions = len(self._sessions)
+            evicted_hosts = self._evicted_hosts
+        return {
+            "sessions": sessions,
+            "max_hosts": self.max_hosts,
+            "evicted_hosts": evicted_hosts,
+            "requests": sum(h["requests"] for h in hosts.values()),
+            "retries": sum(h["retries"] for h in hosts.values()),
+            "errors": sum(h["errors"] for h in hosts.values()),
+            "rate_limits": dict(self.rate_limits),
+            "hosts": hosts,
+        }
+
+    def close(self):
+        """Close all pooled sessions."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+# Global singleton
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Get the global HTTP client instance."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+    return _client
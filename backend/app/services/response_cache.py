@@ -0,0 +1,365 @@
+"""
+Response Cache - Persistent Cache for Bioinformatics REST and E-utilities Lookups
+
+The same gene/protein lookups (UniProt entries, Ensembl xrefs, KEGG
+pathways, ClinVar summaries, PubMed efetch XML) used to be fetched from the
+network again in every chat, by every user. _query_rest_api,
+_query_ncbi_database and pubmed._fetch_paper_details now read through this
+cache:
+
+- Keys: normalized URL (lower-case host, sorted query parameters, without
+  credentials such as api_key/email) plus the JSON body of POST queries
+- Storage: one SQLite file (WAL), zlib-compressed JSON values
+- Per-source TTLs (source = configured host suffix, e.g. "ncbi", "uniprot")
+- Size-bounded LRU eviction (response_cache.max_size_mb)
+- Stale-while-revalidate: an expired entry within its stale window is
+  served immediately and refreshed in the background
+- Offline mode (RESPONSE_CACHE_MODE=offline): only recorded responses are
+  served, regardless of age, and misses fail instead of going to the
+  network, so integration tests can replay a recorded cache file
+- Hit/miss ratios per source in /status
+
+Usage:
+    from app.services.response_cache import get_response_cache
+
+    cache = get_response_cache()
+    key = cache.make_key("GET", url, params)
+    result = cache.get_or_fetch(cache.source_for(url), key, lambda: fetch(url, params))
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from app.config import RESPONSE_CACHE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that identify the caller, not the request
+IGNORED_PARAMS = {"api_key", "apikey", "email", "tool"}
+
+# Only refresh access times this often (a hit is otherwise a read-only query)
+TOUCH_INTERVAL = 60.0
+
+
+class OfflineCacheMiss(Exception):
+    """Raised in offline mode when a response was never recorded."""
+    pass
+
+
+class ResponseCache:
+    """
+    SQLite-backed, size-bounded response cache shared by all tools.
+
+    Thread-safe; several worker processes can share the file (WAL mode).
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        config = config or RESPONSE_CACHE_CONFIG
+        self.enabled = config.get("enabled", True)
+        self.mode = config.get("mode", "normal")
+        self.path = Path(config.get("path") or "./data/cache/responses.sqlite3")
+        self.max_bytes = int(config.get("max_size_mb", 512)) * 1024 * 1024
+        self.default_ttl = config.get("default_ttl", 86400)
+        self.stale_ttl = config.get("stale_ttl", 7 * 86400)
+        self.ttls: Dict[str, float] = dict(config.get("ttls") or {})
+        self.sources: Dict[str, str] = dict(config.get("sources") or {})
+        self.compression_level = config.get("compression_level", 6)
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._total_bytes = 0
+        self._revalidating: set = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    @property
+    def offline(self) -> bool:
+        return self.mode == "offline"
+
+    # ==================== Storage ====================
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, source TEXT NOT NULL, url TEXT,"
+                " value BLOB NOT NULL, size INTEGER NOT NULL,"
+                " stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+            conn.commit()
+            self._total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    def _read(self, key: str) -> Optional[tuple]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value, stored_at, accessed_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            if now - row[2] > TOUCH_INTERVAL and not self.offline:
+                self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+        return json.loads(zlib.decompress(row[0])), row[1]
+
+    def _write(self, key: str, source: str, url: Optional[str], value: Any):
+        blob = zlib.compress(json.dumps(value, default=str).encode("utf-8"), self.compression_level)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            old = conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, source, url, value, size, stored_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, source, url, blob, len(blob), now, now)
+            )
+            self._total_bytes += len(blob) - (old[0] if old else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict_locked()
+            conn.commit()
+
+    def _evict_locked(self):
+        """Delete least recently used entries down to 90% of the size budget."""
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        rows = self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._total_bytes -= size
+            evicted += 1
+        self._count("_all", "evictions", evicted)
+
+    # ==================== Keys and sources ====================
+
+    @staticmethod
+    def make_key(method: str, url: str, params: Optional[Dict[str, Any]] = None, body: Any = None) -> str:
+        """Normalized request key: method, URL with sorted parameters (credentials dropped), body."""
+        parts = urlsplit(url)
+        query = parse_qsl(parts.query, keep_blank_values=True)
+        for name, value in (params or {}).items():
+            if isinstance(value, (list, tuple)):
+                query.extend((name, str(v)) for v in value)
+            elif value is not None:
+                query.append((name, str(value)))
+        query = sorted((k, v) for k, v in query if k.lower() not in IGNORED_PARAMS)
+        normalized = urlunsplit((
+            parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/") or "/",
+            urlencode(query), ""
+        ))
+        key = f"{method.upper()} {normalized}"
+        if body is not None:
+            key += " " + json.dumps(body, sort_keys=True, default=str)
+        return key
+
+    def source_for(self, url: str) -> str:
+        """Configured source name of a URL's host (longest matching host suffix), else the host."""
+        host = (urlsplit(url).hostname or "").lower()
+        matches = [suffix for suffix in self.sources if host == suffix or host.endswith("." + suffix)]
+        return self.sources[max(matches, key=len)] if matches else host
+
+    def ttl_for(self, source: str) -> float:
+        return self.ttls.get(source, self.default_ttl)
+
+    # ==================== Read-through ====================
+
+    def _count(self, source: str, name: str, amount: int = 1):
+        if amount:
+            counters = self._stats.setdefault(source, {})
+            counters[name] = counters.get(name, 0) + amount
+
+    def get_or_fetch(
+        self,
+        source: str,
+        key: str,
+        fetch: Callable[[], Any],
+        cacheable: Callable[[Any], bool] = lambda value: True,
+        url: Optional[str] = None
+    ) -> Any:
+        """
+        Cached value of a request, fetching (and storing) it when needed.
+
+        Args:
+            source: Source name (selects the TTL, groups the statistics)
+            key: Request key (see make_key)
+            fetch: Performs the request; returns a JSON-serializable value
+            cacheable: Whether a fetched value may be stored (e.g. only successes)
+            url: Stored for inspection only
+
+        Returns:
+            The cached or fetched value
+
+        Raises:
+            OfflineCacheMiss: In offline mode, when the key was never recorded
+        """
+        if not self.enabled:
+            return fetch()
+
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        try:
+            entry = self._read(digest)
+        except (sqlite3.Error, zlib.error, ValueError) as e:
+            logger.warning(f"⚠️ Response cache read failed: {e}")
+            entry = None
+
+        if self.offline:
+            with self._lock:
+                self._count(source, "hits" if entry else "offline_misses")
+            if entry is None:
+                raise OfflineCacheMiss(f"No recorded response for {source}: {key[:200]}")
+            return entry[0]
+
+        if entry is not None:
+            value, stored_at = entry
+            age = time.time() - stored_at
+            ttl = self.ttl_for(source)
+            if age <= ttl:
+                with self._lock:
+                    self._count(source, "hits")
+                return value
+            if age <= ttl + self.stale_ttl:
+                with self._lock:
+                    self._count(source, "stale_hits")
+                self._revalidate(source, digest, fetch, cacheable, url)
+                return value
+
+        with self._lock:
+            self._count(source, "misses")
+        value = fetch()
+        self._store(source, digest, value, cacheable, url)
+        return value
+
+    def lookup(self, source: str, key: str) -> Optional[Any]:
+        """
+        Fresh cached value of a key, or None (for callers that batch their misses).
+
+        In offline mode any recorded value is returned and a miss raises OfflineCacheMiss.
+        """
+        if not self.enabled:
+            return None
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        try:
+            entry = self._read(digest)
+        except (sqlite3.Error, zlib.error, ValueError) as e:
+            logger.warning(f"⚠️ Response cache read failed: {e}")
+            entry = None
+        fresh = entry is not None and (self.offline or time.time() - entry[1] <= self.ttl_for(source))
+        with self._lock:
+            self._count(source, "hits" if fresh else ("offline_misses" if self.offline else "misses"))
+        if not fresh:
+            if self.offline:
+                raise OfflineCacheMiss(f"No recorded response for {source}: {key[:200]}")
+            return None
+        return entry[0]
+
+    def store(self, source: str, key: str, value: Any, url: Optional[str] = None):
+        """Store a fetched value (see lookup)."""
+        if self.enabled and not self.offline:
+            self._store(source, hashlib.sha256(key.encode("utf-8")).hexdigest(), value, lambda v: True, url)
+
+    def _store(self, source: str, digest: str, value: Any, cacheable: Callable[[Any], bool], url: Optional[str]):
+        if not cacheable(value):
+            return
+        try:
+            self._write(digest, source, url, value)
+            with self._lock:
+                self._count(source, "stores")
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"⚠️ Response cache write failed: {e}")
+
+    def _revalidate(self, source: str, digest: str, fetch: Callable[[], Any], cacheable: Callable[[Any], bool], url: Optional[str]):
+        """Refresh a stale entry in the background (once per key at a time)."""
+        with self._lock:
+            if digest in self._revalidating:
+                return
+            self._revalidating.add(digest)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-revalidate")
+
+        def refresh():
+            try:
+                self._store(source, digest, fetch(), cacheable, url)
+                with self._lock:
+                    self._count(source, "revalidations")
+            except Exception as e:
+                logger.info(f"ℹ️ Revalidation of {source} response failed: {e}")
+            finally:
+                with self._lock:
+                    self._revalidating.discard(digest)
+
+        self._executor.submit(refresh)
+
+    # ==================== Maintenance ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sources = {}
+            for source, counters in self._stats.items():
+                if source == "_all":
+                    continue
+                stats = dict(counters)
+                served = stats.get("hits", 0) + stats.get("stale_hits", 0)
+                total = served + stats.get("misses", 0) + stats.get("offline_misses", 0)
+                stats["hit_ratio"] = round(served / total, 3) if total else 0.0
+                sources[source] = stats
+            return {
+                "enabled": self.enabled,
+                "mode": self.mode,
+                "path": str(self.path),
+                "size_mb": round(self._total_bytes / (1024 * 1024), 2),
+                "max_size_mb": round(self.max_bytes / (1024 * 1024), 2),
+                "evictions": self._stats.get("_all", {}).get("evictions", 0),
+                "sources": sources,
+            }
+
+    def clear(self, source: Optional[str] = None):
+        """Delete all entries (or those of one source)."""
+        with self._lock:
+            conn = self._connect()
+            if source:
+                conn.execute("DELETE FROM responses WHERE source = ?", (source,))
+            else:
+                conn.execute("DELETE FROM responses")
+            conn.commit()
+            self._total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+# Global singleton
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the global response cache instance."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
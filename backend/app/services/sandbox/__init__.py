@@ -30,6 +30,15 @@ from app.services.sandbox.sync import (
     SandboxSyncManager,
     get_sync_manager,
 )
+from app.services.sandbox.hydration import (
+    SandboxHydrator,
+    get_hydrator,
+)
+from app.services.sandbox.kernel_pool import (
+    SandboxKernelPool,
+    get_kernel_pool,
+    shutdown_kernel_pool,
+)
 from app.services.sandbox.agent_adapter import (
     sandbox_save_file,
     sandbox_read_file,
@@ -50,9 +59,14 @@ __all__ = [
     "SandboxManager",
     "SandboxSyncManager",
     "SandboxSecurityError",
+    "SandboxKernelPool",
+    "SandboxHydrator",
     # Singleton getters
     "get_sandbox_manager",
     "get_sync_manager",
+    "get_hydrator",
+    "get_kernel_pool",
+    "shutdown_kernel_pool",
     # Agent adapter functions (main API)
     "sandbox_save_file",
     "sandbox_read_file",
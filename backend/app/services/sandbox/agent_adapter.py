@@ -281,18 +281,18 @@ def sandbox_delete_file(filename: str, category: Optional[str] = None) -> bool:
     user_id, project_id = _require_context()
 
     sandbox = get_sandbox_manager()
-    result = sandbox.delete_file(user_id, project_id, filename, category)
+    relative_path = sandbox.delete_file(user_id, project_id, filename, category)
 
-    # Also delete from GCS
-    if result:
+    # Also delete from GCS (exactly the object that matched, e.g. uploads/ when no category was given)
+    if relative_path:
         sync_manager = get_sync_manager()
         if sync_manager.sync_enabled:
             import asyncio
             asyncio.create_task(
-                sync_manager.delete_from_gcs(user_id, project_id, f"{category or 'generated'}/{filename}")
+                sync_manager.delete_from_gcs(user_id, project_id, relative_path)
             )
 
-    return result
+    return relative_path is not None
 
 
 def sandbox_file_exists(filename: str, category: Optional[str] = None) -> bool:
@@ -0,0 +1,462 @@
+"""
+LABOS Sandbox Hydration
+
+Lazy, on-demand hydration of project sandboxes from GCS. A fresh instance
+(Cloud Run cold start) does not download whole projects up front:
+
+- list_files is served from the remote manifest (one GCS listing, cached)
+- read_file / read_file_by_path / open() inside sandbox code fetch a single
+  blob the first time it is accessed; concurrent requests for the same file
+  share one download
+- Hydrated files live in a local disk cache with an LRU byte budget; cold
+  files are evicted (only if unmodified, so local changes are never lost)
+  and fetched again when needed
+- Prefetch hints: file names referenced by python_interpreter code
+  (pd.read_csv('uploads/data.csv'), np.load(...), open(...)) are fetched
+  before the code runs and remembered per project, so the next cold start
+  prefetches the recently used files in the background
+
+Kernel processes have no GCS access: they ask the parent to hydrate a path
+over the kernel pipe (see kernel_pool._run_on_kernel).
+
+Usage:
+    from app.services.sandbox import get_hydrator
+
+    hydrator = get_hydrator()
+    path = hydrator.hydrate(user_id, project_id, "uploads/data.csv")
+    hydrator.prefetch_for_code(user_id, project_id, code)
+"""
+
+import ast
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import wait
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import SANDBOX_CONFIG
+from app.services.sandbox.sync import SandboxSyncManager, get_sync_manager
+
+logger = logging.getLogger(__name__)
+
+# Recently used files of a project (synced to GCS next to the project files)
+PREFETCH_HINTS_FILE = ".prefetch_hints.json"
+
+# String literals that look like file references in sandbox code
+_FILE_LITERAL = re.compile(r"""['"]([^'"\n]{1,255}\.[A-Za-z0-9]{1,8})['"]""")
+
+
+def extract_file_references(code: str) -> List[str]:
+    """
+    File paths referenced by string literals in Python code.
+
+    Catches pd.read_csv('uploads/data.csv'), open("results.json"),
+    np.load(path='x.npy') and plain assignments like FILE = 'data.xlsx'.
+    Falls back to a regex when the code does not parse.
+
+    Returns:
+        Normalized relative paths (or bare file names), in order of appearance
+    """
+    literals: List[str] = []
+    try:
+        for node in ast.walk(ast.parse(code)):
+            if isinstance(node, ast.Constant) and isinstance(node.value, str):
+                literals.append(node.value)
+    except (SyntaxError, ValueError):
+        literals = _FILE_LITERAL.findall(code)
+
+    references = []
+    seen = set()
+    for literal in literals:
+        literal = literal.strip()
+        if not literal or "\n" in literal or len(literal) > 255 or "." not in PurePosixPath(literal).name:
+            continue
+        path = PurePosixPath(literal)
+        if path.is_absolute() or ".." in path.parts:
+            continue
+        normalized = path.as_posix()  # PurePosixPath drops a leading "./"
+        if normalized not in seen:
+            seen.add(normalized)
+            references.append(normalized)
+    return references
+
+
+class SandboxHydrator:
+    """
+    Fetches project files from GCS on first access and bounds the local copy.
+
+    Thread-safe: called from tool threads, the kernel pool and API handlers.
+    """
+
+    def __init__(self, sync_manager: Optional[SandboxSyncManager] = None):
+        self.sync = sync_manager or get_sync_manager()
+        self.sandbox_root = self.sync.sandbox_root
+        self.enabled = self.sync.sync_enabled and SANDBOX_CONFIG.get("hydration_enabled", True)
+
+        self.cache_budget_bytes = SANDBOX_CONFIG.get("hydration_cache_mb", 2048) * 1024 * 1024
+        self.manifest_ttl = SANDBOX_CONFIG.get("hydration_manifest_ttl", 60)
+        self.max_hints = SANDBOX_CONFIG.get("prefetch_hints_max", 20)
+
+        self._lock = threading.Lock()
+        # (user_id, project_id) -> (fetched_at, manifest)
+        self._manifests: Dict[Tuple[str, str], Tuple[float, Dict[str, Dict[str, Any]]]] = {}
+        # local path -> Event of the download in progress
+        self._inflight: Dict[str, threading.Event] = {}
+        # LRU of hydrated files: local path -> (size, mtime_ns)
+        self._cache: "OrderedDict[str, Tuple[int, int]]" = OrderedDict()
+        self._cache_bytes = 0
+        self._warmed: set = set()
+
+        self._stats = {
+            "hits": 0,
+            "fetches": 0,
+            "fetch_failures": 0,
+            "bytes_fetched": 0,
+            "prefetched": 0,
+            "evictions": 0,
+            "bytes_evicted": 0,
+        }
+
+    # ==================== Manifest ====================
+
+    def get_manifest(self, user_id: str, project_id: str, refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Remote manifest of a project (relative path -> size/hashes), cached for manifest_ttl."""
+        if not self.enabled:
+            return {}
+
+        key = (user_id, project_id)
+        with self._lock:
+            cached = self._manifests.get(key)
+        if cached and not refresh and time.monotonic() - cached[0] < self.manifest_ttl:
+            return cached[1]
+
+        try:
+            manifest = self.sync.list_remote_manifest(user_id, project_id)
+        except Exception as e:
+            logger.warning(f"Could not list GCS manifest for {user_id}/{project_id}: {e}")
+            return cached[1] if cached else {}
+
+        with self._lock:
+            self._manifests[key] = (time.monotonic(), manifest)
+        return manifest
+
+    def _manifest_snapshot(self, user_id: str, project_id: str) -> Dict[str, Dict[str, Any]]:
+        """Copy of the manifest for iteration (forget() pops from the cached dict concurrently)."""
+        manifest = self.get_manifest(user_id, project_id)
+        with self._lock:
+            return dict(manifest)
+
+    def forget(self, user_id: str, project_id: str, relative_path: str):
+        """Drop a deleted file from the cached manifest."""
+        with self._lock:
+            cached = self._manifests.get((user_id, project_id))
+            if cached:
+                cached[1].pop(relative_path, None)
+
+    def remote_files(self, user_id: str, project_id: str, categories: List[str]) -> List[Dict[str, Any]]:
+        """
+        Manifest entries in the given top-level directories that are not on local disk.
+
+        Returns:
+            File info dicts in the SandboxManager.list_files format
+        """
+        project_dir = self.sandbox_root / user_id / project_id
+        files = []
+        for relative, entry in self._manifest_snapshot(user_id, project_id).items():
+            parts = relative.split("/")
+            if len(parts) != 2 or parts[0] not in categories or parts[1].startswith("."):
+                continue
+            if (project_dir / relative).exists():
+                continue
+            files.append({
+                "filename": parts[1],
+                "category": parts[0],
+                "relative_path": relative,
+                "size": entry.get("size") or 0,
+                "modified_at": entry.get("updated") or "",
+                "hydrated": False,
+            })
+        return files
+
+    def find_remote(self, user_id: str, project_id: str, directory: str, filename: str) -> Optional[str]:
+        """
+        Relative path of a remote file matching a name in one directory.
+
+        Same matching as SandboxManager.read_file: exact name first, then a
+        name sharing the stem (files saved with a unique suffix).
+        """
+        manifest = self._manifest_snapshot(user_id, project_id)
+        prefix = f"{directory}/" if directory else ""
+        exact = f"{prefix}{filename}"
+        if exact in manifest:
+            return exact
+
+        stem = filename.rsplit(".", 1)[0]
+        for relative in manifest:
+            if not relative.startswith(prefix):
+                continue
+            name = relative[len(prefix):]
+            if "/" not in name and name.startswith(stem):
+                return relative
+        return None
+
+    # ==================== Hydration ====================
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _project_of(self, project_dir: Path) -> Optional[Tuple[str, str]]:
+        try:
+            parts = Path(project_dir).resolve().relative_to(self.sandbox_root).parts
+        except ValueError:
+            return None
+        return (parts[0], parts[1]) if len(parts) == 2 else None
+
+    def hydrate(self, user_id: str, project_id: str, relative_path: str) -> Optional[Path]:
+        """
+        Make sure a project file exists locally, fetching it from GCS if needed.
+
+        Returns:
+            Local path, or None if the file exists neither locally nor remotely
+        """
+        project_dir = (self.sandbox_root / user_id / project_id).resolve()
+        local_path = (project_dir / relative_path).resolve()
+        try:
+            relative = local_path.relative_to(project_dir).as_posix()
+        except ValueError:
+            return None
+
+        if local_path.exists():
+            self._touch(str(local_path))
+            return local_path
+        if not self.enabled:
+            return None
+
+        entry = self.get_manifest(user_id, project_id).get(relative)
+        if entry is None:
+            return None
+
+        key = str(local_path)
+        with self._lock:
+            event = self._inflight.get(key)
+            owner = event is None
+            if owner:
+                event = threading.Event()
+                self._inflight[key] = event
+
+        if not owner:
+            # Another thread is fetching the same file
+            event.wait(timeout=300)
+            return local_path if local_path.exists() else None
+
+        try:
+            ok = self.sync.download_blocking(f"{user_id}/{project_id}/{relative}", key, entry)
+            if not ok:
+                self._count("fetch_failures")
+                return None
+            self.sync.record_download(project_dir, relative, entry)
+            self._count("fetches")
+            self._count("bytes_fetched", entry.get("size") or 0)
+            self._register(key)
+            return local_path
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def hydrate_sandbox_path(self, sandbox_root: str, relative_path: str) -> bool:
+        """Hydrate a path given the sandbox root (used for kernel fetch requests)."""
+        project = self._project_of(Path(sandbox_root))
+        if project is None:
+            return False
+        return self.hydrate(project[0], project[1], relative_path) is not None
+
+    # ==================== Disk Cache ====================
+
+    def _touch(self, key: str):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self._stats["hits"] += 1
+
+    def _register(self, key: str):
+        try:
+            st = Path(key).stat()
+        except OSError:
+            return
+        with self._lock:
+            previous = self._cache.pop(key, None)
+            if previous:
+                self._cache_bytes -= previous[0]
+            self._cache[key] = (st.st_size, st.st_mtime_ns)
+            self._cache_bytes += st.st_size
+        self._enforce_budget(keep=key)
+
+    def _enforce_budget(self, keep: Optional[str] = None):
+        """Evict least recently used hydrated files until the cache fits the budget."""
+        while True:
+            with self._lock:
+                if self._cache_bytes <= self.cache_budget_bytes:
+                    return
+                key = next((k for k in self._cache if k != keep and k not in self._inflight), None)
+                if key is None:
+                    return
+                size, mtime_ns = self._cache.pop(key)
+                self._cache_bytes -= size
+
+            path = Path(key)
+            try:
+                # Modified locally since it was fetched: not a cache copy any more
+                if path.stat().st_mtime_ns != mtime_ns:
+                    continue
+                path.unlink()
+            except OSError:
+                continue
+            self._count("evictions")
+            self._count("bytes_evicted", size)
+            logger.debug(f"Evicted hydrated file: {key}")
+
+    # ==================== Prefetch ====================
+
+    def resolve_references(self, user_id: str, project_id: str, references: List[str]) -> List[str]:
+        """Map file references from code to remote relative paths."""
+        manifest = self._manifest_snapshot(user_id, project_id)
+        if not manifest:
+            return []
+
+        by_name: Dict[str, List[str]] = {}
+        for relative in manifest:
+            by_name.setdefault(PurePosixPath(relative).name, []).append(relative)
+
+        resolved = []
+        for reference in references:
+            if reference in manifest:
+                candidates = [reference]
+            else:
+                # Bare names are redirected/looked up in the category folders
+                candidates = by_name.get(PurePosixPath(reference).name, [])
+            for relative in candidates:
+                if relative not in resolved:
+                    resolved.append(relative)
+        return resolved
+
+    def prefetch(self, user_id: str, project_id: str, relative_paths: List[str], wait_for: bool = True) -> List[str]:
+        """
+        Fetch missing files in parallel on the sync transfer pool.
+
+        Returns:
+            Relative paths that were missing locally and scheduled (or fetched)
+        """
+        project_dir = self.sandbox_root / user_id / project_id
+        missing = [p for p in relative_paths if not (project_dir / p).exists()]
+        if not missing:
+            return []
+
+        executor = self.sync.get_executor()
+        futures = [executor.submit(self.hydrate, user_id, project_id, p) for p in missing]
+        self._count("prefetched", len(missing))
+        if wait_for:
+            wait(futures, timeout=300)
+        return missing
+
+    def prefetch_for_code(self, user_id: str, project_id: str, code: str) -> List[str]:
+        """
+        Fetch the files referenced by sandbox code before it runs, and remember them as hints.
+
+        Returns:
+            Relative paths that had to be fetched
+        """
+        if not self.enabled:
+            return []
+        references = extract_file_references(code)
+        if not references:
+            return []
+
+        relative_paths = self.resolve_references(user_id, project_id, references)
+        if not relative_paths:
+            return []
+
+        self._record_hints(user_id, project_id, relative_paths)
+        fetched = self.prefetch(user_id, project_id, relative_paths, wait_for=True)
+        if fetched:
+            logger.info(f"Prefetched {len(fetched)} files for code in {project_id}: {fetched}")
+        return fetched
+
+    def _record_hints(self, user_id: str, project_id: str, relative_paths: List[str]):
+        """Keep the most recently used files of a project (newest first), synced to GCS."""
+        project_dir = self.sandbox_root / user_id / project_id
+        hints_path = project_dir / PREFETCH_HINTS_FILE
+
+        with self._lock:
+            try:
+                hints = json.loads(hints_path.read_text()).get("recent", [])
+            except (OSError, ValueError):
+                hints = []
+            updated = list(dict.fromkeys(relative_paths + hints))[:self.max_hints]
+            if updated == hints:
+                return
+            try:
+                project_dir.mkdir(parents=True, exist_ok=True)
+                hints_path.write_text(json.dumps({"recent": updated}))
+            except OSError:
+                return
+
+        self.sync.upload_in_background(str(hints_path), f"{user_id}/{project_id}/{PREFETCH_HINTS_FILE}")
+
+    def warm_project(self, user_id: str, project_id: str):
+        """
+        First use of a project on this instance: prefetch its recent files in the background.
+
+        Non-blocking; later calls for the same project are no-ops.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if (user_id, project_id) in self._warmed:
+                return
+            self._warmed.add((user_id, project_id))
+
+        def warm():
+            hints_path = self.hydrate(user_id, project_id, PREFETCH_HINTS_FILE)
+            if hints_path is None:
+                return
+            try:
+                hints = json.loads(hints_path.read_text()).get("recent", [])
+            except (OSError, ValueError):
+                return
+            manifest = self.get_manifest(user_id, project_id)
+            scheduled = self.prefetch(user_id, project_id, [h for h in hints if h in manifest], wait_for=False)
+            if scheduled:
+                logger.info(f"Warming {project_id}: prefetching {len(scheduled)} recently used files")
+
+        self.sync.get_executor().submit(warm)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["enabled"] = self.enabled
+            stats["cached_files"] = len(self._cache)
+            stats["cached_bytes"] = self._cache_bytes
+            stats["cache_budget_bytes"] = self.cache_budget_bytes
+            stats["manifests"] = len(self._manifests)
+        return stats
+
+
+# Global singleton
+_hydrator: Optional[SandboxHydrator] = None
+_hydrator_lock = threading.Lock()
+
+
+def get_hydrator() -> SandboxHydrator:
+    """Get the global sandbox hydrator instance."""
+    global _hydrator
+    if _hydrator is None:
+        with _hydrator_lock:
+            if _hydrator is None:
+                _hydrator = SandboxHydrator()
+    return _hydrator
@@ -0,0 +1,832 @@
+"""
+LABOS Sandbox Kernel Pool
+
+Runs python_interpreter code in pre-forked worker processes instead of the
+API process:
+
+- Workers are forked from a fork server that has numpy/pandas/matplotlib
+  already imported, so spawning a fresh kernel is cheap
+- Hard limits per execution: wall-clock timeout (enforced by the parent)
+  and memory (RSS watchdog in the parent + RLIMIT_AS in the worker)
+- A kernel that violates a limit or crashes is killed and replaced
+- Reuse policy: an idle kernel is reused only for the sandbox it last
+  served; serving another sandbox, exceeding max_tasks or growing past
+  recycle_rss_mb recycles it into a fresh process
+- Stateful sessions: one resident kernel per (user, project) keeps its
+  namespace between calls; LRU cap, idle eviction and a total RSS budget
+  bound the resident kernels; inspect/reset/snapshot/restore commands
+- Lazy hydration: files opened by sandbox code but not on local disk are
+  fetched by the parent on the kernel's request
+- get_stats() reports pool size, spawn latency, kills, recycles and sessions
+
+Usage:
+    from app.services.sandbox import get_kernel_pool
+
+    result = get_kernel_pool().execute(code, sandbox_root, timeout=60)
+    result = get_kernel_pool().execute_in_session("user:project", code, sandbox_root)
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+import multiprocessing
+from pathlib import Path
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List
+
+from app.config import SANDBOX_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Interval for the parent-side watchdog (RSS + liveness) while a task runs
+_WATCHDOG_INTERVAL = 0.1
+
+# Max time for a new kernel to report ready (first spawn also starts the fork server)
+_SPAWN_TIMEOUT = 60
+
+
+def _kernel_main(conn, memory_limit_bytes: int):
+    """
+    Worker process entry point.
+
+    Protocol: sends "ready" once preloaded, then receives request dicts
+    ({"op": "exec"|"inspect"|"reset"|"snapshot"|"restore", "sandbox_root", ...})
+    and replies with a result dict plus the worker's peak RSS. While code
+    runs, the worker may send {"op": "fetch", "path"} and wait for a bool
+    (lazy hydration of a file). None or EOF ends the loop.
+    """
+    try:
+        import resource
+        if memory_limit_bytes > 0:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+    except (ImportError, ValueError, OSError) as e:
+        print(f"⚠️ Kernel {os.getpid()}: could not set memory rlimit: {e}")
+
+    from app.services.sandbox import kernel_runtime
+    kernel_runtime.preload()
+
+    # Files missing on disk are hydrated by the parent (kernels have no GCS access)
+    def fetch_from_parent(sandbox_root: str, relative_path: str) -> bool:
+        conn.send({"op": "fetch", "sandbox_root": sandbox_root, "path": relative_path})
+        return bool(conn.recv())
+    kernel_runtime.set_fetch_hook(fetch_from_parent)
+
+    conn.send("ready")
+
+    # Globals kept between calls when the kernel backs a stateful session
+    session_namespace = None
+
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            break
+        if request is None:
+            break
+
+        sandbox_root = Path(request["sandbox_root"])
+        op = request.get("op", "exec")
+        try:
+            if op == "exec":
+                if request.get("stateful") and session_namespace is None:
+                    session_namespace = {}
+                result = kernel_runtime.run_code(
+                    request["code"], sandbox_root,
+                    namespace=session_namespace if request.get("stateful") else None
+                )
+                kernel_runtime.reset_process_state()
+            elif op == "inspect":
+                result = kernel_runtime.describe_namespace(session_namespace or {}, sandbox_root)
+            elif op == "reset":
+                session_namespace = None
+                kernel_runtime.reset_process_state()
+                result = {"success": True}
+            elif op == "snapshot":
+                result = kernel_runtime.snapshot_namespace(session_namespace or {}, sandbox_root, request["name"])
+            elif op == "restore":
+                if session_namespace is None:
+                    session_namespace = {}
+                result = kernel_runtime.restore_namespace(session_namespace, sandbox_root, request["name"])
+            else:
+                result = {"success": False, "error": f"Unknown kernel op: {op}"}
+        except Exception as e:
+            result = {"success": False, "error": f"{type(e).__name__}: {e}"}
+        result["peak_rss_mb"] = _peak_rss_mb()
+
+        try:
+            conn.send(result)
+        except (EOFError, OSError):
+            break
+
+
+def _peak_rss_mb() -> float:
+    try:
+        import resource
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+    except ImportError:
+        return 0.0
+
+
+def _get_mp_context():
+    """Fork server with the scientific stack preloaded (falls back to spawn)."""
+    method = SANDBOX_CONFIG.get("kernel_start_method", "forkserver")
+    if method not in multiprocessing.get_all_start_methods():
+        method = "spawn"
+
+    ctx = multiprocessing.get_context(method)
+    if method == "forkserver":
+        ctx.set_forkserver_preload(["app.services.sandbox.kernel_runtime", "numpy", "pandas", "matplotlib.pyplot"])
+    return ctx
+
+
+class SandboxKernel:
+    """One worker process and its pipe."""
+
+    def __init__(self, ctx, memory_limit_bytes: int):
+        started = time.perf_counter()
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_kernel_main,
+            args=(child_conn, memory_limit_bytes),
+            name="sandbox-kernel",
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+        # Spawn latency = fork + preload until the kernel reports ready
+        try:
+            ready = self.conn.poll(_SPAWN_TIMEOUT) and self.conn.recv() == "ready"
+        except (EOFError, OSError):
+            ready = False
+        if not ready:
+            self.kill()
+            raise RuntimeError("Sandbox kernel did not become ready")
+        self.spawn_seconds = time.perf_counter() - started
+
+        self.sandbox_key: Optional[str] = None  # Sandbox this kernel has executed code for
+        self.tasks_done = 0
+        self.peak_rss_mb = 0.0
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def rss_bytes(self) -> int:
+        try:
+            import psutil
+            return psutil.Process(self.pid).memory_info().rss
+        except Exception:
+            return 0
+
+    def kill(self):
+        try:
+            self.process.kill()
+            self.process.join(timeout=2)
+        except Exception:
+            pass
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """Ask the kernel to exit, kill it if it does not"""
+        try:
+            self.conn.send(None)
+            self.process.join(timeout=1)
+        except Exception:
+            pass
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+
+class KernelSession:
+    """A resident kernel that keeps its namespace for one user/project."""
+
+    def __init__(self, key: str, sandbox_root: str):
+        self.key = key
+        self.sandbox_root = sandbox_root
+        self.kernel: Optional[SandboxKernel] = None
+        self.lock = threading.Lock()  # One call at a time per namespace
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.calls = 0
+        self.restarts = 0
+        self.rss_mb = 0.0
+        self.closed = False  # Set once evicted; callers holding a stale reference retry
+
+
+class SandboxKernelPool:
+    """
+    Bounded pool of sandbox kernel processes.
+
+    Thread-safe: each execute() call checks out a kernel exclusively, so
+    concurrent workflows never share a process (and never share a cwd).
+    """
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        timeout: Optional[int] = None,
+        memory_limit_mb: Optional[int] = None,
+        max_tasks: Optional[int] = None,
+        recycle_rss_mb: Optional[int] = None
+    ):
+        self.size = size or SANDBOX_CONFIG.get("kernel_pool_size", 4)
+        self.default_timeout = timeout or SANDBOX_CONFIG.get("kernel_timeout", 60)
+        self.memory_limit_mb = memory_limit_mb or SANDBOX_CONFIG.get("kernel_memory_limit_mb", 2048)
+        self.max_tasks = max_tasks or SANDBOX_CONFIG.get("kernel_max_tasks", 50)
+        self.recycle_rss_mb = recycle_rss_mb or SANDBOX_CONFIG.get("kernel_recycle_rss_mb", 1024)
+        # Address-space cap in the worker; RSS itself is watched by the parent
+        self.address_space_limit_mb = SANDBOX_CONFIG.get("kernel_address_space_limit_mb", self.memory_limit_mb * 4)
+
+        # Stateful sessions (separate from the stateless pool)
+        self.max_sessions = SANDBOX_CONFIG.get("kernel_max_sessions", 8)
+        self.session_idle_timeout = SANDBOX_CONFIG.get("kernel_session_idle_timeout", 1800)
+        self.sessions_memory_budget_mb = SANDBOX_CONFIG.get("kernel_sessions_memory_budget_mb", 8192)
+        self._sessions: "OrderedDict[str, KernelSession]" = OrderedDict()
+        self._reaper: Optional[threading.Thread] = None
+
+        self._ctx = None
+        self._idle: List[SandboxKernel] = []
+        self._busy = 0
+        self._spawning = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        # Metrics
+        self.kernels_spawned = 0
+        self.spawn_seconds_total = 0.0
+        self.spawn_seconds_max = 0.0
+        self.spawn_seconds_last = 0.0
+        self.tasks_executed = 0
+        self.timeouts = 0
+        self.memory_kills = 0
+        self.crashes = 0
+        self.recycled = 0
+        self.acquire_wait_seconds_total = 0.0
+        self.sessions_evicted: Dict[str, int] = {}
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def _spawn(self) -> SandboxKernel:
+        if self._ctx is None:
+            self._ctx = _get_mp_context()
+
+        kernel = SandboxKernel(self._ctx, self.address_space_limit_mb * 1024 * 1024)
+        with self._cond:
+            self.kernels_spawned += 1
+            self.spawn_seconds_last = kernel.spawn_seconds
+            self.spawn_seconds_total += kernel.spawn_seconds
+            self.spawn_seconds_max = max(self.spawn_seconds_max, kernel.spawn_seconds)
+        logger.info(f"[KernelPool] Spawned kernel pid={kernel.pid} in {kernel.spawn_seconds * 1000:.0f}ms")
+        return kernel
+
+    def warm_up(self):
+        """Pre-fork the pool up to its configured size"""
+        while True:
+            with self._cond:
+                if self._closed or len(self._idle) + self._busy + self._spawning >= self.size:
+                    break
+                self._spawning += 1
+            kernel = self._spawn_or_none()
+            self._add_idle(kernel)
+            if kernel is None:
+                break
+        print(f"🧪 Sandbox kernel pool ready: {len(self._idle)} kernels")
+
+    def _spawn_or_none(self) -> Optional[SandboxKernel]:
+        try:
+            return self._spawn()
+        except Exception as e:
+            logger.error(f"[KernelPool] Failed to spawn kernel: {e}")
+            return None
+
+    def _add_idle(self, kernel: Optional[SandboxKernel]):
+        """Put a freshly spawned kernel into the idle list (releases its spawn slot)"""
+        with self._cond:
+            self._spawning -= 1
+            if kernel is not None and not self._closed:
+                self._idle.append(kernel)
+                kernel = None
+            self._cond.notify_all()
+        if kernel is not None:
+            kernel.close()
+
+    def _replenish_async(self):
+        """Respawn a replacement kernel in the background after a kill"""
+        with self._cond:
+            if self._closed or len(self._idle) + self._busy + self._spawning >= self.size:
+                return
+            self._spawning += 1
+        threading.Thread(
+            target=lambda: self._add_idle(self._spawn_or_none()),
+            name="sandbox-kernel-respawn",
+            daemon=True
+        ).start()
+
+    def shutdown(self):
+        """Stop all idle kernels and sessions; busy kernels are stopped when released"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+            self._cond.notify_all()
+        for kernel in idle:
+            kernel.close()
+        for session in sessions:
+            self._close_session(session, "shutdown")
+
+    # ------------------------------------------------------------------
+    # Checkout
+    # ------------------------------------------------------------------
+
+    def _acquire(self, sandbox_key: str, timeout: float) -> SandboxKernel:
+        """
+        Check out a kernel for a sandbox.
+
+        Preference: idle kernel of the same sandbox > never-used idle kernel >
+        new kernel (pool not full) > recycle another sandbox's idle kernel.
+        """
+        started = time.monotonic()
+        deadline = started + timeout
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Sandbox kernel pool is shut down")
+
+                kernel = next((k for k in self._idle if k.sandbox_key == sandbox_key), None)
+                if kernel is None:
+                    kernel = next((k for k in self._idle if k.sandbox_key is None), None)
+                if kernel is not None:
+                    self._idle.remove(kernel)
+                    self._busy += 1
+                    recycle = False
+                    break
+
+                if len(self._idle) + self._busy + self._spawning < self.size:
+                    kernel = None
+                    self._spawning += 1
+                    recycle = False
+                    break
+
+                if self._idle:
+                    # Kernels are never shared across sandboxes: replace the oldest idle one
+                    kernel = self._idle.pop(0)
+                    self._spawning += 1
+                    recycle = True
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No sandbox kernel available within {timeout:.0f}s (pool size {self.size})")
+                self._cond.wait(remaining)
+
+            self.acquire_wait_seconds_total += time.monotonic() - started
+
+        if recycle:
+            kernel.close()
+            with self._cond:
+                self.recycled += 1
+
+        if kernel is None or recycle:
+            try:
+                kernel = self._spawn()
+            except Exception:
+                with self._cond:
+                    self._spawning -= 1
+                    self._cond.notify_all()
+                raise
+            with self._cond:
+                self._spawning -= 1
+                self._busy += 1
+
+        return kernel
+
+    def _release(self, kernel: SandboxKernel, reusable: bool):
+        recycle = not reusable or not kernel.is_alive()
+        if not recycle and kernel.tasks_done >= self.max_tasks:
+            recycle = True
+        if not recycle and kernel.peak_rss_mb >= self.recycle_rss_mb:
+            recycle = True
+
+        with self._cond:
+            self._busy -= 1
+            if not recycle and not self._closed:
+                self._idle.append(kernel)
+                kernel = None
+            elif reusable:
+                self.recycled += 1
+            self._cond.notify_all()
+
+        if kernel is not None:
+            kernel.close() if kernel.is_alive() else kernel.kill()
+            self._replenish_async()
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def _run_on_kernel(self, kernel: SandboxKernel, request: Dict[str, Any], timeout: float):
+        """
+        Send one request to a kernel and wait for the reply under the limits.
+
+        Returns:
+            (result, violation) - violation is None, "timeout", "memory" or "crash";
+            on violation the kernel has already been killed
+        """
+        memory_limit_bytes = self.memory_limit_mb * 1024 * 1024
+        violation = None
+        result = None
+        try:
+            kernel.conn.send(request)
+            deadline = time.monotonic() + timeout
+
+            while True:
+                if kernel.conn.poll(_WATCHDOG_INTERVAL):
+                    message = kernel.conn.recv()
+                    if isinstance(message, dict) and message.get("op") == "fetch":
+                        # Time spent downloading does not count against the code's limit
+                        deadline += self._serve_fetch(kernel, request["sandbox_root"], message["path"])
+                        continue
+                    result = message
+                    break
+                if not kernel.is_alive():
+                    violation = "crash"
+                    break
+                if memory_limit_bytes and kernel.rss_bytes() > memory_limit_bytes:
+                    violation = "memory"
+                    break
+                if time.monotonic() >= deadline:
+                    violation = "timeout"
+                    break
+        except (EOFError, OSError) as e:
+            logger.warning(f"[KernelPool] Lost kernel pid={kernel.pid}: {e}")
+            violation = "crash"
+
+        if violation is not None:
+            kernel.kill()
+            with self._cond:
+                if violation == "timeout":
+                    self.timeouts += 1
+                elif violation == "memory":
+                    self.memory_kills += 1
+                else:
+                    self.crashes += 1
+            logger.warning(f"[KernelPool] Killed kernel pid={kernel.pid} ({violation})")
+            return None, violation
+
+        kernel.tasks_done += 1
+        kernel.peak_rss_mb = result.pop("peak_rss_mb", kernel.peak_rss_mb)
+        with self._cond:
+            self.tasks_executed += 1
+            # A MemoryError (address-space cap) also counts as a memory violation
+            if (result.get("error") or "").startswith("MemoryError"):
+                self.memory_kills += 1
+        return result, None
+
+    def _serve_fetch(self, kernel: SandboxKernel, sandbox_root: str, relative_path: str) -> float:
+        """
+        Hydrate a file a kernel tried to open and reply to it.
+
+        The sandbox root comes from the request we sent, not from the kernel.
+
+        Returns:
+            Seconds spent fetching
+        """
+        started = time.monotonic()
+        try:
+            from app.services.sandbox.hydration import get_hydrator
+            ok = get_hydrator().hydrate_sandbox_path(sandbox_root, relative_path)
+        except Exception as e:
+            logger.warning(f"[KernelPool] Hydration of {relative_path} failed: {e}")
+            ok = False
+        kernel.conn.send(ok)
+        return time.monotonic() - started
+
+    def execute(self, code: str, sandbox_root: Path, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Execute code in a kernel bound to sandbox_root, enforcing limits.
+
+        Args:
+            code: Python code to execute
+            sandbox_root: Project sandbox directory (kernel cwd)
+            timeout: Wall-clock limit in seconds (default: kernel_timeout)
+
+        Returns:
+            Dict with stdout, stderr, error, and success status
+        """
+        timeout = timeout or self.default_timeout
+        sandbox_key = str(Path(sandbox_root).resolve())
+
+        kernel = self._acquire(sandbox_key, timeout)
+        kernel.sandbox_key = sandbox_key
+
+        result, violation = self._run_on_kernel(
+            kernel, {"op": "exec", "code": code, "sandbox_root": sandbox_key}, timeout
+        )
+        if violation is not None:
+            self._release(kernel, reusable=False)
+            return self._error_result(self._violation_message(violation, timeout))
+
+        # A MemoryError leaves the heap fragmented: recycle the kernel
+        reusable = not (result.get("error") or "").startswith("MemoryError")
+        self._release(kernel, reusable=reusable)
+        return result
+
+    @staticmethod
+    def _error_result(error: str) -> Dict[str, Any]:
+        return {'success': False, 'stdout': '', 'stderr': '', 'error': error}
+
+    # ------------------------------------------------------------------
+    # Stateful sessions (one resident kernel per user/project)
+    # ------------------------------------------------------------------
+
+    def _ensure_reaper(self):
+        """Start the idle-session reaper thread on first use"""
+        if self._reaper is not None:
+            return
+        interval = max(5.0, min(60.0, self.session_idle_timeout / 4))
+
+        def reap():
+            while not self._closed:
+                time.sleep(interval)
+                self.evict_idle_sessions()
+
+        self._reaper = threading.Thread(target=reap, name="sandbox-kernel-reaper", daemon=True)
+        self._reaper.start()
+
+    def _get_session(self, session_key: str, sandbox_root: str) -> Optional[KernelSession]:
+        """
+        Get (or create) the session kernel for a user/project.
+
+        Returns None when the session cap is reached and every session is busy.
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Sandbox kernel pool is shut down")
+
+            session = self._sessions.get(session_key)
+            if session is not None:
+                self._sessions.move_to_end(session_key)
+                return session
+
+            # LRU cap on resident session kernels
+            victim = None
+            if len(self._sessions) >= self.max_sessions:
+                victim = next((s for s in self._sessions.values() if not s.lock.locked()), None)
+                if victim is None:
+                    return None
+                del self._sessions[victim.key]
+                victim.closed = True
+
+            session = KernelSession(session_key, sandbox_root)
+            self._sessions[session_key] = session
+            self._ensure_reaper()
+
+        if victim is not None:
+            self._close_session(victim, "lru")
+        return session
+
+    def _close_session(self, session: KernelSession, reason: str):
+        """Stop a session's kernel (its namespace is lost)"""
+        session.closed = True
+        with self._cond:
+            self.sessions_evicted[reason] = self.sessions_evicted.get(reason, 0) + 1
+        if session.kernel is not None:
+            session.kernel.close() if session.kernel.is_alive() else session.kernel.kill()
+            session.kernel = None
+        logger.info(f"[KernelPool] Evicted session {session.key} ({reason})")
+
+    def evict_session(self, session_key: str, reason: str = "manual") -> bool:
+        """Drop a session and stop its kernel"""
+        with self._cond:
+            session = self._sessions.pop(session_key, None)
+        if session is None:
+            return False
+        with session.lock:
+            self._close_session(session, reason)
+        return True
+
+    def evict_idle_sessions(self):
+        """Evict sessions idle for longer than kernel_session_idle_timeout"""
+        now = time.monotonic()
+        with self._cond:
+            idle = [
+                s for s in self._sessions.values()
+                if not s.lock.locked() and now - s.last_used > self.session_idle_timeout
+            ]
+            for session in idle:
+                del self._sessions[session.key]
+                session.closed = True
+        for session in idle:
+            self._close_session(session, "idle")
+
+    def _enforce_memory_budget(self, keep_key: str):
+        """Evict least-recently-used idle sessions while total RSS exceeds the budget"""
+        budget_mb = self.sessions_memory_budget_mb
+        if not budget_mb:
+            return
+
+        while True:
+            with self._cond:
+                total_mb = sum(s.rss_mb for s in self._sessions.values())
+                if total_mb <= budget_mb:
+                    return
+                victim = next(
+                    (s for s in self._sessions.values() if s.key != keep_key and not s.lock.locked()),
+                    None
+                )
+                if victim is None:
+                    return
+                del self._sessions[victim.key]
+                victim.closed = True
+            self._close_session(victim, "memory_budget")
+
+    def _session_call(self, session_key: str, sandbox_root: Path, request: Dict[str, Any], timeout: float) -> Optional[Dict[str, Any]]:
+        """Run a request on a session kernel (spawning it if needed); None if no session slot"""
+        sandbox_key = str(Path(sandbox_root).resolve())
+
+        while True:
+            session = self._get_session(session_key, sandbox_key)
+            if session is None:
+                return None
+            session.lock.acquire()
+            if not session.closed:
+                break
+            # Evicted between lookup and lock: get a fresh session
+            session.lock.release()
+
+        try:
+            if session.kernel is None or not session.kernel.is_alive():
+                if session.kernel is not None:
+                    # Kernel died between calls: namespace is gone
+                    session.kernel.kill()
+                    session.restarts += 1
+                session.kernel = self._spawn()
+                session.kernel.sandbox_key = sandbox_key
+
+            request = {**request, "sandbox_root": sandbox_key, "stateful": True}
+            result, violation = self._run_on_kernel(session.kernel, request, timeout)
+            session.last_used = time.monotonic()
+
+            if violation is not None:
+                session.kernel = None
+                session.restarts += 1
+                return self._error_result(
+                    self._violation_message(violation, timeout) + ". Session variables were lost; reload your data."
+                )
+
+            session.calls += 1
+            session.rss_mb = session.kernel.rss_bytes() / (1024 * 1024)
+        finally:
+            session.lock.release()
+
+        self._enforce_memory_budget(keep_key=session_key)
+        return result
+
+    def execute_in_session(self, session_key: str, code: str, sandbox_root: Path, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Execute code in the persistent kernel of a session (e.g. "user:project").
+
+        Variables defined by earlier calls stay available. Falls back to a
+        stateless execution when all session slots are busy.
+        """
+        timeout = timeout or self.default_timeout
+        result = self._session_call(session_key, sandbox_root, {"op": "exec", "code": code}, timeout)
+        if result is None:
+            logger.warning(f"[KernelPool] No free session slot for {session_key}, running stateless")
+            result = self.execute(code, sandbox_root, timeout)
+            result['stderr'] = (result.get('stderr') or '') + \
+                "[kernel] All persistent kernels are busy; this run did not keep variables.\n"
+        return result
+
+    def session_command(self, session_key: str, sandbox_root: Path, op: str, **params) -> Dict[str, Any]:
+        """
+        Run a namespace command on a session kernel.
+
+        Args:
+            session_key: Session identifier (e.g. "user:project")
+            sandbox_root: Project sandbox directory
+            op: "inspect", "reset", "snapshot" or "restore"
+            **params: Command parameters (e.g. name for snapshot/restore)
+
+        Returns:
+            Command result dict ('success' plus command-specific fields)
+        """
+        if op not in ("inspect", "reset", "snapshot", "restore"):
+            return {'success': False, 'error': f"Unknown kernel command: {op}"}
+
+        with self._cond:
+            exists = session_key in self._sessions
+        if not exists and op in ("inspect", "reset", "snapshot"):
+            # Nothing resident: report an empty namespace instead of spawning a kernel
+            if op == "inspect":
+                return {'success': True, 'variables': [], 'total_bytes': 0, 'resident': False}
+            if op == "reset":
+                return {'success': True, 'resident': False}
+            return {'success': False, 'error': "No active kernel session to snapshot"}
+
+        result = self._session_call(session_key, sandbox_root, {"op": op, **params}, self.default_timeout)
+        if result is None:
+            return {'success': False, 'error': "All persistent kernels are busy, try again later"}
+        result['resident'] = True
+        return result
+
+    def _violation_message(self, violation: str, timeout: float) -> str:
+        if violation == "timeout":
+            return f"TimeoutError: Execution exceeded the {timeout:.0f}s time limit and was stopped (kernel restarted)"
+        if violation == "memory":
+            return f"MemoryError: Execution exceeded the {self.memory_limit_mb} MB memory limit and was stopped (kernel restarted)"
+        return "KernelError: The Python kernel crashed during execution (kernel restarted)"
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool size, utilisation, spawn latency and limit violations"""
+        with self._cond:
+            spawned = self.kernels_spawned
+            return {
+                "pool_size": self.size,
+                "kernels_idle": len(self._idle),
+                "kernels_busy": self._busy,
+                "kernels_spawning": self._spawning,
+                "kernels_spawned": spawned,
+                "spawn_latency_ms": {
+                    "last": round(self.spawn_seconds_last * 1000, 1),
+                    "avg": round(self.spawn_seconds_total / spawned * 1000, 1) if spawned else 0.0,
+                    "max": round(self.spawn_seconds_max * 1000, 1),
+                },
+                "tasks_executed": self.tasks_executed,
+                "timeouts": self.timeouts,
+                "memory_kills": self.memory_kills,
+                "crashes": self.crashes,
+                "recycled": self.recycled,
+                "acquire_wait_seconds_total": round(self.acquire_wait_seconds_total, 3),
+                "limits": {
+                    "timeout_seconds": self.default_timeout,
+                    "memory_limit_mb": self.memory_limit_mb,
+                    "max_tasks_per_kernel": self.max_tasks,
+                    "recycle_rss_mb": self.recycle_rss_mb,
+                },
+                "sessions": self._session_stats_locked(),
+            }
+
+    def _session_stats_locked(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "resident": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "resident_rss_mb": round(sum(s.rss_mb for s in self._sessions.values()), 1),
+            "memory_budget_mb": self.sessions_memory_budget_mb,
+            "idle_timeout_seconds": self.session_idle_timeout,
+            "evicted": dict(self.sessions_evicted),
+            "active": [
+                {
+                    "key": s.key,
+                    "rss_mb": round(s.rss_mb, 1),
+                    "calls": s.calls,
+                    "restarts": s.restarts,
+                    "idle_seconds": round(now - s.last_used, 1),
+                    "busy": s.lock.locked(),
+                }
+                for s in reversed(self._sessions.values())
+            ],
+        }
+
+
+# Global singleton
+_kernel_pool: Optional[SandboxKernelPool] = None
+_kernel_pool_lock = threading.Lock()
+
+
+def get_kernel_pool() -> SandboxKernelPool:
+    """Get the process-wide sandbox kernel pool (kernels spawn on first use or warm_up())"""
+    global _kernel_pool
+    if _kernel_pool is None:
+        with _kernel_pool_lock:
+            if _kernel_pool is None:
+                _kernel_pool = SandboxKernelPool()
+    return _kernel_pool
+
+
+def shutdown_kernel_pool():
+    """Stop the kernel pool if it was created"""
+    if _kernel_pool is not None:
+        _kernel_pool.shutdown()
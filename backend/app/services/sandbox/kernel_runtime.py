@@ -0,0 +1,644 @@
+"""
+LABOS Sandbox Kernel Runtime
+
+Execution core for sandboxed Python code. Used inside the pre-forked kernel
+worker processes (see kernel_pool.py) and, when the pool is disabled, in the
+API process itself.
+
+- Restricted builtins and sandbox-aware open()
+- Import hook for blocked modules (network, subprocess, ...)
+- Output redirection of numpy/pandas/matplotlib writers into generated/
+- preload() imports the scientific stack once per process
+- Persistent namespaces for stateful kernel sessions: describe (inspect),
+  snapshot to / restore from the sandbox
+- Lazy hydration: reading a file that is not on local disk asks the fetch
+  hook (set_fetch_hook) to bring it in from GCS first
+
+Only stdlib imports at module level: this module is preloaded by the
+kernel fork server, so it must stay cheap to import.
+"""
+
+import os
+import sys
+import io
+import pickle
+import types
+import traceback
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+from contextlib import redirect_stdout, redirect_stderr
+import builtins
+
+logger = logging.getLogger(__name__)
+
+# Dangerous modules that should be blocked
+BLOCKED_MODULES = {
+    'subprocess',
+    'socket',
+    'requests',  # Use our controlled tools for HTTP
+    'urllib',
+    'http.client',
+    'ftplib',
+    'telnetlib',
+    'smtplib',
+    'poplib',
+    'imaplib',
+    'nntplib',
+    'multiprocessing',
+    'threading',  # Allow limited threading
+    'ctypes',
+    'cffi',
+    '_thread',
+}
+
+# Modules sandbox code may not import by name: process execution and ways
+# back to the unrestricted interpreter (os is handed out as a restricted proxy)
+BLOCKED_IMPORTS = BLOCKED_MODULES | {
+    'importlib',
+    'builtins',
+    'shutil',
+    'pty',
+    'posix',
+    'nt',
+    'posixpath',  # Has .os; use os.path
+    'ntpath',
+}
+
+# Dangerous functions that should be blocked
+BLOCKED_BUILTINS = {
+    'eval',  # Already in exec context
+    'exec',  # Already in exec context
+    'compile',
+    '__import__',
+    'open',  # Replace with sandbox-aware version
+}
+
+# Allowed dangerous operations (with restrictions)
+ALLOWED_OS_FUNCTIONS = {
+    'path',
+    'getcwd',
+    'listdir',
+    'makedirs',
+    'mkdir',
+    'remove',
+    'rename',
+    'stat',
+    'walk',
+    'sep',
+    'pathsep',
+    'linesep',
+    'environ',  # Read only, filtered to ENVIRON_KEYS
+}
+
+# Environment variables visible through the os proxy (the kernel inherits the
+# server's environment, API keys included)
+ENVIRON_KEYS = {'PATH', 'HOME', 'LANG', 'LC_ALL', 'TZ', 'TMPDIR', 'MPLBACKEND'}
+
+# Where namespace snapshots are stored (relative to the sandbox root)
+SNAPSHOT_DIR = Path('workspace') / '.kernel_snapshots'
+
+# Called as fetch(sandbox_root, relative_path) -> bool for files missing on disk
+_fetch_hook = None
+
+# Output redirects patch library functions process-wide; install them once
+_redirects_installed = False
+_redirects_lock = threading.Lock()
+
+
+def set_fetch_hook(hook):
+    """
+    Install the lazy-hydration callback for files that are not on local disk.
+
+    In kernel processes the hook forwards the request to the parent over
+    the kernel pipe; in the API process it calls the hydrator directly.
+    """
+    global _fetch_hook
+    _fetch_hook = hook
+
+
+def _hydrate_if_missing(path: Path, sandbox_root: Path, mode: str):
+    """Fetch a file that is opened for reading but not hydrated yet."""
+    if _fetch_hook is None or any(m in mode for m in 'wax+') or path.exists():
+        return
+    try:
+        relative = path.relative_to(sandbox_root).as_posix()
+    except ValueError:
+        return
+    try:
+        _fetch_hook(str(sandbox_root), relative)
+    except Exception as e:
+        logger.warning(f"[Sandbox] Could not hydrate {relative}: {e}")
+
+
+class SandboxImportHook:
+    """
+    Import hook that blocks dangerous modules and restricts 'os' module.
+    """
+
+    def __init__(self, sandbox_root: Path):
+        self.sandbox_root = sandbox_root
+
+    def find_module(self, name: str, path=None):
+        # Check if module is blocked
+        base_module = name.split('.')[0]
+        if base_module in BLOCKED_MODULES:
+            return self  # Return self to handle the import
+        return None
+
+    def load_module(self, name: str):
+        raise ImportError(
+            f"Module '{name}' is not allowed in sandbox environment. "
+            f"For security reasons, network and subprocess operations are restricted."
+        )
+
+
+class SandboxedOpen:
+    """
+    A sandboxed version of the open() function that restricts file access.
+    """
+
+    def __init__(self, sandbox_root: Path):
+        self.sandbox_root = sandbox_root.resolve()
+        self._original_open = builtins.open
+
+    def __call__(self, file, mode='r', *args, **kwargs):
+        # Convert to Path and resolve
+        file_path = Path(file)
+
+        # If relative, make it relative to sandbox
+        if not file_path.is_absolute():
+            file_path = self.sandbox_root / file_path
+
+        # Resolve to absolute path
+        resolved = file_path.resolve()
+
+        # Security check: ensure path is within sandbox
+        try:
+            resolved.relative_to(self.sandbox_root)
+        except ValueError:
+            raise PermissionError(
+                f"Access denied: Cannot access files outside sandbox. "
+                f"Attempted: {file}"
+            )
+
+        # Ensure parent directory exists for write operations
+        if 'w' in mode or 'a' in mode or 'x' in mode:
+            resolved.parent.mkdir(parents=True, exist_ok=True)
+        else:
+            _hydrate_if_missing(resolved, self.sandbox_root, mode)
+
+        return self._original_open(str(resolved), mode, *args, **kwargs)
+
+
+class RestrictedModule(types.ModuleType):
+    """Read-only view of a module that exposes only the allowed attributes."""
+
+    def __init__(self, module: types.ModuleType, allowed, overrides: Optional[Dict[str, Any]] = None):
+        super().__init__(module.__name__)
+        object.__setattr__(self, '_module', module)
+        object.__setattr__(self, '_allowed', frozenset(allowed))
+        object.__setattr__(self, '_overrides', overrides or {})
+
+    def __getattr__(self, name: str):
+        if name in self._overrides:
+            return self._overrides[name]
+        if name in self._allowed:
+            return getattr(self._module, name)
+        raise AttributeError(f"'{self.__name__}.{name}' is not allowed in sandbox environment")
+
+    def __setattr__(self, name: str, value):
+        raise AttributeError(f"'{self.__name__}' is read-only in sandbox environment")
+
+    def __dir__(self):
+        return sorted(self._allowed | set(self._overrides))
+
+
+def _restricted_os():
+    """The os module as seen by sandbox code: ALLOWED_OS_FUNCTIONS only."""
+    path_names = {n for n in dir(os.path) if not n.startswith('_')} - {'os', 'sys', 'stat', 'genericpath'}
+    restricted_path = RestrictedModule(os.path, path_names)
+    environ = types.MappingProxyType({k: v for k, v in os.environ.items() if k in ENVIRON_KEYS})
+    restricted = RestrictedModule(os, ALLOWED_OS_FUNCTIONS, {'path': restricted_path, 'environ': environ})
+    return restricted, restricted_path
+
+
+def _guarded_import(name, globals=None, locals=None, fromlist=(), level=0):
+    """
+    __import__ replacement for sandbox code: blocks BLOCKED_IMPORTS and hands
+    out a restricted os, allows the rest.
+
+    A missing __import__ breaks import statements and also lazy imports done
+    by C extensions on behalf of sandbox code (e.g. numpy reductions).
+
+    This guards import statements only; the kernel process boundary (memory,
+    time limits, no inherited sockets) is what contains the code.
+    """
+    base_module = name.split('.')[0]
+    if level == 0 and base_module in BLOCKED_IMPORTS:
+        raise ImportError(
+            f"Module '{name}' is not allowed in sandbox environment. "
+            f"For security reasons, network and subprocess operations are restricted."
+        )
+    if level == 0 and base_module == 'os':
+        restricted_os, restricted_path = _restricted_os()
+        # "from os.path import join" gets os.path itself, every other form gets os
+        return restricted_path if name == 'os.path' and fromlist else restricted_os
+    return builtins.__import__(name, globals, locals, fromlist, level)
+
+
+def create_sandbox_globals(sandbox_root: Path) -> Dict[str, Any]:
+    """
+    Create a restricted globals dict for code execution.
+    """
+    # Start with safe builtins
+    safe_builtins = {
+        k: v for k, v in builtins.__dict__.items()
+        if k not in BLOCKED_BUILTINS
+    }
+
+    # Replace open with sandboxed version
+    safe_builtins['open'] = SandboxedOpen(sandbox_root)
+    safe_builtins['__import__'] = _guarded_import
+
+    # Create globals
+    sandbox_globals = {
+        '__builtins__': safe_builtins,
+        '__name__': '__main__',
+        '__doc__': None,
+        '__file__': str(sandbox_root / 'script.py'),
+    }
+
+    return sandbox_globals
+
+
+def _redirect_path(path):
+    """Redirect output paths to generated/ folder"""
+    path_str = str(path)
+    if not path_str.startswith('generated/') and not path_str.startswith('./generated/'):
+        basename = Path(path_str).name
+        new_path = f'generated/{basename}'
+        logger.info(f"[Sandbox] Redirecting output to: {new_path}")
+        return new_path
+    return path_str
+
+
+def _install_output_redirects():
+    """
+    Wrap numpy/pandas/matplotlib writers so relative outputs land in generated/.
+
+    Idempotent: the wrappers are installed once per process instead of being
+    stacked on every execution.
+    """
+    global _redirects_installed
+    with _redirects_lock:
+        if _redirects_installed:
+            return
+
+        import numpy
+        import pandas
+
+        # Wrap numpy save functions to enforce generated/ path
+        _original_np_save = numpy.save
+        _original_np_savez = numpy.savez
+        _original_np_savetxt = numpy.savetxt
+
+        def _wrapped_np_save(file, arr, *args, **kwargs):
+            return _original_np_save(_redirect_path(file), arr, *args, **kwargs)
+        def _wrapped_np_savez(file, *args, **kwargs):
+            return _original_np_savez(_redirect_path(file), *args, **kwargs)
+        def _wrapped_np_savetxt(fname, X, *args, **kwargs):
+            return _original_np_savetxt(_redirect_path(fname), X, *args, **kwargs)
+
+        numpy.save = _wrapped_np_save
+        numpy.savez = _wrapped_np_savez
+        numpy.savetxt = _wrapped_np_savetxt
+
+        # Wrap matplotlib savefig (Agg backend, no display)
+        try:
+            import matplotlib
+            matplotlib.use('Agg')
+            import matplotlib.pyplot as plt
+
+            _original_savefig = plt.savefig
+            def _wrapped_savefig(fname, *args, **kwargs):
+                fname_str = str(fname)
+                if not fname_str.startswith('generated/') and not fname_str.startswith('./generated/'):
+                    fname = f'generated/{Path(fname_str).name}'
+                    logger.info(f"[Sandbox] Redirecting savefig to: {fname}")
+                return _original_savefig(fname, *args, **kwargs)
+            plt.savefig = _wrapped_savefig
+        except ImportError:
+            pass
+
+        # Wrap pandas to_csv/to_excel to enforce generated/ path
+        df_class = pandas.DataFrame
+        _original_to_csv = df_class.to_csv
+        _original_to_excel = df_class.to_excel if hasattr(df_class, 'to_excel') else None
+
+        def _wrapped_to_csv(self, path_or_buf=None, *args, **kwargs):
+            if path_or_buf is not None and isinstance(path_or_buf, str):
+                if not path_or_buf.startswith('generated/'):
+                    path_or_buf = f'generated/{Path(path_or_buf).name}'
+                    logger.info(f"[Sandbox] Redirecting to_csv to: {path_or_buf}")
+            return _original_to_csv(self, path_or_buf, *args, **kwargs)
+        df_class.to_csv = _wrapped_to_csv
+
+        if _original_to_excel:
+            def _wrapped_to_excel(self, excel_writer, *args, **kwargs):
+                if isinstance(excel_writer, str):
+                    if not excel_writer.startswith('generated/'):
+                        excel_writer = f'generated/{Path(excel_writer).name}'
+                        logger.info(f"[Sandbox] Redirecting to_excel to: {excel_writer}")
+                return _original_to_excel(self, excel_writer, *args, **kwargs)
+            df_class.to_excel = _wrapped_to_excel
+
+        _redirects_installed = True
+
+
+def preload():
+    """
+    Import the scientific stack and install output redirects.
+
+    Called once per kernel process (and by the fork server, so forked
+    workers start with numpy/pandas/matplotlib already imported).
+    """
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+    _install_output_redirects()
+
+
+def build_namespace(sandbox_root: Path) -> Dict[str, Any]:
+    """Restricted globals with the pre-imported modules and redirected open()."""
+    import numpy
+    import pandas
+    import json
+    import csv
+    import re
+    import math
+    import datetime
+    import collections
+    import itertools
+    import functools
+
+    sandbox_globals = create_sandbox_globals(sandbox_root)
+
+    # Wrap open() for write mode to enforce generated/ path
+    _original_open = builtins.open
+    resolved_root = sandbox_root.resolve()
+    def _wrapped_open(file, mode='r', *args, **kwargs):
+        if 'w' in mode or 'a' in mode or 'x' in mode:
+            # Write mode - redirect to generated/
+            file = _redirect_path(file)
+        elif isinstance(file, (str, os.PathLike)):
+            _hydrate_if_missing((resolved_root / file).resolve(), resolved_root, mode)
+        return _original_open(file, mode, *args, **kwargs)
+
+    sandbox_globals['numpy'] = numpy
+    sandbox_globals['np'] = numpy
+    sandbox_globals['pandas'] = pandas
+    sandbox_globals['pd'] = pandas
+    sandbox_globals['json'] = json
+    sandbox_globals['csv'] = csv
+    sandbox_globals['re'] = re
+    sandbox_globals['math'] = math
+    sandbox_globals['datetime'] = datetime
+    sandbox_globals['collections'] = collections
+    sandbox_globals['itertools'] = itertools
+    sandbox_globals['functools'] = functools
+    sandbox_globals['open'] = _wrapped_open  # Use wrapped open
+
+    try:
+        import matplotlib
+        import matplotlib.pyplot as plt
+        sandbox_globals['matplotlib'] = matplotlib
+        sandbox_globals['plt'] = plt
+    except ImportError:
+        pass
+
+    return sandbox_globals
+
+
+def run_code(code: str, sandbox_root: Path, namespace: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Execute Python code within the sandbox directory (no time/memory limits).
+
+    Mutates process-global state (cwd, sys.path, sys.meta_path) for the
+    duration of the call, so it belongs in a dedicated kernel process.
+
+    Args:
+        code: Python code to execute
+        sandbox_root: Path to sandbox root directory
+        namespace: Persistent globals of a kernel session (filled on first
+                   use and kept between calls); None for a fresh namespace
+
+    Returns:
+        Dict with stdout, stderr, error, and success status
+    """
+    # Ensure sandbox exists
+    sandbox_root.mkdir(parents=True, exist_ok=True)
+
+    # Create subdirectories
+    (sandbox_root / 'uploads').mkdir(exist_ok=True)
+    (sandbox_root / 'generated').mkdir(exist_ok=True)
+    (sandbox_root / 'workspace').mkdir(exist_ok=True)
+
+    # Save current state
+    original_cwd = os.getcwd()
+    original_path = sys.path.copy()
+    original_meta_path = sys.meta_path.copy()
+
+    # Capture output
+    stdout_capture = io.StringIO()
+    stderr_capture = io.StringIO()
+
+    error = None
+    success = False
+
+    # Imported here, before the import hook is installed: the sandbox package
+    # pulls in GCS sync and the kernel pool, too heavy for module level
+    from app.services.sandbox.manager import SandboxSecurityError
+
+    try:
+        # Change to sandbox directory
+        os.chdir(str(sandbox_root))
+
+        # Add sandbox to path
+        sys.path.insert(0, str(sandbox_root))
+
+        # Scientific stack must be imported before the hook blocks its dependencies
+        preload()
+
+        # Install import hook
+        import_hook = SandboxImportHook(sandbox_root)
+        sys.meta_path.insert(0, import_hook)
+
+        if namespace is None:
+            sandbox_globals = build_namespace(sandbox_root)
+        else:
+            if not namespace:
+                namespace.update(build_namespace(sandbox_root))
+            sandbox_globals = namespace
+
+        # Execute code with output capture
+        with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture):
+            exec(code, sandbox_globals)
+
+        success = True
+
+    except SandboxSecurityError as e:
+        error = f"Security Error: {str(e)}"
+    except PermissionError as e:
+        error = f"Permission Denied: {str(e)}"
+    except ImportError as e:
+        error = f"Import Error: {str(e)}"
+    except MemoryError:
+        error = "MemoryError: Kernel memory limit exceeded"
+    except Exception as e:
+        error = f"{type(e).__name__}: {str(e)}\n{traceback.format_exc()}"
+    finally:
+        # Restore original state
+        os.chdir(original_cwd)
+        sys.path = original_path
+        sys.meta_path = original_meta_path
+
+    return {
+        'success': success,
+        'stdout': stdout_capture.getvalue(),
+        'stderr': stderr_capture.getvalue(),
+        'error': error,
+    }
+
+
+def _is_user_variable(name: str, value: Any, base_names: set) -> bool:
+    """Names the user created (skips builtins, preloaded modules and helpers)"""
+    if name.startswith('_') or name in base_names:
+        return False
+    return not isinstance(value, types.ModuleType)
+
+
+def _base_names(sandbox_root: Path) -> set:
+    return set(build_namespace(sandbox_root).keys())
+
+
+def estimate_nbytes(value: Any) -> int:
+    """Approximate memory held by a value (numpy/pandas aware)"""
+    try:
+        if hasattr(value, 'memory_usage') and callable(value.memory_usage):
+            usage = value.memory_usage(deep=True)
+            return int(usage.sum() if hasattr(usage, 'sum') else usage)
+        if hasattr(value, 'nbytes'):
+            return int(value.nbytes)
+    except Exception:
+        pass
+    try:
+        return sys.getsizeof(value)
+    except Exception:
+        return 0
+
+
+def describe_namespace(namespace: Dict[str, Any], sandbox_root: Path) -> Dict[str, Any]:
+    """
+    Summarize the user variables of a session namespace.
+
+    Returns:
+        Dict with 'variables' (name, type, shape, bytes, preview) and 'total_bytes'
+    """
+    base_names = _base_names(sandbox_root)
+    variables = []
+    total_bytes = 0
+
+    for name, value in namespace.items():
+        if not _is_user_variable(name, value, base_names):
+            continue
+        nbytes = estimate_nbytes(value)
+        total_bytes += nbytes
+        entry = {
+            'name': name,
+            'type': type(value).__name__,
+            'bytes': nbytes,
+        }
+        shape = getattr(value, 'shape', None)
+        if shape is not None:
+            entry['shape'] = list(shape) if isinstance(shape, tuple) else str(shape)
+        elif hasattr(value, '__len__') and not callable(value):
+            try:
+                entry['length'] = len(value)
+            except Exception:
+                pass
+        try:
+            entry['preview'] = repr(value)[:120]
+        except Exception:
+            entry['preview'] = '<unrepresentable>'
+        variables.append(entry)
+
+    variables.sort(key=lambda v: v['bytes'], reverse=True)
+    return {'success': True, 'variables': variables, 'total_bytes': total_bytes}
+
+
+def _snapshot_path(sandbox_root: Path, name: str) -> Path:
+    safe_name = ''.join(c for c in name if c.isalnum() or c in '-_') or 'snapshot'
+    return sandbox_root / SNAPSHOT_DIR / f'{safe_name}.pkl'
+
+
+def snapshot_namespace(namespace: Dict[str, Any], sandbox_root: Path, name: str) -> Dict[str, Any]:
+    """
+    Pickle the picklable user variables of a namespace into the sandbox.
+
+    Returns:
+        Dict with the snapshot path, saved and skipped variable names
+    """
+    base_names = _base_names(sandbox_root)
+    saved = {}
+    skipped = []
+
+    for var_name, value in namespace.items():
+        if not _is_user_variable(var_name, value, base_names):
+            continue
+        try:
+            pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            saved[var_name] = value
+        except Exception:
+            skipped.append(var_name)
+
+    path = _snapshot_path(sandbox_root, name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'wb') as f:
+        pickle.dump(saved, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    return {
+        'success': True,
+        'path': str(path.relative_to(sandbox_root)),
+        'saved': sorted(saved),
+        'skipped': sorted(skipped),
+        'bytes': path.stat().st_size,
+    }
+
+
+def restore_namespace(namespace: Dict[str, Any], sandbox_root: Path, name: str) -> Dict[str, Any]:
+    """Load a snapshot created by snapshot_namespace() into a namespace"""
+    path = _snapshot_path(sandbox_root, name)
+    _hydrate_if_missing(path.resolve(), sandbox_root.resolve(), 'rb')
+    if not path.exists():
+        return {'success': False, 'error': f"Snapshot not found: {path.relative_to(sandbox_root)}"}
+
+    if not namespace:
+        namespace.update(build_namespace(sandbox_root))
+    with open(path, 'rb') as f:
+        restored = pickle.load(f)
+    namespace.update(restored)
+
+    return {'success': True, 'restored': sorted(restored)}
+
+
+def reset_process_state():
+    """Release per-execution leftovers between tasks on a reused kernel."""
+    try:
+        import matplotlib.pyplot as plt
+        plt.close('all')
+    except ImportError:
+        pass
+
+    import gc
+    gc.collect()
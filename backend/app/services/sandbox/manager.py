@@ -186,6 +186,11 @@ class SandboxManager:
                 "files": []
             })
 
+        # Fresh instance: prefetch the project's recently used files from GCS
+        hydrator = self._hydrator()
+        if hydrator is not None:
+            hydrator.warm_project(user_id, project_id)
+
         return project_dir
 
     # ==================== File Operations ====================
@@ -339,6 +344,23 @@ class SandboxManager:
                         "category": search_dir.name
                     }
 
+        # Not on local disk: fetch from GCS on first access (lazy hydration)
+        hydrator = self._hydrator()
+        if hydrator is not None:
+            for search_dir in search_dirs:
+                directory = search_dir.relative_to(project_dir).as_posix() if search_dir != project_dir else ""
+                relative = hydrator.find_remote(user_id, project_id, directory, safe_filename)
+                if relative and hydrator.hydrate(user_id, project_id, relative) is not None:
+                    file_path = project_dir / relative
+                    self._validate_path_within_sandbox(file_path, project_dir)
+                    content = file_path.read_bytes()
+                    return content, {
+                        "filename": file_path.name,
+                        "path": str(file_path),
+                        "size": len(content),
+                        "category": search_dir.name
+                    }
+
         raise FileNotFoundError(f"File not found: {filename}")
 
     def read_file_by_path(
@@ -365,7 +387,9 @@ class SandboxManager:
         self._validate_path_within_sandbox(file_path, project_dir)
 
         if not file_path.exists():
-            raise FileNotFoundError(f"File not found: {relative_path}")
+            hydrator = self._hydrator()
+            if hydrator is None or hydrator.hydrate(user_id, project_id, relative_path) is None:
+                raise FileNotFoundError(f"File not found: {relative_path}")
 
         content = file_path.read_bytes()
         return content, {
@@ -394,10 +418,15 @@ class SandboxManager:
         """
         project_dir = self.get_project_sandbox(user_id, project_id)
 
+        # Files that are only in GCS (not hydrated yet) come from the remote manifest
+        hydrator = self._hydrator()
+        categories = [category] if category else [self.UPLOADS_DIR, self.GENERATED_DIR, self.WORKSPACE_DIR]
+        remote_files = hydrator.remote_files(user_id, project_id, categories) if hydrator else []
+
         if not project_dir.exists():
-            return []
+            return sorted(remote_files, key=lambda x: x.get("modified_at", ""), reverse=True)
 
-        files = []
+        files = remote_files
 
         if category:
             search_dirs = [(category, project_dir / category)]
@@ -441,11 +470,13 @@ class SandboxManager:
         project_id: str,
         filename: str,
         category: Optional[str] = None
-    ) -> bool:
+    ) -> Optional[str]:
         """
         Delete a file from the project sandbox.
 
-        Returns True if file was deleted.
+        Returns the deleted file's path relative to the project sandbox
+        (e.g. "uploads/data.csv", the GCS object to delete as well), or None
+        if no such file exists.
         """
         project_dir = self.get_project_sandbox(user_id, project_id)
 
@@ -466,10 +497,38 @@ class SandboxManager:
                 self._validate_path_within_sandbox(file_path, project_dir)
                 file_path.unlink()
                 self._remove_file_from_metadata(project_dir, safe_filename)
+                relative = f"{search_dir.name}/{safe_filename}"
+                self._forget_remote(user_id, project_id, relative)
                 logger.info(f"Deleted file: {file_path}")
-                return True
-
-        return False
+                return relative
+
+        # Not hydrated yet: the caller deletes the GCS copy
+        hydrator = self._hydrator()
+        if hydrator is not None:
+            for search_dir in search_dirs:
+                relative = f"{search_dir.name}/{safe_filename}"
+                if relative in hydrator.get_manifest(user_id, project_id):
+                    self._remove_file_from_metadata(project_dir, safe_filename)
+                    hydrator.forget(user_id, project_id, relative)
+                    logger.info(f"Deleted remote-only file: {relative}")
+                    return relative
+
+        return None
+
+    # ==================== Lazy Hydration ====================
+
+    def _hydrator(self):
+        """Sandbox hydrator when GCS sync is on (files may exist only remotely), else None."""
+        if not self.sync_enabled:
+            return None
+        from app.services.sandbox.hydration import get_hydrator
+        hydrator = get_hydrator()
+        return hydrator if hydrator.enabled else None
+
+    def _forget_remote(self, user_id: str, project_id: str, relative_path: str):
+        hydrator = self._hydrator()
+        if hydrator is not None:
+            hydrator.forget(user_id, project_id, relative_path)
 
     # ==================== Metadata Management ====================
 
@@ -7,21 +7,70 @@ This ensures data persistence even if the local storage is ephemeral (like Cloud
 Sync Strategy:
     - Write-through: Files are written locally first, then queued for GCS sync
     - Read-through: If file not found locally, attempt to fetch from GCS
-    - Background sync: A background worker processes the sync queue
+    - Background sync: A background worker processes the sync queue by priority
+    - Incremental: Bulk syncs compare content hashes and only transfer changed files
+
+Change detection:
+    - Uploads carry their sha256 as blob metadata; GCS keeps md5/crc32c itself
+    - Local hashes are cached per project in .sync_state.json (keyed by
+      size + mtime) and seeded from the sha256 recorded in .metadata.json,
+      so unchanged files are neither re-read nor re-transferred
+    - Objects uploaded before hashes were recorded are compared by md5
+      (or crc32c for composite objects)
+
+All GCS calls are blocking; they run on a bounded transfer pool so the
+event loop never waits on the network.
 """
 
 import os
 import asyncio
+import base64
+import hashlib
+import heapq
+import itertools
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any, List
-from datetime import datetime
-from collections import deque
+from typing import Optional, Dict, Any, List, Tuple
+from datetime import datetime, timezone
 from threading import Lock
 import json
 
+from app.config import SANDBOX_CONFIG
+
 logger = logging.getLogger(__name__)
 
+# Per-project cache of local file hashes (dot file: never synced itself)
+SYNC_STATE_FILE = ".sync_state.json"
+METADATA_FILE = ".metadata.json"
+PARTIAL_SUFFIX = ".part"
+
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def _hash_file(path: Path) -> Tuple[str, str]:
+    """sha256 (hex) and md5 (base64, as reported by GCS) of a file in one pass"""
+    sha256 = hashlib.sha256()
+    md5 = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            sha256.update(block)
+            md5.update(block)
+    return sha256.hexdigest(), base64.b64encode(md5.digest()).decode()
+
+
+def _crc32c_file(path: Path) -> Optional[str]:
+    """crc32c (base64, as reported by GCS) of a file, None if google_crc32c is missing"""
+    try:
+        import google_crc32c
+    except ImportError:
+        return None
+    checksum = google_crc32c.Checksum()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            checksum.update(block)
+    return base64.b64encode(checksum.digest()).decode()
+
 
 class SyncTask:
     """Represents a sync task to be processed."""
@@ -45,15 +94,21 @@ class SyncTask:
         self.retries = 0
         self.max_retries = 3
 
+    @property
+    def key(self) -> Tuple[str, str]:
+        return self.action, self.gcs_path
+
 
 class SandboxSyncManager:
     """
     Manages synchronization between local sandbox and GCS.
 
     Features:
-    - Async background sync worker
+    - Async background sync worker with bounded parallel transfers
     - Retry logic for failed uploads
-    - Priority queue for important files
+    - Priority queue for important files (higher priority runs first)
+    - Incremental bulk sync based on content hashes
+    - Chunked (resumable) transfers for large files
     """
 
     def __init__(self, sandbox_root: Optional[str] = None):
@@ -64,18 +119,42 @@ class SandboxSyncManager:
         self.gcs_bucket = os.getenv("GCS_SANDBOX_BUCKET", "labos-sandboxes")
         self.sync_enabled = os.getenv("SYNC_TO_GCS", "false").lower() == "true"
 
-        # Sync queue
-        self._queue: deque = deque()
+        # Transfer settings
+        self.max_concurrency = SANDBOX_CONFIG.get("sync_max_concurrency", 8)
+        self.chunk_size = SANDBOX_CONFIG.get("sync_chunk_size_mb", 8) * 1024 * 1024
+        self.large_file_bytes = SANDBOX_CONFIG.get("sync_large_file_mb", 32) * 1024 * 1024
+
+        # Sync queue: heap of (-priority, seq, task); one pending task per (action, gcs_path)
+        self._queue: List[Tuple[int, int, SyncTask]] = []
+        self._queued: set = set()
+        self._seq = itertools.count()
         self._queue_lock = Lock()
 
+        # Per-project hash caches are read-modify-written from several threads
+        self._state_lock = Lock()
+
         # GCS client (lazy init)
         self._gcs_client = None
         self._bucket = None
+        self._client_lock = Lock()
+
+        # Transfer pool (lazy init)
+        self._executor: Optional[ThreadPoolExecutor] = None
 
         # Background worker state
         self._worker_task: Optional[asyncio.Task] = None
         self._running = False
 
+        self._stats = {
+            "uploaded": 0,
+            "downloaded": 0,
+            "skipped_unchanged": 0,
+            "failed": 0,
+            "bytes_uploaded": 0,
+            "bytes_downloaded": 0,
+        }
+        self._stats_lock = Lock()
+
         logger.info(f"SandboxSyncManager initialized: sync_enabled={self.sync_enabled}")
 
     # ==================== GCS Client ====================
@@ -83,18 +162,67 @@ class SandboxSyncManager:
     def _get_gcs_client(self):
         """Lazy initialize GCS client."""
         if self._gcs_client is None:
-            try:
-                from google.cloud import storage
-                self._gcs_client = storage.Client()
-                self._bucket = self._gcs_client.bucket(self.gcs_bucket)
-                logger.info(f"GCS client initialized for bucket: {self.gcs_bucket}")
-            except Exception as e:
-                logger.error(f"Failed to initialize GCS client: {e}")
-                raise
+            with self._client_lock:
+                if self._gcs_client is None:
+                    try:
+                        from google.cloud import storage
+                        self._gcs_client = storage.Client()
+                        self._bucket = self._gcs_client.bucket(self.gcs_bucket)
+                        logger.info(f"GCS client initialized for bucket: {self.gcs_bucket}")
+                    except Exception as e:
+                        logger.error(f"Failed to initialize GCS client: {e}")
+                        raise
         return self._gcs_client, self._bucket
 
+    def get_executor(self) -> ThreadPoolExecutor:
+        """Bounded pool for blocking transfers (shared with sandbox hydration)."""
+        if self._executor is None:
+            with self._client_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_concurrency,
+                        thread_name_prefix="gcs-sync"
+                    )
+        return self._executor
+
+    async def _run_blocking(self, func, *args):
+        """Run a blocking GCS/file operation on the transfer pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.get_executor(), func, *args)
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Transfer counters and queue depth."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        with self._queue_lock:
+            stats["queued"] = len(self._queue)
+        stats["max_concurrency"] = self.max_concurrency
+        return stats
+
     # ==================== Queue Management ====================
 
+    def _push(self, task: SyncTask) -> bool:
+        """Add a task to the priority queue unless the same transfer is already pending."""
+        with self._queue_lock:
+            if task.key in self._queued:
+                return False
+            self._queued.add(task.key)
+            heapq.heappush(self._queue, (-task.priority, next(self._seq), task))
+        return True
+
+    def _pop(self) -> Optional[SyncTask]:
+        """Pop the highest-priority task (FIFO within the same priority)."""
+        with self._queue_lock:
+            if not self._queue:
+                return None
+            _, _, task = heapq.heappop(self._queue)
+            self._queued.discard(task.key)
+            return task
+
     def queue_upload(
         self,
         local_path: str,
@@ -118,10 +246,8 @@ class SandboxSyncManager:
             priority=priority
         )
 
-        with self._queue_lock:
-            self._queue.append(task)
-
-        logger.debug(f"Queued upload: {local_path} -> gs://{self.gcs_bucket}/{gcs_path}")
+        if self._push(task):
+            logger.debug(f"Queued upload: {local_path} -> gs://{self.gcs_bucket}/{gcs_path}")
 
     def queue_download(
         self,
@@ -146,19 +272,151 @@ class SandboxSyncManager:
             priority=priority
         )
 
-        with self._queue_lock:
-            # Insert at front for higher priority
-            self._queue.appendleft(task)
+        if self._push(task):
+            logger.debug(f"Queued download: gs://{self.gcs_bucket}/{gcs_path} -> {local_path}")
+
+    # ==================== Local Hash State ====================
+
+    def _project_dir(self, user_id: str, project_id: str) -> Path:
+        return self.sandbox_root / user_id / project_id
+
+    def _load_state(self, project_dir: Path) -> Dict[str, Dict[str, Any]]:
+        state_path = project_dir / SYNC_STATE_FILE
+        try:
+            return json.loads(state_path.read_text()).get("files", {})
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, project_dir: Path, files: Dict[str, Dict[str, Any]]):
+        state_path = project_dir / SYNC_STATE_FILE
+        tmp_path = state_path.with_name(state_path.name + PARTIAL_SUFFIX)
+        try:
+            tmp_path.write_text(json.dumps({"updated_at": datetime.utcnow().isoformat(), "files": files}))
+            os.replace(tmp_path, state_path)
+        except OSError as e:
+            logger.warning(f"Could not write sync state for {project_dir}: {e}")
+
+    def _update_state(self, project_dir: Path, relative: str, entry: Optional[Dict[str, Any]]):
+        """Record (or forget) the hashes of one file."""
+        with self._state_lock:
+            files = self._load_state(project_dir)
+            if entry is None:
+                files.pop(relative, None)
+            else:
+                files[relative] = entry
+            self._save_state(project_dir, files)
 
-        logger.debug(f"Queued download: gs://{self.gcs_bucket}/{gcs_path} -> {local_path}")
+    def _recorded_hashes(self, project_dir: Path) -> Dict[str, Dict[str, Any]]:
+        """sha256/size of the files registered in the project's .metadata.json"""
+        try:
+            metadata = json.loads((project_dir / METADATA_FILE).read_text())
+        except (OSError, ValueError):
+            return {}
+
+        subdirs = {"uploads": "uploads", "workspace": "workspace"}
+        recorded = {}
+        for info in metadata.get("files", []):
+            if not info.get("hash") or not info.get("filename"):
+                continue
+            relative = f"{subdirs.get(info.get('category'), 'generated')}/{info['filename']}"
+            recorded[relative] = info
+        return recorded
+
+    def _local_entry(
+        self,
+        path: Path,
+        relative: str,
+        state: Dict[str, Dict[str, Any]],
+        recorded: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Hashes of a local file, reusing cached values when size and mtime match.
+
+        A sha256 from .metadata.json is trusted when the size matches and the
+        file has not been modified after it was registered; md5 is then only
+        computed if a remote object without sha256 metadata has to be compared.
+        """
+        st = path.stat()
+        entry = state.get(relative)
+        if entry and entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns:
+            return entry
+
+        info = recorded.get(relative)
+        if info and info.get("size") == st.st_size:
+            try:
+                # created_at is naive UTC (datetime.utcnow())
+                registered = datetime.fromisoformat(info["created_at"]).replace(tzinfo=timezone.utc).timestamp()
+            except (KeyError, ValueError):
+                registered = 0
+            # The file is written just before it is registered
+            if st.st_mtime <= registered + 2:
+                entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": info["hash"], "md5": None}
+                state[relative] = entry
+                return entry
+
+        sha256, md5 = _hash_file(path)
+        entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha256, "md5": md5}
+        state[relative] = entry
+        return entry
+
+    @staticmethod
+    def _is_syncable(path: Path) -> bool:
+        return path.is_file() and not path.name.startswith(".") and not path.name.endswith(PARTIAL_SUFFIX)
+
+    def _unchanged(self, path: Path, local: Dict[str, Any], remote: Optional[Dict[str, Any]]) -> bool:
+        """Whether the remote object has the same content as the local file."""
+        if remote is None or remote.get("size") != local["size"]:
+            return False
+        if remote.get("sha256"):
+            return remote["sha256"] == local["sha256"]
+        if remote.get("md5"):
+            if not local.get("md5"):
+                local["sha256"], local["md5"] = _hash_file(path)
+            return remote["md5"] == local["md5"]
+        if remote.get("crc32c"):
+            return _crc32c_file(path) == remote["crc32c"]
+        return False
+
+    # ==================== Remote Manifest ====================
+
+    def list_remote_manifest(self, user_id: str, project_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        List the project's objects in GCS (blocking).
+
+        Returns:
+            relative path -> {size, sha256, md5, crc32c, generation, updated}
+        """
+        _, bucket = self._get_gcs_client()
+        prefix = f"{user_id}/{project_id}/"
+
+        manifest = {}
+        for blob in bucket.list_blobs(prefix=prefix):
+            relative = blob.name[len(prefix):]
+            if not relative or relative.endswith("/"):
+                continue
+            manifest[relative] = {
+                "size": blob.size,
+                "sha256": (blob.metadata or {}).get("sha256"),
+                "md5": blob.md5_hash,
+                "crc32c": blob.crc32c,
+                "generation": blob.generation,
+                "updated": blob.updated.isoformat() if blob.updated else None,
+            }
+        return manifest
 
     # ==================== Sync Operations ====================
 
-    async def upload_file(self, local_path: str, gcs_path: str) -> bool:
-        """Upload a single file to GCS."""
+    def _upload_blocking(self, local_path: str, gcs_path: str, sha256: Optional[str] = None) -> bool:
         try:
             _, bucket = self._get_gcs_client()
-            blob = bucket.blob(gcs_path)
+            path = Path(local_path)
+            size = path.stat().st_size
+            if sha256 is None:
+                sha256, _ = _hash_file(path)
+
+            # Large files go through a chunked resumable upload
+            blob = bucket.blob(gcs_path, chunk_size=self.chunk_size if size >= self.large_file_bytes else None)
+            blob.metadata = {"sha256": sha256}
 
             # Upload with metadata
             blob.upload_from_filename(
@@ -166,34 +424,66 @@ class SandboxSyncManager:
                 timeout=300  # 5 minutes for large files
             )
 
+            self._count("uploaded")
+            self._count("bytes_uploaded", size)
             logger.info(f"Uploaded: {local_path} -> gs://{self.gcs_bucket}/{gcs_path}")
             return True
 
         except Exception as e:
+            self._count("failed")
             logger.error(f"Upload failed: {local_path} -> {gcs_path}: {e}")
             return False
 
-    async def download_file(self, gcs_path: str, local_path: str) -> bool:
-        """Download a single file from GCS."""
+    def _download_blocking(self, gcs_path: str, local_path: str, remote: Optional[Dict[str, Any]] = None) -> bool:
         try:
             _, bucket = self._get_gcs_client()
-            blob = bucket.blob(gcs_path)
 
-            if not blob.exists():
-                logger.warning(f"GCS file not found: gs://{self.gcs_bucket}/{gcs_path}")
-                return False
+            if remote is None:
+                blob = bucket.get_blob(gcs_path)
+                if blob is None:
+                    logger.warning(f"GCS file not found: gs://{self.gcs_bucket}/{gcs_path}")
+                    return False
+                remote = {"size": blob.size, "sha256": (blob.metadata or {}).get("sha256"), "md5": blob.md5_hash}
+
+            size = remote.get("size") or 0
+            blob = bucket.blob(gcs_path, chunk_size=self.chunk_size if size >= self.large_file_bytes else None)
 
             # Ensure local directory exists
-            Path(local_path).parent.mkdir(parents=True, exist_ok=True)
+            target = Path(local_path)
+            target.parent.mkdir(parents=True, exist_ok=True)
 
-            blob.download_to_filename(local_path)
+            # Download next to the target and rename, so readers never see partial files
+            tmp_path = target.with_name(target.name + PARTIAL_SUFFIX)
+            blob.download_to_filename(str(tmp_path))
+            os.replace(tmp_path, target)
+
+            self._count("downloaded")
+            self._count("bytes_downloaded", size)
             logger.info(f"Downloaded: gs://{self.gcs_bucket}/{gcs_path} -> {local_path}")
             return True
 
         except Exception as e:
+            self._count("failed")
             logger.error(f"Download failed: {gcs_path} -> {local_path}: {e}")
             return False
 
+    def download_blocking(self, gcs_path: str, local_path: str, remote: Optional[Dict[str, Any]] = None) -> bool:
+        """Download a single file from GCS on the calling thread (for sync callers)."""
+        return self._download_blocking(gcs_path, local_path, remote)
+
+    def upload_in_background(self, local_path: str, gcs_path: str):
+        """Fire-and-forget upload on the transfer pool (callable from any thread)."""
+        if self.sync_enabled:
+            self.get_executor().submit(self._upload_blocking, local_path, gcs_path)
+
+    async def upload_file(self, local_path: str, gcs_path: str, sha256: Optional[str] = None) -> bool:
+        """Upload a single file to GCS (runs on the transfer pool)."""
+        return await self._run_blocking(self._upload_blocking, local_path, gcs_path, sha256)
+
+    async def download_file(self, gcs_path: str, local_path: str, remote: Optional[Dict[str, Any]] = None) -> bool:
+        """Download a single file from GCS (runs on the transfer pool)."""
+        return await self._run_blocking(self._download_blocking, gcs_path, local_path, remote)
+
     async def ensure_local(
         self,
         user_id: str,
@@ -222,33 +512,37 @@ class SandboxSyncManager:
 
     # ==================== Background Worker ====================
 
-    async def _process_queue(self):
-        """Process the sync queue in the background."""
-        while self._running:
-            task = None
-
-            with self._queue_lock:
-                if self._queue:
-                    task = self._queue.popleft()
+    async def _run_task(self, task: SyncTask, slots: asyncio.Semaphore):
+        try:
+            success = False
 
-            if task:
-                success = False
+            if task.action == "upload":
+                success = await self.upload_file(task.local_path, task.gcs_path)
+            elif task.action == "download":
+                success = await self.download_file(task.gcs_path, task.local_path)
 
-                if task.action == "upload":
-                    success = await self.upload_file(task.local_path, task.gcs_path)
-                elif task.action == "download":
-                    success = await self.download_file(task.gcs_path, task.local_path)
+            # Retry on failure
+            if not success and task.retries < task.max_retries:
+                task.retries += 1
+                self._push(task)
+                logger.warning(f"Retrying task ({task.retries}/{task.max_retries}): {task.gcs_path}")
+        finally:
+            slots.release()
 
-                # Retry on failure
-                if not success and task.retries < task.max_retries:
-                    task.retries += 1
-                    with self._queue_lock:
-                        self._queue.append(task)
-                    logger.warning(f"Retrying task ({task.retries}/{task.max_retries}): {task.gcs_path}")
+    async def _process_queue(self):
+        """Process the sync queue in the background, up to max_concurrency transfers at once."""
+        slots = asyncio.Semaphore(self.max_concurrency)
+        while self._running:
+            # Take a slot first, so a task queued meanwhile with higher priority goes next
+            await slots.acquire()
+            task = self._pop()
 
+            if task:
+                asyncio.create_task(self._run_task(task, slots))
             else:
+                slots.release()
                 # No tasks, wait a bit
-                await asyncio.sleep(1)
+                await asyncio.sleep(0.5)
 
     def start_worker(self):
         """Start the background sync worker."""
@@ -273,44 +567,129 @@ class SandboxSyncManager:
 
     # ==================== Bulk Operations ====================
 
+    def _plan_upload(self, user_id: str, project_id: str) -> Tuple[List[Tuple[str, Path, Dict[str, Any]]], List[str]]:
+        """
+        Compare local files with the remote manifest (blocking).
+
+        Returns:
+            (files to upload as (relative, path, local hashes), unchanged relative paths)
+        """
+        project_dir = self._project_dir(user_id, project_id)
+        remote = self.list_remote_manifest(user_id, project_id)
+        recorded = self._recorded_hashes(project_dir)
+
+        with self._state_lock:
+            state = self._load_state(project_dir)
+
+        changed = []
+        unchanged = []
+        for file_path in project_dir.rglob("*"):
+            if not self._is_syncable(file_path):
+                continue
+            relative = file_path.relative_to(project_dir).as_posix()
+            local = self._local_entry(file_path, relative, state, recorded)
+            if self._unchanged(file_path, local, remote.get(relative)):
+                unchanged.append(relative)
+            else:
+                changed.append((relative, file_path, local))
+
+        with self._state_lock:
+            merged = self._load_state(project_dir)
+            merged.update(state)
+            self._save_state(project_dir, merged)
+
+        return changed, unchanged
+
     async def sync_project_to_gcs(self, user_id: str, project_id: str) -> Dict[str, Any]:
         """
-        Sync entire project to GCS.
+        Sync entire project to GCS, uploading only new or changed files.
 
         Returns summary of synced files.
         """
         if not self.sync_enabled:
             return {"synced": False, "reason": "sync_disabled"}
 
-        project_dir = self.sandbox_root / user_id / project_id
+        project_dir = self._project_dir(user_id, project_id)
         if not project_dir.exists():
             return {"synced": False, "reason": "project_not_found"}
 
-        uploaded = []
-        failed = []
+        try:
+            changed, unchanged = await self._run_blocking(self._plan_upload, user_id, project_id)
+        except Exception as e:
+            logger.error(f"Failed to list project in GCS: {e}")
+            return {"synced": False, "reason": str(e)}
 
-        for file_path in project_dir.rglob("*"):
-            if file_path.is_file() and not file_path.name.startswith("."):
-                relative = file_path.relative_to(project_dir)
-                gcs_path = f"{user_id}/{project_id}/{relative}"
+        self._count("skipped_unchanged", len(unchanged))
+
+        # Largest files first, so they overlap with the many small ones
+        changed.sort(key=lambda item: item[2]["size"], reverse=True)
+        results = await asyncio.gather(*(
+            self.upload_file(str(path), f"{user_id}/{project_id}/{relative}", local["sha256"])
+            for relative, path, local in changed
+        ))
+
+        uploaded = [relative for (relative, _, _), ok in zip(changed, results) if ok]
+        failed = [relative for (relative, _, _), ok in zip(changed, results) if not ok]
 
-                success = await self.upload_file(str(file_path), gcs_path)
-                if success:
-                    uploaded.append(str(relative))
-                else:
-                    failed.append(str(relative))
+        logger.info(
+            f"Synced project {project_id} to GCS: {len(uploaded)} uploaded, "
+            f"{len(unchanged)} unchanged, {len(failed)} failed"
+        )
 
         return {
             "synced": True,
             "uploaded_count": len(uploaded),
+            "skipped_count": len(unchanged),
             "failed_count": len(failed),
             "uploaded": uploaded,
             "failed": failed
         }
 
+    def _plan_download(self, user_id: str, project_id: str) -> Tuple[List[Tuple[str, Path, Dict[str, Any]]], List[str]]:
+        """Remote objects that are missing or different locally (blocking)."""
+        project_dir = self._project_dir(user_id, project_id)
+        remote = self.list_remote_manifest(user_id, project_id)
+        recorded = self._recorded_hashes(project_dir)
+
+        with self._state_lock:
+            state = self._load_state(project_dir)
+
+        changed = []
+        unchanged = []
+        for relative, remote_entry in remote.items():
+            local_path = project_dir / relative
+            if local_path.is_file():
+                local = self._local_entry(local_path, relative, state, recorded)
+                if self._unchanged(local_path, local, remote_entry):
+                    unchanged.append(relative)
+                    continue
+            changed.append((relative, local_path, remote_entry))
+
+        with self._state_lock:
+            merged = self._load_state(project_dir)
+            merged.update(state)
+            self._save_state(project_dir, merged)
+
+        return changed, unchanged
+
+    def record_download(self, project_dir: Path, relative: str, remote: Dict[str, Any]):
+        """Cache the remote hashes for a downloaded file, so the next sync does not re-read it."""
+        if not remote.get("sha256"):
+            return
+        try:
+            st = (project_dir / relative).stat()
+        except OSError:
+            return
+        self._update_state(project_dir, relative, {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": remote["sha256"],
+            "md5": remote.get("md5"),
+        })
+
     async def sync_project_from_gcs(self, user_id: str, project_id: str) -> Dict[str, Any]:
         """
-        Sync entire project from GCS to local.
+        Sync entire project from GCS to local, downloading only missing or changed files.
 
         Useful for Cloud Run cold starts.
         """
@@ -318,26 +697,31 @@ class SandboxSyncManager:
             return {"synced": False, "reason": "sync_disabled"}
 
         try:
-            _, bucket = self._get_gcs_client()
-            prefix = f"{user_id}/{project_id}/"
+            changed, unchanged = await self._run_blocking(self._plan_download, user_id, project_id)
+            self._count("skipped_unchanged", len(unchanged))
+
+            project_dir = self._project_dir(user_id, project_id)
+
+            async def fetch(relative: str, local_path: Path, remote: Dict[str, Any]) -> bool:
+                ok = await self.download_file(f"{user_id}/{project_id}/{relative}", str(local_path), remote)
+                if ok:
+                    await self._run_blocking(self.record_download, project_dir, relative, remote)
+                return ok
 
-            downloaded = []
-            failed = []
+            results = await asyncio.gather(*(fetch(*item) for item in changed))
 
-            blobs = bucket.list_blobs(prefix=prefix)
-            for blob in blobs:
-                relative = blob.name[len(prefix):]
-                local_path = self.sandbox_root / user_id / project_id / relative
+            downloaded = [relative for (relative, _, _), ok in zip(changed, results) if ok]
+            failed = [relative for (relative, _, _), ok in zip(changed, results) if not ok]
 
-                success = await self.download_file(blob.name, str(local_path))
-                if success:
-                    downloaded.append(relative)
-                else:
-                    failed.append(relative)
+            logger.info(
+                f"Synced project {project_id} from GCS: {len(downloaded)} downloaded, "
+                f"{len(unchanged)} unchanged, {len(failed)} failed"
+            )
 
             return {
                 "synced": True,
                 "downloaded_count": len(downloaded),
+                "skipped_count": len(unchanged),
                 "failed_count": len(failed),
                 "downloaded": downloaded,
                 "failed": failed
@@ -349,20 +733,27 @@ class SandboxSyncManager:
 
     # ==================== Cleanup ====================
 
+    def _delete_blocking(self, gcs_path: str):
+        _, bucket = self._get_gcs_client()
+        blob = bucket.blob(gcs_path)
+        if blob.exists():
+            blob.delete()
+            logger.info(f"Deleted from GCS: gs://{self.gcs_bucket}/{gcs_path}")
+
+    def _delete_prefix_blocking(self, prefix: str):
+        _, bucket = self._get_gcs_client()
+        blobs = list(bucket.list_blobs(prefix=prefix))
+        for blob in blobs:
+            blob.delete()
+
     async def delete_from_gcs(self, user_id: str, project_id: str, relative_path: str) -> bool:
         """Delete a file from GCS."""
         if not self.sync_enabled:
             return True
 
         try:
-            _, bucket = self._get_gcs_client()
             gcs_path = f"{user_id}/{project_id}/{relative_path}"
-            blob = bucket.blob(gcs_path)
-
-            if blob.exists():
-                blob.delete()
-                logger.info(f"Deleted from GCS: gs://{self.gcs_bucket}/{gcs_path}")
-
+            await self._run_blocking(self._delete_blocking, gcs_path)
             return True
 
         except Exception as e:
@@ -375,12 +766,8 @@ class SandboxSyncManager:
             return True
 
         try:
-            _, bucket = self._get_gcs_client()
             prefix = f"{user_id}/{project_id}/"
-
-            blobs = bucket.list_blobs(prefix=prefix)
-            for blob in blobs:
-                blob.delete()
+            await self._run_blocking(self._delete_prefix_blocking, prefix)
 
             logger.info(f"Deleted project from GCS: gs://{self.gcs_bucket}/{prefix}")
             return True
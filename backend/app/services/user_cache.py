@@ -0,0 +1,201 @@
+"""
+User Cache - Process-local cache of authenticated user identity and status
+
+Every protected endpoint resolved the caller with
+`SELECT ... FROM users WHERE auth0_id = ...`: one Cloud SQL round trip per
+file listing, message, poll and download. get_or_create_user and
+require_approved_user now read through this cache:
+
+- Values: a detached CachedUser snapshot (id, email, status, is_admin), not a
+  session-bound ORM object, so it can be shared between requests
+- TTL + LRU bounded (performance.user_cache.ttl / size)
+- Concurrent misses for the same auth0_id share one query
+- Admin approve / reject / update invalidate the user's entry; on other
+  workers the TTL bounds how long an old status is served
+- Unknown users are not cached (they may log in and be created any moment)
+- Hit rate and the DB time saved (hits x average lookup time) in /status
+
+All methods run on the event loop; the cache is not shared across threads.
+
+Usage:
+    from app.services.user_cache import get_user_cache
+
+    user = await get_user_cache().get(db, auth0_id)   # CachedUser or None
+    get_user_cache().invalidate(auth0_id)
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import PERFORMANCE_CONFIG
+from app.models import User, UserStatus
+
+logger = logging.getLogger(__name__)
+
+# Result handed to waiters when the request doing the lookup was cancelled
+_RETRY = object()
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """Identity and access status of a user, as needed by endpoint auth checks"""
+
+    id: uuid.UUID
+    auth0_id: str
+    email: str
+    name: Optional[str]
+    status: UserStatus
+    is_admin: bool
+
+    @classmethod
+    def from_model(cls, user: User) -> "CachedUser":
+        return cls(
+            id=user.id,
+            auth0_id=user.auth0_id,
+            email=user.email,
+            name=user.name,
+            status=user.status,
+            is_admin=bool(user.is_admin),
+        )
+
+
+class UserCache:
+    """TTL + LRU cache of CachedUser by auth0_id with miss coalescing"""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        config = config or PERFORMANCE_CONFIG
+        self.enabled = config.get("user_cache_enabled", True)
+        self.ttl = config.get("user_cache_ttl", 30)
+        self.max_size = config.get("user_cache_size", 1024)
+
+        # auth0_id -> (CachedUser, expires_at), least recently used first
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # auth0_id -> future of the lookup in progress
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats = {
+            "hits": 0, "misses": 0, "coalesced": 0, "not_found": 0,
+            "invalidations": 0, "evictions": 0, "expired": 0,
+        }
+        self._lookup_ms_total = 0.0
+
+    async def get(self, db: AsyncSession, auth0_id: str) -> Optional[CachedUser]:
+        """
+        Resolve a user by auth0_id.
+
+        Args:
+            db: Session used if the user has to be loaded
+            auth0_id: The Auth0 user identifier
+
+        Returns:
+            CachedUser, or None if no such user exists
+        """
+        if not self.enabled:
+            return await self._load(db, auth0_id)
+
+        entry = self._entries.get(auth0_id)
+        if entry is not None:
+            user, expires_at = entry
+            if time.monotonic() < expires_at:
+                self._entries.move_to_end(auth0_id)
+                self._stats["hits"] += 1
+                return user
+            del self._entries[auth0_id]
+            self._stats["expired"] += 1
+
+        pending = self._inflight.get(auth0_id)
+        if pending is not None:
+            # shield: a cancelled waiter must not cancel the shared lookup
+            user = await asyncio.shield(pending)
+            if user is not _RETRY:
+                self._stats["coalesced"] += 1
+                return user
+            # The request doing the lookup was cancelled (client went away): do our own
+            return await self.get(db, auth0_id)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[auth0_id] = future
+        self._stats["misses"] += 1
+        try:
+            started = time.perf_counter()
+            user = await self._load(db, auth0_id)
+            self._lookup_ms_total += (time.perf_counter() - started) * 1000
+        except asyncio.CancelledError:
+            # The cancellation is this request's, not the waiters': let them retry
+            future.set_result(_RETRY)
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody else is waiting
+            raise
+        finally:
+            # An invalidate() during the lookup unregisters it: don't store the old row
+            current = self._inflight.get(auth0_id) is future
+            if current:
+                del self._inflight[auth0_id]
+
+        future.set_result(user)
+        if user is None:
+            self._stats["not_found"] += 1
+        elif current:
+            self._store(auth0_id, user)
+        return user
+
+    def invalidate(self, auth0_id: Optional[str]):
+        """Drop a user's entry (after its status or admin flag changed)."""
+        if not auth0_id:
+            return
+        self._entries.pop(auth0_id, None)
+        self._inflight.pop(auth0_id, None)
+        self._stats["invalidations"] += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._inflight.clear()
+
+    async def _load(self, db: AsyncSession, auth0_id: str) -> Optional[CachedUser]:
+        result = await db.execute(select(User).where(User.auth0_id == auth0_id))
+        user = result.scalar_one_or_none()
+        return CachedUser.from_model(user) if user is not None else None
+
+    def _store(self, auth0_id: str, user: CachedUser):
+        self._entries[auth0_id] = (user, time.monotonic() + self.ttl)
+        self._entries.move_to_end(auth0_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        lookups = stats["misses"]
+        served = stats["hits"] + stats["coalesced"]
+        avg_lookup_ms = self._lookup_ms_total / lookups if lookups else 0.0
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            **stats,
+            "hit_rate": round(served / (served + lookups), 3) if served + lookups else 0.0,
+            "avg_lookup_ms": round(avg_lookup_ms, 2),
+            "saved_db_ms": round(served * avg_lookup_ms, 1),
+        }
+
+
+# Global singleton
+_cache: Optional[UserCache] = None
+
+
+def get_user_cache() -> UserCache:
+    """Get the global user cache instance."""
+    global _cache
+    if _cache is None:
+        _cache = UserCache()
+    return _cache
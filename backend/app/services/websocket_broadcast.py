@@ -1,15 +1,180 @@
 """
 WebSocket broadcast service - For sending real-time updates to connected clients with room isolation
+
+Every connection has a bounded outbound queue drained by its own writer
+task, so broadcast() never awaits a socket: one slow client cannot delay
+the other subscribers or the workflow listener that publishes the event.
+
+- Messages are serialized once per broadcast and enqueued per target
+- Messages with a project_id only go to that project's room (no room: nobody)
+- workflow_progress updates of a workflow are coalesced (only the newest is kept)
+- On overflow, queued workflow_token / workflow_progress messages are dropped
+  first; a client that is still behind is disconnected (websocket.slow_consumer_policy)
+- Per-connection metrics: queue depth, send lag, sent / dropped / coalesced
+- Published messages also go to the event backplane (websocket.backplane),
+  so clients connected to other workers receive them too
+- Workflow messages carry a per-workflow seq; each connection skips seqs it
+  already got, so a replay after reconnect and the live stream never duplicate
 """
 
 import json
 import asyncio
 import logging
-from typing import Set, Dict, Any
+import time
+from collections import deque
+from typing import Set, Dict, Any, Optional
 from fastapi import WebSocket
 
+from app.config import WEBSOCKET_CONFIG
+from app.services.event_backplane import EventBackplane, InProcessBackplane, GLOBAL_TOPIC, create_backplane, project_topic
+
 logger = logging.getLogger('labos.websocket')
 
+# Message types that may be dropped when a client falls behind
+LOW_PRIORITY_TYPES = {"workflow_token", "workflow_progress"}
+
+# WebSocket close code for clients that cannot keep up ("try again later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+
+class _Outgoing:
+    """One queued message of a connection"""
+
+    __slots__ = ("payload", "enqueued_at", "low_priority", "coalesce_key")
+
+    def __init__(self, payload: str, low_priority: bool, coalesce_key: Optional[tuple]):
+        self.payload = payload
+        self.enqueued_at = time.monotonic()
+        self.low_priority = low_priority
+        self.coalesce_key = coalesce_key
+
+
+class ConnectionSender:
+    """Bounded outbound queue and writer task of one WebSocket"""
+
+    def __init__(self, broadcaster: "WebSocketBroadcaster", websocket: WebSocket, max_queue: int, send_timeout: float):
+        self.broadcaster = broadcaster
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.queue: deque = deque()
+        self._wakeup = asyncio.Event()
+        self._closed = False
+        self.connected_at = time.time()
+        client = getattr(websocket, "client", None)
+        self.client = f"{client.host}:{client.port}" if client else "unknown"
+        self.stats = {
+            "sent": 0, "bytes": 0, "dropped": 0, "coalesced": 0, "duplicates_skipped": 0, "send_errors": 0,
+            "max_queue_depth": 0, "lag_ms_max": 0.0, "lag_ms_total": 0.0,
+        }
+        self.last_lag_ms = 0.0
+        # workflow_id -> highest seq queued to this client (replay or live)
+        self.workflow_seq: Dict[str, int] = {}
+        self.task = asyncio.create_task(self._run())
+
+    def enqueue(self, payload: str, message_type: str, coalesce_key: Optional[tuple] = None,
+                seq_key: Optional[tuple] = None) -> bool:
+        """Queue a message; returns False if the connection is closed or was dropped as a slow consumer."""
+        if self._closed:
+            return False
+
+        if seq_key is not None:
+            workflow_id, seq = seq_key
+            if seq <= self.workflow_seq.get(workflow_id, 0):
+                # Already sent by a replay
+                self.stats["duplicates_skipped"] += 1
+                return True
+            self.workflow_seq[workflow_id] = seq
+
+        if coalesce_key is not None:
+            for i, item in enumerate(self.queue):
+                if item.coalesce_key == coalesce_key:
+                    # Newer state replaces the queued one, keeping its place in line
+                    self.queue[i] = _Outgoing(payload, item.low_priority, coalesce_key)
+                    self.stats["coalesced"] += 1
+                    return True
+
+        if len(self.queue) >= self.max_queue and not self._make_room():
+            return False
+
+        self.queue.append(_Outgoing(payload, message_type in LOW_PRIORITY_TYPES, coalesce_key))
+        self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], len(self.queue))
+        self._wakeup.set()
+        return True
+
+    def _make_room(self) -> bool:
+        """Free one queue slot: drop the oldest low-priority message, else apply the slow consumer policy."""
+        for i, item in enumerate(self.queue):
+            if item.low_priority:
+                del self.queue[i]
+                self.stats["dropped"] += 1
+                return True
+
+        if self.broadcaster.slow_consumer_policy == "drop_oldest":
+            self.queue.popleft()
+            self.stats["dropped"] += 1
+            return True
+
+        logger.warning(f"⚠️ WebSocket client {self.client} is {len(self.queue)} messages behind, disconnecting")
+        self.broadcaster.stats["slow_consumers_disconnected"] += 1
+        self.stats["dropped"] += len(self.queue)
+        self.broadcaster.disconnect(self.websocket)
+        asyncio.create_task(self._close_socket(SLOW_CONSUMER_CLOSE_CODE))
+        return False
+
+    async def _run(self):
+        """Writer task: send queued messages in order, one socket write at a time."""
+        try:
+            while True:
+                while not self.queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                item = self.queue.popleft()
+                try:
+                    await asyncio.wait_for(self.websocket.send_text(item.payload), timeout=self.send_timeout)
+                except Exception as e:
+                    # Includes send timeouts: the client stopped reading
+                    self.stats["send_errors"] += 1
+                    logger.warning(f"Failed to send to client {self.client}: {type(e).__name__}: {e}")
+                    self.broadcaster.disconnect(self.websocket)
+                    return
+
+                lag_ms = (time.monotonic() - item.enqueued_at) * 1000
+                self.last_lag_ms = lag_ms
+                self.stats["sent"] += 1
+                self.stats["bytes"] += len(item.payload)
+                self.stats["lag_ms_total"] += lag_ms
+                self.stats["lag_ms_max"] = max(self.stats["lag_ms_max"], lag_ms)
+        except asyncio.CancelledError:
+            pass
+
+    async def _close_socket(self, code: int):
+        try:
+            await asyncio.wait_for(self.websocket.close(code=code), timeout=self.send_timeout)
+        except Exception:
+            pass
+
+    def close(self):
+        """Stop the writer task and drop queued messages."""
+        self._closed = True
+        self.queue.clear()
+        if not self.task.done():
+            self.task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        sent = stats.pop("lag_ms_total")
+        stats["lag_ms_avg"] = round(sent / stats["sent"], 2) if stats["sent"] else 0.0
+        stats["lag_ms_max"] = round(stats["lag_ms_max"], 2)
+        stats["lag_ms_last"] = round(self.last_lag_ms, 2)
+        # Age of the oldest unsent message: grows while the client is stalled
+        stats["oldest_pending_ms"] = round((time.monotonic() - self.queue[0].enqueued_at) * 1000, 2) if self.queue else 0.0
+        stats["queue_depth"] = len(self.queue)
+        stats["client"] = self.client
+        stats["connected_seconds"] = round(time.time() - self.connected_at, 1)
+        return stats
+
+
 class WebSocketBroadcaster:
     """WebSocket broadcaster with room-based isolation"""
 
@@ -19,18 +184,55 @@ class WebSocketBroadcaster:
         self.project_rooms: Dict[str, Set[WebSocket]] = {}
         # Map websocket -> set of project_ids it's subscribed to
         self.socket_subscriptions: Dict[WebSocket, Set[str]] = {}
+        # Map websocket -> outbound queue and writer task
+        self.senders: Dict[WebSocket, ConnectionSender] = {}
+        self.send_queue_size = WEBSOCKET_CONFIG.get("send_queue_size", 256)
+        self.send_timeout = WEBSOCKET_CONFIG.get("send_timeout", 10)
+        self.slow_consumer_policy = WEBSOCKET_CONFIG.get("slow_consumer_policy", "disconnect")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.backplane: EventBackplane = InProcessBackplane()
+        self.backplane.set_handler(self._on_remote_message)
+        self.stats = {
+            "broadcasts": 0, "messages_enqueued": 0, "unrouted": 0, "slow_consumers_disconnected": 0,
+            "remote_messages": 0,
+        }
+
+    async def start(self, backplane: Optional[EventBackplane] = None):
+        """
+        Connect this worker to the event backplane (call once at startup).
+
+        Args:
+            backplane: Backplane to use (default: the one selected by websocket.backplane)
+        """
+        self._loop = asyncio.get_running_loop()
+        backplane = backplane or create_backplane()
+        backplane.set_handler(self._on_remote_message)
+        backplane.subscribe(GLOBAL_TOPIC)
+        # Rooms that already have local clients keep receiving remote messages
+        for project_id in self.project_rooms:
+            backplane.subscribe(project_topic(project_id))
+        self.backplane = backplane
+        await backplane.start()
+        logger.info(f"WebSocket broadcaster using {backplane.name} backplane")
+
+    async def stop(self):
+        """Disconnect from the event backplane"""
+        await self.backplane.stop()
 
     async def connect(self, websocket: WebSocket):
         """Add WebSocket connection"""
         # No need to accept again, as websocket_manager has already accepted
+        self._loop = asyncio.get_running_loop()
         self.active_connections.add(websocket)
         self.socket_subscriptions[websocket] = set()
+        self.senders[websocket] = ConnectionSender(self, websocket, self.send_queue_size, self.send_timeout)
         logger.info(f"WebSocket connected. Total connections: {len(self.active_connections)}")
 
     def subscribe_to_project(self, websocket: WebSocket, project_id: str):
         """Subscribe a websocket to a specific project room"""
         if project_id not in self.project_rooms:
             self.project_rooms[project_id] = set()
+            self.backplane.subscribe(project_topic(project_id))
 
         self.project_rooms[project_id].add(websocket)
 
@@ -45,6 +247,7 @@ class WebSocketBroadcaster:
             self.project_rooms[project_id].discard(websocket)
             if not self.project_rooms[project_id]:
                 del self.project_rooms[project_id]
+                self.backplane.unsubscribe(project_topic(project_id))
 
         if websocket in self.socket_subscriptions:
             self.socket_subscriptions[websocket].discard(project_id)
@@ -53,8 +256,14 @@ class WebSocketBroadcaster:
 
     def disconnect(self, websocket: WebSocket):
         """Remove WebSocket connection and clean up all subscriptions"""
+        if websocket not in self.active_connections and websocket not in self.senders:
+            return
         self.active_connections.discard(websocket)
 
+        sender = self.senders.pop(websocket, None)
+        if sender is not None:
+            sender.close()
+
         # Remove from all project rooms
         if websocket in self.socket_subscriptions:
             for project_id in self.socket_subscriptions[websocket]:
@@ -62,23 +271,65 @@ class WebSocketBroadcaster:
                     self.project_rooms[project_id].discard(websocket)
                     if not self.project_rooms[project_id]:
                         del self.project_rooms[project_id]
+                        self.backplane.unsubscribe(project_topic(project_id))
             del self.socket_subscriptions[websocket]
 
         logger.info(f"WebSocket disconnected. Total connections: {len(self.active_connections)}")
-    
-    async def broadcast(self, message: Dict[Any, Any]):
+
+    def send_to(self, websocket: WebSocket, message: Dict[Any, Any]) -> bool:
         """
-        Broadcast message to connected clients
-        - If message has project_id: send only to clients subscribed to that project
-        - Otherwise: send to all connected clients (for backward compatibility)
+        Queue a message for one connection (replies such as pong / subscribed).
+
+        Goes through the connection's writer task, so it never interleaves
+        with broadcast sends on the same socket.
+        """
+        sender = self.senders.get(websocket)
+        if sender is None:
+            return False
+        return sender.enqueue(json.dumps(message), message.get('type', 'unknown'), seq_key=_seq_key(message))
+
+    def publish(self, message: Dict[Any, Any]) -> int:
+        """
+        Serialize a message once, queue it for this worker's target
+        connections and send it to the other workers through the backplane.
+
+        - If message has project_id: only clients subscribed to that project
+        - Otherwise: all connected clients (for backward compatibility)
+
+        Safe to call from other threads (hands off to the event loop).
+
+        Returns:
+            Number of local connections the message was queued for
         """
+        loop = self._loop
+        if loop is not None:
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if running is not loop:
+                loop.call_soon_threadsafe(self.publish, message)
+                return 0
+
+        message_str = json.dumps(message)
+        self.stats["broadcasts"] += 1
+        self.backplane.publish(project_topic(message.get('project_id')), message_str)
+        return self._deliver(message, message_str)
+
+    def _on_remote_message(self, topic: str, payload: str):
+        """Backplane handler: a message published by another worker"""
+        self.stats["remote_messages"] += 1
+        self._deliver(json.loads(payload), payload)
+
+    def _deliver(self, message: Dict[Any, Any], message_str: str) -> int:
+        """Queue an already serialized message for this worker's target connections."""
         message_type = message.get('type', 'unknown')
         project_id = message.get('project_id')
 
         # Determine target connections
-        if project_id and project_id in self.project_rooms:
-            # Send to project room only
-            target_connections = self.project_rooms[project_id]
+        if project_id:
+            # Project messages never leak to other projects' clients
+            target_connections = self.project_rooms.get(project_id, set())
             logger.debug(f"Broadcasting {message_type} to project {project_id} ({len(target_connections)} clients)")
         else:
             # Send to all connections (for messages without project_id)
@@ -86,27 +337,35 @@ class WebSocketBroadcaster:
             logger.debug(f"Broadcasting {message_type} to all connections ({len(target_connections)} clients)")
 
         if not target_connections:
+            self.stats["unrouted"] += 1
             logger.debug(f"No target connections for message type: {message_type}")
-            return
+            return 0
 
-        message_str = json.dumps(message)
-        disconnected = set()
+        coalesce_key = None
+        if message_type == "workflow_progress":
+            coalesce_key = ("workflow_progress", message.get('workflow_id'))
+        seq_key = _seq_key(message)
 
-        for connection in target_connections:
-            try:
-                await connection.send_text(message_str)
-            except Exception as e:
-                logger.warning(f"Failed to send {message_type} to client: {e}")
-                disconnected.add(connection)
-
-        # Clean up disconnected connections
-        if disconnected:
-            for connection in disconnected:
-                self.disconnect(connection)
-            logger.info(f"Cleaned up {len(disconnected)} disconnected clients")
-    
-    async def send_workflow_step(self, workflow_id: str, step_data: Dict[Any, Any], project_id: str = None):
-        """Send workflow step update"""
+        queued = 0
+        # Copy: a slow consumer may be disconnected while enqueueing
+        for connection in list(target_connections):
+            sender = self.senders.get(connection)
+            if sender is not None and sender.enqueue(message_str, message_type, coalesce_key, seq_key):
+                queued += 1
+        self.stats["messages_enqueued"] += queued
+        return queued
+
+    async def broadcast(self, message: Dict[Any, Any]):
+        """
+        Broadcast message to connected clients (queued; never waits for a socket)
+        - If message has project_id: send only to clients subscribed to that project
+        - Otherwise: send to all connected clients (for backward compatibility)
+        """
+        self.publish(message)
+
+    @staticmethod
+    def workflow_step_message(workflow_id: str, step_data: Dict[Any, Any], project_id: str = None) -> Dict[str, Any]:
+        """Build a workflow_step message (live or replayed)"""
         message = {
             "type": "workflow_step",
             "workflow_id": workflow_id,
@@ -119,6 +378,8 @@ class WebSocketBroadcaster:
             "observations": step_data.get("observations", []),
             "timestamp": step_data.get("timestamp")
         }
+        if step_data.get("seq") is not None:
+            message["seq"] = step_data["seq"]
 
         # Include project_id for user isolation
         if project_id:
@@ -129,8 +390,28 @@ class WebSocketBroadcaster:
             message["step_metadata"] = step_data["step_metadata"]
             logger.debug(f"Including step_metadata for workflow {workflow_id}")
 
+        return message
+
+    async def send_workflow_step(self, workflow_id: str, step_data: Dict[Any, Any], project_id: str = None):
+        """Send workflow step update"""
+        await self.broadcast(self.workflow_step_message(workflow_id, step_data, project_id))
+
+    async def send_workflow_token(self, workflow_id: str, token_data: Dict[Any, Any], project_id: str = None):
+        """Send streamed partial LLM output for a running workflow"""
+        message = {
+            "type": "workflow_token",
+            "workflow_id": workflow_id,
+            "stream_id": token_data.get("stream_id"),
+            "delta": token_data.get("delta", ""),
+            "step_number": token_data.get("step_number"),
+            "timestamp": token_data.get("timestamp")
+        }
+        if token_data.get("seq") is not None:
+            message["seq"] = token_data["seq"]
+        if project_id:
+            message["project_id"] = project_id  # Include project_id for user isolation
         await self.broadcast(message)
-    
+
     async def send_workflow_progress(self, workflow_id: str, progress: float, current_step: int = 0, total_steps: int = 0, is_processing: bool = True, project_id: str = None):
         """Send workflow progress update"""
         message = {
@@ -149,5 +430,32 @@ class WebSocketBroadcaster:
         """Get current connection count"""
         return len(self.active_connections)
 
+    def get_stats(self) -> Dict[str, Any]:
+        """Broadcast counters and per-connection queue / lag metrics"""
+        connections = [sender.get_stats() for sender in self.senders.values()]
+        connections.sort(key=lambda c: c["oldest_pending_ms"], reverse=True)
+        return {
+            **self.stats,
+            "connections": len(self.active_connections),
+            "rooms": len(self.project_rooms),
+            "send_queue_size": self.send_queue_size,
+            "slow_consumer_policy": self.slow_consumer_policy,
+            "queued_messages": sum(c["queue_depth"] for c in connections),
+            "dropped": sum(c["dropped"] for c in connections),
+            "coalesced": sum(c["coalesced"] for c in connections),
+            "lag_ms_max": max((c["lag_ms_max"] for c in connections), default=0.0),
+            "backplane": self.backplane.get_stats(),
+            "per_connection": connections,
+        }
+
+def _seq_key(message: Dict[Any, Any]) -> Optional[tuple]:
+    """(workflow_id, seq) of a sequenced workflow message, else None"""
+    seq = message.get('seq')
+    workflow_id = message.get('workflow_id')
+    if seq is None or workflow_id is None:
+        return None
+    return workflow_id, seq
+
+
 # Global broadcaster instance
 websocket_broadcaster = WebSocketBroadcaster()
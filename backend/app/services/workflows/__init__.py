@@ -4,7 +4,7 @@ Workflow Management Module
 This package contains all workflow-related functionality:
 - workflow_service: Core workflow state management
 - workflow_context: Thread-local workflow context
-- workflow_events: Event queue for real-time updates
+- workflow_events: Per-workflow event channels for real-time updates
 - workflow_event_listener: WebSocket event broadcasting
 - workflow_callback: Agent execution callbacks
 - workflow_executor: Core workflow execution logic
@@ -18,6 +18,8 @@ from .workflow_context import (
     set_workflow_context,
     get_workflow_context,
     clear_workflow_context,
+    attach_workflow_context,
+    detach_workflow_context,
     emit_tool_call_event,
     emit_observation_event,
     emit_visualization_event,
@@ -26,10 +28,10 @@ from .workflow_context import (
     check_cancellation,
     WorkflowCancelledException,
 )
-from .workflow_events import workflow_event_queue, WorkflowEvent
+from .workflow_events import workflow_event_queue, WorkflowEvent, WorkflowEventChannel
 from .workflow_callback import create_agent_with_simple_callbacks, agent_aware_callback
 from .workflow_executor import WorkflowExecutor
-from .workflow_database import WorkflowDatabase
+from .workflow_database import WorkflowDatabase, WorkflowStepStreamWriter
 from .workflow_file_manager import WorkflowFileManager
 
 __all__ = [
@@ -44,6 +46,8 @@ __all__ = [
     'set_workflow_context',
     'get_workflow_context',
     'clear_workflow_context',
+    'attach_workflow_context',
+    'detach_workflow_context',
     'emit_tool_call_event',
     'emit_observation_event',
     'emit_visualization_event',
@@ -55,6 +59,7 @@ __all__ = [
     # Events
     'workflow_event_queue',
     'WorkflowEvent',
+    'WorkflowEventChannel',
 
     # Callbacks
     'create_agent_with_simple_callbacks',
@@ -63,5 +68,6 @@ __all__ = [
     # New modules
     'WorkflowExecutor',
     'WorkflowDatabase',
+    'WorkflowStepStreamWriter',
     'WorkflowFileManager',
 ]
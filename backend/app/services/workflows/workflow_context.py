@@ -1,13 +1,16 @@
 """
 Workflow Context Management
-Provides thread-local storage for workflow context, allowing tools to know
+Provides per-execution storage for workflow context, allowing tools to know
 which workflow they're executing in and emit events.
 
-This module uses threading.local() to safely store workflow context per thread,
-avoiding conflicts when multiple workflows execute concurrently.
+This module uses a contextvars.ContextVar to store workflow context, which
+behaves like thread-local storage for worker threads and is additionally
+isolated per asyncio task, avoiding conflicts when multiple workflows execute
+concurrently (in threads or on the same event loop).
 """
 
 import threading
+import contextvars
 import logging
 import re
 from typing import Optional, Dict, Any, List
@@ -40,8 +43,10 @@ def _is_visualization_tool(tool_name: str) -> bool:
     return tool_name in VISUALIZATION_TOOLS
 
 
-# Thread-local storage for workflow context
-_context = threading.local()
+# Workflow context storage (per thread, and per asyncio task)
+_context: contextvars.ContextVar[Optional['WorkflowContext']] = contextvars.ContextVar(
+    'workflow_context', default=None
+)
 
 
 class WorkflowCancelledException(Exception):
@@ -96,7 +101,7 @@ def set_workflow_context(workflow_id: str, step_counter: Dict[str, int], metadat
     if metadata:
         context.metadata.update(metadata)
 
-    _context.workflow_context = context
+    _context.set(context)
     print(f"📝 Workflow context set: {context}")
 
 
@@ -112,7 +117,7 @@ def get_workflow_context() -> Optional[WorkflowContext]:
         if context:
             print(f"I'm in workflow {context.workflow_id}")
     """
-    return getattr(_context, 'workflow_context', None)
+    return _context.get()
 
 
 def clear_workflow_context():
@@ -128,8 +133,8 @@ def clear_workflow_context():
         _cancelled_workflows.discard(context.workflow_id)
         print(f"🧹 Removed workflow {context.workflow_id} from global cancelled set")
     
-    if hasattr(_context, 'workflow_context'):
-        delattr(_context, 'workflow_context')
+    if _context.get() is not None:
+        _context.set(None)
         print(f"🧹 Workflow context cleared")
 
 
@@ -140,7 +145,31 @@ def has_workflow_context() -> bool:
     Returns:
         True if context is set, False otherwise
     """
-    return hasattr(_context, 'workflow_context')
+    return _context.get() is not None
+
+
+def attach_workflow_context(context: Optional[WorkflowContext]):
+    """
+    Attach an existing workflow context to the current thread.
+
+    Used by helper threads (e.g. parallel tool dispatch workers) that run
+    on behalf of a workflow thread. Unlike set_workflow_context(), this
+    shares the same context object, so cancellation flags and step counters
+    stay in sync with the owning thread.
+
+    Args:
+        context: Context captured with get_workflow_context() (None is a no-op)
+    """
+    if context is not None:
+        _context.set(context)
+
+
+def detach_workflow_context():
+    """
+    Detach the workflow context from the current thread without clearing
+    workflow-level state (counterpart of attach_workflow_context()).
+    """
+    _context.set(None)
 
 
 # === Convenience Functions for Emitting Events ===
@@ -622,21 +651,25 @@ def emit_visualization_event(
     filename: str,
     title: str,
     chart_type: str,
-    base64_data: str,
-    tool_name: str = None
+    base64_data: Optional[str] = None,
+    tool_name: str = None,
+    artifact: Optional[Dict[str, Any]] = None
 ) -> bool:
     """
-    Emit a visualization event directly with base64 data.
+    Emit a visualization event directly to the frontend.
 
     This is used by plotting tools to send visualization directly to the frontend
-    without needing file_id-based retrieval.
+    without needing file_id-based retrieval. The image is referenced by its
+    artifact (sha256, URL and a small thumbnail); base64_data is only used
+    when the artifact store was unavailable.
 
     Args:
         filename: Name of the visualization file
         title: Title of the visualization
         chart_type: Type of chart (line, bar, scatter, etc.)
-        base64_data: Full base64-encoded image data (data:image/png;base64,...)
+        base64_data: Full base64-encoded image data (data:image/png;base64,...), fallback only
         tool_name: Optional name of the tool that created this
+        artifact: Artifact reference from app.services.artifact_store
 
     Returns:
         True if event was emitted successfully
@@ -646,16 +679,22 @@ def emit_visualization_event(
         print(f"⚠️ Cannot emit visualization event: No workflow context available")
         return False
 
-    # Prepare visualization metadata with base64 for direct display
-    visualization_metadata = {
-        'visualizations': [{
-            "type": "chart",
-            "chart_type": chart_type,
-            "title": title,
-            "filename": filename,
-            "base64": base64_data  # Full base64 for direct rendering
-        }]
+    visualization = {
+        "type": "chart",
+        "chart_type": chart_type,
+        "title": title,
+        "filename": filename,
     }
+    if artifact:
+        visualization.update({
+            "sha256": artifact["sha256"],
+            "artifact_url": artifact["url"],
+            "size": artifact.get("size"),
+            "thumbnail": artifact.get("thumbnail"),
+        })
+    else:
+        visualization["base64"] = base64_data  # Full base64 for direct rendering
+    visualization_metadata = {'visualizations': [visualization]}
 
     event = WorkflowEvent(
         workflow_id=context.workflow_id,
@@ -669,7 +708,10 @@ def emit_visualization_event(
     )
 
     workflow_event_queue.put(event)
-    print(f"📤 Emitted visualization event: {filename} with base64 data ({len(base64_data)} chars)")
+    if artifact:
+        print(f"📤 Emitted visualization event: {filename} -> artifact {artifact['sha256'][:12]} ({artifact.get('size')} bytes)")
+    else:
+        print(f"📤 Emitted visualization event: {filename} with base64 data ({len(base64_data or '')} chars)")
 
     return True
 
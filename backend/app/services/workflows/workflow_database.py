@@ -5,14 +5,20 @@ executions, and chat messages.
 
 This module extracts database operations from labos_service.py to provide
 a clean interface for workflow persistence.
+
+Workflow steps are written in bulk: the WorkflowExecution is resolved once
+and all step rows go out as one executemany INSERT in a single transaction.
+WorkflowStepStreamWriter flushes micro-batches while the agent is running.
 """
 
-from typing import Dict, Optional
+import asyncio
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 import uuid
 import logging
 
 from app.core.infrastructure.database import AsyncSessionLocal
+from app.config import PERFORMANCE_CONFIG
 
 logger = logging.getLogger(__name__)
 from app.models import (
@@ -23,7 +29,59 @@ from app.models import (
     StepStatus,
     WorkflowStatus
 )
-from sqlalchemy import select
+from sqlalchemy import select, insert
+
+
+def _enum_str(value: Any) -> str:
+    """Convert enum values (or 'StepType.THINKING' strings) to plain strings"""
+    if hasattr(value, 'value'):
+        return value.value
+    return str(value).split('.')[-1].lower() if '.' in str(value) else str(value)
+
+
+def _step_row(execution_id: uuid.UUID, step: Any, step_index: int, now: datetime) -> Dict[str, Any]:
+    """
+    Build the column values of one workflow_steps row.
+
+    Accepts WorkflowStep-like objects as well as the step dicts collected by
+    LangChainWebSocketCallback (which use 'step_type' instead of 'type').
+    """
+    if isinstance(step, dict):
+        get = step.get
+        step_type = step.get('step_type', step.get('type', 'unknown'))
+    else:
+        get = lambda key, default=None: getattr(step, key, default)
+        step_type = get('type', 'unknown')
+
+    step_status = _enum_str(get('status', 'completed') or 'completed')
+    step_tool_result = get('tool_result')
+    if step_tool_result and not isinstance(step_tool_result, str):
+        step_tool_result = str(step_tool_result)
+
+    return {
+        'execution_id': execution_id,
+        'step_index': step_index,
+        'type': _enum_str(step_type),
+        'title': get('title', 'Untitled Step'),
+        'description': get('description', ''),
+        'status': StepStatus.COMPLETED if step_status == 'completed' else StepStatus.FAILED,
+        'tool_name': get('tool_name'),
+        'tool_result': step_tool_result,
+        'agent_name': get('agent_name'),
+        'agent_task': get('agent_task'),
+        'step_metadata': get('step_metadata'),
+        'started_at': now,
+        'completed_at': now,
+    }
+
+
+async def _find_execution_id(db, session_id: str, workflow_id: str) -> Optional[uuid.UUID]:
+    query = select(WorkflowExecution.id).where(
+        WorkflowExecution.session_id == uuid.UUID(session_id),
+        WorkflowExecution.workflow_id == workflow_id
+    )
+    result = await db.execute(query)
+    return result.scalars().first()
 
 
 class WorkflowDatabase:
@@ -46,10 +104,13 @@ class WorkflowDatabase:
         """
         Save individual workflow step to database.
 
+        Prefer save_workflow_steps_batch() when several steps are available:
+        this opens a session and looks up the execution for every call.
+
         Args:
             session_id: Session identifier
             workflow_id: Workflow identifier
-            step: WorkflowStep object to save
+            step: WorkflowStep object (or collected step dict) to save
             step_index: Sequential step number (1, 2, 3, ...)
 
         Returns:
@@ -57,71 +118,72 @@ class WorkflowDatabase:
         """
         try:
             async with AsyncSessionLocal() as db:
-                # Find the workflow execution
-                query = select(WorkflowExecution).where(
-                    WorkflowExecution.session_id == uuid.UUID(session_id),
-                    WorkflowExecution.workflow_id == workflow_id
-                )
-                result = await db.execute(query)
-                workflow_execution = result.scalar_one_or_none()
-
-                if not workflow_execution:
+                execution_id = await _find_execution_id(db, session_id, workflow_id)
+                if not execution_id:
                     logger.warning(f"No workflow execution found for {workflow_id}")
                     return False
 
-                # Extract step information (matching Stella schema)
-                step_type = getattr(step, 'type', 'unknown')
-                step_title = getattr(step, 'title', 'Untitled Step')
-                step_description = getattr(step, 'description', '')
-                step_status = getattr(step, 'status', 'completed')
-                step_tool_name = getattr(step, 'tool_name', None)
-                step_tool_result = getattr(step, 'tool_result', None)
-
-                # Extract agent-aware fields
-                step_agent_name = getattr(step, 'agent_name', None)
-                step_agent_task = getattr(step, 'agent_task', None)
-                step_metadata = getattr(step, 'step_metadata', None)
-
-                # Convert enum values to strings
-                if hasattr(step_type, 'value'):
-                    step_type = step_type.value
-                else:
-                    step_type = str(step_type).split('.')[-1].lower() if '.' in str(step_type) else str(step_type)
-
-                if hasattr(step_status, 'value'):
-                    step_status = step_status.value
-                else:
-                    step_status = str(step_status).split('.')[-1].lower() if '.' in str(step_status) else str(step_status)
-
-                if step_tool_result and not isinstance(step_tool_result, str):
-                    step_tool_result = str(step_tool_result)
-
-                # Create database workflow step
-                workflow_step = DBWorkflowStep(
-                    execution_id=workflow_execution.id,
-                    step_index=step_index,
-                    type=step_type,
-                    title=step_title,
-                    description=step_description,
-                    status=StepStatus.COMPLETED if step_status == 'completed' else StepStatus.FAILED,
-                    tool_name=step_tool_name,
-                    tool_result=step_tool_result,
-                    agent_name=step_agent_name,
-                    agent_task=step_agent_task,
-                    step_metadata=step_metadata,
-                    started_at=datetime.now(),
-                    completed_at=datetime.now()
-                )
-                db.add(workflow_step)
+                row = _step_row(execution_id, step, step_index, datetime.now())
+                db.add(DBWorkflowStep(**row))
                 await db.commit()
 
-                logger.debug(f"Saved workflow step {step_index} to database: {step_title}")
+                logger.debug(f"Saved workflow step {step_index} to database: {row['title']}")
                 return True
 
         except Exception as e:
             logger.exception(f"Error saving workflow step to database: {e}")
             return False
 
+    @staticmethod
+    async def create_running_execution(session_id: str, workflow_id: str) -> Optional[uuid.UUID]:
+        """
+        Create the WorkflowExecution of a workflow that is still running.
+
+        Used by WorkflowStepStreamWriter so steps can be persisted before the
+        final response exists; save_response_to_project() completes the row.
+
+        Returns:
+            Execution ID, or None on failure
+        """
+        try:
+            async with AsyncSessionLocal() as db:
+                execution_id = await _find_execution_id(db, session_id, workflow_id)
+                if execution_id:
+                    return execution_id
+
+                workflow_execution = WorkflowExecution(
+                    session_id=uuid.UUID(session_id),
+                    workflow_id=workflow_id,
+                    status=WorkflowStatus.RUNNING,
+                    started_at=datetime.now()
+                )
+                db.add(workflow_execution)
+                await db.commit()
+                return workflow_execution.id
+
+        except Exception as e:
+            logger.exception(f"Error creating running workflow execution: {e}")
+            return None
+
+    @staticmethod
+    async def mark_execution_failed(session_id: str, workflow_id: str, error: str) -> None:
+        """Close a running WorkflowExecution after the agent failed"""
+        try:
+            async with AsyncSessionLocal() as db:
+                query = select(WorkflowExecution).where(
+                    WorkflowExecution.session_id == uuid.UUID(session_id),
+                    WorkflowExecution.workflow_id == workflow_id,
+                    WorkflowExecution.status == WorkflowStatus.RUNNING
+                )
+                result = await db.execute(query)
+                for workflow_execution in result.scalars():
+                    workflow_execution.status = WorkflowStatus.FAILED
+                    workflow_execution.completed_at = datetime.now()
+                    workflow_execution.result = {"error": error}
+                await db.commit()
+        except Exception as e:
+            logger.exception(f"Error marking workflow execution failed: {e}")
+
     @staticmethod
     async def save_response_to_project(
         session_id: str,
@@ -153,18 +215,26 @@ class WorkflowDatabase:
                 await db.commit()
                 await db.refresh(assistant_message)
 
-                # Create workflow execution record
-                workflow_execution = WorkflowExecution(
-                    session_id=uuid.UUID(session_id),
-                    message_id=assistant_message.id,
-                    workflow_id=workflow_id,
-                    status=WorkflowStatus.COMPLETED,
-                    started_at=datetime.now(),
-                    completed_at=datetime.now(),
-                    result=response
+                # Complete the execution created by a streaming step writer,
+                # or create the workflow execution record
+                query = select(WorkflowExecution).where(
+                    WorkflowExecution.session_id == uuid.UUID(session_id),
+                    WorkflowExecution.workflow_id == workflow_id
                 )
+                workflow_execution = (await db.execute(query)).scalars().first()
+                if workflow_execution is None:
+                    workflow_execution = WorkflowExecution(
+                        session_id=uuid.UUID(session_id),
+                        workflow_id=workflow_id,
+                        started_at=datetime.now()
+                    )
+                    db.add(workflow_execution)
+
+                workflow_execution.message_id = assistant_message.id
+                workflow_execution.status = WorkflowStatus.COMPLETED
+                workflow_execution.completed_at = datetime.now()
+                workflow_execution.result = response
 
-                db.add(workflow_execution)
                 await db.commit()
                 await db.refresh(workflow_execution)
 
@@ -179,31 +249,152 @@ class WorkflowDatabase:
     async def save_workflow_steps_batch(
         session_id: str,
         workflow_id: str,
-        steps: list
+        steps: list,
+        start_index: int = 1,
+        execution_id: Optional[Any] = None
     ) -> int:
         """
-        Save multiple workflow steps to database in batch.
+        Save multiple workflow steps to database in one transaction.
+
+        The execution is resolved once and all rows are written with a single
+        executemany INSERT, so a workflow costs one round-trip per batch
+        instead of a session, a lookup and a commit per step.
 
         Args:
             session_id: Session identifier
             workflow_id: Workflow identifier
-            steps: List of WorkflowStep objects
+            steps: WorkflowStep objects or collected step dicts
+            start_index: step_index of the first step (sequential after that)
+            execution_id: Known WorkflowExecution ID (skips the lookup)
 
         Returns:
-            Number of steps successfully saved
+            Number of steps saved (0 if the batch failed and was rolled back)
         """
-        saved_count = 0
-        for i, step in enumerate(steps):
-            success = await WorkflowDatabase.save_workflow_step(
-                session_id=session_id,
-                workflow_id=workflow_id,
-                step=step,
-                step_index=i + 1  # Sequential numbering (1, 2, 3, ...)
+        if not steps:
+            return 0
+
+        try:
+            async with AsyncSessionLocal() as db:
+                if execution_id is None:
+                    execution_id = await _find_execution_id(db, session_id, workflow_id)
+                    if not execution_id:
+                        logger.warning(f"No workflow execution found for {workflow_id}")
+                        return 0
+                elif isinstance(execution_id, str):
+                    execution_id = uuid.UUID(execution_id)
+
+                now = datetime.now()
+                rows = [
+                    _step_row(execution_id, step, start_index + i, now)
+                    for i, step in enumerate(steps)
+                ]
+                await db.execute(insert(DBWorkflowStep), rows)
+                await db.commit()
+
+            logger.info(f"Saved {len(rows)} workflow steps to database")
+            return len(rows)
+
+        except Exception as e:
+            logger.exception(f"Error saving workflow steps batch to database: {e}")
+            return 0
+
+
+class WorkflowStepStreamWriter:
+    """
+    Persists workflow steps in micro-batches while the agent is running.
+
+    Watches a growing step list (LangChainWebSocketCallback.collected_steps)
+    and writes new entries every flush_interval seconds or as soon as
+    flush_size steps are pending. A RUNNING WorkflowExecution is created up
+    front, so partial progress survives a crash of the worker.
+
+    Usage:
+        writer = WorkflowStepStreamWriter(session_id, workflow_id, ws_callback.collected_steps)
+        await writer.start()
+        ...  # agent runs, steps are appended
+        await writer.close()  # final flush
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        workflow_id: str,
+        steps: List[Any],
+        flush_size: Optional[int] = None,
+        flush_interval: Optional[float] = None
+    ):
+        self.session_id = session_id
+        self.workflow_id = workflow_id
+        self.steps = steps
+        self.flush_size = flush_size or PERFORMANCE_CONFIG.get("workflow_step_flush_size", 20)
+        self.flush_interval = flush_interval or PERFORMANCE_CONFIG.get("workflow_step_flush_interval", 2.0)
+        self.execution_id: Optional[uuid.UUID] = None
+        self.written = 0
+        self.flushes = 0
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+    async def start(self) -> bool:
+        """Create the running execution and start the background flusher"""
+        self.execution_id = await WorkflowDatabase.create_running_execution(self.session_id, self.workflow_id)
+        if self.execution_id is None:
+            return False
+        self._task = asyncio.create_task(self._run())
+        return True
+
+    async def _run(self):
+        poll = min(self.flush_interval, 0.25)
+        last_flush = asyncio.get_running_loop().time()
+        while True:
+            await asyncio.sleep(poll)
+            now = asyncio.get_running_loop().time()
+            pending = len(self.steps) - self.written
+            if pending >= self.flush_size or (pending and now - last_flush >= self.flush_interval):
+                # Shielded: close() must not cancel a batch halfway through its commit
+                await asyncio.shield(self.flush())
+                last_flush = now
+
+    async def flush(self) -> int:
+        """Write the steps appended since the last flush"""
+        async with self._flush_lock:
+            if self.execution_id is None:
+                return 0
+            pending = list(self.steps[self.written:])
+            if not pending:
+                return 0
+            saved = await WorkflowDatabase.save_workflow_steps_batch(
+                self.session_id,
+                self.workflow_id,
+                pending,
+                start_index=self.written + 1,
+                execution_id=self.execution_id
             )
-            if success:
-                saved_count += 1
+            if saved:
+                self.written += saved
+                self.flushes += 1
+            return saved
 
-        if saved_count > 0:
-            logger.info(f"Saved {saved_count}/{len(steps)} workflow steps to database")
+    async def close(self, error: Optional[str] = None) -> int:
+        """
+        Stop the flusher and write the remaining steps.
 
-        return saved_count
+        Args:
+            error: Agent error; marks the running execution as failed
+
+        Returns:
+            Total number of steps written
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        await self.flush()
+        if error is not None:
+            await WorkflowDatabase.mark_execution_failed(self.session_id, self.workflow_id, error)
+
+        logger.info(f"Streamed {self.written} workflow steps in {self.flushes} batches for {self.workflow_id}")
+        return self.written
@@ -11,14 +11,17 @@ import asyncio
 from typing import Optional
 from datetime import datetime
 
-from .workflow_events import workflow_event_queue, WorkflowEvent
+from .workflow_events import workflow_event_queue, WorkflowEvent, WorkflowEventChannel
 from app.services.websocket_broadcast import websocket_broadcaster
 
 
 class WorkflowEventListener:
     """
-    Async listener that monitors the event queue and broadcasts to WebSocket.
-    
+    Async listener that drains a workflow's event channel and broadcasts to WebSocket.
+
+    The listener sleeps until its channel signals new events (no polling),
+    then processes everything buffered in one batch.
+
     Usage:
         listener = WorkflowEventListener(workflow_id)
         task = asyncio.create_task(listener.start())
@@ -27,60 +30,63 @@ class WorkflowEventListener:
         await task
     """
     
-    def __init__(self, workflow_id: str, project_id: str = None, poll_interval: float = 0.1):
+    def __init__(self, workflow_id: str, project_id: str = None, max_batch_size: Optional[int] = None):
         """
         Initialize event listener for a specific workflow.
 
         Args:
             workflow_id: Workflow to listen for
             project_id: Project ID for user isolation (optional)
-            poll_interval: How often to check queue (seconds, default 0.1)
+            max_batch_size: Maximum events drained per wake-up (default: all buffered)
         """
         self.workflow_id = workflow_id
         self.project_id = project_id  # CRITICAL: Store project_id for user isolation
-        self.poll_interval = poll_interval
+        self.max_batch_size = max_batch_size
         self._is_running = False
-        self._stop_event = asyncio.Event()
+        self._stop_requested = False
+        self._channel: Optional[WorkflowEventChannel] = None
 
         # Statistics
         self.events_processed = 0
         self.events_broadcasted = 0
         self.events_failed = 0
+        self.batches_processed = 0
     
     async def start(self):
         """
-        Start listening to the event queue.
+        Start listening to the workflow's event channel.
         
-        This runs in a loop until stop() is called.
+        This runs until stop() is called or the workflow is unregistered,
+        delivering any events still buffered before exiting.
         Should be run as an asyncio task.
         """
         self._is_running = True
-        self._stop_event.clear()
+        self._stop_requested = False
+
+        channel = workflow_event_queue.get_channel(self.workflow_id)
+        if channel is None:
+            print(f"📡 Workflow not registered, listener not started: {self.workflow_id}")
+            self._is_running = False
+            return
+
+        self._channel = channel
+        channel.attach(asyncio.get_running_loop())
         
         print(f"📡 Event listener started for workflow: {self.workflow_id}")
         
         try:
-            while not self._stop_event.is_set():
-                # Check if workflow is still active
-                if not workflow_event_queue.is_active(self.workflow_id):
-                    print(f"📡 Workflow inactive, stopping listener: {self.workflow_id}")
+            while True:
+                batch = channel.drain(self.max_batch_size)
+                if batch:
+                    self.batches_processed += 1
+                    for event in batch:
+                        await self._process_event(event)
+                    continue
+
+                if self._stop_requested or channel.closed:
                     break
-                
-                # Get event from queue (non-blocking)
-                event = workflow_event_queue.get_nowait()
-                
-                if event and event.workflow_id == self.workflow_id:
-                    await self._process_event(event)
-                
-                # Small delay to avoid busy waiting
-                try:
-                    await asyncio.wait_for(
-                        self._stop_event.wait(),
-                        timeout=self.poll_interval
-                    )
-                except asyncio.TimeoutError:
-                    # Timeout is expected, continue loop
-                    pass
+
+                await channel.wait()
         
         except asyncio.CancelledError:
             print(f"📡 Event listener cancelled for workflow: {self.workflow_id}")
@@ -95,7 +101,9 @@ class WorkflowEventListener:
             print(f"📡 Event listener stopped for workflow: {self.workflow_id}")
             print(f"   Stats: {self.events_processed} processed, "
                   f"{self.events_broadcasted} broadcasted, "
-                  f"{self.events_failed} failed")
+                  f"{self.events_failed} failed, "
+                  f"{self.batches_processed} batches, "
+                  f"{channel.events_dropped} dropped")
     
     async def _process_event(self, event: WorkflowEvent):
         """
@@ -109,6 +117,16 @@ class WorkflowEventListener:
         try:
             # Convert event to WebSocket message format
             message = event.to_dict()
+
+            # Streamed LLM tokens go out as lightweight workflow_token messages
+            if event.event_type == "token":
+                await websocket_broadcaster.send_workflow_token(
+                    self.workflow_id,
+                    message,
+                    project_id=self.project_id
+                )
+                self.events_broadcasted += 1
+                return
             
             # Broadcast via WebSocket with project_id for user isolation
             await websocket_broadcaster.send_workflow_step(
@@ -139,7 +157,9 @@ class WorkflowEventListener:
         Call this when the Agent completes or errors.
         The listener will finish processing remaining events and exit.
         """
-        self._stop_event.set()
+        self._stop_requested = True
+        if self._channel is not None:
+            self._channel.wake()
         print(f"🛑 Stop signal sent to listener: {self.workflow_id}")
     
     def is_running(self) -> bool:
@@ -179,7 +199,7 @@ async def stop_workflow_listener(task: asyncio.Task, grace_period: float = 0.5):
     
     Args:
         task: The task returned by start_workflow_listener()
-        grace_period: Time to wait for remaining events (seconds)
+        grace_period: Maximum time to wait for remaining events (seconds)
     
     Example:
         task = await start_workflow_listener(workflow_id)
@@ -193,8 +213,8 @@ async def stop_workflow_listener(task: asyncio.Task, grace_period: float = 0.5):
     if hasattr(task, 'listener'):
         task.listener.stop()
     
-    # Give it time to process remaining events
-    await asyncio.sleep(grace_period)
+    # Wait for the listener to drain remaining events (returns as soon as it exits)
+    await asyncio.wait({task}, timeout=grace_period)
     
     # Cancel if still running
     if not task.done():
@@ -1,17 +1,23 @@
 """
 Workflow Event System
-Provides thread-safe event queue for real-time workflow updates with rich media support.
+Provides thread-safe, per-workflow event channels for real-time workflow updates
+with rich media support.
 
 This module enables:
 - Real-time step-by-step progress visibility
 - Rich media artifacts (images, code, data, tables)
 - Thread-safe communication between Agent threads and WebSocket broadcasts
+- Isolation between concurrent workflows (one bounded buffer per workflow)
+- Resumable streams: every event gets a per-workflow sequence number and is
+  kept in a bounded replay ring, so a reconnecting client can fetch what it
+  missed (replay(workflow_id, last_seq)) instead of reloading the page
 """
 
 from dataclasses import dataclass, asdict
-from typing import Literal, Optional, Dict, Any, List
+from typing import Literal, Optional, Dict, Any, List, Tuple
 from datetime import datetime
-import queue
+from collections import deque, OrderedDict
+import asyncio
 import threading
 
 
@@ -60,13 +66,14 @@ class WorkflowEvent:
     workflow_id: str
     """Unique identifier for the workflow this event belongs to"""
     
-    event_type: Literal["step", "artifact", "tool_call", "agent_call", "observation"]
+    event_type: Literal["step", "artifact", "tool_call", "agent_call", "observation", "token"]
     """Type of event:
     - step: General progress step
     - artifact: Rich media content (code, image, data)
     - tool_call: Tool execution started
     - agent_call: Agent execution started
     - observation: Tool execution result
+    - token: Partial LLM output (streamed, not persisted)
     """
     
     timestamp: datetime
@@ -129,6 +136,17 @@ class WorkflowEvent:
     
     step_metadata: Optional[Dict[str, Any]] = None
     """Extended metadata for visualizations, code blocks, etc."""
+
+    # === Token Streaming ===
+    delta: Optional[str] = None
+    """Partial LLM text for token events (appended by the frontend)"""
+
+    stream_id: Optional[str] = None
+    """Identifies the LLM call a token event belongs to (LangChain run_id)"""
+
+    # === Resumable Streams ===
+    seq: Optional[int] = None
+    """Monotonic per-workflow sequence number, assigned when the event is buffered"""
     
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -137,6 +155,17 @@ class WorkflowEvent:
         Returns:
             Dictionary with all event data, ready for JSON serialization
         """
+        if self.event_type == "token":
+            return {
+                "type": "workflow_token",
+                "workflow_id": self.workflow_id,
+                "step_number": self.step_number,
+                "stream_id": self.stream_id,
+                "delta": self.delta or "",
+                "timestamp": self.timestamp.isoformat(),
+                "seq": self.seq,
+            }
+
         # Map event_type to step_type for frontend
         step_type_mapping = {
             "tool_call": "tool_execution",
@@ -154,6 +183,7 @@ class WorkflowEvent:
             "title": self.title,
             "description": self.description,
             "timestamp": self.timestamp.isoformat(),
+            "seq": self.seq,
         }
         
         # Add artifact information if present
@@ -197,162 +227,475 @@ class WorkflowEvent:
         return " ".join(parts) + ")"
 
 
+class WorkflowEventChannel:
+    """
+    Bounded, thread-safe event buffer for a single workflow.
+
+    Producers (Agent threads or the event loop itself) call put(); a single
+    async consumer attaches to an event loop and is woken through
+    loop.call_soon_threadsafe() as soon as events arrive, then drains the
+    whole buffer in one batch. There is no polling.
+
+    Backpressure:
+        - put(block=False): when the buffer is full the event is dropped and
+          counted in events_dropped (never raises into the Agent thread)
+        - put(block=True, timeout=...): waits for the consumer to make room,
+          and drops only if the timeout expires
+
+    Replay:
+        Every accepted event gets the next sequence number (event.seq). The
+        last replay_size non-token events stay in a ring after delivery;
+        token deltas are not kept, the step that follows carries the full text.
+    """
+
+    def __init__(self, workflow_id: str, maxsize: int = 1000, replay_size: int = 500):
+        """
+        Initialize channel.
+
+        Args:
+            workflow_id: Workflow this channel belongs to
+            maxsize: Maximum number of buffered (undelivered) events
+            replay_size: Number of recent events kept for replay()
+        """
+        self.workflow_id = workflow_id
+        self.maxsize = maxsize
+
+        self._buffer: deque = deque()
+        self._history: deque = deque(maxlen=replay_size)
+        self._seq = 0
+        # Highest seq pushed out of the ring; a replay from below it has a hole
+        self._evicted_seq = 0
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+
+        # Consumer side (bound by attach())
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiter: Optional[asyncio.Event] = None
+        self._wake_pending = False
+        self._closed = False
+
+        # Statistics
+        self.events_enqueued = 0
+        self.events_delivered = 0
+        self.events_dropped = 0
+        self.high_water_mark = 0
+
+    def attach(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """
+        Bind the consumer side of the channel to an event loop.
+
+        Must be called from the loop that will await wait().
+
+        Args:
+            loop: Event loop of the consumer (default: running loop)
+        """
+        loop = loop or asyncio.get_running_loop()
+        with self._lock:
+            self._loop = loop
+            self._waiter = asyncio.Event()
+            self._wake_pending = False
+            if self._buffer or self._closed:
+                self._waiter.set()
+
+    def put(self, event: WorkflowEvent, block: bool = False, timeout: Optional[float] = None) -> bool:
+        """
+        Add an event to the channel (thread-safe).
+
+        Args:
+            event: WorkflowEvent to add
+            block: If True, wait for free space instead of dropping immediately
+            timeout: Maximum wait in seconds when blocking (None = wait forever)
+
+        Returns:
+            True if the event was buffered, False if it was dropped
+        """
+        with self._not_full:
+            if self._closed:
+                self.events_dropped += 1
+                return False
+
+            if len(self._buffer) >= self.maxsize and block:
+                self._not_full.wait_for(
+                    lambda: len(self._buffer) < self.maxsize or self._closed,
+                    timeout=timeout
+                )
+
+            if self._closed or len(self._buffer) >= self.maxsize:
+                self.events_dropped += 1
+                return False
+
+            self._seq += 1
+            event.seq = self._seq
+            if event.event_type != "token":
+                if len(self._history) == self._history.maxlen:
+                    self._evicted_seq = self._history[0].seq
+                self._history.append(event)
+
+            self._buffer.append(event)
+            self.events_enqueued += 1
+            self.high_water_mark = max(self.high_water_mark, len(self._buffer))
+            self._schedule_wake_locked()
+        return True
+
+    def drain(self, max_items: Optional[int] = None) -> List[WorkflowEvent]:
+        """
+        Remove and return buffered events in arrival order.
+
+        Args:
+            max_items: Optional cap on batch size (default: everything buffered)
+
+        Returns:
+            List of events (possibly empty)
+        """
+        with self._not_full:
+            if max_items is None or max_items >= len(self._buffer):
+                batch = list(self._buffer)
+                self._buffer.clear()
+            else:
+                batch = [self._buffer.popleft() for _ in range(max_items)]
+
+            self.events_delivered += len(batch)
+            if self._waiter is not None and not self._buffer and not self._closed:
+                self._waiter.clear()
+            if batch:
+                self._not_full.notify_all()
+        return batch
+
+    def replay(self, last_seq: int) -> Tuple[List[WorkflowEvent], bool]:
+        """
+        Get the retained events after last_seq, in order.
+
+        Args:
+            last_seq: Highest sequence number the client has seen (0 = none)
+
+        Returns:
+            (events, complete) - complete is False when part of the gap has
+            already left the ring and the client must reload instead
+        """
+        with self._lock:
+            events = [event for event in self._history if event.seq > last_seq]
+            return events, last_seq >= self._evicted_seq
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the newest event"""
+        return self._seq
+
+    async def wait(self):
+        """Wait until events are available, or the channel is woken/closed."""
+        if self._waiter is None:
+            self.attach()
+        await self._waiter.wait()
+
+    def wake(self):
+        """Wake the consumer without adding an event (e.g. stop request)."""
+        with self._lock:
+            self._schedule_wake_locked()
+
+    def close(self):
+        """
+        Close the channel: further puts are dropped, blocked producers are
+        released, and the consumer is woken to drain what is left.
+        """
+        with self._not_full:
+            self._closed = True
+            self._not_full.notify_all()
+            self._schedule_wake_locked()
+
+    @property
+    def closed(self) -> bool:
+        """True once close() has been called"""
+        return self._closed
+
+    def qsize(self) -> int:
+        """Number of buffered events"""
+        with self._lock:
+            return len(self._buffer)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get channel statistics.
+
+        Returns:
+            Dictionary with channel stats
+        """
+        with self._lock:
+            return {
+                "workflow_id": self.workflow_id,
+                "queue_size": len(self._buffer),
+                "maxsize": self.maxsize,
+                "events_enqueued": self.events_enqueued,
+                "events_delivered": self.events_delivered,
+                "events_dropped": self.events_dropped,
+                "high_water_mark": self.high_water_mark,
+                "last_seq": self._seq,
+                "replay_buffered": len(self._history),
+                "closed": self._closed,
+            }
+
+    def _schedule_wake_locked(self):
+        """Set the consumer's asyncio.Event from any thread. Caller holds _lock."""
+        loop, waiter = self._loop, self._waiter
+        if loop is None or waiter is None or self._wake_pending:
+            return
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is loop:
+            waiter.set()
+            return
+
+        self._wake_pending = True
+        try:
+            loop.call_soon_threadsafe(self._set_waiter)
+        except RuntimeError:
+            # Consumer loop already closed; nothing left to wake
+            self._wake_pending = False
+
+    def _set_waiter(self):
+        """Runs on the consumer loop."""
+        with self._lock:
+            self._wake_pending = False
+            if self._waiter is not None:
+                self._waiter.set()
+
+
 class WorkflowEventQueue:
     """
-    Thread-safe event queue for workflow updates.
-    
-    This class manages a global queue of workflow events, allowing:
-    - Agent threads to put events (thread-safe)
-    - Async event listener to get events (non-blocking)
+    Registry of per-workflow event channels.
+
+    Each registered workflow gets its own bounded WorkflowEventChannel, so
+    concurrent workflows never compete for (or discard) each other's events:
+    - Agent threads put events (thread-safe, never raises on overflow)
+    - The workflow's async listener is woken on arrival and drains batches
     - Workflow lifecycle management (register/unregister)
-    
+
     Usage:
         # In Agent thread (synchronous)
         event = WorkflowEvent(...)
         workflow_event_queue.put(event)
-        
+
         # In async listener
-        event = workflow_event_queue.get_nowait()
-        if event:
+        channel = workflow_event_queue.get_channel(workflow_id)
+        channel.attach()
+        await channel.wait()
+        for event in channel.drain():
             await broadcast_to_websocket(event)
     """
-    
-    def __init__(self, maxsize: int = 1000):
+
+    def __init__(self, maxsize: int = 1000, replay_size: int = 500, retain_finished: int = 50):
         """
-        Initialize event queue.
-        
+        Initialize the channel registry.
+
         Args:
-            maxsize: Maximum queue size (default 1000 events)
+            maxsize: Maximum buffered events per workflow (default 1000 events)
                     Prevents memory issues with long-running workflows
+            replay_size: Events kept per workflow for reconnect replay
+            retain_finished: Finished workflows whose replay rings are kept, so a
+                    client reconnecting just after completion still gets the tail
         """
-        # Thread-safe queue (queue.Queue is thread-safe by design)
-        self._queue = queue.Queue(maxsize=maxsize)
-        
-        # Track active workflows
-        self._active_workflows: Dict[str, bool] = {}
+        self.maxsize = maxsize
+        self.replay_size = replay_size
+        self.retain_finished = retain_finished
+
+        # workflow_id -> channel for active workflows
+        self._channels: Dict[str, WorkflowEventChannel] = {}
+        # workflow_id -> closed channel of recently finished workflows (oldest first)
+        self._finished: "OrderedDict[str, WorkflowEventChannel]" = OrderedDict()
         self._lock = threading.Lock()
-        
-        # Statistics
+
+        # Statistics (totals survive channel removal)
         self._stats = {
             "total_events": 0,
             "events_dropped": 0,
-            "active_workflows_count": 0
+            "events_orphaned": 0,
+            "active_workflows_count": 0,
+            "replays": 0,
+            "replayed_events": 0,
+            "replays_incomplete": 0
         }
-    
-    def put(self, event: WorkflowEvent, block: bool = False, timeout: Optional[float] = None):
+
+    def put(self, event: WorkflowEvent, block: bool = False, timeout: Optional[float] = None) -> bool:
         """
-        Put event in queue (thread-safe, called from Agent thread).
-        
+        Put event in its workflow's channel (thread-safe, called from Agent thread).
+
         Args:
             event: WorkflowEvent to add
             block: If True, block until space available (default: False)
             timeout: Timeout in seconds if blocking (default: None)
-        
-        Raises:
-            queue.Full: If queue is full and block=False
+
+        Returns:
+            True if buffered; False if dropped (channel full, or workflow not registered)
         """
-        try:
-            self._queue.put(event, block=block, timeout=timeout)
-            self._stats["total_events"] += 1
-        except queue.Full:
-            self._stats["events_dropped"] += 1
-            print(f"⚠️ Event queue full! Dropped event: {event.title}")
-            if not block:
-                raise
-    
-    def get_nowait(self) -> Optional[WorkflowEvent]:
+        with self._lock:
+            channel = self._channels.get(event.workflow_id)
+            if channel is None:
+                self._stats["events_orphaned"] += 1
+                return False
+
+        accepted = channel.put(event, block=block, timeout=timeout)
+
+        with self._lock:
+            if accepted:
+                self._stats["total_events"] += 1
+            else:
+                self._stats["events_dropped"] += 1
+
+        if not accepted:
+            print(f"⚠️ Event channel full for {event.workflow_id}! Dropped event: {event.title}")
+        return accepted
+
+    def get_channel(self, workflow_id: str) -> Optional[WorkflowEventChannel]:
         """
-        Get event without blocking (for async listener).
-        
+        Get the channel of an active workflow.
+
+        Args:
+            workflow_id: Unique workflow identifier
+
         Returns:
-            WorkflowEvent if available, None if queue is empty
+            WorkflowEventChannel, or None if the workflow is not registered
         """
-        try:
-            return self._queue.get_nowait()
-        except queue.Empty:
-            return None
-    
-    def register_workflow(self, workflow_id: str):
+        with self._lock:
+            return self._channels.get(workflow_id)
+
+    def register_workflow(self, workflow_id: str) -> WorkflowEventChannel:
         """
-        Register a workflow as active.
-        
+        Register a workflow as active and create its channel.
+
         Args:
             workflow_id: Unique workflow identifier
+
+        Returns:
+            The workflow's channel (existing one if already registered)
         """
         with self._lock:
-            self._active_workflows[workflow_id] = True
-            self._stats["active_workflows_count"] = len(self._active_workflows)
-            print(f"📝 Registered workflow: {workflow_id}")
-    
+            channel = self._channels.get(workflow_id)
+            if channel is None:
+                channel = WorkflowEventChannel(workflow_id, maxsize=self.maxsize, replay_size=self.replay_size)
+                self._channels[workflow_id] = channel
+                self._finished.pop(workflow_id, None)
+            self._stats["active_workflows_count"] = len(self._channels)
+        print(f"📝 Registered workflow: {workflow_id}")
+        return channel
+
     def unregister_workflow(self, workflow_id: str):
         """
         Unregister workflow (workflow completed or errored).
-        
+
+        The channel is closed; its listener still drains any buffered events
+        before exiting. Its replay ring is retained for retain_finished more
+        workflows.
+
         Args:
             workflow_id: Unique workflow identifier
         """
         with self._lock:
-            self._active_workflows.pop(workflow_id, None)
-            self._stats["active_workflows_count"] = len(self._active_workflows)
-            print(f"📝 Unregistered workflow: {workflow_id}")
-    
+            channel = self._channels.pop(workflow_id, None)
+            self._stats["active_workflows_count"] = len(self._channels)
+            if channel is not None and self.retain_finished > 0:
+                self._finished[workflow_id] = channel
+                while len(self._finished) > self.retain_finished:
+                    self._finished.popitem(last=False)
+        if channel is not None:
+            channel.close()
+        print(f"📝 Unregistered workflow: {workflow_id}")
+
     def is_active(self, workflow_id: str) -> bool:
         """
         Check if workflow is active.
-        
+
         Args:
             workflow_id: Workflow to check
-        
+
         Returns:
             True if workflow is active, False otherwise
         """
         with self._lock:
-            return self._active_workflows.get(workflow_id, False)
-    
+            return workflow_id in self._channels
+
+    def replay(self, workflow_id: str, last_seq: int = 0) -> Tuple[List[WorkflowEvent], bool]:
+        """
+        Get the events of a workflow that a reconnecting client missed.
+
+        Cost is O(retained events); nothing is read from the database.
+
+        Args:
+            workflow_id: Workflow to replay
+            last_seq: Highest sequence number the client has seen (0 = none)
+
+        Returns:
+            (events after last_seq in order, complete). complete is False when
+            the workflow is unknown here or part of the gap was evicted.
+        """
+        with self._lock:
+            channel = self._channels.get(workflow_id) or self._finished.get(workflow_id)
+            self._stats["replays"] += 1
+        if channel is None:
+            with self._lock:
+                self._stats["replays_incomplete"] += 1
+            return [], False
+
+        events, complete = channel.replay(last_seq)
+        with self._lock:
+            self._stats["replayed_events"] += len(events)
+            if not complete:
+                self._stats["replays_incomplete"] += 1
+        return events, complete
+
     def get_active_workflows(self) -> List[str]:
         """
         Get list of active workflow IDs.
-        
+
         Returns:
             List of workflow IDs currently active
         """
         with self._lock:
-            return list(self._active_workflows.keys())
-    
+            return list(self._channels.keys())
+
     def get_stats(self) -> Dict[str, Any]:
         """
         Get queue statistics.
-        
+
         Returns:
-            Dictionary with queue stats
+            Dictionary with registry totals and per-workflow channel stats
         """
         with self._lock:
-            return {
-                **self._stats,
-                "queue_size": self._queue.qsize(),
-                "active_workflows": list(self._active_workflows.keys())
-            }
-    
+            channels = list(self._channels.values())
+            stats = dict(self._stats)
+
+        channel_stats = {channel.workflow_id: channel.get_stats() for channel in channels}
+        return {
+            **stats,
+            "queue_size": sum(s["queue_size"] for s in channel_stats.values()),
+            "active_workflows": list(channel_stats.keys()),
+            "retained_finished": len(self._finished),
+            "channels": channel_stats
+        }
+
     def clear_workflow_events(self, workflow_id: str):
         """
         Clear all events for a specific workflow (cleanup after completion).
-        
-        Note: This doesn't actually remove from queue (queue.Queue doesn't support),
-        but marks the workflow as inactive so listener stops processing its events.
-        
+
+        Discards anything still buffered and unregisters the workflow.
+
         Args:
             workflow_id: Workflow to clear
         """
+        channel = self.get_channel(workflow_id)
+        if channel is not None:
+            channel.drain()
         self.unregister_workflow(workflow_id)
 
 
 # === Global Singleton Instance ===
 workflow_event_queue = WorkflowEventQueue(maxsize=1000)
 """
-Global event queue instance.
+Global event channel registry.
 
 Import this in:
 - Tools (to send events): from app.services.workflows.workflow_events import workflow_event_queue
 - Service layer (to listen): from app.services.workflows.workflow_events import workflow_event_queue
 """
-
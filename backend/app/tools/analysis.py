@@ -7,11 +7,20 @@ including differential expression analysis between tumor and normal samples.
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, Iterable, List, Optional, Union, Any
 from scipy import stats
 import os
 from smolagents import tool
 
+# Statistical tests supported by the differential analysis
+DE_TESTS = ("student", "welch", "mannwhitney")
+
+# Features tested per vectorized block
+DE_BLOCK_ROWS = 8192
+
+# Files from this size on are read as float32 chunks (streamed for differential-only analysis)
+LARGE_FILE_MB = 512
+
 
 @tool
 def csv_data_analyzer(
@@ -19,7 +28,8 @@ def csv_data_analyzer(
     tumor_columns: Optional[List[str]] = None,
     normal_columns: Optional[List[str]] = None,
     analysis_type: str = "summary",
-    alpha: float = 0.05
+    alpha: float = 0.05,
+    test: str = "student"
 ) -> Dict[str, Any]:
     """
     Reads a CSV file and performs basic data analysis including differential expression.
@@ -27,7 +37,8 @@ def csv_data_analyzer(
     This tool can perform various types of analysis on CSV data:
     - Summary statistics (mean, std, median, etc.)
     - Differential expression analysis between tumor and normal samples
-    - T-tests for statistical significance
+    - T-tests (or Mann-Whitney U tests) for statistical significance, with
+      Benjamini-Hochberg FDR q-values
     
     Args:
         file_path (str): Path to the CSV file to analyze
@@ -40,6 +51,10 @@ def csv_data_analyzer(
                            - "differential": Differential expression analysis
                            - "both": Both summary and differential analysis
         alpha (float): Significance level for statistical tests (default: 0.05)
+        test (str): Statistical test for differential analysis. Options:
+                    - "student": Two-sample t-test with pooled variance (default)
+                    - "welch": Welch's t-test (unequal variances)
+                    - "mannwhitney": Mann-Whitney U test (non-parametric)
     
     Returns:
         Dict[str, Any]: Dictionary containing analysis results with the following structure:
@@ -58,14 +73,22 @@ def csv_data_analyzer(
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
         
-        # Read CSV file
+        # Read CSV file; large files are read as float32 chunks, and streamed
+        # through the differential analysis without loading the whole matrix
+        large_file = os.path.getsize(file_path) >= LARGE_FILE_MB * 1024 * 1024
+        stream = large_file and analysis_type == "differential"
         try:
-            df = pd.read_csv(file_path, index_col=0)
+            if stream:
+                df = pd.read_csv(file_path, index_col=0, nrows=0)
+            elif large_file:
+                df = pd.concat(_read_csv_chunks(file_path))
+            else:
+                df = pd.read_csv(file_path, index_col=0)
         except Exception as e:
             raise ValueError(f"Error reading CSV file: {str(e)}")
         
         # Validate that dataframe is not empty
-        if df.empty:
+        if len(df.columns) == 0 or (df.empty and not stream):
             raise ValueError("The CSV file is empty")
         
         # Auto-detect tumor and normal columns if not provided
@@ -102,7 +125,18 @@ def csv_data_analyzer(
         if analysis_type in ["differential", "both"]:
             if len(tumor_columns) == 0 or len(normal_columns) == 0:
                 raise ValueError("Both tumor and normal columns are required for differential analysis")
-            results["differential"] = _perform_differential_analysis(df, tumor_columns, normal_columns, alpha)
+            if stream:
+                feature_count = 0
+                def counted_chunks():
+                    nonlocal feature_count
+                    for chunk in _read_csv_chunks(file_path):
+                        feature_count += len(chunk)
+                        yield chunk
+                results["differential"] = _perform_differential_analysis(counted_chunks(), tumor_columns, normal_columns, alpha, test=test)
+                results["metadata"]["shape"] = (feature_count, len(df.columns))
+                results["metadata"]["total_features"] = feature_count
+            else:
+                results["differential"] = _perform_differential_analysis(df, tumor_columns, normal_columns, alpha, test=test)
         
         return results
         
@@ -156,74 +190,209 @@ def _perform_summary_analysis(df: pd.DataFrame, tumor_columns: List[str], normal
     return summary
 
 
-def _perform_differential_analysis(df: pd.DataFrame, tumor_columns: List[str], normal_columns: List[str], alpha: float) -> Dict[str, Any]:
+def _read_csv_chunks(file_path: str, chunk_rows: int = DE_BLOCK_ROWS):
+    """Read a CSV file in row chunks with numeric columns downcast to float32"""
+    for chunk in pd.read_csv(file_path, index_col=0, chunksize=chunk_rows):
+        numeric = chunk.select_dtypes(include='number').columns
+        yield chunk.astype({col: np.float32 for col in numeric})
+
+
+def _benjamini_hochberg(p_values: np.ndarray) -> np.ndarray:
+    """
+    Benjamini-Hochberg adjusted p-values (FDR q-values).
+    
+    NaN p-values stay NaN and do not count towards the number of tests.
+    """
+    q_values = np.full(p_values.shape, np.nan)
+    tested = np.flatnonzero(~np.isnan(p_values))
+    m = len(tested)
+    if m == 0:
+        return q_values
+    
+    order = tested[np.argsort(p_values[tested], kind='stable')]
+    ranked = p_values[order] * m / np.arange(1, m + 1)
+    # Enforce monotonicity from the largest p-value down
+    q_values[order] = np.minimum(np.minimum.accumulate(ranked[::-1])[::-1], 1.0)
+    return q_values
+
+
+def _differential_statistics(tumor_values: np.ndarray, normal_values: np.ndarray, test: str) -> Dict[str, np.ndarray]:
+    """
+    Per-row group means, log2 fold change and test statistics for a block of features.
+    
+    NaN-aware: each row uses only its non-missing samples, like dropping NaNs
+    per feature before the test. Rows without samples in either group are
+    marked untestable.
+    
+    Args:
+        tumor_values: (features x tumor samples) float array
+        normal_values: (features x normal samples) float array
+        test: "student" (pooled-variance t-test), "welch" or "mannwhitney"
+    
+    Returns:
+        Dictionary of per-row arrays: tumor_mean, normal_mean, fold_change,
+        statistic, p_value and the boolean mask 'tested'
+    """
+    tumor_n = np.sum(~np.isnan(tumor_values), axis=1)
+    normal_n = np.sum(~np.isnan(normal_values), axis=1)
+    tested = (tumor_n > 0) & (normal_n > 0)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        tumor_mean = np.nansum(tumor_values, axis=1) / tumor_n
+        normal_mean = np.nansum(normal_values, axis=1) / normal_n
+        
+        # log2(tumor/normal) when both means are positive, inf for a zero normal mean
+        fold_change = np.where(
+            normal_mean != 0,
+            np.where((tumor_mean > 0) & (normal_mean > 0), np.log2(tumor_mean / normal_mean), 0.0),
+            np.where(tumor_mean > 0, np.inf, 0.0)
+        )
+        
+        if test == "mannwhitney":
+            statistic = np.full(len(tumor_n), np.nan)
+            p_value = np.full(len(tumor_n), np.nan)
+            complete = (tumor_n == tumor_values.shape[1]) & (normal_n == normal_values.shape[1])
+            # scipy's method='auto' is decided once per call (a tie in any row makes
+            # every row asymptotic), so complete rows are split by the same rule applied
+            # per row: exact for small samples without ties, asymptotic otherwise
+            ranked = np.sort(np.concatenate([tumor_values, normal_values], axis=1), axis=1)
+            ties = np.any(ranked[:, 1:] == ranked[:, :-1], axis=1)
+            small = min(tumor_values.shape[1], normal_values.shape[1]) <= 8
+            exact = complete & ~ties if small else np.zeros(len(tumor_n), dtype=bool)
+            # Rows with missing values need nan_policy='omit', which scipy evaluates
+            # row by row (and so chooses the method per row itself)
+            for rows, nan_policy, method in (
+                (exact, 'propagate', 'exact'),
+                (complete & ~exact, 'propagate', 'asymptotic'),
+                (tested & ~complete, 'omit', 'auto'),
+            ):
+                if rows.any():
+                    result = stats.mannwhitneyu(
+                        tumor_values[rows], normal_values[rows], axis=1, nan_policy=nan_policy, method=method
+                    )
+                    statistic[rows] = np.asarray(result.statistic, dtype=float)
+                    p_value[rows] = np.asarray(result.pvalue, dtype=float)
+        else:
+            tumor_ss = np.nansum((tumor_values - tumor_mean[:, None]) ** 2, axis=1)
+            normal_ss = np.nansum((normal_values - normal_mean[:, None]) ** 2, axis=1)
+            
+            if test == "welch":
+                # A single sample has no variance estimate (NaN, like scipy)
+                tumor_var = np.where(tumor_n > 1, tumor_ss / np.maximum(tumor_n - 1, 1), np.nan)
+                normal_var = np.where(normal_n > 1, normal_ss / np.maximum(normal_n - 1, 1), np.nan)
+                tumor_se2 = tumor_var / tumor_n
+                normal_se2 = normal_var / normal_n
+                standard_error = np.sqrt(tumor_se2 + normal_se2)
+                dof_denominator = (
+                    tumor_se2 ** 2 / np.maximum(tumor_n - 1, 1) + normal_se2 ** 2 / np.maximum(normal_n - 1, 1)
+                )
+                # Zero variance in both groups: scipy falls back to 1 degree of freedom
+                dof = np.where(
+                    dof_denominator > 0,
+                    (tumor_se2 + normal_se2) ** 2 / np.where(dof_denominator > 0, dof_denominator, 1.0),
+                    np.where(np.isnan(dof_denominator), np.nan, 1.0)
+                )
+            else:
+                # Pooled sum of squares: a single-sample group contributes 0, not NaN
+                dof = (tumor_n + normal_n - 2).astype(float)
+                pooled_var = (tumor_ss + normal_ss) / dof
+                standard_error = np.sqrt(pooled_var * (1.0 / tumor_n + 1.0 / normal_n))
+            
+            statistic = (tumor_mean - normal_mean) / standard_error
+            dof = np.where(dof > 0, dof, np.nan)
+            p_value = 2 * stats.t.sf(np.abs(statistic), dof)
+            # Zero variance in both groups: undefined like scipy, unless the means differ
+            p_value = np.where(np.isinf(statistic) & ~np.isnan(dof), 0.0, p_value)
+    
+    return {
+        "tumor_mean": tumor_mean,
+        "normal_mean": normal_mean,
+        "fold_change": fold_change,
+        "statistic": statistic,
+        "p_value": p_value,
+        "tested": tested,
+    }
+
+
+def _iter_blocks(df: pd.DataFrame, block_rows: int):
+    """Row blocks of a dataframe"""
+    for start in range(0, len(df), block_rows):
+        yield df.iloc[start:start + block_rows]
+
+
+def _perform_differential_analysis(
+    df: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+    tumor_columns: List[str],
+    normal_columns: List[str],
+    alpha: float,
+    test: str = "student",
+    block_rows: int = DE_BLOCK_ROWS
+) -> Dict[str, Any]:
     """
     Perform differential expression analysis between tumor and normal samples.
     
+    All features of a row block are tested at once (NaN-aware t-test or
+    Mann-Whitney U along the sample axis), so memory stays bounded by the
+    block size and the input may be a stream of chunks from a file larger
+    than RAM.
+    
     Args:
-        df: Input dataframe
+        df: Input dataframe, or an iterable of dataframe chunks (features x samples)
         tumor_columns: List of tumor sample columns
         normal_columns: List of normal sample columns
         alpha: Significance level for statistical tests
+        test: "student" (pooled-variance t-test, default), "welch" or "mannwhitney"
+        block_rows: Features tested per block
     
     Returns:
         Dictionary containing differential expression results
     """
-    tumor_data = df[tumor_columns]
-    normal_data = df[normal_columns]
-    
-    # Calculate fold changes and statistics for each gene/feature
-    results_list = []
-    
-    for gene in df.index:
-        tumor_values = tumor_data.loc[gene].values
-        normal_values = normal_data.loc[gene].values
-        
-        # Remove NaN values
-        tumor_values = tumor_values[~np.isnan(tumor_values)]
-        normal_values = normal_values[~np.isnan(normal_values)]
-        
-        if len(tumor_values) == 0 or len(normal_values) == 0:
-            continue
-        
-        # Calculate basic statistics
-        tumor_mean = np.mean(tumor_values)
-        normal_mean = np.mean(normal_values)
-        
-        # Calculate fold change (log2)
-        if normal_mean != 0:
-            fold_change = np.log2(tumor_mean / normal_mean) if tumor_mean > 0 and normal_mean > 0 else 0
-        else:
-            fold_change = np.inf if tumor_mean > 0 else 0
-        
-        # Perform t-test
-        try:
-            t_stat, p_value = stats.ttest_ind(tumor_values, normal_values)
-        except:
-            t_stat, p_value = np.nan, np.nan
-        
-        results_list.append({
-            "gene": gene,
-            "tumor_mean": tumor_mean,
-            "normal_mean": normal_mean,
-            "fold_change": fold_change,
-            "t_statistic": t_stat,
-            "p_value": p_value,
-            "significant": p_value < alpha if not np.isnan(p_value) else False
-        })
-    
-    # Convert to dataframe for easier manipulation
-    results_df = pd.DataFrame(results_list)
+    if test not in DE_TESTS:
+        raise ValueError(f"Unknown test '{test}'. Options: {', '.join(DE_TESTS)}")
+    
+    blocks = _iter_blocks(df, block_rows) if isinstance(df, pd.DataFrame) else df
+    
+    genes, columns = [], {key: [] for key in ("tumor_mean", "normal_mean", "fold_change", "statistic", "p_value")}
+    for block in blocks:
+        # Compute in float64 per block (float32 inputs keep the resident matrix small)
+        block_stats = _differential_statistics(
+            block[tumor_columns].to_numpy(dtype=np.float64),
+            block[normal_columns].to_numpy(dtype=np.float64),
+            test
+        )
+        tested = block_stats.pop("tested")
+        genes.append(block.index[tested])
+        for key, values in block_stats.items():
+            columns[key].append(values[tested])
+    
+    statistic_name = "u_statistic" if test == "mannwhitney" else "t_statistic"
+    p_values = np.concatenate(columns["p_value"]) if genes else np.array([])
+    q_values = _benjamini_hochberg(p_values)
+    
+    results_df = pd.DataFrame({
+        "gene": np.concatenate([g.to_numpy() for g in genes]) if genes else [],
+        "tumor_mean": np.concatenate(columns["tumor_mean"]) if genes else [],
+        "normal_mean": np.concatenate(columns["normal_mean"]) if genes else [],
+        "fold_change": np.concatenate(columns["fold_change"]) if genes else [],
+        statistic_name: np.concatenate(columns["statistic"]) if genes else [],
+        "p_value": p_values,
+        "q_value": q_values,
+        "significant": np.nan_to_num(p_values, nan=1.0) < alpha,
+        "significant_fdr": np.nan_to_num(q_values, nan=1.0) < alpha,
+    })
     
     # Sort by p-value
-    results_df = results_df.sort_values('p_value', na_position='last')
+    results_df = results_df.sort_values('p_value', na_position='last', kind='stable')
     
     # Calculate summary statistics
+    significant = results_df['significant']
     differential_summary = {
+        "test": test,
         "total_features_tested": len(results_df),
-        "significant_features": len(results_df[results_df['significant']]),
-        "upregulated": len(results_df[(results_df['significant']) & (results_df['fold_change'] > 0)]),
-        "downregulated": len(results_df[(results_df['significant']) & (results_df['fold_change'] < 0)]),
+        "significant_features": int(significant.sum()),
+        "significant_features_fdr": int(results_df['significant_fdr'].sum()),
+        "upregulated": int((significant & (results_df['fold_change'] > 0)).sum()),
+        "downregulated": int((significant & (results_df['fold_change'] < 0)).sum()),
         "alpha_threshold": alpha
     }
     
@@ -0,0 +1,336 @@
+"""
+API Translation - Memoized Prompt-to-Endpoint Translation for Database Tools
+
+query_uniprot(prompt=...), query_ensembl, query_kegg, query_reactome and the
+other natural-language database tools translate the prompt into an API call
+with a Gemini request (_query_gemini_for_api in app/tools/database.py),
+with the tool's whole API schema rendered into the prompt. That costs
+seconds and thousands of tokens before the real API call starts, even for
+prompts like "P04637" or "rs6025".
+
+This module keeps that translation cheap:
+
+- Rendered schemas: each schema is rendered to prompt JSON once; its sha256
+  is the schema version used in translation keys
+- Fast path: a prompt that is just an identifier (UniProt accession,
+  Ensembl ID, rsID, KEGG ID, Reactome stable ID, HGNC-style symbol) is
+  translated deterministically for tools that support it, without an LLM
+- Translation cache: successful translations are stored in the persistent
+  response cache (source "api_translation"), keyed by tool, prompt template,
+  schema version, model and normalized prompt
+- Near duplicates (optional): with tools.api_translation.similarity_threshold
+  set, a recent translation of a near-identical prompt (rapidfuzz ratio) with
+  the same identifiers is reused
+
+Usage:
+    from app.tools.api_translation import get_api_translator
+
+    translator = get_api_translator()
+    fast = translator.fast_path("query_uniprot", "P04637")
+    schema_json = translator.render_schema(schema)
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from app.config import TOOLS_CONFIG
+
+logger = logging.getLogger(__name__)
+
+TRANSLATION_SOURCE = "api_translation"
+
+# Identifier patterns, tried in order (first match wins)
+IDENTIFIER_PATTERNS: List[Tuple[str, "re.Pattern"]] = [
+    ("ensembl", re.compile(r"^ENS[A-Z]*[GTPE]\d{11}(\.\d+)?$")),
+    ("rsid", re.compile(r"^rs\d+$", re.IGNORECASE)),
+    ("reactome", re.compile(r"^R-[A-Z]{3}-\d+(\.\d+)?$")),
+    ("kegg", re.compile(r"^([a-z]{3,4}:[A-Za-z0-9_.-]+|[a-z]{2,4}\d{5}|[CDKGR]\d{5})$")),
+    ("uniprot", re.compile(r"^([OPQ][0-9][A-Z0-9]{3}[0-9]|[A-NR-Z][0-9]([A-Z][A-Z0-9]{2}[0-9]){1,2})(-\d+)?$")),
+    # Upper-case symbols with a digit (TP53, BRCA1, NKX2-1); plain words like
+    # "INSULIN" or "KINASE" are left to the LLM
+    ("symbol", re.compile(r"^(?=.*\d)[A-Z][A-Z0-9]*(-[A-Z0-9]+)*$")),
+]
+
+# Words that may surround an identifier in a prompt ("TP53", "the TP53 gene")
+_FILLER_WORDS = {
+    "the", "a", "gene", "protein", "human", "variant", "snp", "pathway", "entry", "id",
+    "find", "get", "show", "lookup", "for", "about", "on", "info", "information",
+}
+
+
+def classify_identifier(prompt: str) -> Optional[Tuple[str, str]]:
+    """
+    (kind, identifier) when a prompt is a single direct identifier.
+
+    Only prompts consisting of one identifier plus filler words ("human",
+    "gene", ...) qualify; anything else goes to the LLM.
+    """
+    tokens = [t.strip(".,;:?!\"'()") for t in prompt.split()]
+    candidates = [t for t in tokens if t and t.lower() not in _FILLER_WORDS]
+    if len(candidates) != 1 or len(candidates[0]) > 32:
+        return None
+    identifier = candidates[0]
+    kind = identifier_kind(identifier)
+    if kind is None:
+        return None
+    return kind, (identifier.lower() if kind == "rsid" else identifier)
+
+
+def identifier_kind(identifier: str) -> Optional[str]:
+    """Kind of a single identifier ("uniprot", "ensembl", "rsid", "kegg", "reactome", "symbol") or None."""
+    for kind, pattern in IDENTIFIER_PATTERNS:
+        if pattern.match(identifier):
+            return kind
+    return None
+
+
+def _uniprot(kind: str, identifier: str) -> Optional[Dict[str, Any]]:
+    if kind == "uniprot":
+        return {"full_url": f"https://rest.uniprot.org/uniprotkb/{identifier}",
+                "description": f"Retrieve UniProt entry {identifier}"}
+    if kind == "symbol":
+        query = quote(f"gene_exact:{identifier} AND organism_id:9606 AND reviewed:true")
+        return {"full_url": f"https://rest.uniprot.org/uniprotkb/search?query={query}&format=json",
+                "description": f"Search reviewed human UniProt entries for gene {identifier}"}
+    return None
+
+
+def _ensembl(kind: str, identifier: str) -> Optional[Dict[str, Any]]:
+    if kind == "ensembl":
+        return {"endpoint": f"lookup/id/{identifier}", "params": {},
+                "description": f"Look up Ensembl ID {identifier}"}
+    if kind == "rsid":
+        return {"endpoint": f"variation/human/{identifier}", "params": {},
+                "description": f"Retrieve variant {identifier}"}
+    if kind == "symbol":
+        return {"endpoint": f"lookup/symbol/homo_sapiens/{identifier}", "params": {},
+                "description": f"Look up human gene symbol {identifier}"}
+    return None
+
+
+def _kegg(kind: str, identifier: str) -> Optional[Dict[str, Any]]:
+    if kind == "kegg":
+        return {"full_url": f"https://rest.kegg.jp/get/{identifier}",
+                "description": f"Retrieve KEGG entry {identifier}"}
+    return None
+
+
+def _reactome(kind: str, identifier: str) -> Optional[Dict[str, Any]]:
+    if kind == "reactome":
+        return {"endpoint": f"data/query/{identifier}", "base": "content", "params": {},
+                "description": f"Retrieve Reactome entry {identifier}"}
+    if kind == "symbol":
+        # data/query only resolves stable IDs; symbols go through the search endpoint
+        return {"endpoint": "search/query", "base": "content",
+                "params": {"query": identifier, "species": "Homo sapiens"},
+                "description": f"Search human Reactome entries for gene {identifier}"}
+    return None
+
+
+def _dbsnp(kind: str, identifier: str) -> Optional[Dict[str, Any]]:
+    if kind == "rsid":
+        return {"search_term": f"{identifier}[rs]"}
+    return None
+
+
+def _clinvar(kind: str, identifier: str) -> Optional[Dict[str, Any]]:
+    if kind == "rsid":
+        return {"search_term": f"{identifier}[rsid]"}
+    if kind == "symbol":
+        return {"search_term": f"{identifier}[gene]"}
+    return None
+
+
+def _regulomedb(kind: str, identifier: str) -> Optional[Dict[str, Any]]:
+    if kind == "rsid":
+        return {"endpoint": f"https://regulomedb.org/regulome-search/?regions={identifier}&genome=GRCh38"}
+    return None
+
+
+# Tool name -> builder of the translated query for a direct identifier
+FAST_PATH_BUILDERS: Dict[str, Callable[[str, str], Optional[Dict[str, Any]]]] = {
+    "query_uniprot": _uniprot,
+    "query_ensembl": _ensembl,
+    "query_kegg": _kegg,
+    "query_reactome": _reactome,
+    "query_dbsnp": _dbsnp,
+    "query_clinvar": _clinvar,
+    "query_regulomedb": _regulomedb,
+}
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Cache form of a prompt: collapsed whitespace, no trailing punctuation,
+    ordinary words lower-cased. Identifiers and symbols keep their case
+    (BRCA1 vs Brca1 are different genes).
+    """
+    words = []
+    for word in prompt.strip().rstrip(".?!").split():
+        if word.isalpha() and (word.islower() or word.istitle()):
+            word = word.lower()
+        words.append(word)
+    return " ".join(words)
+
+
+def _identifier_tokens(prompt: str) -> frozenset:
+    """Tokens with digits or upper case letters after the first (gene symbols, IDs, positions)."""
+    return frozenset(t for t in re.findall(r"[\w:.-]+", prompt) if any(c.isdigit() for c in t) or t[1:] != t[1:].lower())
+
+
+class ApiTranslator:
+    """
+    Process-wide schema renderings, fast path and translation cache.
+
+    Thread-safe: database tools run concurrently in the tool dispatch pool.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        config = config or TOOLS_CONFIG
+        self.fast_path_enabled = config.get("api_translation_fast_path", True)
+        self.cache_enabled = config.get("api_translation_cache", True)
+        self.similarity_threshold = config.get("api_translation_similarity_threshold", 0)
+        self.recent_size = config.get("api_translation_recent_size", 512)
+        self._lock = threading.Lock()
+        # id(schema) -> (schema, rendered JSON, version); the reference keeps id() stable
+        self._schemas: Dict[int, Tuple[Any, str, str]] = {}
+        # Recent successful translations for near-duplicate matching: scope -> {normalized prompt: result}
+        self._recent: Dict[str, "OrderedDict[str, Dict[str, Any]]"] = {}
+        self._stats = {
+            "fast_path_hits": 0, "cache_hits": 0, "similar_hits": 0, "llm_calls": 0, "llm_failures": 0,
+            "llm_seconds": 0.0, "prompt_tokens_sent": 0, "prompt_tokens_saved": 0, "schema_renders": 0,
+        }
+        self._fast_path_by_tool: Dict[str, int] = {}
+
+    # ==================== Schemas ====================
+
+    def _schema_entry(self, schema: Any) -> Tuple[Any, str, str]:
+        with self._lock:
+            entry = self._schemas.get(id(schema))
+            if entry is not None and entry[0] is schema:
+                return entry
+        rendered = json.dumps(schema, indent=2)
+        version = hashlib.sha256(rendered.encode("utf-8")).hexdigest()[:16]
+        entry = (schema, rendered, version)
+        with self._lock:
+            self._schemas[id(schema)] = entry
+            self._stats["schema_renders"] += 1
+        return entry
+
+    def render_schema(self, schema: Any) -> str:
+        """json.dumps(schema, indent=2), computed once per schema object."""
+        return self._schema_entry(schema)[1]
+
+    def schema_version(self, schema: Any) -> str:
+        return self._schema_entry(schema)[2] if schema is not None else "none"
+
+    # ==================== Fast path ====================
+
+    def fast_path(self, tool_name: Optional[str], prompt: str) -> Optional[Dict[str, Any]]:
+        """Translated query for a direct-identifier prompt, or None when the LLM is needed."""
+        builder = FAST_PATH_BUILDERS.get(tool_name or "")
+        if not self.fast_path_enabled or builder is None or not prompt:
+            return None
+        match = classify_identifier(prompt)
+        if match is None:
+            return None
+        data = builder(*match)
+        if data is not None:
+            with self._lock:
+                self._stats["fast_path_hits"] += 1
+                self._fast_path_by_tool[tool_name] = self._fast_path_by_tool.get(tool_name, 0) + 1
+        return data
+
+    # ==================== Translation cache ====================
+
+    def cache_key(self, tool_name: Optional[str], system_template: str, schema: Any, model_id: str, prompt: str) -> Tuple[str, str]:
+        """(scope, key): scope groups translations that near-duplicate matching may share."""
+        template_hash = hashlib.sha256(system_template.encode("utf-8")).hexdigest()[:16]
+        scope = f"{tool_name or 'query'}|{template_hash}|{self.schema_version(schema)}|{model_id}"
+        return scope, f"{scope}|{normalize_prompt(prompt)}"
+
+    def find_similar(self, scope: str, prompt: str) -> Optional[Dict[str, Any]]:
+        """Recent translation of a near-identical prompt with the same identifiers."""
+        if not self.similarity_threshold:
+            return None
+        try:
+            from rapidfuzz import fuzz, process
+        except ImportError:
+            return None
+        normalized = normalize_prompt(prompt)
+        identifiers = _identifier_tokens(normalized)
+        with self._lock:
+            recent = dict(self._recent.get(scope) or {})
+        candidates = [p for p in recent if _identifier_tokens(p) == identifiers]
+        if not candidates:
+            return None
+        match = process.extractOne(normalized, candidates, scorer=fuzz.token_sort_ratio,
+                                   score_cutoff=self.similarity_threshold)
+        if match is None:
+            return None
+        with self._lock:
+            self._stats["similar_hits"] += 1
+        logger.debug(f"Reusing translation of similar prompt ({match[1]:.0f}): {match[0][:80]}")
+        return recent[match[0]]
+
+    def remember(self, scope: str, prompt: str, result: Dict[str, Any]):
+        """Keep a successful translation for near-duplicate matching."""
+        if not self.similarity_threshold:
+            return
+        with self._lock:
+            recent = self._recent.setdefault(scope, OrderedDict())
+            recent[normalize_prompt(prompt)] = result
+            recent.move_to_end(normalize_prompt(prompt))
+            while len(recent) > self.recent_size:
+                recent.popitem(last=False)
+
+    # ==================== Metrics ====================
+
+    def record_llm_call(self, seconds: float, prompt_tokens: int, success: bool):
+        with self._lock:
+            self._stats["llm_calls"] += 1
+            self._stats["llm_seconds"] += seconds
+            self._stats["prompt_tokens_sent"] += prompt_tokens
+            if not success:
+                self._stats["llm_failures"] += 1
+
+    def record_cache_hit(self, prompt_tokens: int):
+        with self._lock:
+            self._stats["cache_hits"] += 1
+            self._stats["prompt_tokens_saved"] += prompt_tokens
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["fast_path_by_tool"] = dict(self._fast_path_by_tool)
+            stats["schemas"] = len(self._schemas)
+        avoided = stats["fast_path_hits"] + stats["cache_hits"] + stats["similar_hits"]
+        total = avoided + stats["llm_calls"]
+        avg = stats["llm_seconds"] / stats["llm_calls"] if stats["llm_calls"] else 0.0
+        stats["llm_seconds"] = round(stats["llm_seconds"], 3)
+        stats["llm_avoided_rate"] = round(avoided / total, 3) if total else 0.0
+        # Estimated from the average latency of the LLM translations that did run
+        stats["seconds_saved_estimate"] = round(avoided * avg, 3)
+        stats["similarity_threshold"] = self.similarity_threshold
+        return stats
+
+
+# Global singleton
+_translator: Optional[ApiTranslator] = None
+_translator_lock = threading.Lock()
+
+
+def get_api_translator() -> ApiTranslator:
+    """Get the global API translator instance."""
+    global _translator
+    if _translator is None:
+        with _translator_lock:
+            if _translator is None:
+                _translator = ApiTranslator()
+    return _translator
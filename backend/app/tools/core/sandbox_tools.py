@@ -31,6 +31,9 @@ from app.tools.core.sandbox_files import (
 from app.tools.core.sandbox_python import (
     python_interpreter,
     run_python_file,
+    inspect_kernel,
+    reset_kernel,
+    snapshot_kernel,
 )
 
 # Import visualization tools (already sandbox-aware)
@@ -71,6 +74,9 @@ def get_sandbox_tools() -> List[Any]:
         # Code execution (sandbox-restricted)
         python_interpreter,
         run_python_file,
+        inspect_kernel,
+        reset_kernel,
+        snapshot_kernel,
 
         # Visualization (writes to sandbox)
         create_line_plot,
@@ -123,6 +129,9 @@ __all__ = [
     # Code execution
     'python_interpreter',
     'run_python_file',
+    'inspect_kernel',
+    'reset_kernel',
+    'snapshot_kernel',
     # Visualization
     'create_line_plot',
     'create_bar_chart',
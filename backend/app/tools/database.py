@@ -10,8 +10,16 @@ from Bio import Entrez
 # Removed biomni dependency to avoid environment variable loading side effects
 import traceback
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from smolagents import tool, OpenAIServerModel
 
+# Pooled, rate-limited and retrying HTTP client shared by all database tools
+from app.services.http_client import get_http_client
+from app.services.response_cache import get_response_cache, OfflineCacheMiss
+from app.config import TOOLS_CONFIG
+from app.tools.api_translation import get_api_translator, identifier_kind, TRANSLATION_SOURCE
+
 
 OPENROUTER_API_KEY_STRING = os.getenv('OPENROUTER_API_KEY_STRING')
 if not OPENROUTER_API_KEY_STRING:
@@ -84,15 +92,32 @@ gemini_model = OpenAIServerModel(
     temperature=0.1,  # Lower temperature for more consistent analysis
 )
 
-def _query_gemini_for_api(prompt, schema, system_template, model=None):
+@lru_cache(maxsize=None)
+def _load_schema(name):
+    """
+    API schema of a database tool from resource/schema_db/<name>.pkl, unpickled once per process.
+
+    The returned object is shared; callers must not modify it.
+    """
+    schema_path = os.path.join(SCHEMA_DB_PATH, f"{name}.pkl")
+    with open(schema_path, "rb") as f:
+        return pickle.load(f)
+
+
+def _query_gemini_for_api(prompt, schema, system_template, model=None, tool_name=None):
     """
     Helper function to query Gemini for generating API calls based on natural language prompts.
+
+    Translations are memoized (app/tools/api_translation.py): prompts that are
+    a direct identifier of a supported tool skip the LLM, and successful
+    translations are cached per tool, template, schema version and normalized prompt.
     
     Args:
     prompt (str): Natural language query to process
     schema (dict): API schema to include in the system prompt
     system_template (str): Template string for the system prompt (should have {schema} placeholder)
     model: Gemini model instance to use (defaults to global gemini_model)
+    tool_name (str, optional): Calling tool (enables its identifier fast path and scopes the cache)
     
     Returns:
         
@@ -100,18 +125,64 @@ def _query_gemini_for_api(prompt, schema, system_template, model=None):
     """
     # Use global gemini_model if none provided
     model = gemini_model
-    
+    translator = get_api_translator()
+
+    fast_data = translator.fast_path(tool_name, prompt)
+    if fast_data is not None:
+        return {
+            "success": True,
+            "data": fast_data,
+            "raw_response": f"Direct identifier fast path ({tool_name})"
+        }
+
     try:
         if schema is not None:
-            # Format the system prompt with the schema
-            schema_json = json.dumps(schema, indent=2)
-            system_prompt = system_template.format(schema=schema_json)
+            # Format the system prompt with the schema (rendered once per schema)
+            system_prompt = system_template.format(schema=translator.render_schema(schema))
         else:
             system_prompt = system_template
-        
-        # Combine system prompt and user prompt for Gemini
-        full_prompt = f"{system_prompt}\n\nUser query: {prompt}"
-        
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Error querying Gemini: {str(e)}"
+        }
+
+    # Combine system prompt and user prompt for Gemini
+    full_prompt = f"{system_prompt}\n\nUser query: {prompt}"
+    prompt_tokens = len(full_prompt) // 4
+
+    if not translator.cache_enabled:
+        return _translate_with_gemini(model, full_prompt, translator, prompt_tokens)
+
+    scope, key = translator.cache_key(tool_name, system_template, schema, model.model_id, prompt)
+    similar = translator.find_similar(scope, prompt)
+    if similar is not None:
+        return similar
+
+    fetched = []
+
+    def fetch():
+        fetched.append(True)
+        return _translate_with_gemini(model, full_prompt, translator, prompt_tokens)
+
+    try:
+        result = get_response_cache().get_or_fetch(
+            TRANSLATION_SOURCE, key, fetch, cacheable=lambda value: value.get("success", False)
+        )
+    except OfflineCacheMiss as e:
+        return {"success": False, "error": str(e)}
+
+    if not fetched:
+        translator.record_cache_hit(prompt_tokens)
+    if result.get("success"):
+        translator.remember(scope, prompt, result)
+    return result
+
+
+def _translate_with_gemini(model, full_prompt, translator, prompt_tokens):
+    """Run one Gemini translation request and parse the JSON it returns."""
+    start = time.perf_counter()
+    try:
         # Create messages in the correct format for OpenAIServerModel
         messages = [{"role": "user", "content": full_prompt}]
         response = model(messages)
@@ -133,6 +204,7 @@ def _query_gemini_for_api(prompt, schema, system_template, model=None):
             # If no JSON found, try the whole response
             result = json.loads(gemini_text)
         
+        translator.record_llm_call(time.perf_counter() - start, prompt_tokens, True)
         return {
             "success": True,
             "data": result,
@@ -140,12 +212,14 @@ def _query_gemini_for_api(prompt, schema, system_template, model=None):
         }
             
     except (json.JSONDecodeError, KeyError, IndexError) as e:
+        translator.record_llm_call(time.perf_counter() - start, prompt_tokens, False)
         return {
             "success": False,
             "error": f"Failed to parse Gemini's response: {str(e)}",
             "raw_response": gemini_text if 'gemini_text' in locals() else "No content found"
         }
     except Exception as e:
+        translator.record_llm_call(time.perf_counter() - start, prompt_tokens, False)
         return {
             "success": False,
             "error": f"Error querying Gemini: {str(e)}"
@@ -175,6 +249,54 @@ def get_hpo_names(hpo_terms: List[str], ) -> List[str]:
 def _query_rest_api(endpoint, method="GET", params=None, headers=None, json_data=None, description=None):
     """
     General helper function to query REST APIs with consistent error handling.
+
+    Successful responses are served from the persistent response cache
+    (app/services/response_cache.py) while fresh.
+    
+    Args:
+    endpoint (str): Full URL endpoint to query
+    method (str): HTTP method ("GET" or "POST")
+    params (dict, optional): Query parameters to include in the URL
+    headers (dict, optional): HTTP headers for the request
+    json_data (dict, optional): JSON data for POST requests
+    description (str, optional): Description of this query for error messages
+    
+    Returns:
+        
+    dict: Dictionary containing the result or error information
+    """
+    def fetch():
+        return _fetch_rest_api(endpoint, method, params, headers, json_data, description)
+
+    # History-server requests (WebEnv) are bound to an NCBI session, never cache them
+    uses_history = bool(params) and ("WebEnv" in params or params.get("usehistory") == "y")
+    if method.upper() not in ("GET", "POST") or uses_history:
+        return fetch()
+
+    cache = get_response_cache()
+    accept = (headers or {}).get("Accept", "application/json")
+    key = cache.make_key(method, endpoint, params, body={"json": json_data, "accept": accept})
+    try:
+        return cache.get_or_fetch(
+            cache.source_for(endpoint), key, fetch,
+            cacheable=lambda result: result.get("success", False),
+            url=endpoint
+        )
+    except OfflineCacheMiss as e:
+        return {
+            "success": False,
+            "error": f"Offline mode: {str(e)}",
+            "query_info": {
+                "endpoint": endpoint,
+                "method": method,
+                "description": description or f"{method} request to {endpoint}"
+            }
+        }
+
+
+def _fetch_rest_api(endpoint, method="GET", params=None, headers=None, json_data=None, description=None):
+    """
+    Query a REST API over the network (uncached part of _query_rest_api).
     
     Args:
     endpoint (str): Full URL endpoint to query
@@ -201,9 +323,10 @@ def _query_rest_api(endpoint, method="GET", params=None, headers=None, json_data
     try:
         # Make the API request
         if method.upper() == "GET":
-            response = requests.get(endpoint, params=params, headers=headers)
+            response = get_http_client().get(endpoint, params=params, headers=headers)
         elif method.upper() == "POST":
-            response = requests.post(endpoint, params=params, headers=headers, json=json_data)
+            # Query APIs (GraphQL, search) only read, so POST is safe to retry
+            response = get_http_client().post(endpoint, params=params, headers=headers, json=json_data, idempotent=True)
         else:
             return {"error": f"Unsupported HTTP method: {method}"}
         
@@ -289,7 +412,53 @@ def _query_ncbi_database(
         
     dict: Dictionary containing both the structured query and the results
     """
-    
+
+    # The esearch/esummary round trip is cached as a unit: its WebEnv only lives on NCBI's history server
+    cache = get_response_cache()
+    key = f"NCBI {database} {max_results} {' '.join(search_term.split())}"
+    try:
+        fetched = cache.get_or_fetch(
+            database if database in cache.ttls else "ncbi", key,
+            lambda: _fetch_ncbi_records(database, search_term, max_results),
+            cacheable=lambda result: "records" in result
+        )
+    except OfflineCacheMiss as e:
+        return {"success": False, "error": f"Offline mode: {str(e)}"}
+
+    if "records" not in fetched:
+        return fetched
+
+    total_results, results = fetched["total_results"], fetched["records"]
+    if total_results > 0:
+        # Format results using the provided formatter
+        if result_formatter:
+            formatted_results = result_formatter(results)
+        else:
+            formatted_results = results
+        
+        # Return the combined information
+        return {
+            "database": database,
+            "query_interpretation": search_term,
+            "total_results": total_results,
+            "formatted_results": formatted_results
+        }
+    else:
+        return {
+            "database": database,
+            "query_interpretation": search_term,
+            "total_results": 0,
+            "formatted_results": []
+        }
+
+
+def _fetch_ncbi_records(database: str, search_term: str, max_results: int) -> Dict[str, Any]:
+    """
+    Run NCBI ESearch + ESummary for a search term (uncached part of _query_ncbi_database).
+
+    Returns:
+        {"total_results": int, "records": ...} or the error dict of the failed request
+    """
     # Query NCBI API using the structured search term
     esearch_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
     esearch_params = {
@@ -367,26 +536,9 @@ def _query_ncbi_database(
             
             results = details_response["result"]
         
-        # Format results using the provided formatter
-        if result_formatter:
-            formatted_results = result_formatter(results)
-        else:
-            formatted_results = results
-        
-        # Return the combined information
-        return {
-            "database": database,
-            "query_interpretation": search_term,
-            "total_results": int(search_data["esearchresult"]["count"]),
-            "formatted_results": formatted_results
-        }
+        return {"total_results": int(search_data["esearchresult"]["count"]), "records": results}
     else:
-        return {
-            "database": database,
-            "query_interpretation": search_term,
-            "total_results": 0,
-            "formatted_results": []
-        }
+        return {"total_results": 0, "records": []}
 
 def _format_query_results(result, options=None):
     """
@@ -549,9 +701,7 @@ def query_uniprot(prompt: str = None, endpoint: str = None, max_results: int = 5
     # If using prompt, parse with Claude
     if prompt:
         # Load UniProt schema
-        schema_path = os.path.join(SCHEMA_DB_PATH, "uniprot.pkl")
-        with open(schema_path, "rb") as f:
-            uniprot_schema = pickle.load(f)
+        uniprot_schema = _load_schema("uniprot")
                 
         # Create system prompt template
         system_template = """
@@ -581,7 +731,8 @@ def query_uniprot(prompt: str = None, endpoint: str = None, max_results: int = 5
         gemini_result = _query_gemini_for_api(
             prompt=prompt,
             schema=uniprot_schema,
-            system_template=system_template
+            system_template=system_template,
+            tool_name="query_uniprot"
         )
         
         if not gemini_result["success"]:
@@ -673,7 +824,7 @@ def query_alphafold(
     
     try:
         # Make the API request
-        response = requests.get(url)
+        response = get_http_client().get(url)
         response.raise_for_status()
         
         # Parse the response as JSON
@@ -696,7 +847,7 @@ def query_alphafold(
             download_url = f"https://alphafold.ebi.ac.uk/files/{filename}"
             
             # Download the file
-            download_response = requests.get(download_url)
+            download_response = get_http_client().get(download_url)
             if download_response.status_code == 200:
                 with open(file_path, 'wb') as f:
                     f.write(download_response.content)
@@ -793,9 +944,7 @@ def query_interpro(prompt: str = None, endpoint: str = None, max_results: int =
     # If using prompt, parse with Claude
     if prompt:
         # Load InterPro schema
-        schema_path = os.path.join(SCHEMA_DB_PATH, "interpro.pkl")
-        with open(schema_path, "rb") as f:
-            interpro_schema = pickle.load(f)
+        interpro_schema = _load_schema("interpro")
 
         # Create system prompt template
         system_template = """
@@ -824,7 +973,8 @@ def query_interpro(prompt: str = None, endpoint: str = None, max_results: int =
         gemini_result = _query_gemini_for_api(
             prompt=prompt,
             schema=interpro_schema,
-            system_template=system_template
+            system_template=system_template,
+            tool_name="query_interpro"
         )
         
         if not gemini_result["success"]:
@@ -894,10 +1044,7 @@ def query_pdb(prompt: str = None, query: dict = None, max_results: int = 3) -> d
     # Generate search query from natural language if prompt is provided and query is not
     if prompt and not query:
         # Load schema from pickle file
-        schema_path = os.path.join(SCHEMA_DB_PATH, "pdb.pkl")
-        
-        with open(schema_path, "rb") as f:
-            schema = pickle.load(f)
+        schema = _load_schema("pdb")
 
         # Create system prompt template
         system_template = """
@@ -931,7 +1078,8 @@ def query_pdb(prompt: str = None, query: dict = None, max_results: int = 3) -> d
         gemini_result = _query_gemini_for_api(
             prompt=prompt,
             schema=schema,
-            system_template=system_template
+            system_template=system_template,
+            tool_name="query_pdb"
         )
         
         if not gemini_result["success"]:
@@ -1033,7 +1181,7 @@ def query_pdb_identifiers(identifiers: List[str], return_type: str = "entry", do
                     data_url = f"https://data.rcsb.org/rest/v1/core/chem_comp/{identifier}"
                 
                 # Fetch data
-                data_response = requests.get(data_url)
+                data_response = get_http_client().get(data_url)
                 data_response.raise_for_status()
                 entity_data = data_response.json()
                 
@@ -1078,7 +1226,7 @@ def query_pdb_identifiers(identifiers: List[str], return_type: str = "entry", do
                 try:
                     # Download PDB file
                     pdb_url = f"https://files.rcsb.org/download/{pdb_id}.pdb"
-                    pdb_response = requests.get(pdb_url)
+                    pdb_response = get_http_client().get(pdb_url)
                     
                     if pdb_response.status_code == 200:
                         # Create data directory if it doesn't exist
@@ -1129,9 +1277,7 @@ def query_kegg(prompt: str, endpoint: str = None, verbose: bool = True) -> dict:
 
     if prompt:
         # Load schema from pickle file
-        schema_path = os.path.join(SCHEMA_DB_PATH, "kegg.pkl")
-        with open(schema_path, "rb") as f:
-            kegg_schema = pickle.load(f)
+        kegg_schema = _load_schema("kegg")
 
         # Create system prompt template
         system_template = """
@@ -1164,7 +1310,8 @@ def query_kegg(prompt: str, endpoint: str = None, verbose: bool = True) -> dict:
         gemini_result = _query_gemini_for_api(
             prompt=prompt,
             schema=kegg_schema,
-            system_template=system_template
+            system_template=system_template,
+            tool_name="query_kegg"
         )
         
         if not gemini_result["success"]:
@@ -1232,9 +1379,7 @@ def query_stringdb(prompt: str = None, endpoint: str = None, api_key: str = None
     # If using prompt, parse with Claude
     if prompt:
         # Load STRING schema
-        schema_path = os.path.join(SCHEMA_DB_PATH, "stringdb.pkl")
-        with open(schema_path, "rb") as f:
-            stringdb_schema = pickle.load(f)
+        stringdb_schema = _load_schema("stringdb")
                 
         # Create system prompt template
         system_template = """
@@ -1263,7 +1408,8 @@ def query_stringdb(prompt: str = None, endpoint: str = None, api_key: str = None
         gemini_result = _query_gemini_for_api(
             prompt=prompt,
             schema=stringdb_schema,
-            system_template=system_template
+            system_template=system_template,
+            tool_name="query_stringdb"
         )
         
         if not gemini_result["success"]:
@@ -1300,7 +1446,7 @@ def query_stringdb(prompt: str = None, endpoint: str = None, api_key: str = None
         if download_image:
             # For images, we need to handle the download manually
             try:
-                response = requests.get(endpoint, stream=True)
+                response = get_http_client().get(endpoint, stream=True)
                 response.raise_for_status()
                 
                 # Create output directory if needed
@@ -1399,9 +1545,7 @@ def query_paleobiology(prompt: str = None, endpoint: str = None, api_key: str =
     # If using prompt, parse with Claude
     if prompt:
         # Load PBDB schema
-        schema_path = os.path.join(SCHEMA_DB_PATH, "paleobiology.pkl")
-        with open(schema_path, "rb") as f:
-            pbdb_schema = pickle.load(f)
+        pbdb_schema = _load_schema("paleobiology")
                 
         # Create system prompt template
         system_template = """
@@ -1431,7 +1575,8 @@ def query_paleobiology(prompt: str = None, endpoint: str = None, api_key: str =
         gemini_result = _query_gemini_for_api(
             prompt=prompt,
             schema=pbdb_schema,
-            system_template=system_template
+            system_template=system_template,
+            tool_name="query_paleobiology"
         )
         
         if not gemini_result["success"]:
@@ -1464,7 +1609,7 @@ def query_paleobiology(prompt: str = None, endpoint: str = None, api_key: str =
     if is_image:
         # For image queries, we need special handling
         try:
-            response = requests.get(endpoint)
+            response = get_http_client().get(endpoint)
             response.raise_for_status()
             
             # Return image metadata without the binary data
@@ -1533,9 +1678,7 @@ def query_jaspar(prompt: str = None, endpoint: str = None, api_key: str = None,
     # If using prompt, parse with Claude
     if prompt:
         # Load JASPAR schema
-        schema_path = os.path.join(SCHEMA_DB_PATH, "jaspar.pkl")
-        with open(schema_path, "rb") as f:
-            jaspar_schema = pickle.load(f)
+        jaspar_schema = _load_schema("jaspar")
                 
         # Create system prompt template
         system_template = """
@@ -1563,7 +1706,8 @@ def query_jaspar(prompt: str = None, endpoint: str = None, api_key: str = None,
         gemini_result = _query_gemini_for_api(
             prompt=prompt,
             schema=jaspar_schema,
-            system_template=system_template
+            system_template=system_template,
+            tool_name="query_jaspar"
         )
         
         if not gemini_result["success"]:
@@ -1637,9 +1781,7 @@ def query_worms(prompt: str = None, endpoint: str = None, api_key: str = None,
     # If using prompt, parse with Claude
     if prompt:
         # Load WoRMS schema
-        schema_path = os.path.join(SCHEMA_DB_PATH, "worms.pkl")
-        with open(schema_path, "rb") as f:
-            worms_schema = pickle.load(f)
+        worms_schema = _load_schema("worms")
                 
         # Create system prompt template
         system_template = """
@@ -1668,7 +1810,8 @@ def query_worms(prompt: str = None, endpoint: str = None, api_key: str = None,
         gemini_result = _query_gemini_for_api(
             prompt=prompt,
             schema=worms_schema,
-            system_template=system_template
+            system_template=system_template,
+            tool_name="query_worms"
         )
         
         if not gemini_result["success"]:
@@ -1737,9 +1880,7 @@ def query_cbioportal(prompt: str = None, endpoint: str = None, api_key: str = No
     # If using prompt, parse with Claude
     if prompt:
         # Load cBioPortal schema
-        schema_path = os.path.join(SCHEMA_DB_PATH, "cbioportal.pkl")
-        with open(schema_path, "rb") as f:
-            cbioportal_schema = pickle.load(f)
+        cbioportal_schema = _load_schema("cbioportal")
                 
         # Create system prompt template
         system_template = """
@@ -1769,7 +1910,8 @@ def query_cbioportal(prompt: str = None, endpoint: str = None, api_key: str = No
         gemini_result = _query_gemini_for_api(
             prompt=prompt,
             schema=cbioportal_schema,
-            system_template=system_template
+            system_template=system_template,
+            tool_name="query_cbioportal"
         )
         
         if not gemini_result["success"]:
@@ -1830,9 +1972,7 @@ def query_clinvar(prompt: str = None, search_term: str = None, max_results: int
     
     if prompt:
         # Load ClinVar schema
-        schema_path = os.path.join(SCHEMA_DB_PATH, "clinvar.pkl")
-        with open(schema_path, "rb") as f:
-            clinvar_schema = pickle.load(f)
+        clinvar_schema = _load_schema("clinvar")
             
         # ClinVar system prompt template
         system_prompt_template = """
@@ -1867,7 +2007,8 @@ def query_clinvar(prompt: str = None, search_term: str = None, max_results: int
         gemini_result = _query_gemini_for_api(
             prompt=prompt,
             schema=clinvar_schema,
-            system_template=system_prompt_template
+            system_template=system_prompt_template,
+            tool_name="query_clinvar"
         )
         
         if not gemini_result["success"]:
@@ -1916,9 +2057,7 @@ def query_geo(prompt: str = None, search_term: str = None, max_results: int = 3)
     
     if prompt:
         # Load GEO schema
-        schema_path = os.path.join(SCHEMA_DB_PATH, "geo.pkl")
-        with open(schema_path, "rb") as f:
-            geo_schema = pickle.load(f)
+        geo_schema = _load_schema("geo")
         
         # Create system prompt template
         system_template = """
@@ -1957,7 +2096,8 @@ def query_geo(prompt: str = None, search_term: str = None, max_results: int = 3)
         gemini_result = _query_gemini_for_api(
             prompt=prompt,
             schema=geo_schema,
-            system_template=system_template
+            system_template=system_template,
+            tool_name="query_geo"
         )
         
         if not gemini_result["success"]:
@@ -2007,9 +2147,7 @@ def query_dbsnp(prompt: str = None, search_term: str = None, max_results: int =
     
     if prompt:
         # Load dbSNP schema
-        schema_path = os.path.join(SCHEMA_DB_PATH, "dbsnp.pkl")
-        with open(schema_path, "rb") as f:
-            dbsnp_schema = pickle.load(f)
+        dbsnp_schema = _load_schema("dbsnp")
         
         # Create system prompt template
         system_template = """
@@ -2041,7 +2179,8 @@ def query_dbsnp(prompt: str = None, search_term: str = None, max_results: int =
         gemini_result = _query_gemini_for_api(
             prompt=prompt,
             schema=dbsnp_schema,
-            system_template=system_template
+            system_template=system_template,
+            tool_name="query_dbsnp"
         )
         
         if not gemini_result["success"]:
@@ -2094,9 +2233,7 @@ def query_ucsc(prompt: str = None, endpoint: str = None, verbose: bool = True) -
     # If using prompt, parse with Claude
     if prompt:
         # Load UCSC schema
-        schema_path = os.path.join(SCHEMA_DB_PATH, "ucsc.pkl")
-        with open(schema_path, "rb") as f:
-            ucsc_schema = pickle.load(f)
+        ucsc_schema = _load_schema("ucsc")
                 
         # Create system prompt template
         system_template = """
@@ -2128,7 +2265,8 @@ def query_ucsc(prompt: str = None, endpoint: str = None, verbose: bool = True) -
         gemini_result = _query_gemini_for_api(
             prompt=prompt,
             schema=ucsc_schema,
-            system_template=system_template
+            system_template=system_template,
+            tool_name="query_ucsc"
         )
         
         if not gemini_result["success"]:
@@ -2198,9 +2336,7 @@ def query_ensembl(prompt: str = None, endpoint: str = None, verbose: bool = True
     # If using prompt, parse with Claude
     if prompt:
         # Load Ensembl schema
-        schema_path = os.path.join(SCHEMA_DB_PATH, "ensembl.pkl")
-        with open(schema_path, "rb") as f:
-            ensembl_schema = pickle.load(f)
+        ensembl_schema = _load_schema("ensembl")
                 
         # Create system prompt template
         system_template = """
@@ -2232,7 +2368,8 @@ def query_ensembl(prompt: str = None, endpoint: str = None, verbose: bool = True
         gemini_result = _query_gemini_for_api(
             prompt=prompt,
             schema=ensembl_schema,
-            system_template=system_template
+            system_template=system_template,
+            tool_name="query_ensembl"
         )
         
         if not gemini_result["success"]:
@@ -2318,9 +2455,7 @@ def query_opentarget_genetics(prompt: str = None, query: str = None, variables:
     # If using prompt, parse with Claude
     if prompt:
         # Load OpenTargets schema
-        schema_path = os.path.join(SCHEMA_DB_PATH, "opentarget_genetics.pkl")
-        with open(schema_path, "rb") as f:
-            opentarget_schema = pickle.load(f)
+        opentarget_schema = _load_schema("opentarget_genetics")
                 
         # Create system prompt template
         system_template = """
@@ -2348,7 +2483,8 @@ def query_opentarget_genetics(prompt: str = None, query: str = None, variables:
         gemini_result = _query_gemini_for_api(
             prompt=prompt,
             schema=opentarget_schema,
-            system_template=system_template
+            system_template=system_template,
+            tool_name="query_opentarget_genetics"
         )
         
         if not gemini_result["success"]:
@@ -2412,9 +2548,7 @@ def query_opentarget(prompt: str = None, query: str = None, variables: dict = No
     # If using prompt, parse with Claude
     if prompt:
         # Load OpenTargets schema
-        schema_path = os.path.join(SCHEMA_DB_PATH, "opentarget.pkl")
-        with open(schema_path, "rb") as f:
-            opentarget_schema = pickle.load(f)
+        opentarget_schema = _load_schema("opentarget")
                 
         # Create system prompt template
         system_template = """
@@ -2442,7 +2576,8 @@ def query_opentarget(prompt: str = None, query: str = None, variables: dict = No
         gemini_result = _query_gemini_for_api(
             prompt=prompt,
             schema=opentarget_schema,
-            system_template=system_template
+            system_template=system_template,
+            tool_name="query_opentarget"
         )
         
         if not gemini_result["success"]:
@@ -2506,9 +2641,7 @@ def query_gwas_catalog(prompt: str = None, endpoint: str = None, max_results: in
     # If using prompt, parse with Claude
     if prompt:
         # Load GWAS Catalog schema
-        schema_path = os.path.join(SCHEMA_DB_PATH, "gwas_catalog.pkl")
-        with open(schema_path, "rb") as f:
-            gwas_schema = pickle.load(f)
+        gwas_schema = _load_schema("gwas_catalog")
                 
         # Create system prompt template
         system_template = """
@@ -2538,7 +2671,8 @@ def query_gwas_catalog(prompt: str = None, endpoint: str = None, max_results: in
         gemini_result = _query_gemini_for_api(
             prompt=prompt,
             schema=gwas_schema,
-            system_template=system_template
+            system_template=system_template,
+            tool_name="query_gwas_catalog"
         )
         
         if not gemini_result["success"]:
@@ -2609,9 +2743,7 @@ def query_gnomad(prompt: str = None, gene_symbol: str = None, verbose: bool = Tr
     # If using prompt, parse with Claude
     if prompt and not gene_symbol:
         # Load gnomAD schema
-        schema_path = os.path.join(SCHEMA_DB_PATH, "gnomad.pkl")
-        with open(schema_path, "rb") as f:
-            gnomad_schema = pickle.load(f)
+        gnomad_schema = _load_schema("gnomad")
                 
         # Create system prompt template
         system_template = """
@@ -2641,7 +2773,8 @@ def query_gnomad(prompt: str = None, gene_symbol: str = None, verbose: bool = Tr
         gemini_result = _query_gemini_for_api(
             prompt=prompt,
             schema=gnomad_schema,
-            system_template=system_template
+            system_template=system_template,
+            tool_name="query_gnomad"
         )
         
         if not gemini_result["success"]:
@@ -2658,9 +2791,7 @@ def query_gnomad(prompt: str = None, gene_symbol: str = None, verbose: bool = Tr
             }
     else:
         # Load gnomAD schema for gene_symbol substitution
-        schema_path = os.path.join(SCHEMA_DB_PATH, "gnomad.pkl")
-        with open(schema_path, "rb") as f:
-            gnomad_schema = pickle.load(f)
+        gnomad_schema = _load_schema("gnomad")
             
         description = f"Query gnomAD for variants in {gene_symbol}"
         # replace BRCA1 with gene_symbol
@@ -2810,9 +2941,7 @@ def query_reactome(prompt: str = None, endpoint: str = None, download: bool = Fa
     # If using prompt, parse with Claude
     if prompt:
         # Load Reactome schema
-        schema_path = os.path.join(SCHEMA_DB_PATH, "reactome.pkl")
-        with open(schema_path, "rb") as f:
-            reactome_schema = pickle.load(f)
+        reactome_schema = _load_schema("reactome")
                 
         # Create system prompt template
         system_template = """
@@ -2843,7 +2972,8 @@ def query_reactome(prompt: str = None, endpoint: str = None, download: bool = Fa
         gemini_result = _query_gemini_for_api(
             prompt=prompt,
             schema=reactome_schema,
-            system_template=system_template
+            system_template=system_template,
+            tool_name="query_reactome"
         )
         
         if not gemini_result["success"]:
@@ -2914,7 +3044,7 @@ def query_reactome(prompt: str = None, endpoint: str = None, download: bool = Fa
         if pathway_id and output_dir:
             diagram_url = f"{content_base_url}/data/pathway/{pathway_id}/diagram"
             try:
-                diagram_response = requests.get(diagram_url)
+                diagram_response = get_http_client().get(diagram_url)
                 diagram_response.raise_for_status()
                 
                 # Save diagram file
@@ -2988,7 +3118,8 @@ def query_regulomedb(prompt: str = None, endpoint: str = None, api_key: str = No
         gemini_result = _query_gemini_for_api(
             prompt=prompt,
             schema=None,
-            system_template=system_template
+            system_template=system_template,
+            tool_name="query_regulomedb"
         )
         
         if not gemini_result["success"]:
@@ -3053,9 +3184,7 @@ def query_pride(prompt: str = None, endpoint: str = None, api_key: str = None,
     # If using prompt, parse with Claude
     if prompt:
         # Load PRIDE schema
-        schema_path = os.path.join(SCHEMA_DB_PATH, "pride.pkl")
-        with open(schema_path, "rb") as f:
-            pride_schema = pickle.load(f)
+        pride_schema = _load_schema("pride")
                 
         # Create system prompt template
         system_template = """
@@ -3084,7 +3213,8 @@ def query_pride(prompt: str = None, endpoint: str = None, api_key: str = None,
         gemini_result = _query_gemini_for_api(
             prompt=prompt,
             schema=pride_schema,
-            system_template=system_template
+            system_template=system_template,
+            tool_name="query_pride"
         )
         
         if not gemini_result["success"]:
@@ -3153,9 +3283,7 @@ def query_gtopdb(prompt: str = None, endpoint: str = None, api_key: str = None,
     # If using prompt, parse with Claude
     if prompt:
         # Load GtoPdb schema
-        schema_path = os.path.join(SCHEMA_DB_PATH, "gtopdb.pkl")
-        with open(schema_path, "rb") as f:
-            gtopdb_schema = pickle.load(f)
+        gtopdb_schema = _load_schema("gtopdb")
                 
         # Create system prompt template
         system_template = """
@@ -3185,7 +3313,8 @@ def query_gtopdb(prompt: str = None, endpoint: str = None, api_key: str = None,
         gemini_result = _query_gemini_for_api(
             prompt=prompt,
             schema=gtopdb_schema,
-            system_template=system_template
+            system_template=system_template,
+            tool_name="query_gtopdb"
         )
         
         if not gemini_result["success"]:
@@ -3257,7 +3386,7 @@ def region_to_ccre_screen(coord_chrom: str, coord_start: int, coord_end: int, as
         steps.append(str(data))
 
         # Make the request
-        response = requests.post(url, json=data)
+        response = get_http_client().post(url, json=data, idempotent=True)
 
         # Check if the response is successful
         if not response.ok:
@@ -3359,7 +3488,7 @@ def get_genes_near_ccre(accession: str, assembly: str, chromosome: str, k: int =
     }
     
     steps_log += "Sending POST request to API with given data.\n"
-    response = requests.post(url, json=data)
+    response = get_http_client().post(url, json=data, idempotent=True)
     
     if not response.ok:
         steps_log += f"API request failed with response: {response.text}\n"
@@ -3423,9 +3552,7 @@ def query_remap(prompt: str = None, endpoint: str = None, api_key: str = None,
     # If using prompt, parse with Claude
     if prompt:
         # Load ReMap schema
-        schema_path = os.path.join(SCHEMA_DB_PATH, "remap.pkl")
-        with open(schema_path, "rb") as f:
-            remap_schema = pickle.load(f)
+        remap_schema = _load_schema("remap")
                 
         # Create system prompt template
         system_template = """
@@ -3454,7 +3581,8 @@ def query_remap(prompt: str = None, endpoint: str = None, api_key: str = None,
         gemini_result = _query_gemini_for_api(
             prompt=prompt,
             schema=remap_schema,
-            system_template=system_template
+            system_template=system_template,
+            tool_name="query_remap"
         )
         
         if not gemini_result["success"]:
@@ -3524,9 +3652,7 @@ def query_mpd(prompt: str = None, endpoint: str = None, api_key: str = None,  ve
     # If using prompt, parse with Claude
     if prompt:
         # Load MPD schema
-        schema_path = os.path.join(SCHEMA_DB_PATH, "mpd.pkl")
-        with open(schema_path, "rb") as f:
-            mpd_schema = pickle.load(f)
+        mpd_schema = _load_schema("mpd")
                 
         # Create system prompt template
         system_template = """
@@ -3555,7 +3681,8 @@ def query_mpd(prompt: str = None, endpoint: str = None, api_key: str = None,  ve
         gemini_result = _query_gemini_for_api(
             prompt=prompt,
             schema=mpd_schema,
-            system_template=system_template
+            system_template=system_template,
+            tool_name="query_mpd"
         )
         
         if not gemini_result["success"]:
@@ -3626,9 +3753,7 @@ def query_emdb(prompt: str = None, endpoint: str = None, api_key: str = None,  v
     # If using prompt, parse with Claude
     if prompt:
         # Load EMDB schema
-        schema_path = os.path.join(SCHEMA_DB_PATH, "emdb.pkl")
-        with open(schema_path, "rb") as f:
-            emdb_schema = pickle.load(f)
+        emdb_schema = _load_schema("emdb")
                 
         # Create system prompt template
         system_template = """
@@ -3659,7 +3784,8 @@ def query_emdb(prompt: str = None, endpoint: str = None, api_key: str = None,  v
         gemini_result = _query_gemini_for_api(
             prompt=prompt,
             schema=emdb_schema,
-            system_template=system_template
+            system_template=system_template,
+            tool_name="query_emdb"
         )
         
         if not gemini_result["success"]:
@@ -3701,3 +3827,525 @@ def query_emdb(prompt: str = None, endpoint: str = None, api_key: str = None,  v
         api_result["result"] = _format_query_results(api_result["result"])
     
     return api_result
+
+
+# ==================== Batch lookups ====================
+# The query_*_batch tools take lists of identifiers (e.g. 200 genes of a
+# screen) and return one table: bulk endpoints where the service has them,
+# otherwise concurrent requests under the host's rate limit (http_client).
+
+def _batch_identifiers(identifiers) -> List[str]:
+    """Identifiers as a de-duplicated list (also accepts a comma / whitespace separated string)."""
+    if isinstance(identifiers, str):
+        identifiers = identifiers.replace(",", " ").split()
+    seen = []
+    for identifier in identifiers or []:
+        identifier = str(identifier).strip()
+        if identifier and identifier not in seen:
+            seen.append(identifier)
+    return seen
+
+
+def _batch_check(identifiers: List[str]) -> Optional[Dict[str, Any]]:
+    """Error dict when a batch is empty or too large, else None."""
+    if not identifiers:
+        return {"success": False, "error": "No identifiers provided"}
+    max_identifiers = TOOLS_CONFIG.get("batch_max_identifiers", 1000)
+    if len(identifiers) > max_identifiers:
+        return {"success": False, "error": f"Too many identifiers ({len(identifiers)}); the limit is {max_identifiers} per call"}
+    return None
+
+
+def _chunks(items: List[Any], size: int) -> List[List[Any]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _fan_out(func, items: List[Any]) -> List[Any]:
+    """Run func(item) concurrently; results in item order (exceptions become error dicts)."""
+    def run(item):
+        try:
+            return func(item)
+        except Exception as e:
+            return {"success": False, "error": f"{type(e).__name__}: {str(e)}"}
+
+    if len(items) <= 1:
+        return [run(item) for item in items]
+    workers = min(TOOLS_CONFIG.get("batch_workers", 8), len(items))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db-batch") as executor:
+        return list(executor.map(run, items))
+
+
+def _batch_table(database: str, columns: List[str], rows: List[List[Any]], identifiers: List[str],
+                 errors: Dict[str, str], requests_made: int) -> Dict[str, Any]:
+    """Merged, table-shaped result of a batch tool (rows follow the order of columns)."""
+    found = {row[0] for row in rows}
+    result = {
+        "success": bool(rows) or not errors,
+        "database": database,
+        "columns": columns,
+        "rows": rows,
+        "row_count": len(rows),
+        "identifiers": len(identifiers),
+        "not_found": [i for i in identifiers if i not in found and i not in errors],
+        "errors": errors,
+        "requests": requests_made,
+    }
+    if not result["success"]:
+        result["error"] = f"All {database} requests failed"
+    return result
+
+
+def _batch_error(identifiers: List[str], response: Dict[str, Any]) -> Dict[str, str]:
+    message = response.get("error", "Request failed")
+    return {identifier: message for identifier in identifiers}
+
+
+def _first(items, key, default=None):
+    return items[0].get(key, default) if items else default
+
+
+@tool
+def query_uniprot_batch(identifiers: List[str], organism_id: int = 9606) -> dict:
+    """
+    Look up many proteins in UniProt at once and return one table.
+
+    Accessions (e.g. P04637) are fetched with the bulk accessions endpoint;
+    gene symbols (e.g. TP53) are searched as reviewed (Swiss-Prot) entries of
+    the organism, many symbols per request.
+
+    Args:
+        identifiers: UniProt accessions and/or gene symbols (list, or comma separated string)
+        organism_id: NCBI taxonomy ID used for gene symbol searches (default 9606, human)
+
+    Returns:
+        Dictionary with "columns", "rows" (one per matched entry), "not_found" and "errors"
+
+    Examples:
+        - query_uniprot_batch(["P04637", "P38398", "EGFR", "KRAS"])
+    """
+    identifiers = _batch_identifiers(identifiers)
+    error = _batch_check(identifiers)
+    if error:
+        return error
+
+    base_url = "https://rest.uniprot.org/uniprotkb"
+    fields = "accession,id,gene_primary,protein_name,organism_name,length,reviewed"
+    columns = ["identifier", "accession", "entry_name", "gene", "protein_name", "organism", "length", "reviewed"]
+    accessions = [i for i in identifiers if identifier_kind(i) == "uniprot"]
+    symbols = [i for i in identifiers if i not in accessions]
+
+    def row(identifier, entry):
+        genes = entry.get("genes") or []
+        gene = (genes[0].get("geneName") or {}).get("value") if genes else None
+        description = entry.get("proteinDescription") or {}
+        name = ((description.get("recommendedName") or {}).get("fullName") or {}).get("value")
+        if name is None and description.get("submissionNames"):
+            name = (description["submissionNames"][0].get("fullName") or {}).get("value")
+        return [identifier, entry.get("primaryAccession"), entry.get("uniProtkbId"), gene, name,
+                (entry.get("organism") or {}).get("scientificName"), (entry.get("sequence") or {}).get("length"),
+                str(entry.get("entryType", "")).startswith("UniProtKB reviewed")]
+
+    def fetch_accessions(chunk):
+        return chunk, _query_rest_api(
+            endpoint=f"{base_url}/accessions",
+            params={"accessions": ",".join(chunk), "fields": fields, "format": "json", "size": 500},
+            description=f"UniProt bulk lookup of {len(chunk)} accessions"
+        )
+
+    def fetch_symbols(chunk):
+        genes = " OR ".join(f"gene_exact:{symbol}" for symbol in chunk)
+        return chunk, _query_rest_api(
+            endpoint=f"{base_url}/search",
+            params={"query": f"({genes}) AND organism_id:{organism_id} AND reviewed:true",
+                    "fields": fields, "format": "json", "size": 500},
+            description=f"UniProt search for {len(chunk)} gene symbols"
+        )
+
+    jobs = [(fetch_accessions, chunk) for chunk in _chunks(accessions, 100)]
+    jobs += [(fetch_symbols, chunk) for chunk in _chunks(symbols, 50)]
+    rows, errors = [], {}
+    for chunk, response in _fan_out(lambda job: job[0](job[1]), jobs):
+        if not response.get("success"):
+            errors.update(_batch_error(chunk, response))
+            continue
+        entries = (response.get("result") or {}).get("results", [])
+        wanted = {identifier.upper(): identifier for identifier in chunk}
+        for entry in entries:
+            keys = [entry.get("primaryAccession", "")] + list(entry.get("secondaryAccessions") or [])
+            keys += [(g.get("geneName") or {}).get("value", "") for g in entry.get("genes") or []]
+            for key in keys:
+                identifier = wanted.get(str(key).upper())
+                if identifier:
+                    rows.append(row(identifier, entry))
+                    break
+
+    order = {identifier: i for i, identifier in enumerate(identifiers)}
+    rows.sort(key=lambda r: order[r[0]])
+    return _batch_table("uniprot", columns, rows, identifiers, errors, len(jobs))
+
+
+@tool
+def query_alphafold_batch(uniprot_ids: List[str]) -> dict:
+    """
+    Look up AlphaFold DB predictions for many UniProt accessions and return one table.
+
+    AlphaFold DB has no bulk endpoint, so the accessions are fetched
+    concurrently within the host's rate limit.
+
+    Args:
+        uniprot_ids: UniProt accessions (list, or comma separated string)
+
+    Returns:
+        Dictionary with "columns", "rows" (one per prediction), "not_found" and "errors"
+
+    Examples:
+        - query_alphafold_batch(["P04637", "P38398", "P00533"])
+    """
+    identifiers = _batch_identifiers(uniprot_ids)
+    error = _batch_check(identifiers)
+    if error:
+        return error
+
+    columns = ["identifier", "entry_id", "gene", "organism", "sequence_length", "mean_plddt", "model_version", "pdb_url", "cif_url"]
+
+    def fetch(identifier):
+        return _query_rest_api(
+            endpoint=f"https://alphafold.ebi.ac.uk/api/prediction/{identifier}",
+            description=f"AlphaFold prediction for {identifier}"
+        )
+
+    rows, errors = [], {}
+    for identifier, response in zip(identifiers, _fan_out(fetch, identifiers)):
+        if not response.get("success"):
+            # Accessions without a prediction are answered with 404
+            if "404" not in str(response.get("error", "")):
+                errors[identifier] = response.get("error", "Request failed")
+            continue
+        for prediction in response.get("result") or []:
+            if not isinstance(prediction, dict):
+                continue
+            rows.append([
+                identifier, prediction.get("entryId"), prediction.get("gene"), prediction.get("organismScientificName"),
+                prediction.get("uniprotEnd"), prediction.get("globalMetricValue"), prediction.get("latestVersion"),
+                prediction.get("pdbUrl"), prediction.get("cifUrl"),
+            ])
+    return _batch_table("alphafold", columns, rows, identifiers, errors, len(identifiers))
+
+
+@tool
+def query_ensembl_batch(identifiers: List[str], species: str = "homo_sapiens") -> dict:
+    """
+    Look up many genes, transcripts or variants in Ensembl at once and return one table.
+
+    Uses the bulk POST endpoints: /lookup/id for Ensembl stable IDs,
+    /lookup/symbol for gene symbols and /variation for rsIDs.
+
+    Args:
+        identifiers: Ensembl stable IDs (ENSG...), gene symbols and/or rsIDs (list, or comma separated string)
+        species: Ensembl species name (default "homo_sapiens")
+
+    Returns:
+        Dictionary with "columns", "rows" (one per identifier found), "not_found" and "errors"
+
+    Examples:
+        - query_ensembl_batch(["BRCA2", "TP53", "ENSG00000141510", "rs6025"])
+    """
+    identifiers = _batch_identifiers(identifiers)
+    error = _batch_check(identifiers)
+    if error:
+        return error
+
+    base_url = "https://rest.ensembl.org"
+    headers = {"Content-Type": "application/json", "Accept": "application/json"}
+    columns = ["identifier", "ensembl_id", "name", "type", "chromosome", "start", "end", "strand", "detail"]
+    kinds = {identifier: identifier_kind(identifier) for identifier in identifiers}
+    stable_ids = [i for i in identifiers if kinds[i] == "ensembl"]
+    rsids = [i for i in identifiers if kinds[i] == "rsid"]
+    symbols = [i for i in identifiers if kinds[i] not in ("ensembl", "rsid")]
+
+    def lookup_row(identifier, record):
+        return [identifier, record.get("id"), record.get("display_name"), record.get("biotype") or record.get("object_type"),
+                record.get("seq_region_name"), record.get("start"), record.get("end"), record.get("strand"),
+                record.get("description")]
+
+    def variation_row(identifier, record):
+        mapping = next((m for m in record.get("mappings") or [] if m.get("assembly_name")), {})
+        detail = ", ".join(filter(None, [mapping.get("allele_string"), record.get("most_severe_consequence"),
+                                         f"MAF {record['MAF']}" if record.get("MAF") is not None else None]))
+        return [identifier, record.get("name"), record.get("name"), record.get("var_class"), mapping.get("seq_region_name"),
+                mapping.get("start"), mapping.get("end"), mapping.get("strand"), detail]
+
+    jobs = [(f"{base_url}/lookup/id", "ids", chunk, lookup_row) for chunk in _chunks(stable_ids, 1000)]
+    jobs += [(f"{base_url}/lookup/symbol/{species}", "symbols", chunk, lookup_row) for chunk in _chunks(symbols, 1000)]
+    jobs += [(f"{base_url}/variation/{species}", "ids", chunk, variation_row) for chunk in _chunks(rsids, 200)]
+
+    def fetch(job):
+        url, field, chunk, _ = job
+        return _query_rest_api(
+            endpoint=url,
+            method="POST",
+            json_data={field: chunk},
+            headers=headers,
+            description=f"Ensembl bulk lookup of {len(chunk)} identifiers"
+        )
+
+    rows, errors = [], {}
+    for (_, _, chunk, make_row), response in zip(jobs, _fan_out(fetch, jobs)):
+        if not response.get("success"):
+            errors.update(_batch_error(chunk, response))
+            continue
+        records = response.get("result") or {}
+        # Keys are the identifiers as sent (rsIDs may be returned under their current name)
+        by_key = {str(key).lower(): value for key, value in records.items()} if isinstance(records, dict) else {}
+        for identifier in chunk:
+            record = by_key.get(identifier.lower())
+            if isinstance(record, dict):
+                rows.append(make_row(identifier, record))
+
+    order = {identifier: i for i, identifier in enumerate(identifiers)}
+    rows.sort(key=lambda r: order[r[0]])
+    return _batch_table("ensembl", columns, rows, identifiers, errors, len(jobs))
+
+
+@tool
+def query_dbsnp_batch(rsids: List[str]) -> dict:
+    """
+    Look up many dbSNP variants at once and return one table.
+
+    Uses NCBI ESummary with comma separated ID lists (200 variants per request).
+
+    Args:
+        rsids: dbSNP rsIDs, e.g. ["rs6025", "rs1801133"] (list, or comma separated string)
+
+    Returns:
+        Dictionary with "columns", "rows" (one per variant), "not_found" and "errors"
+
+    Examples:
+        - query_dbsnp_batch(["rs6025", "rs1801133", "rs429358"])
+    """
+    identifiers = _batch_identifiers(rsids)
+    error = _batch_check(identifiers)
+    if error:
+        return error
+
+    columns = ["identifier", "position", "genes", "snp_class", "function_class", "clinical_significance", "global_maf"]
+    numeric = {}
+    invalid = {}
+    for identifier in identifiers:
+        digits = identifier.lower().removeprefix("rs")
+        if digits.isdigit():
+            numeric[str(int(digits))] = identifier
+        else:
+            invalid[identifier] = "Not an rsID"
+
+    chunks = _chunks(list(numeric), 200)
+
+    def fetch(chunk):
+        return _query_rest_api(
+            endpoint="https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi",
+            params={"db": "snp", "id": ",".join(chunk), "retmode": "json"},
+            description=f"NCBI ESummary of {len(chunk)} dbSNP variants"
+        )
+
+    rows, errors = [], dict(invalid)
+    for chunk, response in zip(chunks, _fan_out(fetch, chunks)):
+        if not response.get("success"):
+            errors.update(_batch_error([numeric[uid] for uid in chunk], response))
+            continue
+        records = (response.get("result") or {}).get("result") or {}
+        for uid in chunk:
+            record = records.get(uid)
+            if not isinstance(record, dict) or record.get("error"):
+                continue
+            mafs = record.get("global_mafs") or []
+            rows.append([
+                numeric[uid], record.get("chrpos"), ",".join(g.get("name", "") for g in record.get("genes") or []),
+                record.get("snp_class"), record.get("fxn_class"), record.get("clinical_significance"),
+                _first(mafs, "freq"),
+            ])
+    return _batch_table("dbsnp", columns, rows, identifiers, errors, len(chunks))
+
+
+@tool
+def query_clinvar_batch(identifiers: List[str], max_results_per_gene: int = 20) -> dict:
+    """
+    Look up ClinVar records for many variants or genes at once and return one table.
+
+    rsIDs are resolved in one E-utilities search (history server) whose
+    records are fetched in pages; ClinVar variation IDs are summarized with
+    comma separated ID lists; gene symbols are searched concurrently within
+    the NCBI rate limit.
+
+    Args:
+        identifiers: rsIDs (rs6025), ClinVar variation IDs (12345) and/or gene symbols (BRCA1) (list, or comma separated string)
+        max_results_per_gene: Maximum ClinVar records per gene symbol
+
+    Returns:
+        Dictionary with "columns", "rows" (one per ClinVar record), "not_found", "errors" and "gene_totals"
+
+    Examples:
+        - query_clinvar_batch(["rs6025", "rs80357906", "BRCA1", "MLH1"])
+    """
+    identifiers = _batch_identifiers(identifiers)
+    error = _batch_check(identifiers)
+    if error:
+        return error
+
+    eutils = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+    columns = ["identifier", "variation_id", "title", "clinical_significance", "review_status", "genes", "variant_type"]
+    rsids = [i for i in identifiers if identifier_kind(i) == "rsid"]
+    variation_ids = [i for i in identifiers if i.isdigit()]
+    symbols = [i for i in identifiers if i not in rsids and i not in variation_ids]
+
+    def row(identifier, uid, record):
+        classification = record.get("germline_classification") or record.get("clinical_significance") or {}
+        return [identifier, uid, record.get("title"), classification.get("description"), classification.get("review_status"),
+                ",".join(g.get("symbol", "") for g in record.get("genes") or []), record.get("obj_type")]
+
+    def rsids_of(record):
+        found = set()
+        for variation in record.get("variation_set") or []:
+            for xref in variation.get("variation_xrefs") or []:
+                if xref.get("db_source") == "dbSNP":
+                    found.add(f"rs{xref.get('db_id')}")
+        return found
+
+    def summaries(params):
+        response = _query_rest_api(endpoint=f"{eutils}/esummary.fcgi", params={"db": "clinvar", "retmode": "json", **params},
+                                   description="NCBI ESummary of ClinVar records")
+        if not response.get("success"):
+            return response, {}
+        result = (response.get("result") or {}).get("result") or {}
+        return response, {uid: result[uid] for uid in result.get("uids", []) if isinstance(result.get(uid), dict)}
+
+    rows, errors, gene_totals = [], {}, {}
+    requests_made = 0
+
+    # rsIDs: one search on the history server, then pages of summaries
+    if rsids:
+        wanted = {rsid.lower(): rsid for rsid in rsids}
+        search = _query_rest_api(
+            endpoint=f"{eutils}/esearch.fcgi",
+            params={"db": "clinvar", "term": " OR ".join(f"{rsid}[rsid]" for rsid in rsids),
+                    "retmode": "json", "retmax": 0, "usehistory": "y"},
+            description=f"NCBI ESearch of ClinVar for {len(rsids)} rsIDs"
+        )
+        requests_made += 1
+        if not search.get("success"):
+            errors.update(_batch_error(rsids, search))
+        else:
+            esearch = (search.get("result") or {}).get("esearchresult") or {}
+            count = int(esearch.get("count", 0))
+            for start in range(0, min(count, 5000), 500):
+                response, records = summaries({"query_key": esearch.get("querykey"), "WebEnv": esearch.get("webenv"),
+                                               "retstart": start, "retmax": 500})
+                requests_made += 1
+                if not response.get("success"):
+                    errors.update(_batch_error(rsids, response))
+                    break
+                for uid, record in records.items():
+                    for rsid in rsids_of(record):
+                        if rsid in wanted:
+                            rows.append(row(wanted[rsid], uid, record))
+
+    # Variation IDs: comma separated summaries
+    for chunk in _chunks(variation_ids, 200):
+        response, records = summaries({"id": ",".join(chunk)})
+        requests_made += 1
+        if not response.get("success"):
+            errors.update(_batch_error(chunk, response))
+            continue
+        for uid in chunk:
+            if uid in records:
+                rows.append(row(uid, uid, records[uid]))
+
+    # Gene symbols: concurrent searches (each esearch + esummary is cached)
+    def search_gene(symbol):
+        return _query_ncbi_database(database="clinvar", search_term=f"{symbol}[gene]", max_results=max_results_per_gene)
+
+    for symbol, result in zip(symbols, _fan_out(search_gene, symbols)):
+        requests_made += 2
+        if "total_results" not in result:
+            errors[symbol] = result.get("error", "Request failed")
+            continue
+        gene_totals[symbol] = result["total_results"]
+        summary = result.get("formatted_results")
+        records = (summary.get("result") or {}) if isinstance(summary, dict) else {}
+        for uid in records.get("uids", []):
+            if isinstance(records.get(uid), dict):
+                rows.append(row(symbol, uid, records[uid]))
+
+    order = {identifier: i for i, identifier in enumerate(identifiers)}
+    rows.sort(key=lambda r: order[r[0]])
+    result = _batch_table("clinvar", columns, rows, identifiers, errors, requests_made)
+    result["gene_totals"] = gene_totals
+    return result
+
+
+@tool
+def query_gnomad_batch(gene_symbols: List[str], reference_genome: str = "GRCh38", include_variant_counts: bool = False) -> dict:
+    """
+    Look up gnomAD gene constraint for many genes at once and return one table.
+
+    Several genes are requested per GraphQL query (aliased gene fields).
+
+    Args:
+        gene_symbols: Gene symbols, e.g. ["BRCA1", "TP53"] (list, or comma separated string)
+        reference_genome: "GRCh38" (gnomAD v4) or "GRCh37" (gnomAD v2)
+        include_variant_counts: Also count gnomAD variants and high-confidence LoF variants per gene (slower)
+
+    Returns:
+        Dictionary with "columns", "rows" (one per gene), "not_found" and "errors"
+
+    Examples:
+        - query_gnomad_batch(["BRCA1", "TP53", "PTEN"])
+    """
+    # Pasted into the GraphQL text as an enum value: only the known values
+    datasets = {"GRCh38": "gnomad_r4", "GRCh37": "gnomad_r2_1"}
+    if reference_genome not in datasets:
+        return {"success": False, "error": f"Unsupported reference_genome {reference_genome!r}; use 'GRCh38' or 'GRCh37'"}
+
+    identifiers = _batch_identifiers(gene_symbols)
+    error = _batch_check(identifiers)
+    if error:
+        return error
+
+    dataset = datasets[reference_genome]
+    columns = ["identifier", "gene_id", "chromosome", "start", "stop", "pli", "oe_lof", "oe_lof_upper", "mis_z"]
+    if include_variant_counts:
+        columns += ["variants", "lof_hc_variants"]
+    variants_field = f"variants(dataset: {dataset}) {{ lof }}" if include_variant_counts else ""
+
+    def fetch(chunk):
+        fields = "\n".join(
+            f'g{i}: gene(gene_symbol: {json.dumps(symbol)}, reference_genome: {reference_genome}) '
+            f'{{ gene_id symbol chrom start stop gnomad_constraint {{ pli oe_lof oe_lof_upper mis_z }} {variants_field} }}'
+            for i, symbol in enumerate(chunk)
+        )
+        return _query_rest_api(
+            endpoint="https://gnomad.broadinstitute.org/api",
+            method="POST",
+            json_data={"query": f"{{\n{fields}\n}}"},
+            headers={"Content-Type": "application/json"},
+            description=f"gnomAD constraint of {len(chunk)} genes"
+        )
+
+    chunks = _chunks(identifiers, 5 if include_variant_counts else 25)
+    rows, errors = [], {}
+    for chunk, response in zip(chunks, _fan_out(fetch, chunks)):
+        if not response.get("success"):
+            errors.update(_batch_error(chunk, response))
+            continue
+        data = (response.get("result") or {}).get("data") or {}
+        for i, symbol in enumerate(chunk):
+            gene = data.get(f"g{i}")
+            if not gene:
+                continue
+            constraint = gene.get("gnomad_constraint") or {}
+            row = [symbol, gene.get("gene_id"), gene.get("chrom"), gene.get("start"), gene.get("stop"),
+                   constraint.get("pli"), constraint.get("oe_lof"), constraint.get("oe_lof_upper"), constraint.get("mis_z")]
+            if include_variant_counts:
+                variants = gene.get("variants") or []
+                row += [len(variants), sum(1 for v in variants if v.get("lof") == "HC")]
+            rows.append(row)
+    return _batch_table("gnomad", columns, rows, identifiers, errors, len(chunks))
@@ -14,6 +14,9 @@ import random
 from typing import Optional, Dict, Any
 from urllib.parse import urljoin
 
+# Pooled, rate-limited and retrying HTTP client shared by all database tools
+from app.services.http_client import get_http_client
+
 # Import googlesearch-python for reliable Google search
 try:
     from googlesearch import search
@@ -259,7 +262,7 @@ def search_with_serpapi(query: str, num_results: int = 5) -> str:
             "format": "json"
         }
         
-        response = requests.get(url, params=params, timeout=10)
+        response = get_http_client().get(url, params=params, timeout=10)
         response.raise_for_status()
         
         data = response.json()
@@ -334,7 +337,7 @@ Be comprehensive and accurate."""
             "Content-Type": "application/json"
         }
         
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
+        response = get_http_client().post(url, json=payload, headers=headers, timeout=30)
         response.raise_for_status()
         
         result = response.json()
@@ -381,7 +384,7 @@ def visit_webpage(url: str) -> str:
     """
     try:
         # Send a GET request to the URL
-        response = requests.get(url)
+        response = get_http_client().get(url)
         response.raise_for_status()  # Raise an exception for bad status codes
 
         # Convert the HTML content to Markdown
@@ -430,7 +433,7 @@ def search_github_repositories(query: str, language: str = "", sort: str = "star
         }
         
         # Make request to GitHub API
-        response = requests.get(url, params=params)
+        response = get_http_client().get(url, params=params)
         response.raise_for_status()
         
         data = response.json()
@@ -497,7 +500,7 @@ def search_github_code(query: str, language: str = "", filename: str = "", exten
             "per_page": min(per_page, 100)
         }
         
-        response = requests.get(url, params=params)
+        response = get_http_client().get(url, params=params)
         response.raise_for_status()
         
         data = response.json()
@@ -541,7 +544,7 @@ def get_github_repository_info(repo_owner: str, repo_name: str) -> str:
     try:
         # Get repository information
         repo_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}"
-        response = requests.get(repo_url)
+        response = get_http_client().get(repo_url)
         response.raise_for_status()
         
         repo_data = response.json()
@@ -549,17 +552,17 @@ def get_github_repository_info(repo_owner: str, repo_name: str) -> str:
         # Get README content
         readme_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/readme"
         try:
-            readme_response = requests.get(readme_url)
+            readme_response = get_http_client().get(readme_url)
             readme_response.raise_for_status()
             readme_data = readme_response.json()
-            readme_content = requests.get(readme_data["download_url"]).text
+            readme_content = get_http_client().get(readme_data["download_url"]).text
         except:
             readme_content = "README not available"
         
         # Get latest release
         releases_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/releases/latest"
         try:
-            release_response = requests.get(releases_url)
+            release_response = get_http_client().get(releases_url)
             release_response.raise_for_status()
             latest_release = release_response.json()
             release_info = f"最新版本: {latest_release.get('tag_name', 'N/A')} ({latest_release.get('published_at', 'N/A')[:10]})"
@@ -863,7 +866,7 @@ def fetch_supplementary_info_from_doi(doi: str, output_dir: str = "supplementary
     # CrossRef API to resolve DOI to a publisher page
     crossref_url = f"https://doi.org/{doi}"
     headers = {"User-Agent": "Mozilla/5.0"}
-    response = requests.get(crossref_url, headers=headers)
+    response = get_http_client().get(crossref_url, headers=headers)
 
     if response.status_code != 200:
         log_message = f"Failed to resolve DOI: {doi}. Status Code: {response.status_code}"
@@ -874,7 +877,7 @@ def fetch_supplementary_info_from_doi(doi: str, output_dir: str = "supplementary
     research_log.append(f"Resolved DOI to publisher page: {publisher_url}")
 
     # Fetch publisher page
-    response = requests.get(publisher_url, headers=headers)
+    response = get_http_client().get(publisher_url, headers=headers)
     if response.status_code != 200:
         log_message = f"Failed to access publisher page for DOI {doi}."
         research_log.append(log_message)
@@ -906,7 +909,7 @@ def fetch_supplementary_info_from_doi(doi: str, output_dir: str = "supplementary
     downloaded_files = []
     for link in supplementary_links:
         file_name = os.path.join(output_dir, link.split("/")[-1])
-        file_response = requests.get(link, headers=headers)
+        file_response = get_http_client().get(link, headers=headers)
         if file_response.status_code == 200:
             with open(file_name, "wb") as f:
                 f.write(file_response.content)
@@ -1085,7 +1088,7 @@ def extract_url_content(url: str) -> str:
         Text content of the webpage
     """
     try:
-        response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'})
+        response = get_http_client().get(url, headers={'User-Agent': 'Mozilla/5.0'})
         
         # Check if the response is in text format
         if 'text/plain' in response.headers.get('Content-Type', '') or 'application/json' in response.headers.get('Content-Type', ''):
@@ -1130,7 +1133,7 @@ def extract_pdf_content(url: str) -> str:
         # Check if the URL ends with .pdf
         if not url.lower().endswith('.pdf'):
             # If not, try to find a PDF link on the page
-            response = requests.get(url, timeout=30)
+            response = get_http_client().get(url, timeout=30)
             if response.status_code == 200:
                 # Look for PDF links in the HTML content
                 pdf_links = re.findall(r'href=[\'"]([^\'"]+\.pdf)[\'"]', response.text)
@@ -1146,7 +1149,7 @@ def extract_pdf_content(url: str) -> str:
                     return f"No PDF file found at {url}. Please provide a direct link to a PDF file."
         
         # Download the PDF
-        response = requests.get(url, timeout=30)
+        response = get_http_client().get(url, timeout=30)
         
         # Check if we actually got a PDF file (by checking content type or magic bytes)
         content_type = response.headers.get('Content-Type', '').lower()
@@ -4,14 +4,16 @@ This module provides a tool for searching PubMed using the NCBI E-utilities API
 to find scientific literature and extract relevant paper details.
 """
 
-import urllib.parse
-import urllib.request
 import xml.etree.ElementTree as ET
 from typing import List, Dict, Any, Optional
 import json
-import time
 import logging
 from smolagents import tool
+import requests
+
+# Pooled HTTP client; NCBI's rate limit (3/s, 10/s with an API key) is enforced there
+from app.services.http_client import get_http_client
+from app.services.response_cache import get_response_cache, OfflineCacheMiss
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -134,18 +136,10 @@ def _search_pubmed(query: str, max_results: int, sort: str, email: Optional[str]
     if email:
         params["email"] = email
     
-    # Build URL
-    url = f"{base_url}?{urllib.parse.urlencode(params)}"
-    
     try:
-        # Add delay to respect rate limits
-        time.sleep(0.1)
-        
-        with urllib.request.urlopen(url, timeout=30) as response:
-            if response.status != 200:
-                raise PubMedAPIError(f"HTTP {response.status}: {response.reason}")
-            
-            xml_data = response.read()
+        response = get_http_client().get(base_url, params=params, timeout=30)
+        response.raise_for_status()
+        xml_data = response.content
             
         # Parse XML response
         root = ET.fromstring(xml_data)
@@ -167,19 +161,22 @@ def _search_pubmed(query: str, max_results: int, sort: str, email: Optional[str]
         logger.info(f"Found {len(pmids)} PMIDs")
         return pmids
         
-    except urllib.error.HTTPError as e:
-        if e.code == 429:
+    except requests.exceptions.HTTPError as e:
+        if e.response.status_code == 429:
             raise RateLimitError("Too many requests. Please wait and try again.")
         else:
-            raise PubMedAPIError(f"HTTP error {e.code}: {e.reason}")
-    except urllib.error.URLError as e:
-        raise PubMedAPIError(f"URL error: {e.reason}")
+            raise PubMedAPIError(f"HTTP error {e.response.status_code}: {e.response.reason}")
+    except requests.exceptions.RequestException as e:
+        raise PubMedAPIError(f"URL error: {e}")
     except ET.ParseError as e:
         raise PubMedAPIError(f"XML parsing error: {e}")
 
 def _fetch_paper_details(pmids: List[str], email: Optional[str]) -> List[Dict[str, Any]]:
     """
     Fetch detailed information for a list of PMIDs
+
+    Papers are cached per PMID in the persistent response cache, so only
+    PMIDs not seen before are fetched (in one efetch request).
     
     Args:
         pmids: List of PubMed IDs
@@ -190,7 +187,36 @@ def _fetch_paper_details(pmids: List[str], email: Optional[str]) -> List[Dict[st
     """
     if not pmids:
         return []
+
+    cache = get_response_cache()
+    try:
+        cached = {pmid: cache.lookup("pubmed", f"PUBMED efetch {pmid}") for pmid in pmids}
+    except OfflineCacheMiss as e:
+        raise PubMedAPIError(f"Offline mode: {e}")
+
+    missing = [pmid for pmid, paper in cached.items() if paper is None]
+    if missing:
+        for paper in _efetch_papers(missing, email):
+            if paper.get("pmid") in cached:
+                cached[paper["pmid"]] = paper
+                cache.store("pubmed", f"PUBMED efetch {paper['pmid']}", paper)
+    else:
+        logger.info(f"All {len(pmids)} papers served from cache")
+
+    return [cached[pmid] for pmid in pmids if cached.get(pmid) is not None]
+
+
+def _efetch_papers(pmids: List[str], email: Optional[str]) -> List[Dict[str, Any]]:
+    """
+    Fetch paper details for PMIDs from NCBI efetch (uncached part of _fetch_paper_details)
+    
+    Args:
+        pmids: List of PubMed IDs
+        email: Email for API requests
     
+    Returns:
+        List of paper details dictionaries
+    """
     base_url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
     
     params = {
@@ -204,17 +230,10 @@ def _fetch_paper_details(pmids: List[str], email: Optional[str]) -> List[Dict[st
     if email:
         params["email"] = email
     
-    url = f"{base_url}?{urllib.parse.urlencode(params)}"
-    
     try:
-        # Add delay to respect rate limits
-        time.sleep(0.1)
-        
-        with urllib.request.urlopen(url, timeout=30) as response:
-            if response.status != 200:
-                raise PubMedAPIError(f"HTTP {response.status}: {response.reason}")
-            
-            xml_data = response.read()
+        response = get_http_client().get(base_url, params=params, timeout=30)
+        response.raise_for_status()
+        xml_data = response.content
         
         # Parse XML response
         root = ET.fromstring(xml_data)
@@ -229,13 +248,13 @@ def _fetch_paper_details(pmids: List[str], email: Optional[str]) -> List[Dict[st
         logger.info(f"Extracted details for {len(papers)} papers")
         return papers
         
-    except urllib.error.HTTPError as e:
-        if e.code == 429:
+    except requests.exceptions.HTTPError as e:
+        if e.response.status_code == 429:
             raise RateLimitError("Too many requests. Please wait and try again.")
         else:
-            raise PubMedAPIError(f"HTTP error {e.code}: {e.reason}")
-    except urllib.error.URLError as e:
-        raise PubMedAPIError(f"URL error: {e.reason}")
+            raise PubMedAPIError(f"HTTP error {e.response.status_code}: {e.response.reason}")
+    except requests.exceptions.RequestException as e:
+        raise PubMedAPIError(f"URL error: {e}")
     except ET.ParseError as e:
         raise PubMedAPIError(f"XML parsing error: {e}")
 
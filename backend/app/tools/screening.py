@@ -10,9 +10,11 @@ import os
 import sys
 from typing import Dict, List, Any, Optional, Tuple
 import math
-from rapidfuzz import fuzz, process
 import numpy as np
 
+# Pooled, rate-limited and retrying HTTP client shared by all database tools
+from app.services.http_client import get_http_client
+
 # Add the parent directory to sys.path to import gene_tools from main directory
 main_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(main_dir)
@@ -21,6 +23,7 @@ os.chdir(main_dir)
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
 from llm import json_llm_call
+from app.tools.screening_resources import GeneSetLibrary, get_resource_registry
 
 
 def validate_genes(genes: List[str], species: str = "human") -> Tuple[List[str], List[str]]:
@@ -39,11 +42,9 @@ def validate_genes(genes: List[str], species: str = "human") -> Tuple[List[str],
         raise ValueError("Only human gene validation is supported with HGNC data")
     
     try:
-        with open("resource/hgnc_name.txt", "r") as f:
-            # Skip header line and get second column (index 1)
-            next(f)  # Skip header
-            valid_symbols = {line.strip().split("\t")[1] for line in f}
-            
+        # Loaded once per process (see screening_resources)
+        valid_symbols = get_resource_registry().hgnc_symbols()
+
         valid_genes = [gene for gene in genes if gene in valid_symbols]
         invalid_genes = [gene for gene in genes if gene not in valid_symbols]
         
@@ -167,7 +168,7 @@ def kegg_pathway_search(query_list: List[str], model_name: str = "gemini-2.5-pro
                 pathway_id = pathway_info['pathway_id']
                 try:
                     url = f"https://rest.kegg.jp/get/{pathway_id}"
-                    response = requests.get(url)
+                    response = get_http_client().get(url)
                     response.raise_for_status()
                     
                     # Extract GENE section
@@ -256,42 +257,32 @@ def disease_gene_search(
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"Disease mapping file not found at: {file_path}")
             
-            # Read the TSV file
-            df = pd.read_csv(file_path, 
-                           sep='\t', 
-                           header=None,
-                           names=['col1', 'gene_name', 'col3', 'disease', 'confidence'])
+            # Cached table with a disease -> rows index (loaded once per process)
+            table = get_resource_registry().disease_table(file_path)
+            if not table.diseases:
+                raise pd.errors.EmptyDataError(f"No diseases in {file_path}")
+            
+            # Score all queries against the distinct, pre-normalized disease names in one
+            # batch (query "cancer" -> "carcinoma" and names "carcinoma" -> "cancer");
+            # the best match is the first one on ties, as in row order
+            best_matches = table.matcher.best(disease_list)
             
             # Process each disease query
-            for query in disease_list:
-                normalized_query = query.lower().replace('cancer', 'carcinoma')
-                
-                # Calculate similarity scores
-                df['similarity'] = df['disease'].apply(
-                    lambda x: max(
-                        fuzz.token_sort_ratio(str(x).lower(), normalized_query),
-                        fuzz.token_sort_ratio(str(x).lower().replace('carcinoma', 'cancer'), query.lower())
-                    ) if pd.notnull(x) else 0
-                )
-                
-                # Get the best matching disease
-                best_match = df.loc[df['similarity'].idxmax()]
-                best_score = best_match['similarity']
-                
+            for query, (best_disease, best_score) in zip(disease_list, best_matches):
                 # Initialize result structure with the match info, even if below threshold
                 results[query] = {
                     "genes": [],
                     "scores": [],
                     "count": 0,
-                    "matched_disease": best_match['disease'],  # Always include the best match
+                    "matched_disease": best_disease,  # Always include the best match
                     "similarity_score": best_score,  # Always include the score
                     "note": ""
                 }
                 
                 # Only proceed with gene collection if above threshold
                 if best_score >= similarity_threshold:
-                    # Filter for the exact matched disease name
-                    disease_df = df[df['disease'] == best_match['disease']]
+                    # Rows of the exact matched disease name
+                    disease_df = table.rows(best_disease)
                     # First filter by confidence score
                     score_mask = disease_df['confidence'] >= confidence_cutoff
                     filtered_df = disease_df[score_mask]
@@ -455,7 +446,7 @@ def string_database_search(
         }
 
         # Make API request
-        response = requests.get(request_url, params=params)
+        response = get_http_client().get(request_url, params=params)
         response.raise_for_status()
 
         # Process results
@@ -552,54 +543,35 @@ def go_terms_search(
     Returns:
         Dictionary containing genes associated with each GO term query and normalized relevance scores
     """
-    import json
-    from rapidfuzz import process, fuzz
-    from rapidfuzz.utils import default_process
-    
     json_directory = "resource/GO"
     
-    def load_json_files() -> List[Dict[str, Any]]:
-        """Load all JSON files from the GO directory"""
-        data_list = []
+    def load_json_files() -> Optional[GeneSetLibrary]:
+        """Load the GO gene sets (parsed once per process and indexed by term)"""
         try:
-            for file_name in os.listdir(json_directory):
-                if file_name.lower().endswith(".json"):
-                    file_path = os.path.join(json_directory, file_name)
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            data_list.append(json.load(f))
-                    except Exception as e:
-                        print(f"Could not parse {file_path} as JSON: {e}")
+            return get_resource_registry().gene_set_library(json_directory)
         except FileNotFoundError:
             print(f"GO directory not found: {json_directory}")
-        return data_list
+            return None
 
-    def extract_all_term_names(data_files: List[Dict[str, Any]]) -> List[str]:
+    def extract_all_term_names(data_files: GeneSetLibrary) -> List[str]:
         """Extract all GO term names from the loaded JSON files"""
         term_names = []
-        for data_file in data_files:
-            if isinstance(data_file, dict):
-                term_names.extend(list(data_file.keys()))
+        term_names.extend(data_files.terms)
         return term_names
 
-    def similarity_search(query: str, all_terms: List[str]) -> List[str]:
-        """Find most similar GO term names using fuzzy matching"""
-        matches = process.extract(
-            query, 
-            all_terms, 
-            scorer=fuzz.token_sort_ratio, 
-            processor=default_process,
-            limit=max_candidates,
-            score_cutoff=similarity_threshold
-        )
-        return [match[0] for match in matches]
+    def similarity_search(queries: List[str]) -> Dict[str, List[str]]:
+        """Find the most similar GO term names for all queries in one fuzzy matching batch"""
+        matcher = get_resource_registry().gene_set_matcher(json_directory)
+        candidates = matcher.top(queries, limit=max_candidates, score_cutoff=similarity_threshold)
+        return dict(zip(queries, candidates))
 
     def match_terms_with_llm(queries: List[str], all_terms: List[str]) -> Dict[str, str]:
         """Use LLM to find the most relevant GO terms"""
         matched_terms = {}
+        candidates_by_query = similarity_search(queries)
         
         for query in queries:
-            candidates = similarity_search(query, all_terms)
+            candidates = candidates_by_query.get(query, [])
             
             if not candidates:
                 matched_terms[query] = ""
@@ -634,7 +606,7 @@ Response format:
                 
         return matched_terms
 
-    def find_genes_for_terms(matched_terms: Dict[str, str], data_files: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    def find_genes_for_terms(matched_terms: Dict[str, str], data_files: GeneSetLibrary) -> Dict[str, List[str]]:
         """Find genes for matched GO terms"""
         results = {}
         
@@ -642,13 +614,7 @@ Response format:
             found_genes = set()
             
             if term_name:  # Only search if we have a matched term
-                for data_file in data_files:
-                    if isinstance(data_file, dict) and term_name in data_file:
-                        entry = data_file[term_name]
-                        if isinstance(entry, dict):
-                            genes = entry.get("geneSymbols", [])
-                            if isinstance(genes, list):
-                                found_genes.update(genes)
+                found_genes.update(data_files.genes_for(term_name))
             
             results[query] = sorted(found_genes)
         
@@ -1167,24 +1133,17 @@ def drug_gene_network_search(
     Returns:
         Dictionary containing matched drugs and their associated genes with relationship details
     """
-    import pickle
     import difflib
-    import networkx as nx
     
     try:
-        # Load the graph
-        with open(graph_path, 'rb') as f:
-            G = pickle.load(f)
-
-        drug_list = [
-            node for node, attrs in G.nodes(data=True)
-            if attrs.get('type', '').lower() == 'compound'
-        ]
+        # Compound -> gene adjacency lists, built once per process from the graph
+        network = get_resource_registry().drug_gene_network(graph_path)
+        drug_list = network.drugs
         
         def find_best_drug_match(drug_query: str) -> str:
             """Find the best matching drug name, handling misspellings"""
             # Check for an exact match first
-            if drug_query in drug_list:
+            if drug_query in network.adjacency:
                 return drug_query
             
             # Use difflib to find the closest match
@@ -1212,14 +1171,13 @@ def drug_gene_network_search(
                 continue
             
             # Get neighbors and their edge data
-            gene_relationships = []
-            for neighbor in G.neighbors(best_match):
-                if G.nodes[neighbor].get('type', '').lower() != 'compound':
-                    edge_data = G.get_edge_data(best_match, neighbor)
-                    gene_relationships.append({
-                        'gene': neighbor,
-                        'relationship': edge_data
-                    })
+            gene_relationships = [
+                {
+                    'gene': neighbor,
+                    'relationship': edge_data
+                }
+                for neighbor, edge_data in network.relationships(best_match)
+            ]
             
             # Store in intermediate_results using the original query for reference
             results["intermediate_results"][drug_query] = {
@@ -1292,7 +1250,7 @@ def pubchem_drug_gene_search(
         """Given a drug name, query PubChem to retrieve its CID."""
         url = f"{pugrest_base}/compound/name/{drug_name}/cids/TXT"
         try:
-            response = requests.get(url, timeout=10)
+            response = get_http_client().get(url, timeout=10)
             if response.status_code != 200:
                 print(f"Error retrieving CID for {drug_name}: {response.text}")
                 return None
@@ -1311,7 +1269,7 @@ def pubchem_drug_gene_search(
         """Retrieve the compound record (in JSON) for the given CID using PubChem PUG-View."""
         url = f"{pugview_base}/compound/{cid}/JSON"
         try:
-            response = requests.get(url, timeout=15)
+            response = get_http_client().get(url, timeout=15)
             if response.status_code != 200:
                 print(f"Error retrieving compound record for CID {cid}: {response.text}")
                 return None
@@ -1517,7 +1475,7 @@ def hpo_phenotype_search(phenotype_terms: List[str], model_name: str = "gemini-2
             
             # Get HPO terms for the query
             try:
-                response = requests.get(f"{base_url}/search", params={"q": query})
+                response = get_http_client().get(f"{base_url}/search", params={"q": query})
                 if response.status_code == 200:
                     data = response.json()
                     if "terms" in data and len(data["terms"]) > 0:
@@ -1583,7 +1541,7 @@ Response format:
                 hpo_id = term_info['hpo_id']
                 try:
                     annotation_url = f"https://ontology.jax.org/api/network/annotation/{hpo_id}"
-                    response = requests.get(annotation_url)
+                    response = get_http_client().get(annotation_url)
                     if response.status_code == 200:
                         data = response.json()
                         if "genes" in data:
@@ -1654,7 +1612,7 @@ def omim_disease_search(disease_terms: List[str], model_name: str = "gemini-2.5-
             }
             
             try:
-                response = requests.get(search_url, params=params)
+                response = get_http_client().get(search_url, params=params)
                 if response.status_code == 200:
                     data = response.json()
                     if 'omim' in data and 'searchResponse' in data['omim'] and 'entryList' in data['omim']['searchResponse']:
@@ -1686,7 +1644,7 @@ def omim_disease_search(disease_terms: List[str], model_name: str = "gemini-2.5-
                             'apiKey': api_key
                         }
                         
-                        detail_response = requests.get(detail_url, params=detail_params)
+                        detail_response = get_http_client().get(detail_url, params=detail_params)
                         if detail_response.status_code == 200:
                             detail_data = detail_response.json()
                             if 'omim' in detail_data and 'entryList' in detail_data['omim']:
@@ -1752,7 +1710,7 @@ def orphanet_rare_disease_search(disease_terms: List[str], model_name: str = "ge
             try:
                 from urllib.parse import quote
                 encoded_term = quote(query)
-                response = requests.get(
+                response = get_http_client().get(
                     f"{base_url}/rd-cross-referencing/orphacodes/names/{encoded_term}?lang=en",
                     headers={"accept": "application/json"},
                     timeout=30
@@ -1837,7 +1795,7 @@ Response format:
             for term_info in term_details:
                 orphacode = term_info['orphacode']
                 try:
-                    response = requests.get(
+                    response = get_http_client().get(
                         f"{base_url}/rd-associated-genes/orphacodes/{orphacode}",
                         headers={"accept": "application/json"},
                         timeout=30
@@ -1903,7 +1861,6 @@ def coxpres_coexpression_search(gene_list: List[str]) -> Dict[str, Any]:
     """
     try:
         import urllib.parse
-        import time
         
         final_results = {}
         raw_results = {}
@@ -1938,7 +1895,7 @@ def coxpres_coexpression_search(gene_list: List[str]) -> Dict[str, Any]:
                 url = f"{base_url}?{query_string}"
                 
                 # Send request
-                response = requests.get(url, timeout=30)
+                response = get_http_client().get(url, timeout=30)
                 response.raise_for_status()
                 
                 # Parse response
@@ -1997,9 +1954,6 @@ def coxpres_coexpression_search(gene_list: List[str]) -> Dict[str, Any]:
                     }
                     final_results[gene] = []
                 
-                # Add delay to avoid too frequent requests
-                time.sleep(1)
-                
             except requests.exceptions.RequestException as e:
                 print(f"COXPRESdb API unavailable for gene {gene} (this is expected): {str(e)}")
                 raw_results[gene] = {
@@ -2063,7 +2017,7 @@ def ensembl_paralog_search(gene_list: List[str], species: str = "human") -> Dict
         """Fetch the Ensembl gene ID for a given gene symbol"""
         species_name = species_map.get(species.lower(), "homo_sapiens")
         try:
-            response = requests.get(
+            response = get_http_client().get(
                 f"{base_url}/lookup/symbol/{species_name}/{gene_symbol}",
                 headers={"Content-Type": "application/json"},
                 timeout=10
@@ -2082,7 +2036,7 @@ def ensembl_paralog_search(gene_list: List[str], species: str = "human") -> Dict
     def get_gene_symbol_from_id(gene_id: str) -> Optional[str]:
         """Fetch the gene symbol for a given Ensembl gene ID"""
         try:
-            response = requests.get(
+            response = get_http_client().get(
                 f"{base_url}/lookup/id/{gene_id}",
                 headers={"Content-Type": "application/json"},
                 timeout=10
@@ -2110,7 +2064,7 @@ def ensembl_paralog_search(gene_list: List[str], species: str = "human") -> Dict
                 "sequence": "none"
             }
             
-            response = requests.get(
+            response = get_http_client().get(
                 url,
                 params=params,
                 headers={"Accept": "application/json"},
@@ -2227,30 +2181,19 @@ def gsea_hallmark_search(
     Returns:
         Dictionary containing genes associated with each gene set query and normalized relevance scores
     """
-    import json
     
-    def load_json_files() -> List[Dict[str, Any]]:
-        """Load all JSON files from the specified directory"""
-        data_list = []
+    def load_json_files() -> Optional[GeneSetLibrary]:
+        """Load the GSEA gene sets (parsed once per process and indexed by term)"""
         try:
-            for file_name in os.listdir(json_directory):
-                if file_name.lower().endswith(".json"):
-                    file_path = os.path.join(json_directory, file_name)
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            data_list.append(json.load(f))
-                    except Exception as e:
-                        print(f"Could not parse {file_path} as JSON: {e}")
+            return get_resource_registry().gene_set_library(json_directory)
         except FileNotFoundError:
             print(f"GSEA directory not found: {json_directory}")
-        return data_list
+            return None
 
-    def extract_all_pathway_names(data_files: List[Dict[str, Any]]) -> List[str]:
+    def extract_all_pathway_names(data_files: GeneSetLibrary) -> List[str]:
         """Extract all pathway names from the loaded JSON files"""
         pathway_names = []
-        for data_file in data_files:
-            if isinstance(data_file, dict):
-                pathway_names.extend(list(data_file.keys()))
+        pathway_names.extend(data_files.terms)
         return pathway_names
 
     def match_pathways_with_llm(queries: List[str], all_pathways: List[str]) -> Dict[str, str]:
@@ -2290,7 +2233,7 @@ Response format:
             print(f"Error matching pathways with LLM: {str(e)}")
             return {}
 
-    def find_genes_for_pathways(matched_pathways: Dict[str, str], data_files: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    def find_genes_for_pathways(matched_pathways: Dict[str, str], data_files: GeneSetLibrary) -> Dict[str, List[str]]:
         """Find genes for multiple matched pathways"""
         results = {}
         
@@ -2299,13 +2242,7 @@ Response format:
             
             if pathway_name and pathway_name != "NA":
                 # Look up genes for the matched pathway
-                for data_file in data_files:
-                    if isinstance(data_file, dict) and pathway_name in data_file:
-                        entry = data_file[pathway_name]
-                        if isinstance(entry, dict):
-                            genes = entry.get("geneSymbols", [])
-                            if isinstance(genes, list):
-                                found_genes.update(genes)
+                found_genes.update(data_files.genes_for(pathway_name))
             
             results[query] = sorted(found_genes)
         
@@ -2411,30 +2348,19 @@ def wikipathways_search(
     Returns:
         Dictionary containing genes associated with each pathway query and normalized relevance scores
     """
-    import json
     
-    def load_json_files() -> List[Dict[str, Any]]:
-        """Load all JSON files from the specified directory"""
-        data_list = []
+    def load_json_files() -> Optional[GeneSetLibrary]:
+        """Load the WikiPathways gene sets (parsed once per process and indexed by term)"""
         try:
-            for file_name in os.listdir(json_directory):
-                if file_name.lower().endswith(".json"):
-                    file_path = os.path.join(json_directory, file_name)
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            data_list.append(json.load(f))
-                    except Exception as e:
-                        print(f"Could not parse {file_path} as JSON: {e}")
+            return get_resource_registry().gene_set_library(json_directory)
         except FileNotFoundError:
             print(f"WikiPathways directory not found: {json_directory}")
-        return data_list
+            return None
 
-    def extract_all_pathway_names(data_files: List[Dict[str, Any]]) -> List[str]:
+    def extract_all_pathway_names(data_files: GeneSetLibrary) -> List[str]:
         """Extract all pathway names from the loaded JSON files"""
         pathway_names = []
-        for data_file in data_files:
-            if isinstance(data_file, dict):
-                pathway_names.extend(list(data_file.keys()))
+        pathway_names.extend(data_files.terms)
         return pathway_names
 
     def match_pathways_with_llm(queries: List[str], all_pathways: List[str]) -> Dict[str, str]:
@@ -2474,7 +2400,7 @@ Response format:
             print(f"Error matching pathways with LLM: {str(e)}")
             return {}
 
-    def find_genes_for_pathways(matched_pathways: Dict[str, str], data_files: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    def find_genes_for_pathways(matched_pathways: Dict[str, str], data_files: GeneSetLibrary) -> Dict[str, List[str]]:
         """Find genes for multiple matched pathways"""
         results = {}
         
@@ -2483,13 +2409,7 @@ Response format:
             
             if pathway_name and pathway_name != "NA":
                 # Look up genes for the matched pathway
-                for data_file in data_files:
-                    if isinstance(data_file, dict) and pathway_name in data_file:
-                        entry = data_file[pathway_name]
-                        if isinstance(entry, dict):
-                            genes = entry.get("geneSymbols", [])
-                            if isinstance(genes, list):
-                                found_genes.update(genes)
+                found_genes.update(data_files.genes_for(pathway_name))
             
             results[query] = sorted(found_genes)
         
@@ -2595,30 +2515,19 @@ def reactome_pathway_search(
     Returns:
         Dictionary containing genes associated with each pathway/reaction query and normalized relevance scores
     """
-    import json
     
-    def load_json_files() -> List[Dict[str, Any]]:
-        """Load all JSON files from the specified directory"""
-        data_list = []
+    def load_json_files() -> Optional[GeneSetLibrary]:
+        """Load the Reactome gene sets (parsed once per process and indexed by term)"""
         try:
-            for file_name in os.listdir(json_directory):
-                if file_name.lower().endswith(".json"):
-                    file_path = os.path.join(json_directory, file_name)
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            data_list.append(json.load(f))
-                    except Exception as e:
-                        print(f"Could not parse {file_path} as JSON: {e}")
+            return get_resource_registry().gene_set_library(json_directory)
         except FileNotFoundError:
             print(f"Reactome directory not found: {json_directory}")
-        return data_list
+            return None
 
-    def extract_all_pathway_names(data_files: List[Dict[str, Any]]) -> List[str]:
+    def extract_all_pathway_names(data_files: GeneSetLibrary) -> List[str]:
         """Extract all pathway names from the loaded JSON files"""
         pathway_names = []
-        for data_file in data_files:
-            if isinstance(data_file, dict):
-                pathway_names.extend(list(data_file.keys()))
+        pathway_names.extend(data_files.terms)
         return pathway_names
 
     def match_pathways_with_llm(queries: List[str], all_pathways: List[str]) -> Dict[str, str]:
@@ -2658,7 +2567,7 @@ Response format:
             print(f"Error matching pathways with LLM: {str(e)}")
             return {}
 
-    def find_genes_for_pathways(matched_pathways: Dict[str, str], data_files: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    def find_genes_for_pathways(matched_pathways: Dict[str, str], data_files: GeneSetLibrary) -> Dict[str, List[str]]:
         """Find genes for multiple matched pathways"""
         results = {}
         
@@ -2667,13 +2576,7 @@ Response format:
             
             if pathway_name and pathway_name != "NA":
                 # Look up genes for the matched pathway
-                for data_file in data_files:
-                    if isinstance(data_file, dict) and pathway_name in data_file:
-                        entry = data_file[pathway_name]
-                        if isinstance(entry, dict):
-                            genes = entry.get("geneSymbols", [])
-                            if isinstance(genes, list):
-                                found_genes.update(genes)
+                found_genes.update(data_files.genes_for(pathway_name))
             
             results[query] = sorted(found_genes)
         
@@ -2779,26 +2682,16 @@ def cancer_biomarkers_search(
     Returns:
         Dictionary containing genes associated with each cancer type query and normalized relevance scores
     """
-    import json
     
     def load_json_data() -> List[Dict[str, Any]]:
-        """Load the Cancer Biomarkers JSON data (line-delimited JSON format)"""
-        data_list = []
+        """Load the Cancer Biomarkers JSON data (line-delimited JSON, cached per process)"""
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                # Each line is a separate JSON object
-                for line in f:
-                    line = line.strip()
-                    if line:  # Skip empty lines
-                        try:
-                            data_list.append(json.loads(line))
-                        except json.JSONDecodeError:
-                            continue
+            return get_resource_registry().json_records(json_path)
         except FileNotFoundError:
             print(f"Cancer biomarkers file not found: {json_path}")
         except Exception as e:
             print(f"Could not parse {json_path} as JSON: {e}")
-        return data_list
+        return []
 
     def extract_all_disease_names(data: List[Dict[str, Any]]) -> List[str]:
         """Extract all unique disease names from the loaded JSON data"""
@@ -2964,7 +2857,6 @@ def clingen_search(
     Returns:
         Dictionary containing genes associated with each disease query and normalized relevance scores based on clinical evidence strength
     """
-    import json
     
     # Confidence to score mapping based on ClinGen classification
     confidence_scores = {
@@ -2978,23 +2870,14 @@ def clingen_search(
     }
     
     def load_json_data() -> List[Dict[str, Any]]:
-        """Load the ClinGen JSON data (line-delimited JSON format)"""
-        data_list = []
+        """Load the ClinGen JSON data (line-delimited JSON, cached per process)"""
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                # Each line is a separate JSON object
-                for line in f:
-                    line = line.strip()
-                    if line:  # Skip empty lines
-                        try:
-                            data_list.append(json.loads(line))
-                        except json.JSONDecodeError:
-                            continue
+            return get_resource_registry().json_records(json_path)
         except FileNotFoundError:
             print(f"ClinGen file not found: {json_path}")
         except Exception as e:
             print(f"Could not parse {json_path} as JSON: {e}")
-        return data_list
+        return []
 
     def extract_all_disease_names(data: List[Dict[str, Any]]) -> List[str]:
         """Extract all unique disease names from the loaded JSON data"""
@@ -3187,7 +3070,6 @@ def gene2phenotype_search(
     Returns:
         Dictionary containing genes associated with each disease query and normalized relevance scores based on confidence levels
     """
-    import json
     
     # Confidence to score mapping based on Gene2Phenotype classification
     confidence_scores = {
@@ -3199,23 +3081,14 @@ def gene2phenotype_search(
     }
     
     def load_json_data() -> List[Dict[str, Any]]:
-        """Load the Gene2Phenotype JSON data (line-delimited JSON format)"""
-        data_list = []
+        """Load the Gene2Phenotype JSON data (line-delimited JSON, cached per process)"""
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                # Each line is a separate JSON object
-                for line in f:
-                    line = line.strip()
-                    if line:  # Skip empty lines
-                        try:
-                            data_list.append(json.loads(line))
-                        except json.JSONDecodeError:
-                            continue
+            return get_resource_registry().json_records(json_path)
         except FileNotFoundError:
             print(f"Gene2Phenotype file not found: {json_path}")
         except Exception as e:
             print(f"Could not parse {json_path} as JSON: {e}")
-        return data_list
+        return []
 
     def extract_all_disease_names(data: List[Dict[str, Any]]) -> List[str]:
         """Extract all unique disease names from the loaded JSON data"""
@@ -3414,26 +3287,16 @@ def gene_burden_search(
     Returns:
         Dictionary containing genes associated with each phenotype query and normalized relevance scores based on p-values
     """
-    import json
     
     def load_json_data() -> List[Dict[str, Any]]:
-        """Load the Gene Burden JSON data (line-delimited JSON format)"""
-        data_list = []
+        """Load the Gene Burden JSON data (line-delimited JSON, cached per process)"""
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                # Each line is a separate JSON object
-                for line in f:
-                    line = line.strip()
-                    if line:  # Skip empty lines
-                        try:
-                            data_list.append(json.loads(line))
-                        except json.JSONDecodeError:
-                            continue
+            return get_resource_registry().json_records(json_path)
         except FileNotFoundError:
             print(f"Gene Burden file not found: {json_path}")
         except Exception as e:
             print(f"Could not parse {json_path} as JSON: {e}")
-        return data_list
+        return []
 
     def extract_all_phenotype_names(data: List[Dict[str, Any]]) -> List[str]:
         """Extract all unique phenotype names from the loaded JSON data"""
@@ -3641,27 +3504,17 @@ def intogen_search(
     Returns:
         Dictionary containing cancer driver genes associated with each cancer type query and normalized relevance scores
     """
-    import json
     import math
     
     def load_json_data() -> List[Dict[str, Any]]:
-        """Load the IntOGen JSON data (line-delimited JSON format)"""
-        data_list = []
+        """Load the IntOGen JSON data (line-delimited JSON, cached per process)"""
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                # Each line is a separate JSON object
-                for line in f:
-                    line = line.strip()
-                    if line:  # Skip empty lines
-                        try:
-                            data_list.append(json.loads(line))
-                        except json.JSONDecodeError:
-                            continue
+            return get_resource_registry().json_records(json_path)
         except FileNotFoundError:
             print(f"IntOGen file not found: {json_path}")
         except Exception as e:
             print(f"Could not parse {json_path} as JSON: {e}")
-        return data_list
+        return []
 
     def extract_all_disease_names(data: List[Dict[str, Any]]) -> List[str]:
         """Extract all unique disease names from the loaded JSON data"""
@@ -3862,30 +3715,19 @@ def gocc_cellular_component_search(
     Returns:
         Dictionary containing genes associated with each cellular component query and normalized relevance scores
     """
-    import json
     
-    def load_json_files() -> List[Dict[str, Any]]:
-        """Load all JSON files from the specified directory"""
-        data_list = []
+    def load_json_files() -> Optional[GeneSetLibrary]:
+        """Load the GOCC gene sets (parsed once per process and indexed by term)"""
         try:
-            for file_name in os.listdir(json_directory):
-                if file_name.lower().endswith(".json"):
-                    file_path = os.path.join(json_directory, file_name)
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            data_list.append(json.load(f))
-                    except Exception as e:
-                        print(f"Could not parse {file_path} as JSON: {e}")
+            return get_resource_registry().gene_set_library(json_directory)
         except FileNotFoundError:
             print(f"GOCC directory not found: {json_directory}")
-        return data_list
+            return None
 
-    def extract_all_component_names(data_files: List[Dict[str, Any]]) -> List[str]:
+    def extract_all_component_names(data_files: GeneSetLibrary) -> List[str]:
         """Extract all cellular component names from the loaded JSON files"""
         component_names = []
-        for data_file in data_files:
-            if isinstance(data_file, dict):
-                component_names.extend(list(data_file.keys()))
+        component_names.extend(data_files.terms)
         return component_names
 
     def match_components_with_llm(queries: List[str], all_components: List[str]) -> Dict[str, str]:
@@ -3925,7 +3767,7 @@ Response format:
             print(f"Error matching components with LLM: {str(e)}")
             return {}
 
-    def find_genes_for_components(matched_components: Dict[str, str], data_files: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    def find_genes_for_components(matched_components: Dict[str, str], data_files: GeneSetLibrary) -> Dict[str, List[str]]:
         """Find genes for multiple matched cellular components"""
         results = {}
         
@@ -3934,13 +3776,7 @@ Response format:
             
             if component_name and component_name != "NA":
                 # Look up genes for the matched component
-                for data_file in data_files:
-                    if isinstance(data_file, dict) and component_name in data_file:
-                        entry = data_file[component_name]
-                        if isinstance(entry, dict):
-                            genes = entry.get("geneSymbols", [])
-                            if isinstance(genes, list):
-                                found_genes.update(genes)
+                found_genes.update(data_files.genes_for(component_name))
             
             results[query] = sorted(found_genes)
         
@@ -4056,9 +3892,6 @@ def clinvar_search(
     Returns:
         Dictionary containing genes associated with each disease query and normalized relevance scores based on clinical evidence
     """
-    import json
-    import time
-    from rapidfuzz import process, fuzz
     
     # Cache for Ensembl ID to gene name mapping
     ensembl_id_cache = {}
@@ -4100,23 +3933,14 @@ def clinvar_search(
     }
     
     def load_json_data() -> List[Dict[str, Any]]:
-        """Load the ClinVar JSON data (line-delimited JSON format)"""
-        data_list = []
+        """Load the ClinVar JSON data (line-delimited JSON, cached per process)"""
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                # Each line is a separate JSON object
-                for line in f:
-                    line = line.strip()
-                    if line:  # Skip empty lines
-                        try:
-                            data_list.append(json.loads(line))
-                        except json.JSONDecodeError:
-                            continue
+            return get_resource_registry().json_records(json_path)
         except FileNotFoundError:
             print(f"ClinVar file not found: {json_path}")
         except Exception as e:
             print(f"Could not parse {json_path} as JSON: {e}")
-        return data_list
+        return []
 
     def extract_all_disease_names(data: List[Dict[str, Any]]) -> List[str]:
         """Extract all unique disease names from the loaded JSON data"""
@@ -4126,25 +3950,20 @@ def clinvar_search(
                 disease_names.add(entry["diseaseFromSource"])
         return sorted(list(disease_names))
 
-    def similarity_search(query: str, all_diseases: List[str]) -> List[str]:
-        """Find most similar disease names using fuzzy matching"""
-        matches = process.extract(
-            query, 
-            all_diseases, 
-            scorer=fuzz.token_sort_ratio, 
-            limit=max_candidates,
-            score_cutoff=similarity_threshold,
-            processor=lambda s: s.lower()
-        )
-        return [match[0] for match in matches]
+    def similarity_search(queries: List[str]) -> Dict[str, List[str]]:
+        """Find the most similar disease names for all queries in one fuzzy matching batch"""
+        matcher = get_resource_registry().json_record_matcher(json_path, "diseaseFromSource")
+        candidates = matcher.top(queries, limit=max_candidates, score_cutoff=similarity_threshold)
+        return dict(zip(queries, candidates))
 
     def match_diseases_with_llm(queries: List[str], all_diseases: List[str]) -> Dict[str, str]:
         """Use LLM to find the most relevant disease names for multiple queries"""
         matched_diseases = {}
+        candidates_by_query = similarity_search(queries)
         
         for query in queries:
             # First use similarity search to get candidate matches
-            candidates = similarity_search(query, all_diseases)
+            candidates = candidates_by_query.get(query, [])
             print(f"Found {len(candidates)} candidate matches for '{query}'")
             
             if not candidates:
@@ -4199,7 +4018,7 @@ Response format:
         try:
             # Use Ensembl REST API to fetch gene name
             url = f"https://rest.ensembl.org/lookup/id/{ensembl_id}?content-type=application/json"
-            response = requests.get(url, headers={"Content-Type": "application/json"}, timeout=10)
+            response = get_http_client().get(url, headers={"Content-Type": "application/json"}, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -4317,7 +4136,6 @@ Response format:
                 gene_symbol = ensembl_id_to_gene_symbol(ensembl_id)
                 gene_symbols.append(gene_symbol)
                 gene_scores.append(score)
-                time.sleep(0.1)  # Add a small delay to avoid rate limiting
             
             # Validate genes 
             valid_genes, invalid_genes = validate_genes(gene_symbols)
@@ -4399,30 +4217,19 @@ def uniprot_variants_search(
     Returns:
         Dictionary containing genes associated with each disease query and normalized relevance scores
     """
-    import json
-    import time
     
     # Cache for UniProt ID to gene name mapping
     uniprot_id_cache = {}
     
     def load_json_data() -> List[Dict[str, Any]]:
-        """Load the UniProt variants JSON data (line-delimited JSON format)"""
-        data_list = []
+        """Load the UniProt variants JSON data (line-delimited JSON, cached per process)"""
         try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                # Each line is a separate JSON object
-                for line in f:
-                    line = line.strip()
-                    if line:  # Skip empty lines
-                        try:
-                            data_list.append(json.loads(line))
-                        except json.JSONDecodeError:
-                            continue
+            return get_resource_registry().json_records(json_path)
         except FileNotFoundError:
             print(f"UniProt variants file not found: {json_path}")
         except Exception as e:
             print(f"Could not parse {json_path} as JSON: {e}")
-        return data_list
+        return []
 
     def extract_all_disease_names(data: List[Dict[str, Any]]) -> List[str]:
         """Extract all unique disease names from the loaded JSON data"""
@@ -4480,7 +4287,7 @@ Response format:
         try:
             # Use UniProt REST API to fetch gene name
             url = f"https://rest.uniprot.org/uniprotkb/{uniprot_id}.json"
-            response = requests.get(url, timeout=10)
+            response = get_http_client().get(url, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
@@ -4564,7 +4371,6 @@ Response format:
             for uniprot_id in uniprot_ids:
                 gene_symbol = uniprot_id_to_gene_symbol(uniprot_id)
                 gene_symbols.append(gene_symbol)
-                time.sleep(0.1)  # Add a small delay to avoid rate limiting
             
             # Validate genes 
             valid_genes, invalid_genes = validate_genes(gene_symbols)
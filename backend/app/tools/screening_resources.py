@@ -0,0 +1,493 @@
+"""
+LABOS Screening Resource Registry
+
+Process-wide cache of the static reference datasets used by the screening
+tools (app/tools/screening.py). Previously every tool call re-read its files
+(HGNC symbols, the DISEASES TSV, the GO/MSigDB/WikiPathways/Reactome/GOCC
+JSON directories, the Open Targets JSON-lines files and the pickled RxGrid
+graph); now each dataset is loaded once and kept in a compact indexed form:
+
+- hgnc_symbols():       frozenset of approved gene symbols
+- disease_table():      DISEASES rows plus a disease -> row positions index
+- gene_set_library():   term -> sorted gene symbols for a JSON directory
+- json_records():       parsed records of a JSON-lines file
+- drug_gene_network():  compound -> [(gene, edge data)] adjacency lists
+
+Loading is lazy and thread-safe (one lock per dataset, so concurrent tool
+calls share a single load). Files are re-checked at most every
+performance.resource_check_interval seconds and reloaded when their
+mtime/size changes. get_stats() reports load times, hits and an estimate
+of the memory held per dataset.
+
+Name lookups go through NameMatcher: the choice names of a dataset are
+deduplicated and normalized once, and all queries of a tool call are scored
+in one rapidfuzz process.cdist batch (replacing per-row fuzz calls and
+per-query process.extract scans).
+
+Usage:
+    from app.tools.screening_resources import get_resource_registry
+
+    symbols = get_resource_registry().hgnc_symbols()
+"""
+
+import json
+import logging
+import os
+import pickle
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from app.config import PERFORMANCE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+HGNC_PATH = "resource/hgnc_name.txt"
+DISEASES_PATH = "resource/diseases/human_disease_integrated_full.tsv"
+DRUG_GRAPH_PATH = "resource/RxGrid/G_full.p"
+
+
+def _estimate_size(value: Any, depth: int = 4) -> int:
+    """Approximate memory held by a loaded dataset (pandas/numpy aware)."""
+    if hasattr(value, "memory_usage") and callable(value.memory_usage):
+        try:
+            return int(value.memory_usage(deep=True).sum())
+        except Exception:
+            pass
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+
+    size = sys.getsizeof(value)
+    if depth <= 0:
+        return size
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += _estimate_size(k, depth - 1) + _estimate_size(v, depth - 1)
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += _estimate_size(item, depth - 1)
+    elif hasattr(value, "__dict__"):
+        size += _estimate_size(vars(value), depth - 1)
+    return size
+
+
+def _signature(path: str) -> Optional[Tuple]:
+    """mtime/size fingerprint of a file, or of the .json files of a directory."""
+    try:
+        if os.path.isdir(path):
+            entries = []
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(".json"):
+                    st = os.stat(os.path.join(path, name))
+                    entries.append((name, st.st_mtime_ns, st.st_size))
+            return tuple(entries)
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except OSError:
+        return None
+
+
+def _cancer_to_carcinoma(name: str) -> str:
+    return name.lower().replace('cancer', 'carcinoma')
+
+
+def _carcinoma_to_cancer(name: str) -> str:
+    return name.lower().replace('carcinoma', 'cancer')
+
+
+class NameMatcher:
+    """
+    Fuzzy matcher over a fixed list of names, scored with rapidfuzz process.cdist.
+
+    Names are deduplicated (first occurrence wins) and normalized once. A
+    matcher can have several (query, name) normalizer pairs; the score of a
+    name is the best score over the pairs (e.g. matching "breast cancer"
+    both as "breast carcinoma" and against names rewritten to "cancer").
+    """
+
+    def __init__(
+        self,
+        names: List[str],
+        normalizers: Optional[List[Tuple[Callable[[str], str], Callable[[str], str]]]] = None,
+        scorer: Optional[Callable] = None,
+        workers: Optional[int] = None,
+    ):
+        from rapidfuzz import fuzz
+        from rapidfuzz.utils import default_process
+
+        self.names = list(dict.fromkeys(n for n in names if isinstance(n, str)))
+        self.scorer = scorer or fuzz.token_sort_ratio
+        self.workers = PERFORMANCE_CONFIG.get("fuzzy_match_workers", -1) if workers is None else workers
+        self._pairs = [
+            (query_fn, [name_fn(n) for n in self.names])
+            for query_fn, name_fn in (normalizers or [(default_process, default_process)])
+        ]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def scores(self, queries: List[str]):
+        """Score matrix (len(queries) x len(names)), 0-100."""
+        import numpy as np
+        from rapidfuzz import process
+
+        result = np.zeros((len(queries), len(self.names)), dtype=np.float64)
+        if not queries or not self.names:
+            return result
+        for query_fn, choices in self._pairs:
+            np.maximum(
+                result,
+                process.cdist(
+                    [query_fn(q) for q in queries], choices,
+                    scorer=self.scorer, processor=None, dtype=np.float64, workers=self.workers
+                ),
+                out=result
+            )
+        return result
+
+    def best(self, queries: List[str]) -> List[Tuple[Optional[str], float]]:
+        """Best name and score per query (first name in list order on ties)."""
+        if not self.names:
+            return [(None, 0.0) for _ in queries]
+        matrix = self.scores(queries)
+        best = matrix.argmax(axis=1)
+        return [(self.names[j], float(matrix[i, j])) for i, j in enumerate(best)]
+
+    def top(self, queries: List[str], limit: int, score_cutoff: float = 0) -> List[List[str]]:
+        """
+        Up to limit names per query scoring at least score_cutoff, best first.
+
+        Same result as process.extract per query, for all queries in one batch.
+        """
+        import numpy as np
+
+        matrix = self.scores(queries)
+        results = []
+        for row in matrix:
+            candidates = np.flatnonzero(row >= score_cutoff)
+            order = candidates[np.argsort(-row[candidates], kind='stable')][:limit]
+            results.append([self.names[j] for j in order])
+        return results
+
+
+@dataclass
+class DiseaseTable:
+    """DISEASES associations with the row positions of every disease name."""
+    df: Any
+    rows_by_disease: Dict[str, Any]
+    # Unique disease names in order of first appearance
+    diseases: List[str]
+    matcher: Optional[NameMatcher] = None
+
+    def rows(self, disease: str):
+        """Rows of one disease (empty frame if unknown)."""
+        positions = self.rows_by_disease.get(disease)
+        if positions is None:
+            return self.df.iloc[0:0]
+        return self.df.iloc[positions]
+
+
+@dataclass
+class GeneSetLibrary:
+    """Term -> gene symbols of a directory of {term: {"geneSymbols": [...]}} JSON files."""
+    # Term names in file order (a term defined in several files appears once per file)
+    terms: List[str]
+    genes: Dict[str, Tuple[str, ...]]
+    file_count: int = 0
+
+    def __len__(self) -> int:
+        return self.file_count
+
+    def genes_for(self, term: str) -> List[str]:
+        return list(self.genes.get(term, ()))
+
+
+@dataclass
+class DrugGeneNetwork:
+    """Compound nodes of the RxGrid graph with their non-compound neighbours."""
+    drugs: List[str]
+    adjacency: Dict[str, List[Tuple[str, Any]]] = field(default_factory=dict)
+
+    def relationships(self, drug: str) -> List[Tuple[str, Any]]:
+        return self.adjacency.get(drug, [])
+
+
+@dataclass
+class _Entry:
+    value: Any = None
+    signature: Optional[Tuple] = None
+    checked_at: float = 0.0
+    loaded_at: float = 0.0
+    load_seconds: float = 0.0
+    nbytes: int = 0
+    loads: int = 0
+    hits: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    # Values computed from the loaded copy (e.g. name matchers); dropped on reload
+    derived: Dict[str, Any] = field(default_factory=dict)
+
+
+class ResourceRegistry:
+    """
+    Lazily loaded, mtime-checked cache of screening datasets.
+
+    Thread-safe: screening tools run on the tool dispatch pool.
+    """
+
+    def __init__(self, check_interval: Optional[float] = None):
+        self.check_interval = (
+            PERFORMANCE_CONFIG.get("resource_check_interval", 5.0)
+            if check_interval is None else check_interval
+        )
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], _Entry] = {}
+
+    def get(self, kind: str, path: str, loader: Callable[[str], Any]) -> Any:
+        """
+        Return the dataset at path, loading (or reloading) it when needed.
+
+        Args:
+            kind: Dataset kind (part of the cache key, reported in stats)
+            path: File or directory; relative paths resolve against the cwd
+            loader: Builds the in-memory form from the path
+
+        Raises:
+            FileNotFoundError: path does not exist and nothing was loaded before
+        """
+        path = os.path.abspath(path)
+        key = (kind, path)
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry())
+
+        now = time.monotonic()
+        if entry.signature is not None and now - entry.checked_at < self.check_interval:
+            entry.hits += 1
+            return entry.value
+
+        with entry.lock:
+            # Another thread may have (re)loaded while we waited
+            if entry.signature is not None and time.monotonic() - entry.checked_at < self.check_interval:
+                entry.hits += 1
+                return entry.value
+
+            signature = _signature(path)
+            if signature is None:
+                if entry.signature is None:
+                    raise FileNotFoundError(f"Resource not found: {path}")
+                # File vanished: keep serving the last good copy
+                entry.checked_at = time.monotonic()
+                entry.hits += 1
+                return entry.value
+
+            if signature == entry.signature:
+                entry.checked_at = time.monotonic()
+                entry.hits += 1
+                return entry.value
+
+            reload = entry.signature is not None
+            start = time.perf_counter()
+            value = loader(path)
+            entry.load_seconds = time.perf_counter() - start
+            entry.value = value
+            entry.derived = {}
+            entry.signature = signature
+            entry.checked_at = time.monotonic()
+            entry.loaded_at = time.time()
+            entry.nbytes = _estimate_size(value)
+            entry.loads += 1
+
+        action = "Reloaded" if reload else "Loaded"
+        logger.info(
+            f"📚 {action} {kind} resource {os.path.relpath(path)} in {entry.load_seconds:.2f}s "
+            f"(~{entry.nbytes / (1024 * 1024):.1f} MB)"
+        )
+        return value
+
+    def derived(self, kind: str, path: str, name: str, builder: Callable[[Any], Any]) -> Any:
+        """
+        Value computed once from a loaded dataset, rebuilt after the dataset reloads.
+
+        The dataset must have been loaded with get() (or a dataset accessor) first.
+        """
+        entry = self._entries.get((kind, os.path.abspath(path)))
+        if entry is None or entry.signature is None:
+            raise KeyError(f"Resource not loaded: {kind}:{path}")
+        with entry.lock:
+            if name not in entry.derived:
+                entry.derived[name] = builder(entry.value)
+            return entry.derived[name]
+
+    def invalidate(self, kind: Optional[str] = None):
+        """Drop cached datasets (all, or one kind) so the next access reloads."""
+        with self._lock:
+            for key in [k for k in self._entries if kind is None or k[0] == kind]:
+                del self._entries[key]
+
+    # ==================== Datasets ====================
+
+    def hgnc_symbols(self, path: str = HGNC_PATH) -> FrozenSet[str]:
+        return self.get("hgnc", path, _load_hgnc)
+
+    def disease_table(self, path: str = DISEASES_PATH) -> DiseaseTable:
+        return self.get("diseases", path, _load_disease_table)
+
+    def gene_set_library(self, directory: str) -> GeneSetLibrary:
+        return self.get("gene_sets", directory, _load_gene_set_library)
+
+    def json_records(self, path: str) -> List[Dict[str, Any]]:
+        """Records of a JSON-lines file. Shared between callers: do not mutate."""
+        return self.get("json_records", path, _load_json_records)
+
+    def gene_set_matcher(self, directory: str) -> NameMatcher:
+        """Matcher over the term names of a gene set directory (rapidfuzz default_process)."""
+        self.gene_set_library(directory)
+        return self.derived("gene_sets", directory, "matcher", lambda library: NameMatcher(library.terms))
+
+    def json_record_matcher(self, path: str, field_name: str) -> NameMatcher:
+        """Matcher over the distinct (sorted) values of one field of a JSON-lines file (lowercased)."""
+        self.json_records(path)
+
+        def build(records):
+            values = sorted({r[field_name] for r in records if isinstance(r, dict) and isinstance(r.get(field_name), str)})
+            return NameMatcher(values, normalizers=[(str.lower, str.lower)])
+
+        return self.derived("json_records", path, f"matcher:{field_name}", build)
+
+    def drug_gene_network(self, path: str = DRUG_GRAPH_PATH) -> DrugGeneNetwork:
+        return self.get("drug_graph", path, _load_drug_gene_network)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = list(self._entries.items())
+
+        datasets = {}
+        for (kind, path), entry in entries:
+            if entry.signature is None:
+                continue
+            datasets[f"{kind}:{os.path.relpath(path)}"] = {
+                "bytes": entry.nbytes,
+                "loads": entry.loads,
+                "hits": entry.hits,
+                "load_seconds": round(entry.load_seconds, 3),
+                "loaded_at": entry.loaded_at,
+            }
+        return {
+            "datasets": datasets,
+            "total_bytes": sum(d["bytes"] for d in datasets.values()),
+            "check_interval": self.check_interval,
+        }
+
+
+# ==================== Loaders ====================
+
+def _load_hgnc(path: str) -> FrozenSet[str]:
+    with open(path, "r") as f:
+        next(f)  # Skip header
+        return frozenset(line.strip().split("\t")[1] for line in f)
+
+
+def _load_disease_table(path: str) -> DiseaseTable:
+    import pandas as pd
+
+    df = pd.read_csv(
+        path,
+        sep='\t',
+        header=None,
+        names=['col1', 'gene_name', 'col3', 'disease', 'confidence']
+    )
+    # Only the columns the search reads; categorical names are much smaller
+    df = df[['gene_name', 'disease', 'confidence']]
+    rows_by_disease = {
+        disease: positions
+        for disease, positions in df.groupby('disease', sort=False).indices.items()
+    }
+    diseases = [d for d in df['disease'].drop_duplicates() if isinstance(d, str)]
+    df = df.assign(gene_name=df['gene_name'].astype('category'), disease=df['disease'].astype('category'))
+    matcher = NameMatcher(diseases, normalizers=[
+        (_cancer_to_carcinoma, str.lower),
+        (str.lower, _carcinoma_to_cancer),
+    ])
+    return DiseaseTable(df=df, rows_by_disease=rows_by_disease, diseases=diseases, matcher=matcher)
+
+
+def _load_gene_set_library(directory: str) -> GeneSetLibrary:
+    terms: List[str] = []
+    genes: Dict[str, set] = {}
+    file_count = 0
+
+    for file_name in os.listdir(directory):
+        if not file_name.lower().endswith(".json"):
+            continue
+        file_path = os.path.join(directory, file_name)
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f"Could not parse {file_path} as JSON: {e}")
+            continue
+        file_count += 1
+        if not isinstance(data, dict):
+            continue
+
+        terms.extend(data.keys())
+        for term, entry in data.items():
+            symbols = genes.setdefault(term, set())
+            if isinstance(entry, dict) and isinstance(entry.get("geneSymbols"), list):
+                symbols.update(entry["geneSymbols"])
+
+    return GeneSetLibrary(
+        terms=terms,
+        genes={term: tuple(sorted(symbols)) for term, symbols in genes.items()},
+        file_count=file_count,
+    )
+
+
+def _load_json_records(path: str) -> List[Dict[str, Any]]:
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        # Each line is a separate JSON object
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return records
+
+
+def _load_drug_gene_network(path: str) -> DrugGeneNetwork:
+    with open(path, 'rb') as f:
+        graph = pickle.load(f)
+
+    def is_compound(node) -> bool:
+        return graph.nodes[node].get('type', '').lower() == 'compound'
+
+    drugs = [node for node in graph.nodes if is_compound(node)]
+    adjacency = {
+        drug: [
+            (neighbor, graph.get_edge_data(drug, neighbor))
+            for neighbor in graph.neighbors(drug)
+            if not is_compound(neighbor)
+        ]
+        for drug in drugs
+    }
+    # The full graph (gene-gene edges, node attributes) is not kept
+    return DrugGeneNetwork(drugs=drugs, adjacency=adjacency)
+
+
+# Global singleton
+_registry: Optional[ResourceRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_resource_registry() -> ResourceRegistry:
+    """Get the global screening resource registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ResourceRegistry()
+    return _registry
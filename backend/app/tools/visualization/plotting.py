@@ -1,6 +1,7 @@
 """
 Plotting tools for data visualization
-All visualization tools return base64 encoded images with metadata
+All visualization tools return metadata with a reference to the image in the
+artifact store (sha256 + URL) instead of inline base64
 
 These tools automatically save outputs to the project sandbox directory.
 """
@@ -62,6 +63,16 @@ def _encode_image_to_base64(file_path: str) -> str:
     return f"data:image/png;base64,{base64_image}"
 
 
+def _store_artifact(file_path: str) -> dict:
+    """Store the image in the content-addressed artifact store (owned by the workflow's user)"""
+    from app.services.artifact_store import get_artifact_store
+    from app.services.workflows import get_workflow_context
+
+    context = get_workflow_context()
+    owner = context.metadata.get('user_id') if context and context.metadata else None
+    return get_artifact_store().put_file(file_path, content_type="image/png", owner=owner)
+
+
 def _save_and_register_plot(
     file_path: str,
     chart_type: str,
@@ -70,17 +81,23 @@ def _save_and_register_plot(
 ) -> dict:
     """
     Save plot file and return metadata.
-    Returns metadata including base64 for workflow display.
-    File is already saved to sandbox, so no database registration needed.
+    The image goes to the artifact store; events, stored steps and the LLM
+    only see a reference (sha256 + URL, plus a thumbnail in the event).
+    Falls back to inline base64 if the artifact store is unavailable.
     """
     try:
-        # Convert to base64
-        base64_image = _encode_image_to_base64(file_path)
-
         # Get file info
         file_size = os.path.getsize(file_path)
         filename = os.path.basename(file_path)
 
+        try:
+            artifact = _store_artifact(file_path)
+            base64_image = None
+        except Exception as e:
+            logger.warning(f"Could not store plot artifact, sending inline base64: {e}")
+            artifact = None
+            base64_image = _encode_image_to_base64(file_path)
+
         # CRITICAL: Emit observation event for WebSocket visualization display
         # This ensures visualization appears in the workflow panel even in multi-agent systems
         # Use filename as identifier (sandbox files are accessed by filename in generated/ folder)
@@ -90,33 +107,37 @@ def _save_and_register_plot(
                 filename=filename,
                 title=title,
                 chart_type=chart_type,
-                base64_data=base64_image
+                base64_data=base64_image,
+                artifact=artifact
             )
             logger.info(f"📊 Emitted visualization event: {filename}")
         except Exception as e:
             logger.warning(f"Could not emit visualization event: {e}")
 
-        # Truncate base64 in return value to avoid log spam
-        base64_truncated = base64_image[:100] + "...[truncated]" if len(base64_image) > 200 else base64_image
+        visualization_metadata = {
+            "type": "chart",
+            "chart_type": chart_type,
+            "title": title,
+            "width": 1000,
+            "height": 600,
+            "format": "png",
+            "filename": filename  # Use filename instead of file_id
+        }
+        if artifact:
+            # Reference only (no thumbnail): this dict is stored with the step and read by the LLM
+            visualization_metadata["sha256"] = artifact["sha256"]
+            visualization_metadata["artifact_url"] = artifact["url"]
+        else:
+            visualization_metadata["base64"] = base64_image  # Full base64 for WebSocket
 
         return {
             "success": True,
             "file_path": filename,
             "sandbox_path": file_path,  # Full path in sandbox
-            "base64": base64_truncated,  # Truncated for log readability
             "chart_type": chart_type,
             "title": title,
             "file_size_bytes": file_size,
-            "visualization_metadata": {
-                "type": "chart",
-                "chart_type": chart_type,
-                "title": title,
-                "width": 1000,
-                "height": 600,
-                "format": "png",
-                "base64": base64_image,  # Full base64 for WebSocket
-                "filename": filename  # Use filename instead of file_id
-            }
+            "visualization_metadata": visualization_metadata
         }
     except Exception as e:
         return {
@@ -150,7 +171,7 @@ def create_line_plot(
         filename: Output filename (saved to sandbox generated/ folder)
 
     Returns:
-        JSON string with file info and base64 encoded image
+        JSON string with file info and the image's artifact reference
 
     Example:
         data = '[{"position": 1, "gc_content": 0.45}, {"position": 2, "gc_content": 0.52}]'
@@ -219,7 +240,7 @@ def create_bar_chart(
         filename: Output filename (saved to sandbox generated/ folder)
 
     Returns:
-        JSON string with file info and base64 encoded image
+        JSON string with file info and the image's artifact reference
     """
     try:
         # Smart parsing: detect if categories/values are data or column names
@@ -303,7 +324,7 @@ def create_scatter_plot(
         filename: Output filename (saved to sandbox generated/ folder)
 
     Returns:
-        JSON string with file info and base64 encoded image
+        JSON string with file info and the image's artifact reference
     """
     try:
         # Try JSON first, then CSV
@@ -375,7 +396,7 @@ def create_heatmap(
         filename: Output filename (saved to sandbox generated/ folder)
 
     Returns:
-        JSON string with file info and base64 encoded image
+        JSON string with file info and the image's artifact reference
     """
     try:
         matrix_data = np.array(json.loads(data))
@@ -434,7 +455,7 @@ def create_distribution_plot(
         filename: Output filename (saved to sandbox generated/ folder)
 
     Returns:
-        JSON string with file info and base64 encoded image
+        JSON string with file info and the image's artifact reference
     """
     try:
         df = pd.DataFrame(json.loads(data))
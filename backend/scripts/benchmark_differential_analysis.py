@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Benchmark the differential expression engine of csv_data_analyzer.
+
+Compares the previous per-feature loop (.loc lookups, NaN filtering and
+one scipy.stats.ttest_ind call per gene) with the vectorized block engine
+in app.tools.analysis._perform_differential_analysis, on synthetic
+log-normal expression matrices with a few missing values.
+
+Also checks that both produce the same means, fold changes and p-values,
+and that single-sample and zero-variance rows match scipy.stats.ttest_ind.
+
+Usage:
+    python scripts/benchmark_differential_analysis.py
+    python scripts/benchmark_differential_analysis.py --features 1000 20000 60000 --samples 500
+    python scripts/benchmark_differential_analysis.py --skip-loop-above 20000
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+from pathlib import Path
+
+# Add parent directory to path (labos-be root)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("USE_SQLITE", "true")
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from app.tools.analysis import _perform_differential_analysis, _differential_statistics
+
+# (tumor, normal) rows that hit the degenerate paths of the t-tests:
+# single-sample groups and zero variance with equal or different means
+EDGE_CASES = [
+    ([7.0], [1.0, 2.0, 2.5]),
+    ([5.0], [2.0, 2.0, 2.0]),
+    ([5.0], [2.0]),
+    ([1.0, 1.0, 1.0], [2.0, 2.0, 2.0]),
+    ([1.0, 1.0, 1.0], [1.0, 1.0, 1.0]),
+    ([1.0, 2.0, 3.5], [2.0, 4.0, 9.0, 1.0]),
+]
+
+
+def make_matrix(features: int, samples: int, seed: int = 42):
+    """Expression matrix with half tumor / half normal samples and a few NaNs"""
+    rng = np.random.default_rng(seed)
+    tumor_cols = [f"Tumor_{i}" for i in range(samples // 2)]
+    normal_cols = [f"Normal_{i}" for i in range(samples - samples // 2)]
+    values = rng.lognormal(mean=2, sigma=1, size=(features, samples))
+    values[: features // 10, : len(tumor_cols)] *= 2  # Upregulated features
+    values[rng.random(values.shape) < 0.0005] = np.nan
+    df = pd.DataFrame(values, index=[f"Gene_{i}" for i in range(features)], columns=tumor_cols + normal_cols)
+    return df, tumor_cols, normal_cols
+
+
+def legacy_loop(df, tumor_columns, normal_columns, alpha):
+    """The previous implementation (per-feature loop)"""
+    tumor_data = df[tumor_columns]
+    normal_data = df[normal_columns]
+    results_list = []
+    for gene in df.index:
+        tumor_values = tumor_data.loc[gene].values
+        normal_values = normal_data.loc[gene].values
+        tumor_values = tumor_values[~np.isnan(tumor_values)]
+        normal_values = normal_values[~np.isnan(normal_values)]
+        if len(tumor_values) == 0 or len(normal_values) == 0:
+            continue
+        tumor_mean = np.mean(tumor_values)
+        normal_mean = np.mean(normal_values)
+        if normal_mean != 0:
+            fold_change = np.log2(tumor_mean / normal_mean) if tumor_mean > 0 and normal_mean > 0 else 0
+        else:
+            fold_change = np.inf if tumor_mean > 0 else 0
+        t_stat, p_value = stats.ttest_ind(tumor_values, normal_values)
+        results_list.append({
+            "gene": gene,
+            "tumor_mean": tumor_mean,
+            "normal_mean": normal_mean,
+            "fold_change": fold_change,
+            "t_statistic": t_stat,
+            "p_value": p_value,
+            "significant": p_value < alpha if not np.isnan(p_value) else False
+        })
+    return pd.DataFrame(results_list).sort_values('p_value', na_position='last')
+
+
+def check_equal(legacy: pd.DataFrame, vectorized: dict) -> float:
+    """Largest relative p-value difference between the two engines"""
+    new = pd.DataFrame(vectorized["all_results"]) if isinstance(vectorized["all_results"], list) else None
+    if new is None:
+        return float("nan")
+    legacy = legacy.set_index("gene").sort_index()
+    new = new.set_index("gene").sort_index()
+    for column in ("tumor_mean", "normal_mean", "fold_change", "t_statistic"):
+        np.testing.assert_allclose(new[column], legacy[column], rtol=1e-9)
+    assert (new["significant"] == legacy["significant"]).all()
+    return float(np.max(np.abs(new["p_value"] - legacy["p_value"]) / np.maximum(legacy["p_value"], 1e-300)))
+
+
+def check_edge_cases() -> bool:
+    """Compare statistic and p-value of the edge-case rows with scipy.stats.ttest_ind"""
+    ok = True
+    for test in ("student", "welch"):
+        for tumor, normal in EDGE_CASES:
+            result = _differential_statistics(np.array([tumor]), np.array([normal]), test)
+            with np.errstate(all="ignore"), warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                expected = stats.ttest_ind(tumor, normal, equal_var=(test == "student"))
+            for name, value, reference in (("statistic", result["statistic"][0], expected.statistic),
+                                           ("p_value", result["p_value"][0], expected.pvalue)):
+                if not np.allclose(value, reference, rtol=1e-12, equal_nan=True):
+                    ok = False
+                    print(f"  ❌ {test} {tumor} vs {normal}: {name} {value} != scipy {reference}")
+    print("✅ Edge cases match scipy (n=1, zero variance)" if ok else "❌ Edge cases differ from scipy")
+    return ok
+
+
+def check_mannwhitney_batch() -> bool:
+    """Compare a batch mixing tied, untied and incomplete rows with per-row scipy.stats.mannwhitneyu"""
+    rng = np.random.default_rng(7)
+    tumor = rng.normal(size=(50, 5))
+    normal = rng.normal(loc=0.5, size=(50, 6))
+    tumor[::7] = np.round(tumor[::7])  # Tied rows force the asymptotic method
+    normal[::7] = np.round(normal[::7])
+    tumor[3, 1] = np.nan  # Incomplete rows (nan_policy='omit')
+    normal[10, 4] = np.nan
+    result = _differential_statistics(tumor, normal, "mannwhitney")
+    ok = True
+    for row in range(len(tumor)):
+        expected = stats.mannwhitneyu(tumor[row][~np.isnan(tumor[row])], normal[row][~np.isnan(normal[row])])
+        if not np.allclose([result["statistic"][row], result["p_value"][row]],
+                           [expected.statistic, expected.pvalue], rtol=1e-12):
+            ok = False
+            print(f"  ❌ mannwhitney row {row}: p {result['p_value'][row]} != scipy {expected.pvalue}")
+    print("✅ Mann-Whitney batch matches per-row scipy (tied and untied rows)" if ok
+          else "❌ Mann-Whitney batch differs from per-row scipy")
+    return ok
+
+
+def main(args) -> bool:
+    print(f"📊 {args.samples} samples, alpha {args.alpha}\n")
+    ok = check_edge_cases()
+    ok = check_mannwhitney_batch() and ok
+    for features in args.features:
+        df, tumor_cols, normal_cols = make_matrix(features, args.samples)
+
+        start = time.perf_counter()
+        result = _perform_differential_analysis(df, tumor_cols, normal_cols, args.alpha)
+        vectorized = time.perf_counter() - start
+
+        line = f"  {features:>6} features   vectorized {vectorized * 1000:9.1f} ms"
+        for test in ("welch", "mannwhitney"):
+            start = time.perf_counter()
+            _perform_differential_analysis(df, tumor_cols, normal_cols, args.alpha, test=test)
+            line += f"   {test} {(time.perf_counter() - start) * 1000:9.1f} ms"
+
+        if features <= args.skip_loop_above:
+            start = time.perf_counter()
+            legacy = legacy_loop(df, tumor_cols, normal_cols, args.alpha)
+            loop = time.perf_counter() - start
+            line += f"   loop {loop * 1000:10.1f} ms   speedup {loop / vectorized:7.1f}x"
+
+            # Full comparison (all_results is only returned up to 1000 features)
+            small = df.iloc[:1000]
+            small_result = _perform_differential_analysis(small, tumor_cols, normal_cols, args.alpha)
+            try:
+                max_diff = check_equal(legacy_loop(small, tumor_cols, normal_cols, args.alpha), small_result)
+                line += f"   max p rel diff {max_diff:.1e}"
+            except AssertionError as e:
+                ok = False
+                line += f"   ❌ mismatch: {e}"
+            if result["summary"]["significant_features"] != int(legacy["significant"].sum()):
+                ok = False
+                line += "   ❌ significant count differs"
+        print(line)
+
+    print("\n✅ Vectorized results match the loop" if ok else "\n❌ Results differ")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark differential expression analysis")
+    parser.add_argument("--features", type=int, nargs="+", default=[1000, 20000, 60000], help="Feature counts")
+    parser.add_argument("--samples", type=int, default=100, help="Samples per matrix (half tumor, half normal)")
+    parser.add_argument("--alpha", type=float, default=0.05, help="Significance level")
+    parser.add_argument("--skip-loop-above", type=int, default=60000,
+                        help="Do not run the (slow) loop implementation above this many features")
+    sys.exit(0 if main(parser.parse_args()) else 1)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Benchmark cross-worker WebSocket fan-out over the TCP event backplane.
+
+Starts a BackplaneBroker and N worker processes, each with its own
+WebSocketBroadcaster connected to the broker (like `uvicorn --workers N`).
+Every worker connects in-memory clients to all M project rooms. Room r is
+"owned" by worker r % N, which publishes E workflow_step events into it.
+The benchmark then checks that every client on every worker received
+exactly its room's events, in order, and reports throughput and
+publish-to-enqueue latency.
+
+Usage:
+    python scripts/benchmark_event_backplane.py
+    python scripts/benchmark_event_backplane.py --workers 4 --rooms 200 --events 50 --clients 2
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path (labos-be root)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.event_backplane import BackplaneBroker, TcpBackplane
+from app.services.websocket_broadcast import WebSocketBroadcaster
+
+
+class RecordingSocket:
+    """Stands in for a client WebSocket and records what it received"""
+
+    client = None
+
+    def __init__(self):
+        self.received = []
+
+    async def send_text(self, text: str):
+        self.received.append((time.time(), text))
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+async def run_worker(worker: int, workers: int, rooms: int, events: int, clients: int, port: int, barrier, results):
+    broadcaster = WebSocketBroadcaster()
+    # Never drop: the benchmark checks for zero loss
+    broadcaster.send_queue_size = events * rooms + 16
+    await broadcaster.start(TcpBackplane(f"tcp://127.0.0.1:{port}", embedded_broker=False))
+
+    sockets = {}
+    for room in range(rooms):
+        project_id = f"project_{room}"
+        for _ in range(clients):
+            socket = RecordingSocket()
+            await broadcaster.connect(socket)
+            broadcaster.subscribe_to_project(socket, project_id)
+            sockets.setdefault(project_id, []).append(socket)
+
+    # Let the SUB frames reach the broker before anyone publishes
+    await asyncio.sleep(0.5)
+    await asyncio.to_thread(barrier.wait)
+
+    started = time.perf_counter()
+    owned = [room for room in range(rooms) if room % workers == worker]
+    for i in range(1, events + 1):
+        for room in owned:
+            await broadcaster.broadcast({
+                "type": "workflow_step",
+                "project_id": f"project_{room}",
+                "workflow_id": f"workflow_{room}",
+                "step_number": i,
+                "sent_at": time.time(),
+            })
+        # Yield like a real listener does between events
+        await asyncio.sleep(0)
+
+    expected = rooms * clients * events
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if sum(len(s.received) for group in sockets.values() for s in group) >= expected:
+            break
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - started
+
+    ok = True
+    foreign = 0
+    latencies = []
+    for project_id, group in sockets.items():
+        for socket in group:
+            messages = [(at, json.loads(text)) for at, text in socket.received]
+            foreign += sum(1 for _, msg in messages if msg["project_id"] != project_id)
+            if [msg["step_number"] for _, msg in messages] != list(range(1, events + 1)):
+                ok = False
+            latencies.extend((at - msg["sent_at"]) * 1000 for at, msg in messages)
+
+    stats = broadcaster.get_stats()
+    await broadcaster.stop()
+    latencies.sort()
+    results.put({
+        "worker": worker,
+        "ok": ok and not foreign,
+        "received": sum(len(s.received) for group in sockets.values() for s in group),
+        "expected": expected,
+        "foreign": foreign,
+        "elapsed": elapsed,
+        "remote_messages": stats["remote_messages"],
+        "backplane_dropped": stats["backplane"]["dropped"],
+        "p50_ms": latencies[len(latencies) // 2] if latencies else 0.0,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] if latencies else 0.0,
+    })
+
+
+def worker_main(*args):
+    asyncio.run(run_worker(*args))
+
+
+async def run_broker(ready, stop):
+    broker = BackplaneBroker("127.0.0.1", 0)
+    await broker.start()
+    ready.put(broker.port)
+    await asyncio.to_thread(stop.wait)
+    stats = broker.get_stats()
+    await broker.stop()
+    ready.put(stats)
+
+
+def broker_main(ready, stop):
+    asyncio.run(run_broker(ready, stop))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cross-worker fan-out over the event backplane")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rooms", type=int, default=100)
+    parser.add_argument("--events", type=int, default=50)
+    parser.add_argument("--clients", type=int, default=1, help="Clients per room on each worker")
+    args = parser.parse_args()
+
+    ready = multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    broker = multiprocessing.Process(target=broker_main, args=(ready, stop), daemon=True)
+    broker.start()
+    port = ready.get(timeout=10)
+
+    barrier = multiprocessing.Barrier(args.workers)
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=worker_main,
+            args=(worker, args.workers, args.rooms, args.events, args.clients, port, barrier, results),
+        )
+        for worker in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    reports = sorted((results.get(timeout=120) for _ in processes), key=lambda r: r["worker"])
+    for process in processes:
+        process.join()
+
+    stop.set()
+    broker_stats = ready.get(timeout=10)
+    broker.join()
+
+    delivered = sum(r["received"] for r in reports)
+    expected = sum(r["expected"] for r in reports)
+    elapsed = max(r["elapsed"] for r in reports)
+    ok = all(r["ok"] for r in reports) and delivered == expected
+
+    print("\n=== Event backplane benchmark ===")
+    print(f"Workers x rooms:      {args.workers} x {args.rooms} ({args.clients} client(s) per room per worker)")
+    print(f"Events per room:      {args.events}")
+    print(f"Delivered:            {delivered}/{expected}")
+    print(f"Cross-room:           {sum(r['foreign'] for r in reports)}")
+    print(f"Broker in/out:        {broker_stats['messages_in']}/{broker_stats['messages_out']} (dropped {broker_stats['dropped']})")
+    print(f"Backplane dropped:    {sum(r['backplane_dropped'] for r in reports)}")
+    print(f"Elapsed:              {elapsed:.2f}s ({delivered / elapsed:,.0f} deliveries/s)")
+    for r in reports:
+        print(f"  worker {r['worker']}: {r['received']}/{r['expected']} received, "
+              f"{r['remote_messages']} remote, p50 {r['p50_ms']:.1f}ms, p99 {r['p99_ms']:.1f}ms")
+    print(f"Result:               {'✅ zero loss, in order' if ok else '❌ loss detected'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-workflow event channels.
+
+Runs N concurrent workflows. Each one has an Agent-style producer thread
+emitting events into workflow_event_queue, and a WorkflowEventListener
+draining its own channel on the event loop. The WebSocket broadcaster is
+replaced with an in-memory recorder. The benchmark then checks that every
+workflow received exactly its own events, in order.
+
+Usage:
+    python scripts/benchmark_workflow_events.py
+    python scripts/benchmark_workflow_events.py --workflows 50 --events 400 --producer-delay 0.0005
+"""
+
+import argparse
+import asyncio
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path (labos-be root)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.workflows.workflow_events import workflow_event_queue, WorkflowEvent
+from app.services.workflows import workflow_event_listener
+from app.services.workflows.workflow_event_listener import start_workflow_listener, stop_workflow_listener
+
+
+class RecordingBroadcaster:
+    """Stands in for websocket_broadcaster and records what each workflow received"""
+
+    def __init__(self):
+        self.received = defaultdict(list)
+
+    async def send_workflow_step(self, workflow_id, step_data, project_id=None):
+        self.received[workflow_id].append(step_data)
+
+
+def produce(workflow_id: str, events: int, delay: float):
+    """Agent-thread producer"""
+    for i in range(1, events + 1):
+        workflow_event_queue.put(WorkflowEvent(
+            workflow_id=workflow_id,
+            event_type="step",
+            timestamp=datetime.now(),
+            step_number=i,
+            title=f"step {i}"
+        ), block=True, timeout=5)
+        if delay:
+            time.sleep(delay)
+
+
+async def run(workflows: int, events: int, delay: float) -> bool:
+    recorder = RecordingBroadcaster()
+    workflow_event_listener.websocket_broadcaster = recorder
+
+    workflow_ids = [f"bench_workflow_{i}" for i in range(workflows)]
+    listeners = []
+    for workflow_id in workflow_ids:
+        workflow_event_queue.register_workflow(workflow_id)
+        listeners.append(await start_workflow_listener(workflow_id, project_id=f"project_{workflow_id}"))
+
+    started = time.perf_counter()
+    await _run_producers(workflow_ids, events, delay)
+
+    for task in listeners:
+        await stop_workflow_listener(task, grace_period=5)
+    elapsed = time.perf_counter() - started
+
+    stats = workflow_event_queue.get_stats()
+    for workflow_id in workflow_ids:
+        workflow_event_queue.unregister_workflow(workflow_id)
+
+    ok = True
+    lost = 0
+    foreign = 0
+    for workflow_id in workflow_ids:
+        received = recorder.received[workflow_id]
+        foreign += sum(1 for msg in received if msg["workflow_id"] != workflow_id)
+        steps = [msg["step_number"] for msg in received]
+        if steps != list(range(1, events + 1)):
+            ok = False
+            lost += events - len(steps)
+
+    total = workflows * events
+    delivered = sum(len(v) for v in recorder.received.values())
+    print("\n=== Workflow event channel benchmark ===")
+    print(f"Workflows:            {workflows}")
+    print(f"Events per workflow:  {events}")
+    print(f"Delivered:            {delivered}/{total}")
+    print(f"Lost:                 {lost}")
+    print(f"Cross-workflow:       {foreign}")
+    print(f"Dropped (registry):   {stats['events_dropped']}")
+    print(f"Elapsed:              {elapsed:.2f}s ({delivered / elapsed:,.0f} events/s)")
+    print(f"Result:               {'✅ zero loss, in order' if ok and not foreign else '❌ loss detected'}")
+    return ok and not foreign
+
+
+async def _run_producers(workflow_ids, events, delay):
+    """Run one dedicated producer thread per workflow, like concurrent Agent runs"""
+    threads = [
+        threading.Thread(target=produce, args=(workflow_id, events, delay), daemon=True)
+        for workflow_id in workflow_ids
+    ]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        await asyncio.sleep(0.01)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-workflow event channels")
+    parser.add_argument("--workflows", type=int, default=50)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--producer-delay", type=float, default=0.0)
+    args = parser.parse_args()
+
+    ok = asyncio.run(run(args.workflows, args.events, args.producer_delay))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
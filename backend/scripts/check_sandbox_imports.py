@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Check the import guard of sandboxed Python code.
+
+Runs snippets through kernel_runtime.run_code (the code path of the kernel
+processes) in a temporary sandbox and checks that process execution and
+the server environment stay out of reach, while ordinary imports work.
+
+Usage:
+    python scripts/check_sandbox_imports.py
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path (labos-be root)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.sandbox.kernel_runtime import run_code
+
+# (description, code, expected to succeed)
+CASES = [
+    ("import os; os.system", "import os\nos.system('true')", False),
+    ("import os; os.popen", "import os\nos.popen('true')", False),
+    ("from os import system", "from os import system", False),
+    ("os.path.os escape", "import os.path\nos.path.os.system('true')", False),
+    ("from os.path import os", "from os.path import os as real_os\nreal_os.system('true')", False),
+    ("import importlib", "import importlib", False),
+    ("import builtins", "import builtins", False),
+    ("import shutil", "import shutil", False),
+    ("import pty", "import pty", False),
+    ("import posix", "import posix", False),
+    ("import subprocess", "import subprocess", False),
+    ("API keys in os.environ", "import os\nassert 'LABOS_CHECK_SECRET' not in os.environ\nos.environ['LABOS_CHECK_SECRET']", False),
+    ("os.getcwd / os.path.join", "import os\nprint(os.path.join(os.getcwd(), 'x'))", True),
+    ("from os.path import join", "from os.path import join\nprint(join('a', 'b'))", True),
+    ("import statistics", "import statistics\nprint(statistics.mean([1, 2, 3]))", True),
+    ("numpy is usable", "print(np.arange(5).sum())", True),
+]
+
+
+def main():
+    os.environ["LABOS_CHECK_SECRET"] = "not-for-sandbox-code"
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        sandbox_root = Path(tmp) / "sandbox"
+        for description, code, should_succeed in CASES:
+            result = run_code(code, sandbox_root)
+            ok = result["success"] == should_succeed
+            failures += not ok
+            outcome = "ran" if result["success"] else (result["error"] or "").splitlines()[0]
+            print(f"{'✅' if ok else '❌'} {description}: {outcome}")
+
+    print(f"\nResult: {'✅ all checks passed' if not failures else f'❌ {failures} check(s) failed'}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -115,11 +115,12 @@ const ExpandableDescription: React.FC<{ description: string }> = ({ description
  * Cannot use hooks inside .map() - must be in a component at the top level.
  */
 const VisualizationImage: React.FC<{ viz: any }> = React.memo(({ viz }) => {
-  const [imageUrl, setImageUrl] = React.useState<string>(viz.base64 || '');
-  const [imageLoading, setImageLoading] = React.useState(!viz.base64);
+  // Artifact references come with a small thumbnail, shown until the full image is loaded
+  const [imageUrl, setImageUrl] = React.useState<string>(viz.base64 || viz.thumbnail || '');
+  const [imageLoading, setImageLoading] = React.useState(!viz.base64 && !viz.thumbnail);
 
   React.useEffect(() => {
-    if (!viz.file_id || viz.base64) return;
+    if ((!viz.file_id && !viz.artifact_url) || viz.base64) return;
 
     const fetchImage = async () => {
       try {
@@ -134,7 +135,8 @@ const VisualizationImage: React.FC<{ viz: any }> = React.memo(({ viz }) => {
           headers['Authorization'] = `Bearer ${token}`;
         }
 
-        const response = await fetch(`${config.api.baseUrl}/api/v1/files/${viz.file_id}/download`, {
+        const path = viz.artifact_url || `/api/v1/files/${viz.file_id}/download`;
+        const response = await fetch(`${config.api.baseUrl}${path}`, {
           headers,
           credentials: 'include'
         });
@@ -144,7 +146,7 @@ const VisualizationImage: React.FC<{ viz: any }> = React.memo(({ viz }) => {
           const blobUrl = URL.createObjectURL(blob);
           setImageUrl(blobUrl);
         } else {
-          console.error('Failed to load image:', viz.file_id, response.status);
+          console.error('Failed to load image:', viz.artifact_url || viz.file_id, response.status);
         }
       } catch (error) {
         console.error('Error fetching image:', error);
@@ -161,7 +163,7 @@ const VisualizationImage: React.FC<{ viz: any }> = React.memo(({ viz }) => {
         URL.revokeObjectURL(imageUrl);
       }
     };
-  }, [viz.file_id, viz.base64]);
+  }, [viz.file_id, viz.artifact_url, viz.base64]);
 
   if (imageLoading) {
     return (
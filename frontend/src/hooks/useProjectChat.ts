@@ -24,6 +24,7 @@ export const useProjectChat = (projectId: string, sessionIdProp?: string) => {
   const isSendingRef = useRef(false); // Use ref to track sending state across async operations
   const previousProjectIdRef = useRef<string>(projectId); // Track previous projectId
   const previousSessionIdRef = useRef<string | undefined | null>(sessionIdProp); // Track previous sessionId
+  const loadProjectDataRef = useRef<(() => Promise<void>) | undefined>(undefined); // Latest loadProjectData for WebSocket handlers
 
   const {
     messages,
@@ -676,14 +677,24 @@ export const useProjectChat = (projectId: string, sessionIdProp?: string) => {
     // Flag to track if subscription is active
     let isSubscribed = false;
 
+    let unsubscribeReplay: (() => void) | undefined;
+
     // Import and subscribe
-    import('@/services/websocket/manager').then(({ subscribeToProject }) => {
+    import('@/services/websocket/manager').then(({ subscribeToProject, subscribe }) => {
+      // Events missed while disconnected fell out of the server's replay buffer: refetch history
+      unsubscribeReplay = subscribe('workflow_replay', (message) => {
+        if (!message.complete && (!message.project_id || message.project_id === projectId)) {
+          console.log('🔄 Incomplete workflow replay, reloading project history:', message.workflow_id);
+          loadProjectDataRef.current?.();
+        }
+      });
       subscribeToProject(projectId);
       isSubscribed = true;
     });
 
     // Cleanup: unsubscribe when component unmounts or projectId changes
     return () => {
+      unsubscribeReplay?.();
       if (isSubscribed) {
         console.log('📌 Unsubscribing from project WebSocket room:', projectId);
         import('@/services/websocket/manager').then(({ unsubscribeFromProject }) => {
@@ -693,6 +704,10 @@ export const useProjectChat = (projectId: string, sessionIdProp?: string) => {
     };
   }, [projectId]);
 
+  useEffect(() => {
+    loadProjectDataRef.current = loadProjectData;
+  }, [loadProjectData]);
+
   // Load project data only when projectId changes (not when other dependencies change)
   useEffect(() => {
     console.log('🔍 useEffect triggered - projectId changed to:', projectId);
@@ -19,6 +19,11 @@ let globalState: WebSocketState | null = null;
 const messageHandlers = new Map<string, (message: WebSocketMessage) => void>();
 const statusHandlers = new Set<(status: ConnectionStatus) => void>();
 
+// Project rooms to rejoin after a reconnect
+const subscribedProjects = new Set<string>();
+// Highest seq received per workflow, sent as last_seq so the server replays only the gap
+const workflowSeqs = new Map<string, { projectId?: string; seq: number }>();
+
 /**
  * Initialize WebSocket connection
  */
@@ -36,6 +41,8 @@ async function initializeWebSocket(config?: Partial<WebSocketConfig>): Promise<v
   setHandlers(globalState, {
     onOpen: (event) => {
       console.log('✅ WebSocketManager: Connection opened');
+      // A new socket starts with no rooms: rejoin them and resume each workflow stream
+      subscribedProjects.forEach(projectId => sendProjectSubscription(projectId));
       notifyStatusHandlers('connected');
     },
     
@@ -139,9 +146,25 @@ function subscribeToProject(projectId: string): void {
   }
 
   console.log(`📌 WebSocketManager: Subscribing to project ${projectId}`);
+  subscribedProjects.add(projectId);
+  sendProjectSubscription(projectId);
+}
+
+/**
+ * Send subscribe_project with the last seen seq of the project's workflows
+ */
+function sendProjectSubscription(projectId: string): void {
+  const lastSeq: Record<string, number> = {};
+  workflowSeqs.forEach((entry, workflowId) => {
+    if (entry.projectId === projectId) {
+      lastSeq[workflowId] = entry.seq;
+    }
+  });
+
   send({
     type: 'subscribe_project',
-    project_id: projectId
+    project_id: projectId,
+    last_seq: lastSeq
   });
 }
 
@@ -155,6 +178,7 @@ function unsubscribeFromProject(projectId: string): void {
   }
 
   console.log(`📌 WebSocketManager: Unsubscribing from project ${projectId}`);
+  subscribedProjects.delete(projectId);
   send({
     type: 'unsubscribe_project',
     project_id: projectId
@@ -165,6 +189,20 @@ function unsubscribeFromProject(projectId: string): void {
  * Route incoming messages to handlers
  */
 function routeMessage(message: WebSocketMessage): void {
+  // Drop workflow events already received (e.g. replayed after a reconnect)
+  if (typeof message.seq === 'number' && message.workflow_id) {
+    const entry = workflowSeqs.get(message.workflow_id);
+    if (entry && message.seq <= entry.seq) {
+      return;
+    }
+    workflowSeqs.set(message.workflow_id, { projectId: message.project_id, seq: message.seq });
+  }
+
+  if (message.type === 'workflow_replay' && !message.complete) {
+    // Routed on below: the chat view reloads the project's history
+    console.warn(`⚠️ WebSocketManager: Could not replay all missed events of ${message.workflow_id}`);
+  }
+
   // Check for wildcard handler first
   const wildcardHandler = messageHandlers.get('*');
   if (wildcardHandler) {